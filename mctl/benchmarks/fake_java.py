@@ -0,0 +1,193 @@
+"""
+Stand-in for the ``java`` executable, so starting and stopping servers can be benchmarked without a JVM.
+
+    java [jvm flags] -jar fabric-installer.jar server -mcversion V [-downloadMinecraft]
+        writes fabric-server-launch.jar (and server.jar with -downloadMinecraft) into the working directory, like the Fabric installer
+
+    java [jvm flags] -jar server.jar [nogui]
+        prints a vanilla-like startup log ending in "Done (...)!", answers RCON if server.properties
+        enables it, and shuts down on "stop" (stdin or RCON) or SIGTERM
+
+FAKE_JAVA_STARTUP sets the seconds between launch and "Done" (default 0.5), FAKE_JAVA_VERSION the
+Minecraft version printed (default 1.21.1).
+
+To exercise mctld's watchdog, the console and RCON also accept 'lag MS' (log a "Can't keep up!"
+warning), 'join NAME' / 'leave NAME' (log a player joining or leaving) and 'hang' (stop logging and
+answering RCON, like a wedged server thread).
+"""
+import os
+import signal
+import socket
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+STOP = threading.Event()
+HUNG = threading.Event()
+
+
+def log(thread: str, message: str, level: str = "INFO") -> None:
+    print(f"[{time.strftime('%H:%M:%S')}] [{thread}/{level}]: {message}", flush=True)
+
+
+def game_command(command: str) -> Optional[str]:
+    """
+    Run a test command from the console or RCON, return its reply or None if it is not one.
+    """
+    word, _, arg = command.partition(" ")
+    if word == "lag":
+        behind = int(arg or 2000)
+        log("Server thread", f"Can't keep up! Is the server overloaded? Running {behind}ms or {behind // 50} ticks behind", "WARN")
+    elif word in ("join", "leave"):
+        log("Server thread", f"{arg or 'Steve'} {'joined' if word == 'join' else 'left'} the game")
+    elif word == "hang":
+        HUNG.set()
+    else:
+        return None
+    return ""
+
+
+def read_properties(path: Path) -> Dict[str, str]:
+    properties = {}
+    if path.exists():
+        for line in path.read_text(encoding="utf-8").splitlines():
+            if "=" in line and not line.startswith("#"):
+                key, _, value = line.partition("=")
+                properties[key.strip()] = value.strip()
+    return properties
+
+
+def fabric_installer(args: list) -> None:
+    version = args[args.index("-mcversion") + 1] if "-mcversion" in args else "1.21.1"
+    print(f"Installing Fabric server for {version}", flush=True)
+    Path("fabric-server-launch.jar").write_bytes(b"PK\x03\x04fabric-server-launch")
+    if "-downloadMinecraft" in args:
+        Path("server.jar").write_bytes(b"PK\x03\x04vanilla-" + version.encode("ascii"))
+    print("Done", flush=True)
+
+
+def _receive(conn: socket.socket) -> Optional[Tuple[int, int, str]]:
+    header = conn.recv(4, socket.MSG_WAITALL)
+    if len(header) < 4:
+        return None
+    (length,) = struct.unpack("<i", header)
+    packet = conn.recv(length, socket.MSG_WAITALL)
+    request_id, kind = struct.unpack("<ii", packet[:8])
+    return request_id, kind, packet[8:-2].decode("utf-8", errors="replace")
+
+
+def _send(conn: socket.socket, request_id: int, kind: int, body: str) -> None:
+    payload = struct.pack("<ii", request_id, kind) + body.encode("utf-8") + b"\x00\x00"
+    conn.sendall(struct.pack("<i", len(payload)) + payload)
+
+
+def rcon_session(conn: socket.socket, password: str) -> None:
+    authenticated = False
+    with conn:
+        while True:
+            packet = _receive(conn)
+            if packet is None:
+                return
+            request_id, kind, body = packet
+            if kind == 3:
+                authenticated = body == password
+                _send(conn, request_id if authenticated else -1, 2, "")
+            elif not authenticated:
+                return
+            elif kind == 2:
+                command = body.strip().lstrip("/")
+                if HUNG.is_set():
+                    # the server thread never picks the command up
+                    STOP.wait()
+                    return
+                if command == "stop":
+                    _send(conn, request_id, 0, "Stopping the server")
+                    STOP.set()
+                    return
+                replies = {
+                    "save-all": "Saving the game (this may take a moment!)Saved the game",
+                    "list": "There are 0 of a max of 20 players online: ",
+                }
+                reply = game_command(command)
+                _send(conn, request_id, 0, reply if reply is not None else replies.get(command.split(" ")[0], f"Unknown command: {command}"))
+            else:
+                _send(conn, request_id, 0, f"Unknown request {kind:x}")
+
+
+def rcon_listener(properties: Dict[str, str]) -> None:
+    port = int(properties.get("rcon.port") or 25575)
+    listener = socket.create_server((properties.get("server-ip") or "0.0.0.0", port))
+    log("Server thread", "Thread RCON Listener started")
+    log("RCON Listener #1", f"RCON running on 0.0.0.0:{port}")
+    while not STOP.is_set():
+        conn, _ = listener.accept()
+        threading.Thread(target=rcon_session, args=(conn, properties.get("rcon.password", "")), daemon=True).start()
+
+
+def console() -> None:
+    for line in sys.stdin:
+        if line.strip() == "stop" and not HUNG.is_set():
+            STOP.set()
+            return
+        game_command(line.strip())
+
+
+def server() -> None:
+    startup = float(os.environ.get("FAKE_JAVA_STARTUP", "0.5"))
+    version = os.environ.get("FAKE_JAVA_VERSION", "1.21.1")
+    signal.signal(signal.SIGTERM, lambda *_: None if HUNG.is_set() else STOP.set())
+    began = time.monotonic()
+
+    log("ServerMain", "Environment: Environment[sessionHost=https://sessionserver.mojang.com, servicesHost=https://api.minecraftservices.com, name=PROD]")
+    time.sleep(startup * 0.2)
+    log("Server thread", f"Starting minecraft server version {version}")
+    log("Server thread", "Loading properties")
+    properties = read_properties(Path("server.properties"))
+    log("Server thread", "Default game type: SURVIVAL")
+    log("Server thread", "Generating keypair")
+    log("Server thread", f"Starting Minecraft server on *:{properties.get('server-port') or 25565}")
+    time.sleep(startup * 0.2)
+    log("Server thread", f"Preparing level \"{properties.get('level-name') or 'world'}\"")
+    world = Path(properties.get("level-name") or "world")
+    world.mkdir(exist_ok=True)
+    if not (world / "level.dat").exists():
+        (world / "level.dat").write_bytes(os.urandom(1024))
+    for percent in (0, 25, 50, 75):
+        log("Worker-Main-1", f"Preparing spawn area: {percent}%")
+        time.sleep(startup * 0.15)
+    elapsed = time.monotonic() - began
+    log("Server thread", f"Time elapsed: {elapsed * 1000:.0f} ms")
+    log("Server thread", f"Done ({elapsed:.3f}s)! For help, type \"help\"")
+
+    if properties.get("enable-rcon", "").lower() == "true":
+        log("Server thread", "Starting remote control listener")
+        threading.Thread(target=rcon_listener, args=(properties,), daemon=True).start()
+    threading.Thread(target=console, daemon=True).start()
+
+    STOP.wait()
+    log("Server thread", "Stopping the server")
+    log("Server thread", "Stopping server")
+    log("Server thread", "Saving players")
+    log("Server thread", "Saving worlds")
+    log("Server thread", "ThreadedAnvilChunkStorage: All dimensions are saved")
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    if "-version" in args or "--version" in args:
+        print('openjdk version "21.0.4" 2024-07-16 (fake)', file=sys.stderr)
+        return
+    if "-jar" not in args:
+        sys.exit("Usage: java [options] -jar <jarfile> [args...]")
+    jar = args[args.index("-jar") + 1]
+    if "fabric-installer" in Path(jar).name:
+        fabric_installer(args)
+    else:
+        server()
+
+
+if __name__ == "__main__":
+    main()
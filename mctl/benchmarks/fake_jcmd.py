@@ -0,0 +1,116 @@
+"""
+Stand-in for the JDK's ``jcmd`` and ``jfr`` tools, so ``mctl profile`` can be exercised without a JVM.
+
+    jcmd PID JFR.start name=N [settings=S]    remembers when recording N started
+    jcmd PID JFR.stop name=N filename=F       writes synthetic JFR events for the time recorded to F
+    jcmd PID Thread.print -l                  prints a thread dump of a Minecraft-like server
+    jfr print --json [options] FILE           prints the events of a file written by JFR.stop
+
+Like the real jcmd, it fails when no process has the PID. Written files are JSON, not real .jfr recordings.
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+# (class, method, share of execution samples)
+HOT_METHODS = [
+    ("net.minecraft.server.level.ServerLevel", "tickChunk", 0.30),
+    ("net.minecraft.world.level.pathfinder.PathFinder", "findPath", 0.20),
+    ("net.minecraft.world.entity.Entity", "move", 0.15),
+    ("net.minecraft.world.level.chunk.LevelChunk", "getBlockState", 0.15),
+    ("java.util.HashMap", "getNode", 0.10),
+    ("net.minecraft.network.Connection", "send", 0.10),
+]
+THREADS = {"Server thread": 0.85, "Netty Epoll Server IO #1": 0.06, "Worker-Main-1": 0.04, "G1 Conc#0": 0.02}
+SAMPLES_PER_SECOND = 50
+
+
+def _state(pid: str, name: str) -> Path:
+    return Path(tempfile.gettempdir()) / f"fake-jcmd-{pid}-{name}"
+
+
+def _options(args: List[str]) -> Dict[str, str]:
+    return dict(arg.split("=", 1) for arg in args if "=" in arg)
+
+
+def _event(kind: str, values: Dict[str, Any]) -> Dict[str, Any]:
+    return {"type": kind, "values": values}
+
+
+def _events(seconds: float) -> List[Dict[str, Any]]:
+    rng = random.Random(42)
+    events = []
+    for _ in range(int(seconds * SAMPLES_PER_SECOND)):
+        owner, method, _ = rng.choices(HOT_METHODS, weights=[w for *_, w in HOT_METHODS])[0]
+        frame = {"method": {"type": {"name": owner}, "name": method}, "lineNumber": 1, "type": "JIT compiled"}
+        events.append(_event("jdk.ExecutionSample", {"stackTrace": {"truncated": True, "frames": [frame]}}))
+    for _ in range(max(1, int(seconds / 2))):
+        pause = rng.uniform(0.005, 0.040)
+        events.append(_event("jdk.GarbageCollection", {"name": "G1New", "sumOfPauses": f"PT{pause:.6f}S", "longestPause": f"PT{pause:.6f}S"}))
+    for _ in range(int(seconds * 20)):
+        events.append(_event("jdk.ObjectAllocationSample", {"weight": rng.randint(1, 4) * 1024 * 1024}))
+    for _ in range(max(1, int(seconds))):
+        for thread, load in THREADS.items():
+            events.append(_event("jdk.ThreadCPULoad", {"eventThread": {"javaName": thread}, "user": load * 0.9, "system": load * 0.1}))
+    return events
+
+
+def jcmd(args: List[str]) -> None:
+    if len(args) < 2:
+        sys.exit("Usage: jcmd <pid> <command> [arguments]")
+    pid, command, options = args[0], args[1], _options(args[2:])
+    try:
+        os.kill(int(pid), 0)
+    except (ValueError, ProcessLookupError):
+        print(f"{pid}:")
+        print(f"com.sun.tools.attach.AttachNotSupportedException: Unable to open socket file /proc/{pid}/root/tmp/.java_pid{pid}")
+        sys.exit(1)
+
+    print(f"{pid}:")
+    if command == "JFR.start":
+        _state(pid, options.get("name", "1")).write_text(str(time.time()), encoding="ascii")
+        print(f"Started recording {options.get('name')}.")
+    elif command == "JFR.stop":
+        state = _state(pid, options.get("name", "1"))
+        if not state.exists():
+            print(f"java.lang.IllegalArgumentException: Could not find recording {options.get('name')}")
+            return
+        seconds = time.time() - float(state.read_text(encoding="ascii"))
+        state.unlink()
+        Path(options["filename"]).write_text(json.dumps({"seconds": seconds, "events": _events(seconds)}), encoding="utf-8")
+        print(f"Stopped recording {options.get('name')}.")
+    elif command == "Thread.print":
+        print(time.strftime("%Y-%m-%d %H:%M:%S"))
+        print("Full thread dump OpenJDK 64-Bit Server VM (21.0.4+7, mixed mode, sharing):\n")
+        for i, thread in enumerate(THREADS):
+            print(f'"{thread}" #{i + 1} prio=5 os_prio=0 cpu=1.00ms elapsed=1.00s tid=0x{i:016x} nid={i} runnable')
+            print("   java.lang.Thread.State: RUNNABLE")
+            print(f"\tat {HOT_METHODS[i][0]}.{HOT_METHODS[i][1]}(Unknown Source)\n")
+    else:
+        print(f"java.lang.IllegalArgumentException: Unknown diagnostic command '{command}'")
+
+
+def jfr(args: List[str]) -> None:
+    if not args or args[0] != "print" or "--json" not in args:
+        sys.exit("Usage: jfr print --json [--stack-depth N] [--events E] FILE")
+    wanted = set(args[args.index("--events") + 1].split(",")) if "--events" in args else None
+    recording = json.loads(Path(args[-1]).read_text(encoding="utf-8"))
+    events = [e for e in recording["events"] if wanted is None or e["type"] in wanted]
+    print(json.dumps({"recording": {"events": events}}))
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    if args and args[0] == "print":
+        jfr(args)
+    else:
+        jcmd(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Startup benchmark: runs each mctl command under ``python -X importtime`` against a throwaway
+mctl home and records import time, wall time and the heavy modules each command pulls in.
+
+    poetry run python benchmarks/startup.py --runs 10 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+COMMANDS: Dict[str, List[str]] = {
+    "help": ["--help"],
+    "config get": ["config", "get", "bench", "motd"],
+    "config set": ["config", "set", "bench", "motd", "hello"],
+    "server info": ["server", "info", "bench"],
+    "stop": ["stop", "bench"],
+    "server install --help": ["server", "install", "--help"],
+}
+
+HEAVY_MODULES = ("requests", "yaml", "urllib3", "typer", "click")
+
+
+def prepare_home(root: Path) -> None:
+    server = root / ".mctl" / "servers" / "bench"
+    server.mkdir(parents=True)
+    (server / "server.properties").write_text("motd=A Minecraft Server\nmax-players=20\n", encoding="utf-8")
+    (server / "mctl.yaml").write_text(
+        f"name: bench\ntype: vanilla\nversion: 1.21.1\nmemory: 2G\njar: {server / 'server.jar'}\n", encoding="utf-8"
+    )
+
+
+def run_once(args: List[str], env: Dict[str, str]) -> Dict[str, object]:
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "mctl.cli.main", *args],
+        env=env, capture_output=True, text=True, check=False,
+    )
+    wall = time.perf_counter() - started
+
+    import_us = 0
+    modules = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        import_us += int(self_us)
+        modules.add(name.strip())
+    return {
+        "wall_ms": wall * 1000,
+        "import_ms": import_us / 1000,
+        "heavy": sorted(m for m in HEAVY_MODULES if m in modules),
+        "exit_code": proc.returncode,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file.")
+    opts = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as home:
+        prepare_home(Path(home))
+        env = {**os.environ, "HOME": home, "PYTHONPATH": str(SRC)}
+        for label, args in COMMANDS.items():
+            runs = [run_once(args, env) for _ in range(opts.runs)]
+            results[label] = {
+                "wall_ms": statistics.median(float(str(r["wall_ms"])) for r in runs),
+                "import_ms": statistics.median(float(str(r["import_ms"])) for r in runs),
+                "heavy_modules": runs[0]["heavy"],
+                "exit_code": runs[0]["exit_code"],
+            }
+
+    print(f"{'COMMAND':<24} {'WALL ms':>9} {'IMPORT ms':>10}  HEAVY MODULES")
+    for label, r in results.items():
+        print(f"{label:<24} {r['wall_ms']:>9.1f} {r['import_ms']:>10.1f}  {', '.join(r['heavy_modules'])}")
+
+    if opts.output:
+        opts.output.write_text(json.dumps({"python": sys.version, "runs": opts.runs, "commands": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+End-to-end benchmark suite. Runs mctl commands against a local stand-in for the Mojang, Paper, Purpur
+and Fabric APIs (upstream.py) with a fake java (fake_java.py), so it needs neither network nor a JVM.
+
+    poetry run python benchmarks/suite.py --runs 5 --output results.json
+    poetry run python benchmarks/suite.py --fleet-sizes 1,10,100 --compare results.json --output new.json
+
+Measured: cold install (empty artifact store and metadata cache) and cached install for every server
+type, start-to-ready, stop, a 1s profile (fake jcmd and jfr), config get/set, and fleet install, registry
+listing and upgrade at each fleet size.
+Every entry records the median/min/max wall time and the upstream requests per run. With --compare the
+medians are compared to an earlier results file, and the run fails if one got slower than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from upstream import VERSIONS, Upstream
+
+HERE = Path(__file__).resolve().parent
+SRC = HERE.parent / "src"
+TYPES = ("vanilla", "paper", "purpur", "fabric")
+VERSION = VERSIONS[-1]
+UPGRADE_VERSION = VERSIONS[0]
+# keep the fake servers' ports clear of anything real on this machine
+SERVER_PORT_START = 45565
+RCON_PORT_START = 45575
+# differences below this are noise for whole-process timings, whatever the percentage
+NOISE_MS = 10.0
+
+
+def install_command(server_type: str, prefix: str) -> Callable[[int], List[str]]:
+    return lambda i: ["server", "install", f"{prefix}-{i}", "-t", server_type, "-v", VERSION, "--eula-accept"]
+
+
+class Suite:
+
+    def __init__(self, root: Path, upstream: Upstream, mirror: str, runs: int, startup: float):
+        self.root = root
+        self.upstream = upstream
+        self.mirror = mirror
+        self.runs = runs
+        self.startup = startup
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.java = root / "bin" / "java"
+        self.java.parent.mkdir(parents=True)
+        # jcmd and jfr sit next to java, where 'mctl profile' looks for them
+        for tool, script in (("java", "fake_java.py"), ("jcmd", "fake_jcmd.py"), ("jfr", "fake_jcmd.py")):
+            path = self.java.parent / tool
+            path.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{HERE / script}" "$@"\n', encoding="utf-8")
+            path.chmod(0o755)
+
+    def home(self, name: str) -> Path:
+        home = self.root / name
+        (home / ".mctl").mkdir(parents=True)
+        (home / ".mctl" / "config.yaml").write_text(
+            # a small heap keeps start admission happy on small CI hosts, the fake server uses next to nothing
+            f"java_path: {self.java}\nmemory: 512M\nserver_port_start: {SERVER_PORT_START}\nrcon_port_start: {RCON_PORT_START}\n",
+            encoding="utf-8",
+        )
+        return home
+
+    def mctl(self, home: Path, args: List[str]) -> float:
+        """
+        Run one mctl command to completion.
+        :return: its wall time in milliseconds
+        """
+        env = {
+            **os.environ,
+            "HOME": str(home),
+            "PYTHONPATH": str(SRC),
+            "MCTL_MIRROR": self.mirror,
+            "FAKE_JAVA_STARTUP": str(self.startup),
+        }
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-m", "mctl.cli.main", *args],
+            env=env, stdin=subprocess.DEVNULL, capture_output=True, text=True, check=False,
+        )
+        wall = (time.perf_counter() - started) * 1000
+        if proc.returncode != 0:
+            raise SystemExit(f"'mctl {' '.join(args)}' failed with code {proc.returncode}:\n{proc.stdout}{proc.stderr}")
+        return wall
+
+    def measure(self, label: str, home: Path, command: Callable[[int], List[str]],
+                before: Optional[Callable[[int], None]] = None, runs: Optional[int] = None) -> None:
+        timings = []
+        requests = self.upstream.request_count()
+        for i in range(runs or self.runs):
+            if before is not None:
+                before(i)
+            timings.append(self.mctl(home, command(i)))
+        self.record(label, timings, self.upstream.request_count() - requests)
+
+    def record(self, label: str, timings: List[float], requests: int) -> None:
+        self.results[label] = {
+            "median_ms": statistics.median(timings),
+            "min_ms": min(timings),
+            "max_ms": max(timings),
+            "runs_ms": timings,
+            "upstream_requests": requests / len(timings),
+        }
+        print(f"{label:<28} {statistics.median(timings):>9.1f} ms  ({len(timings)} runs, {requests / len(timings):.1f} upstream requests/run)")
+
+    def installs(self, home: Path) -> None:
+        def clear_caches(_: int) -> None:
+            shutil.rmtree(home / ".mctl" / "artifacts", ignore_errors=True)
+            shutil.rmtree(home / ".mctl" / "cache" / "metadata", ignore_errors=True)
+
+        for server_type in TYPES:
+            self.measure(f"install/{server_type}/cold", home, install_command(server_type, f"{server_type}-cold"), before=clear_caches)
+            self.measure(f"install/{server_type}/cached", home, install_command(server_type, server_type))
+
+    def lifecycle(self, home: Path, name: str) -> None:
+        starts, stops = [], []
+        for _ in range(self.runs):
+            starts.append(self.mctl(home, ["start", name]))
+            stops.append(self.mctl(home, ["stop", name]))
+        self.record("start (to ready)", starts, 0)
+        self.record("stop", stops, 0)
+        self.mctl(home, ["start", name])
+        self.measure("profile (1s recording)", home, lambda i: ["profile", name, "--duration", "1s"])
+        self.mctl(home, ["stop", name])
+        self.measure("config get", home, lambda i: ["config", "get", name, "motd"])
+        self.measure("config set", home, lambda i: ["config", "set", name, "motd", f"bench-{i}"])
+
+    def fleet(self, size: int) -> None:
+        home = self.home(f"fleet-{size}")
+        spec = home / "fleet.yaml"
+        spec.write_text(json.dumps({
+            "defaults": {"type": "vanilla", "version": VERSION, "eula": True},
+            "servers": [{"name": f"node-{i}"} for i in range(size)],
+        }), encoding="utf-8")
+        self.measure(f"install/fleet/{size}", home, lambda i: ["server", "install", "--from", str(spec)], runs=1)
+        self.measure(f"server list/{size}", home, lambda i: ["server", "list"])
+        self.measure(f"server info/{size}", home, lambda i: ["server", "info", f"node-{size - 1}"])
+        # the servers are stopped, so this is staging and switching over without restarts
+        self.measure(f"upgrade/fleet/{size}", home, lambda i: ["server", "upgrade", "--all", "-v", UPGRADE_VERSION], runs=1)
+
+
+def compare(baseline: Dict[str, Any], results: Dict[str, Dict[str, Any]], threshold: float) -> bool:
+    """
+    Print the change of every median against a baseline results file.
+    :return: True if nothing got slower than threshold percent
+    """
+    ok = True
+    print(f"\n{'BENCHMARK':<28} {'BASELINE':>10} {'CURRENT':>10} {'CHANGE':>8}")
+    for label, current in results.items():
+        before = baseline.get("results", {}).get(label)
+        if before is None:
+            print(f"{label:<28} {'-':>10} {current['median_ms']:>10.1f} {'new':>8}")
+            continue
+        delta = current["median_ms"] - before["median_ms"]
+        change = delta / before["median_ms"] * 100 if before["median_ms"] else 0.0
+        regressed = change > threshold and delta > NOISE_MS
+        ok = ok and not regressed
+        print(f"{label:<28} {before['median_ms']:>10.1f} {current['median_ms']:>10.1f} {change:>+7.1f}%{'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--fleet-sizes", default="1,10,50", help="Comma separated fleet sizes for the registry benchmarks.")
+    parser.add_argument("--jar-mib", type=float, default=16, help="Size of every fake server jar.")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay the stand-in adds to every response.")
+    parser.add_argument("--startup-seconds", type=float, default=0.5, help="Time the fake server takes to report 'Done'.")
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file.")
+    parser.add_argument("--compare", type=Path, help="Earlier results file to compare the medians against.")
+    parser.add_argument("--threshold", type=float, default=10, help="Percent slowdown --compare reports as a regression.")
+    opts = parser.parse_args()
+    fleet_sizes = [int(size) for size in opts.fleet_sizes.split(",") if size]
+
+    with tempfile.TemporaryDirectory(prefix="mctl-bench-") as tmp, \
+            Upstream(jar_size=int(opts.jar_mib * 1024 * 1024), latency=opts.latency_ms / 1000) as upstream:
+        suite = Suite(Path(tmp), upstream, upstream.start(), opts.runs, opts.startup_seconds)
+        home = suite.home("main")
+        try:
+            suite.installs(home)
+            suite.lifecycle(home, "vanilla-0")
+            for size in fleet_sizes:
+                suite.fleet(size)
+        finally:
+            # never leave a fake server behind if a benchmark failed half way
+            subprocess.run(["pkill", "-f", str(HERE / "fake_java.py")], check=False)
+
+    report = {
+        "schema": 1,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "params": {
+            "runs": opts.runs,
+            "fleet_sizes": fleet_sizes,
+            "jar_bytes": int(opts.jar_mib * 1024 * 1024),
+            "latency_ms": opts.latency_ms,
+            "startup_seconds": opts.startup_seconds,
+        },
+        "results": suite.results,
+    }
+    if opts.output:
+        opts.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if opts.compare and not compare(json.loads(opts.compare.read_text(encoding="utf-8")), suite.results, opts.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
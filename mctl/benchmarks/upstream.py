@@ -0,0 +1,193 @@
+"""
+Local stand-in for the Mojang, Paper, Purpur and Fabric download APIs. Documents are served under
+``/<upstream host>/<path>``, the layout of an mctl mirror, so mctl reaches them through
+``MCTL_MIRROR`` without patching a single URL.
+
+    python benchmarks/upstream.py --port 8790 --jar-mib 8
+    MCTL_MIRROR=http://127.0.0.1:8790 mctl server install test -t paper -v 1.21.1
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Sequence, Type
+
+VERSIONS = ("1.20.6", "1.21.1")
+PAPER_BUILD = 132
+PURPUR_BUILD = 2329
+FABRIC_INSTALLER = "1.0.1"
+
+
+def fake_jar(seed: str, size: int) -> bytes:
+    """Incompressible bytes behind a zip signature, the same for the same seed."""
+    return b"PK\x03\x04" + random.Random(seed).randbytes(max(0, size - 4))
+
+
+class Upstream:
+    """
+    Serves the metadata documents and jars mctl's built-in server types download, with ETag
+    revalidation, HEAD and single byte ranges like the real APIs. Every request is counted so a
+    benchmark can tell how much of an operation went over the network.
+    """
+
+    def __init__(self, versions: Sequence[str] = VERSIONS, jar_size: int = 4 * 1024 * 1024, latency: float = 0.0):
+        self.versions = list(versions)
+        self.jar_size = jar_size
+        self.latency = latency
+        self.documents: Dict[str, bytes] = {}
+        self.requests: Counter = Counter()
+        self._lock = threading.Lock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._add_vanilla()
+        self._add_paper()
+        self._add_purpur()
+        self._add_fabric()
+
+    def _add(self, url: str, body: object) -> str:
+        path = url.split("://", 1)[1]
+        self.documents["/" + path] = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+        return url
+
+    def _add_vanilla(self) -> None:
+        entries = []
+        for version in self.versions:
+            jar = fake_jar(f"vanilla-{version}", self.jar_size)
+            sha1 = hashlib.sha1(jar).hexdigest()
+            jar_url = self._add(f"https://piston-data.mojang.com/v1/objects/{sha1}/server.jar", jar)
+            package = {"id": version, "downloads": {"server": {"url": jar_url, "sha1": sha1, "size": len(jar)}}}
+            package_sha1 = hashlib.sha1(json.dumps(package).encode("utf-8")).hexdigest()
+            url = self._add(f"https://piston-meta.mojang.com/v1/packages/{package_sha1}/{version}.json", package)
+            entries.append({"id": version, "type": "release", "url": url})
+        self._add("https://piston-meta.mojang.com/mc/game/version_manifest_v2.json", {
+            "latest": {"release": self.versions[-1], "snapshot": self.versions[-1]},
+            "versions": entries[::-1],
+        })
+
+    def _add_paper(self) -> None:
+        api = "https://api.papermc.io/v2/projects/paper"
+        self._add(api, {"project_id": "paper", "versions": self.versions})
+        for version in self.versions:
+            name = f"paper-{version}-{PAPER_BUILD}.jar"
+            jar = fake_jar(f"paper-{version}", self.jar_size)
+            self._add(f"{api}/versions/{version}/builds/{PAPER_BUILD}/downloads/{name}", jar)
+            self._add(f"{api}/versions/{version}/builds", {"builds": [
+                {"build": PAPER_BUILD, "downloads": {"application": {"name": name, "sha256": hashlib.sha256(jar).hexdigest()}}},
+            ]})
+
+    def _add_purpur(self) -> None:
+        api = "https://api.purpurmc.org/v2/purpur"
+        self._add(api, {"project": "purpur", "versions": self.versions})
+        for version in self.versions:
+            jar = fake_jar(f"purpur-{version}", self.jar_size)
+            self._add(f"{api}/{version}/{PURPUR_BUILD}/download", jar)
+            self._add(f"{api}/{version}/latest", {"build": str(PURPUR_BUILD), "md5": hashlib.md5(jar).hexdigest()})
+
+    def _add_fabric(self) -> None:
+        meta = "https://meta.fabricmc.net/v2/versions"
+        self._add(f"{meta}/game", [{"version": v, "stable": True} for v in reversed(self.versions)])
+        # the installer is small and the real one downloads the vanilla jar itself, see fake_java.py
+        jar = fake_jar("fabric-installer", 256 * 1024)
+        jar_url = self._add(f"https://maven.fabricmc.net/net/fabricmc/fabric-installer/{FABRIC_INSTALLER}/fabric-installer-{FABRIC_INSTALLER}.jar", jar)
+        self._add(f"{jar_url}.sha1", hashlib.sha1(jar).hexdigest().encode("ascii"))
+        self._add(f"{meta}/installer", [{"url": jar_url, "version": FABRIC_INSTALLER, "stable": True}])
+
+    def request_count(self) -> int:
+        with self._lock:
+            return sum(self.requests.values())
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Serve in a background thread.
+        :return: base URL to use as MCTL_MIRROR
+        """
+        handler: Type[_Handler] = type("BoundHandler", (_Handler,), {"upstream": self})
+        self._httpd = ThreadingHTTPServer((host, port), handler)
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, name="upstream", daemon=True).start()
+        return f"http://{host}:{self._httpd.server_address[1]}"
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "Upstream":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    upstream: Upstream
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: object) -> None:  # pylint: disable=redefined-builtin
+        pass
+
+    def do_HEAD(self) -> None:  # pylint: disable=invalid-name
+        self._respond(body=False)
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        self._respond(body=True)
+
+    def _respond(self, body: bool) -> None:
+        upstream = self.upstream
+        path = self.path.split("?", 1)[0]
+        with upstream._lock:  # pylint: disable=protected-access
+            upstream.requests[f"{self.command} {path}"] += 1
+        if upstream.latency:
+            time.sleep(upstream.latency)
+
+        data = upstream.documents.get(path)
+        if data is None:
+            self.send_error(404)
+            return
+        etag = f'"{hashlib.sha1(data).hexdigest()}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        first, last = 0, len(data) - 1
+        status = 200
+        ranged = self.headers.get("Range", "")
+        if ranged.startswith("bytes="):
+            start, _, end = ranged[len("bytes="):].partition("-")
+            first, last, status = int(start or 0), min(int(end) if end else last, last), 206
+        self.send_response(status)
+        self.send_header("Content-Type", "application/java-archive" if data[:2] == b"PK" else "application/json")
+        self.send_header("Content-Length", str(last - first + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {first}-{last}/{len(data)}")
+        self.end_headers()
+        if body:
+            self.wfile.write(data[first:last + 1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--jar-mib", type=float, default=4, help="Size of every fake server jar.")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay added to every response.")
+    opts = parser.parse_args()
+
+    upstream = Upstream(jar_size=int(opts.jar_mib * 1024 * 1024), latency=opts.latency_ms / 1000)
+    print(f"Upstream stand-in on {upstream.start(opts.host, opts.port)} (use it as MCTL_MIRROR)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        upstream.stop()
+
+
+if __name__ == "__main__":
+    main()
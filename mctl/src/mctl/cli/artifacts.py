@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import Optional
+
+import typer
+
+from mctl.core.constants import DEFAULT_HOME_PATH
+from mctl.core.utils.formatting import human_size
+
+app = typer.Typer(help="Downloaded server jars: list the artifact store and evict unused entries")
+
+
+@app.command("list")
+def list_artifacts() -> None:
+    """List stored jars, most recently used first."""
+    from mctl.core.servers.artifacts import ArtifactStore
+
+    blobs = ArtifactStore(DEFAULT_HOME_PATH).list()
+    if not blobs:
+        typer.echo("The artifact store is empty.")
+        return
+    typer.echo(f"{'SHA256':<14} {'SIZE':>10} {'LAST USED':<17} {'IN USE':<7} ARTIFACTS")
+    for b in blobs:
+        used = datetime.fromtimestamp(b.last_used).strftime("%Y-%m-%d %H:%M") if b.last_used else "-"
+        typer.echo(f"{b.sha256[:12]:<14} {human_size(b.size):>10} {used:<17} {'yes' if b.referenced else 'no':<7} {', '.join(b.names)}")
+    typer.echo(f"\n{len(blobs)} jars, {human_size(sum(b.size for b in blobs))}")
+
+
+@app.command()
+def gc(
+        max_size: Optional[str] = typer.Option(
+            None,
+            "--max-size",
+            help="Shrink the store to this size, e.g. 2G (default: artifacts_max_bytes, 0 evicts everything unused).",
+        ),
+    ) -> None:
+    """Evict least recently used jars that no server or image uses."""
+    from mctl.core.exceptions import InvalidCliArgument
+    from mctl.core.servers.artifacts import ArtifactStore
+    from mctl.core.servers.jvm import parse_memory
+    from mctl.core.settings import load_settings
+
+    try:
+        limit = parse_memory(max_size) * 1024 * 1024 if max_size is not None else int(load_settings()["artifacts_max_bytes"])
+    except InvalidCliArgument as e:
+        typer.echo(f"Error: {e}")
+        raise typer.Exit(code=1)
+    evicted = ArtifactStore(DEFAULT_HOME_PATH).collect_garbage(limit)
+    for b in evicted:
+        typer.echo(f"Evicted {b.sha256[:12]} ({', '.join(b.names) or 'unknown'}, {human_size(b.size)})")
+    typer.echo(f"{len(evicted)} jars evicted, {human_size(sum(b.size for b in evicted))} freed.")
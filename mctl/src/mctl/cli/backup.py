@@ -0,0 +1,104 @@
+from pathlib import Path
+from typing import Optional
+
+import typer
+
+from mctl.core.utils.formatting import human_size
+from mctl.core.utils.validators import validate_arg_alphanumeric
+
+app = typer.Typer(help="Incremental, deduplicated server backups: create, list, restore, prune and report")
+
+
+@app.command()
+def create(
+        name: str = typer.Argument(..., help="Name of the server instance.", callback=validate_arg_alphanumeric),
+        workers: Optional[int] = typer.Option(None, "--workers", help="Threads hashing and compressing chunks (default: CPUs, max 8)."),
+    ) -> None:
+    """Back up a server. A running server is flushed with save-all and autosave is paused meanwhile."""
+    from mctl.core.backup.manager import BackupManager
+    from mctl.core.exceptions import BackupError, RconError
+
+    try:
+        snapshot = BackupManager(workers=workers).create(name)
+    except (BackupError, RconError) as e:
+        typer.echo(f"Backup failed: {e}")
+        raise typer.Exit(code=1)
+
+    typer.echo(f"Backup '{snapshot.id}' of '{name}' created in {snapshot.seconds:.1f}s")
+    typer.echo(f"   Files:     {snapshot.files} ({human_size(snapshot.bytes_total)}), {snapshot.files_changed} changed")
+    typer.echo(f"   Read:      {human_size(snapshot.bytes_read)}")
+    typer.echo(f"   Stored:    {human_size(snapshot.bytes_stored)} in {snapshot.chunks_new} new chunks")
+    if snapshot.bytes_stored:
+        typer.echo(f"   Ratio:     {snapshot.bytes_total / snapshot.bytes_stored:.1f}x smaller than a full copy")
+
+
+@app.command("list")
+def list_backups(
+        name: str = typer.Argument(..., help="Name of the server instance.", callback=validate_arg_alphanumeric),
+    ) -> None:
+    """List the backups of a server."""
+    from mctl.core.backup.manager import BackupManager
+
+    snapshots = BackupManager().snapshots(name)
+    if not snapshots:
+        typer.echo(f"No backups of '{name}'.")
+        return
+    typer.echo(f"{'ID':<22} {'CREATED':<26} {'FILES':>7} {'CHANGED':>8} {'SIZE':>11} {'NEW DATA':>11}")
+    for s in snapshots:
+        typer.echo(f"{s.id:<22} {s.created:<26} {s.files:>7} {s.files_changed:>8} {human_size(s.bytes_total):>11} {human_size(s.bytes_stored):>11}")
+
+
+@app.command()
+def restore(
+        name: str = typer.Argument(..., help="Name of the server instance.", callback=validate_arg_alphanumeric),
+        snapshot_id: Optional[str] = typer.Argument(None, help="Backup to restore, the latest if omitted.", metavar="[BACKUP]"),
+        target: Optional[Path] = typer.Option(None, "--target", help="Restore into this directory instead of the (stopped) server."),
+    ) -> None:
+    """Restore a backup into the server directory or another directory."""
+    from mctl.core.backup.manager import BackupManager
+    from mctl.core.exceptions import BackupError
+
+    try:
+        snapshot, written = BackupManager().restore(name, snapshot_id, target)
+    except BackupError as e:
+        typer.echo(f"Restore failed: {e}")
+        raise typer.Exit(code=1)
+    typer.echo(f"Restored backup '{snapshot.id}' of '{name}': {written} of {snapshot.files} files written.")
+
+
+@app.command()
+def prune( # pylint: disable=too-many-positional-arguments,too-many-arguments
+        name: str = typer.Argument(..., help="Name of the server instance.", callback=validate_arg_alphanumeric),
+        keep_last: int = typer.Option(0, "--keep-last", help="Keep the newest N backups."),
+        keep_daily: int = typer.Option(0, "--keep-daily", help="Keep the newest backup of each of the last N days."),
+        keep_weekly: int = typer.Option(0, "--keep-weekly", help="Keep the newest backup of each of the last N weeks."),
+        keep_monthly: int = typer.Option(0, "--keep-monthly", help="Keep the newest backup of each of the last N months."),
+    ) -> None:
+    """Delete backups outside the retention policy and free chunks nothing references any more."""
+    from mctl.core.backup.manager import BackupManager
+    from mctl.core.exceptions import BackupError
+
+    try:
+        removed, chunks, freed = BackupManager().prune(name, keep_last, keep_daily, keep_weekly, keep_monthly)
+    except BackupError as e:
+        typer.echo(f"Prune failed: {e}")
+        raise typer.Exit(code=1)
+    typer.echo(f"Removed {len(removed)} backups of '{name}', deleted {chunks} chunks ({human_size(freed)} freed).")
+
+
+@app.command()
+def stats() -> None:
+    """Show how much the backup store saves through deduplication and compression."""
+    from mctl.core.backup.manager import BackupManager
+
+    report = BackupManager().report()
+    typer.echo(f"Backups:        {report.snapshots} of {len(report.servers)} servers")
+    for server, count in report.servers.items():
+        typer.echo(f"   {server}: {count}")
+    typer.echo(f"Logical size:   {human_size(report.logical_bytes)}")
+    typer.echo(f"Unique data:    {human_size(report.unique_bytes)} in {report.chunks} chunks")
+    typer.echo(f"On disk:        {human_size(report.stored_bytes)} ({report.codec})")
+    if report.unique_bytes and report.stored_bytes:
+        typer.echo(f"Dedup ratio:    {report.logical_bytes / report.unique_bytes:.1f}x")
+        typer.echo(f"Compression:    {report.unique_bytes / report.stored_bytes:.1f}x")
+        typer.echo(f"Overall:        {report.logical_bytes / report.stored_bytes:.1f}x")
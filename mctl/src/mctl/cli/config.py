@@ -1,6 +1,9 @@
+from pathlib import Path
+from typing import List, Optional
+
 import typer
 
-from mctl.core.servers.configurator import ServerConfigManager
+from mctl.core.constants import DEFAULT_HOME_PATH
 
 app = typer.Typer()
 
@@ -23,6 +26,8 @@ def set_server_property(
         ),
     ) -> None:
     """Set a configuration value in server.properties."""
+    from mctl.core.servers.configurator import ServerConfigManager
+
     try:
         cfg = ServerConfigManager(server_name)
         cfg.set(key, value)
@@ -46,6 +51,8 @@ def get_server_property(
         ),
     ) -> None:
     """Get a configuration value from server.properties."""
+    from mctl.core.servers.configurator import ServerConfigManager
+
     try:
         cfg = ServerConfigManager(server_name)
         value = cfg.get(key)
@@ -56,3 +63,56 @@ def get_server_property(
     except FileNotFoundError as e:
         typer.echo(f"Error: {e}")
         raise typer.Exit(1)
+
+
+@app.command("apply")
+def apply_properties( # pylint: disable=too-many-positional-arguments,too-many-arguments,too-many-locals
+        patch_file: Path = typer.Argument(
+            ...,
+            help="YAML file mapping server.properties keys to values.",
+            metavar="PATCH",
+            exists=True,
+            dir_okay=False,
+        ),
+        servers: Optional[List[str]] = typer.Option(None, "--servers", "-s", help="Servers to update, comma separated or repeated."),
+        group: Optional[str] = typer.Option(None, "--group", "-g", help="Update every server in this group."),
+        all_servers: bool = typer.Option(False, "--all", help="Update every installed server."),
+        dry_run: bool = typer.Option(False, "--dry-run", help="Only show what would change."),
+        max_parallel: int = typer.Option(16, "--max-parallel", help="Servers updated at the same time."),
+    ) -> None:
+    """Apply a set of properties to many servers, rewriting only files that change."""
+    import yaml
+    from mctl.core.servers.configurator import apply_patch
+    from mctl.core.servers.registry import ServerRegistry
+
+    with open(patch_file, encoding="utf-8") as f:
+        patch = yaml.safe_load(f) or {}
+    if not isinstance(patch, dict):
+        typer.echo(f"Error: {patch_file} must map property keys to values.")
+        raise typer.Exit(1)
+
+    if servers:
+        names = list(dict.fromkeys(n.strip() for item in servers for n in item.split(",") if n.strip()))
+    elif all_servers or group:
+        names = ServerRegistry(DEFAULT_HOME_PATH).select(group)
+    else:
+        typer.echo("Give --servers, --group or --all.")
+        raise typer.Exit(1)
+    if not names:
+        typer.echo("No matching servers.")
+        raise typer.Exit(1)
+
+    results = apply_patch(names, patch, max_parallel=max_parallel, dry_run=dry_run)
+    changed = 0
+    for name, result in results.items():
+        if isinstance(result, Exception):
+            typer.echo(f"[{name}] ERROR: {result}")
+            continue
+        changed += bool(result)
+        for key, (old, new) in result.items():
+            typer.echo(f"[{name}] {key}: {old if old is not None else '(unset)'} -> {new}")
+
+    verb = "would change" if dry_run else "changed"
+    typer.echo(f"{changed}/{len(results)} servers {verb}.")
+    if any(isinstance(r, Exception) for r in results.values()):
+        raise typer.Exit(1)
@@ -0,0 +1,73 @@
+import time
+
+import typer
+
+from mctl.core.constants import DEFAULT_HOME_PATH
+
+app = typer.Typer(help="mctld, the supervisor that owns server processes and restarts them when they crash")
+
+
+@app.command()
+def run() -> None:
+    """Run mctld in the foreground (use a service manager to keep it running)."""
+    from mctl.core.daemon.supervisor import run as run_supervisor
+    from mctl.core.exceptions import DaemonError
+
+    try:
+        run_supervisor(DEFAULT_HOME_PATH)
+    except DaemonError as e:
+        typer.echo(str(e))
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def status() -> None:
+    """Show whether mctld runs and the state of every server it supervises."""
+    from mctl.core.daemon.client import DaemonClient
+    from mctl.core.exceptions import DaemonError
+
+    client = DaemonClient.connect()
+    if client is None:
+        typer.echo("mctld is not running, servers are managed directly.")
+        raise typer.Exit(code=1)
+    try:
+        with client:
+            info = client.ping()
+            servers = client.status()
+    except DaemonError as e:
+        typer.echo(str(e))
+        raise typer.Exit(code=1)
+
+    typer.echo(f"mctld running (PID {info['pid']}, up {time.time() - info['started_at']:.0f}s), {info['running']} servers running\n")
+    typer.echo(f"{'SERVER':<24} {'STATE':<10} {'PID':>8} {'UPTIME':>8} {'RESTARTS':>8} {'POLICY':<10} LAST EXIT")
+    for s in servers:
+        uptime = f"{time.time() - s.started_at:.0f}s" if s.pid is not None and s.started_at is not None else "-"
+        state = s.state + ("*" if s.adopted else "")
+        typer.echo(f"{s.name:<24} {state:<10} {s.pid or '-':>8} {uptime:>8} {s.restarts:>8} {s.restart_policy:<10} "
+                   f"{s.exit_code if s.exit_code is not None else '-'}")
+    if any(s.adopted for s in servers):
+        typer.echo("\n* adopted: started before mctld, stopped over RCON and restarted without an exit code")
+
+
+@app.command()
+def stop() -> None:
+    """Stop mctld. Servers keep running and are adopted by the next mctld."""
+    from mctl.core.daemon.client import DaemonClient
+    from mctl.core.exceptions import DaemonError
+
+    client = DaemonClient.connect()
+    if client is None:
+        typer.echo("mctld is not running.")
+        return
+    try:
+        with client:
+            client.shutdown()
+    except DaemonError as e:
+        typer.echo(str(e))
+        raise typer.Exit(code=1)
+    typer.echo("mctld stopped.")
+
+
+def main() -> None:
+    """Entry point of the mctld script."""
+    typer.run(run)
@@ -0,0 +1,63 @@
+from typing import Optional
+
+import typer
+
+from mctl.core.utils.formatting import human_size
+from mctl.core.utils.validators import validate_arg_alphanumeric, validate_optional_arg_alphanumeric
+
+app = typer.Typer(help="Server images: capture an initialised server and clone new servers from it")
+
+
+@app.command()
+def create(
+        server: str = typer.Argument(..., help="Stopped server to capture.", callback=validate_arg_alphanumeric),
+        name: Optional[str] = typer.Option(
+            None,
+            "--name",
+            "-n",
+            help="Image name (default: the server name).",
+            callback=validate_optional_arg_alphanumeric,
+        ),
+        force: bool = typer.Option(False, "--force", "-f", help="Replace an existing image of the same name."),
+    ) -> None:
+    """Capture a server (jar, libraries, configs and worlds) as an image for 'server install --from-image'."""
+    from mctl.core.exceptions import ImageError
+    from mctl.core.images.manager import ImageManager
+
+    try:
+        image = ImageManager().create(server, name, force=force)
+    except ImageError as e:
+        typer.echo(f"Error: {e}")
+        raise typer.Exit(code=1)
+    typer.echo(f"Image '{image.name}' created from '{server}': {image.type} {image.version}, "
+               f"{image.files} files, {human_size(image.bytes)}.")
+
+
+@app.command("list")
+def list_images() -> None:
+    """List images."""
+    from mctl.core.images.manager import ImageManager
+
+    images = ImageManager().list()
+    if not images:
+        typer.echo("No images.")
+        return
+    typer.echo(f"{'NAME':<24} {'TYPE':<8} {'VERSION':<10} {'FROM':<20} {'FILES':>7} {'SIZE':>9} CREATED")
+    for i in images:
+        typer.echo(f"{i.name:<24} {i.type or '-':<8} {i.version or '-':<10} {i.server:<20} {i.files:>7} {human_size(i.bytes):>9} {i.created}")
+
+
+@app.command()
+def remove(
+        name: str = typer.Argument(..., help="Image to delete.", callback=validate_arg_alphanumeric),
+    ) -> None:
+    """Delete an image. Servers cloned from it are not affected."""
+    from mctl.core.exceptions import ImageError
+    from mctl.core.images.manager import ImageManager
+
+    try:
+        ImageManager().remove(name)
+    except ImageError as e:
+        typer.echo(f"Error: {e}")
+        raise typer.Exit(code=1)
+    typer.echo(f"Image '{name}' removed.")
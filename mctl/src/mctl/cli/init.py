@@ -1,11 +1,9 @@
 from pathlib import Path
 import typer
 
-from mctl.core.initialiser import ProjectInitialiser
-
 app = typer.Typer()
 
-DEFAULT_DIRS = ["servers", "downloads", "templates", "backups"]
+DEFAULT_DIRS = ["servers", "downloads", "templates", "backups", "images"]
 
 DEFAULT_CONFIG = {
     "java_path": "java",
@@ -32,6 +30,8 @@ def init(
     """
     Initialise the mctl environment - create directory structure to store configs, servers, downloads, etc.
     """
+    from mctl.core.initialiser import ProjectInitialiser
+
     initialiser = ProjectInitialiser(path)
 
     try:
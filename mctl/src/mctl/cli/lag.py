@@ -0,0 +1,85 @@
+import json
+import time
+from dataclasses import asdict
+from datetime import datetime
+from typing import Optional
+
+import typer
+
+from mctl.cli.logs import server_log_dir
+from mctl.core.utils.validators import validate_arg_alphanumeric
+
+app = typer.Typer()
+
+# width of the behind-time bar in the timeline
+BAR_WIDTH = 30
+
+
+@app.command()
+def lag( # pylint: disable=too-many-positional-arguments,too-many-arguments,too-many-locals
+        name: str = typer.Argument(..., help="Name of the server instance.", callback=validate_arg_alphanumeric),
+        since: str = typer.Option("1h", "--since", help="Start of the timeline, e.g. '2024-05-01 13:00', '13:00' or '6h'."),
+        until: Optional[str] = typer.Option(None, "--until", help="End of the timeline (default: now)."),
+        bucket: str = typer.Option("1m", "--bucket", help="Length of one timeline row, e.g. '30s', '5m' or '1h'."),
+        as_json: bool = typer.Option(False, "--json", help="Print the timeline as JSON, e.g. to join it with other metrics."),
+        workers: Optional[int] = typer.Option(None, "--workers", help="Processes decompressing archives (default: CPUs)."),
+    ) -> None:
+    """
+    Show a server's lag timeline: "Can't keep up!" warnings, ticks skipped, players online and, while mctld runs, CPU usage.
+    """
+    from mctl.core.daemon.client import DaemonClient
+    from mctl.core.exceptions import DaemonError, InvalidCliArgument
+    from mctl.core.servers.lag import lag_timeline
+    from mctl.core.servers.logs import parse_duration, parse_time
+
+    log_dir = server_log_dir(name)
+    try:
+        now = datetime.now()
+        start = parse_time(since, now)
+        end = parse_time(until, now) if until else None
+        bucket_seconds = parse_duration(bucket)
+    except InvalidCliArgument as e:
+        typer.echo(f"Error: {e}")
+        raise typer.Exit(code=1)
+    if bucket_seconds <= 0:
+        typer.echo("Error: --bucket must be a duration such as '1m'")
+        raise typer.Exit(code=1)
+
+    report = None
+    client = DaemonClient.connect()
+    if client is not None:
+        try:
+            with client:
+                report = client.lag(name)
+        except DaemonError as e:
+            typer.echo(f"mctld: {e}")
+
+    events, buckets = lag_timeline(log_dir, start, end, bucket_seconds, cpu=report.cpu if report else (), workers=workers)
+    if as_json:
+        typer.echo(json.dumps({
+            "server": name,
+            "bucket_seconds": bucket_seconds,
+            "events": [asdict(e) for e in events],
+            "buckets": [asdict(b) for b in buckets],
+            "watchdog": asdict(report) if report else None,
+        }, indent=2))
+        return
+
+    span_hours = max(1.0, (end or now).timestamp() - start.timestamp()) / 3600
+    typer.echo(f"\n📈  Lag of '{name}' since {start:%Y-%m-%d %H:%M}: {len(events)} warnings ({len(events) / span_hours:.1f}/h), "
+               f"{sum(e.behind_ms for e in events) / 1000:.1f}s behind, {sum(e.ticks for e in events)} ticks skipped, "
+               f"worst {max((e.behind_ms for e in events), default=0)} ms\n")
+    worst = max((b.behind_ms for b in buckets), default=0) or 1
+    typer.echo(f"{'TIME':<16} {'WARN':>4} {'BEHIND':>8} {'TICKS':>6} {'PLAYERS':>7} {'CPU%':>6}")
+    for b in buckets:
+        cpu = f"{b.cpu_percent:.0f}" if b.cpu_percent is not None else "-"
+        players = "-" if b.players is None else str(b.players)
+        meter = "█" * round(BAR_WIDTH * b.behind_ms / worst)
+        typer.echo(f"{datetime.fromtimestamp(b.start):%Y-%m-%d %H:%M} {b.warnings or '':>4} {b.behind_ms or '':>8} "
+                   f"{b.ticks or '':>6} {players:>7} {cpu:>6}  {meter}")
+
+    if report is not None:
+        silent = f", last log line {report.silent_for:.0f}s ago" if report.silent_for is not None else ""
+        typer.echo(f"\nWatchdog: {report.behind_ms} ms behind in the last {report.window:.0f}s{silent}")
+        for alert in report.alerts:
+            typer.echo(f"  {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(alert.at))} {alert.kind}: {alert.detail} ({alert.action})")
@@ -1,28 +1,137 @@
+import time
+from typing import List, Optional
+
 import typer
 
-from mctl.core.servers.manager import ServerManager
-from mctl.core.utils.validators import validate_arg_alphanumeric
+from mctl.core.constants import DEFAULT_HOME_PATH
+from mctl.core.interfaces import StartResult
+from mctl.core.utils.validators import validate_optional_arg_alphanumeric
 
 app = typer.Typer()
 
+
+def _select_servers(name: Optional[str], all_servers: bool, group: Optional[str]) -> List[str]:
+    from mctl.core.servers.registry import ServerRegistry
+
+    if name is not None:
+        if all_servers or group:
+            typer.echo("Give either a server NAME, --all or --group.")
+            raise typer.Exit(code=1)
+        return [name]
+    if not all_servers and not group:
+        typer.echo("Give a server NAME, --all or --group.")
+        raise typer.Exit(code=1)
+
+    names = ServerRegistry(DEFAULT_HOME_PATH).select(group)
+    if not names:
+        typer.echo("No matching servers.")
+        raise typer.Exit(code=1)
+    return names
+
+
+def _start_one(name: str, timeout: Optional[float], admission: Optional[str], wait: bool) -> StartResult:
+    from mctl.core.exceptions import DaemonError
+    from mctl.core.servers.lifecycle import start_server
+
+    try:
+        return start_server(name, timeout=timeout, admission=admission, wait=wait)
+    except DaemonError as e:
+        typer.echo(str(e))
+        raise typer.Exit(code=1)
+
+
+def _stop_one(name: str) -> None:
+    from mctl.core.exceptions import DaemonError
+    from mctl.core.servers.lifecycle import stop_server
+
+    try:
+        stop_server(name)
+    except DaemonError as e:
+        typer.echo(str(e))
+        raise typer.Exit(code=1)
+
+
 @app.command()
-def start(
-        name: str = typer.Argument(
-            ...,
+def start( # pylint: disable=too-many-positional-arguments,too-many-arguments,too-many-locals
+        name: Optional[str] = typer.Argument(
+            None,
             help="Name of the server instance.",
-            callback=validate_arg_alphanumeric,
+            callback=validate_optional_arg_alphanumeric,
+        ),
+        timeout: Optional[float] = typer.Option(
+            None,
+            "--timeout",
+            help="Seconds to wait for the server to report readiness (default depends on server type).",
+        ),
+        all_servers: bool = typer.Option(False, "--all", help="Start every installed server."),
+        group: Optional[str] = typer.Option(None, "--group", "-g", help="Start every server in this group."),
+        max_parallel: int = typer.Option(4, "--max-parallel", help="Servers warming up at the same time."),
+        stagger: float = typer.Option(2.0, "--stagger", help="Minimum seconds between two launches."),
+        admission: Optional[str] = typer.Option(
+            None,
+            "--admission",
+            help="When memory is short: refuse, queue (wait for memory) or off (default: 'admission' from config.yaml).",
         ),
+        wait: bool = typer.Option(True, "--wait/--no-wait", help="Wait for a single server to report readiness."),
     ) -> None:
-    typer.echo(f"Starting server '{name}'")
-    ServerManager(name).start()
+    from mctl.core.servers.admission import ADMISSION_MODES
+    from mctl.core.servers.lifecycle import FleetLifecycle
+
+    if admission is not None and admission not in ADMISSION_MODES:
+        typer.echo(f"Unknown admission mode '{admission}' (available: {', '.join(ADMISSION_MODES)})")
+        raise typer.Exit(code=1)
+    names = _select_servers(name, all_servers, group)
+    if name is not None:
+        typer.echo(f"Starting server '{name}'")
+        result = _start_one(name, timeout, admission, wait)
+        if not result.started:
+            raise typer.Exit(code=1)
+        return
+
+    began = time.perf_counter()
+    typer.echo(f"Starting {len(names)} servers (max {max_parallel} in parallel, {stagger:.1f}s stagger)")
+    results = FleetLifecycle(max_parallel=max_parallel, stagger=stagger).start(names, timeout=timeout, admission=admission)
+
+    typer.echo("")
+    typer.echo(f"{'SERVER':<24} {'RESULT':<10} {'PID':>8} {'READY IN':>9}")
+    for r in results:
+        status = "ready" if r.ready else ("started" if r.started else "FAILED")
+        ready_in = f"{r.time_to_ready:.1f}s" if r.time_to_ready is not None else "-"
+        typer.echo(f"{r.name:<24} {status:<10} {r.pid or '-':>8} {ready_in:>9}")
+    for r in results:
+        if r.error:
+            typer.echo(f"{r.name}: {r.error}")
+    typer.echo(f"\n{sum(r.ready for r in results)}/{len(results)} servers ready in {time.perf_counter() - began:.1f}s")
+    if not all(r.started for r in results):
+        raise typer.Exit(code=1)
+
 
 @app.command()
 def stop(
-        name: str = typer.Argument(
-            ...,
+        name: Optional[str] = typer.Argument(
+            None,
             help="Name of the server instance.",
-            callback=validate_arg_alphanumeric,
+            callback=validate_optional_arg_alphanumeric,
         ),
+        all_servers: bool = typer.Option(False, "--all", help="Stop every installed server."),
+        group: Optional[str] = typer.Option(None, "--group", "-g", help="Stop every server in this group."),
+        max_parallel: int = typer.Option(8, "--max-parallel", help="Servers stopping at the same time."),
     ) -> None:
-    typer.echo(f"Stopping server '{name}'")
-    ServerManager(name).stop()
+    from mctl.core.servers.lifecycle import FleetLifecycle
+
+    names = _select_servers(name, all_servers, group)
+    if name is not None:
+        typer.echo(f"Stopping server '{name}'")
+        _stop_one(name)
+        return
+
+    began = time.perf_counter()
+    typer.echo(f"Stopping {len(names)} servers")
+    results = FleetLifecycle(max_parallel=max_parallel).stop(names)
+
+    typer.echo("")
+    typer.echo(f"{'SERVER':<24} {'RESULT':<12} {'TIME':>8}")
+    for r in results:
+        took = f"{r.seconds:.1f}s" if r.seconds is not None else "-"
+        typer.echo(f"{r.name:<24} {'stopped' if r.stopped else 'not running':<12} {took:>8}")
+    typer.echo(f"\nDone in {time.perf_counter() - began:.1f}s")
@@ -0,0 +1,79 @@
+import re
+from collections import deque
+from datetime import date
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Optional
+
+import typer
+
+from mctl.core.constants import SERVERS_PATH
+from mctl.core.utils.validators import validate_arg_alphanumeric
+
+app = typer.Typer()
+
+
+def server_log_dir(name: str) -> Path:
+    """
+    Return a server's log directory, or exit if it has no logs.
+    """
+    log_dir = SERVERS_PATH / name / "logs"
+    if not log_dir.exists():
+        typer.echo(f"No logs found for '{name}'.")
+        raise typer.Exit(code=1)
+    return log_dir
+
+
+@app.command()
+def logs( # pylint: disable=too-many-positional-arguments,too-many-arguments,too-many-locals
+        name: str = typer.Argument(..., help="Name of the server instance.", callback=validate_arg_alphanumeric),
+        follow: bool = typer.Option(False, "--follow", "-f", help="Keep printing new lines as the server writes them."),
+        since: Optional[str] = typer.Option(None, "--since", help="Only lines at or after this time, e.g. '2024-05-01 13:00', '13:00' or '2h'."),
+        until: Optional[str] = typer.Option(None, "--until", help="Only lines at or before this time."),
+        grep: Optional[str] = typer.Option(None, "--grep", "-e", help="Only lines matching this regular expression."),
+        ignore_case: bool = typer.Option(False, "--ignore-case", "-i", help="Match --grep case-insensitively."),
+        lines: int = typer.Option(0, "--lines", "-n", help="Only print the last N matching lines, 0 prints all."),
+        workers: Optional[int] = typer.Option(None, "--workers", help="Processes decompressing archives (default: CPUs)."),
+    ) -> None:
+    """
+    Print a server's log. With --since, --until or --grep the archived logs are searched as well.
+    """
+    from mctl.core.exceptions import InvalidCliArgument
+    from mctl.core.servers.logs import complete_size, parse_time, search
+    from mctl.core.utils.logtail import LogFollower
+
+    log_dir = server_log_dir(name)
+    latest = log_dir / "latest.log"
+    # start following before searching: the search stops where the follower starts, so lines the
+    # server writes in the meantime are printed exactly once
+    follower = LogFollower(latest, offset=complete_size(latest)) if follow else None
+    try:
+        try:
+            start = parse_time(since) if since else None
+            end = parse_time(until) if until else None
+            found: Iterable[str] = search(log_dir, grep, ignore_case, start, end, workers, archives=bool(since or until or grep),
+                                          latest_bytes=follower.offset if follower is not None else None)
+            if lines > 0:
+                found = deque(found, maxlen=lines)
+            # one write per batch, large searches print millions of lines
+            it = iter(found)
+            while batch := list(islice(it, 1000)):
+                typer.echo("\n".join(batch))
+        except InvalidCliArgument as e:
+            typer.echo(f"Error: {e}")
+            raise typer.Exit(code=1)
+
+        if follower is None:
+            return
+        regex = re.compile(grep, re.IGNORECASE if ignore_case else 0) if grep else None
+        try:
+            while True:
+                for line in follower.read_lines():
+                    if regex is None or regex.search(line):
+                        typer.echo(f"{date.today().isoformat()} {line}")
+                follower.wait(1.0)
+        except KeyboardInterrupt:
+            pass
+    finally:
+        if follower is not None:
+            follower.close()
@@ -1,6 +1,10 @@
 import os
+from pathlib import Path
+from typing import Optional
+
 import typer
-from mctl.cli import lifecycles, init, servers, config
+from mctl.cli import lifecycles, init, servers, config, rcon, stats, backup, world, logs, images, artifacts, mirror, daemon, lag, profile
+from mctl.core.utils import timing
 
 os.environ["NO_COLOR"] = "1"
 
@@ -9,6 +13,54 @@ app.add_typer(init.app)
 app.add_typer(servers.app, name="server")
 app.add_typer(lifecycles.app)
 app.add_typer(config.app, name="config")
+app.add_typer(rcon.app)
+app.add_typer(stats.app)
+app.add_typer(backup.app, name="backup")
+app.add_typer(world.app, name="world")
+app.add_typer(logs.app)
+app.add_typer(lag.app)
+app.add_typer(profile.app)
+app.add_typer(images.app, name="image")
+app.add_typer(artifacts.app, name="artifacts")
+app.add_typer(mirror.app, name="mirror")
+app.add_typer(daemon.app, name="daemon")
+
+
+def _format_ms(ms: float) -> str:
+    return f"{ms / 1000:.2f}s" if ms >= 1000 else f"{ms:.1f}ms"
+
+
+def _report_timings(tracer: timing.Tracer, show: bool, trace: Optional[Path]) -> None:
+    if show:
+        wall_ms = tracer.wall_ns() / 1e6
+        typer.echo(f"\n⏱️  Timings ({_format_ms(wall_ms)} wall)", err=True)
+        typer.echo(f"{'PHASE':<40} {'CALLS':>5} {'TOTAL':>9} {'MAX':>9} {'WALL%':>6}", err=True)
+        for phase in tracer.phases():
+            label = "  " * phase.depth + phase.name
+            typer.echo(f"{label:<40} {phase.calls:>5} {_format_ms(phase.total_ms):>9} {_format_ms(phase.max_ms):>9} "
+                       f"{100 * phase.total_ms / max(wall_ms, 0.001):>5.1f}%", err=True)
+    if trace is not None:
+        tracer.write_trace(trace)
+        typer.echo(f"Trace written to {trace} (open it in ui.perfetto.dev or chrome://tracing)", err=True)
+
+
+@app.callback()
+def main_options(
+        ctx: typer.Context,
+        timings: bool = typer.Option(False, "--timings", help=f"Print how long each phase took (or set {timing.TIMINGS_ENV}=1)."),
+        trace: Optional[Path] = typer.Option(None, "--trace", help=f"Write a Chrome/Perfetto trace of the phases (or set {timing.TRACE_ENV}).", dir_okay=False),
+    ) -> None:
+    # timings stay off, and spans cost next to nothing, unless asked for
+    timings = timings or timing.timings_from_env()
+    env_trace = timing.trace_from_env()
+    trace = trace or (Path(env_trace) if env_trace else None)
+    if not timings and trace is None:
+        return
+    tracer = timing.enable()
+    # resources and callbacks are closed in reverse order: the command span ends before the report
+    ctx.call_on_close(lambda: _report_timings(tracer, timings, trace))
+    ctx.with_resource(tracer.span(f"mctl {ctx.invoked_subcommand}"))
+
 
 def main() -> None:
     app()
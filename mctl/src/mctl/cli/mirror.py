@@ -0,0 +1,63 @@
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import typer
+
+from mctl.core.utils.formatting import human_size
+
+app = typer.Typer(help="Local mirror of server metadata and jars for nodes with restricted egress")
+
+
+@app.command()
+def sync(
+        directory: Path = typer.Argument(..., help="Mirror directory to fill.", file_okay=False),
+        items: Optional[List[str]] = typer.Argument(None, help="TYPE:VERSION pairs, e.g. paper:1.21.1 vanilla:latest."),
+        fleet_spec: Optional[Path] = typer.Option(
+            None,
+            "--from",
+            help="Also mirror every type and version a fleet spec installs.",
+            exists=True,
+            dir_okay=False,
+        ),
+        workers: int = typer.Option(4, "--workers", help="Types/versions synced in parallel."),
+    ) -> None:
+    """Download metadata and jars for the given types and versions into a mirror directory."""
+    from mctl.core.servers.fleet import load_fleet_spec
+    from mctl.core.servers.mirror import sync as sync_mirror
+
+    wanted: List[Tuple[str, str]] = []
+    for item in items or []:
+        server_type, _, version = item.partition(":")
+        wanted.append((server_type.lower(), version or "latest"))
+    if fleet_spec is not None:
+        try:
+            wanted += [(spec.server_type, spec.version) for spec in load_fleet_spec(fleet_spec)]
+        except Exception as e:
+            typer.echo(f"Invalid fleet spec: {e}")
+            raise typer.Exit(code=1)
+    if not wanted:
+        typer.echo("Give TYPE:VERSION pairs or a fleet spec with --from.")
+        raise typer.Exit(code=1)
+
+    results = sync_mirror(directory, wanted, workers=workers)
+    typer.echo(f"\n{'TYPE':<8} {'VERSION':<10} {'RESOLVED':<12} {'SIZE':>10} RESULT")
+    for r in results:
+        size = human_size(r.size) if r.size is not None else "-"
+        typer.echo(f"{r.server_type:<8} {r.version:<10} {r.resolved or '-':<12} {size:>10} {r.error or 'ok'}")
+    if any(r.error for r in results):
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def serve(
+        directory: Path = typer.Argument(..., help="Mirror directory to serve.", exists=True, file_okay=False),
+        bind: str = typer.Option("127.0.0.1", "--bind", help="Address to listen on, 0.0.0.0 for every interface."),
+        port: int = typer.Option(8780, "--port", "-p", help="Port to listen on."),
+    ) -> None:
+    """Serve a mirror directory over HTTP for 'server install --mirror URL'."""
+    from mctl.core.servers.mirror import serve as serve_mirror
+
+    try:
+        serve_mirror(directory, bind, port)
+    except KeyboardInterrupt:
+        typer.echo("Mirror stopped.")
@@ -0,0 +1,73 @@
+from pathlib import Path
+from typing import Optional
+
+import typer
+
+from mctl.core.utils.validators import validate_arg_alphanumeric
+
+app = typer.Typer()
+
+
+@app.command()
+def profile( # pylint: disable=too-many-positional-arguments,too-many-arguments,too-many-locals
+        name: str = typer.Argument(..., help="Name of the server instance.", callback=validate_arg_alphanumeric),
+        duration: str = typer.Option("60s", "--duration", "-d", help="How long to record, e.g. '60s' or '5m'."),
+        thread_dumps: Optional[str] = typer.Option(None, "--thread-dumps", help="Also take a thread dump every interval, e.g. '10s'."),
+        top: int = typer.Option(15, "--top", help="Hot methods and threads to show."),
+        summary_only: Optional[Path] = typer.Option(
+            None,
+            "--summarize",
+            help="Only summarize an existing .jfr file, recorded for --duration.",
+            exists=True,
+            dir_okay=False,
+        ),
+    ) -> None:
+    """
+    Record a running server with Java Flight Recorder and summarize hot methods, GC pauses, allocation and thread CPU.
+    """
+    from mctl.core.exceptions import InvalidCliArgument, ProfileError
+    from mctl.core.servers.logs import parse_duration
+    from mctl.core.servers.profiler import JvmProfiler
+    from mctl.core.utils.formatting import human_size
+
+    try:
+        seconds = parse_duration(duration)
+        interval = parse_duration(thread_dumps) if thread_dumps else None
+        profiler = JvmProfiler(name)
+        if summary_only is not None:
+            jfr_path = summary_only
+        else:
+            if profiler.pid is None:
+                raise ProfileError(f"Server '{name}' is not running")
+            typer.echo(f"Recording '{name}' (PID {profiler.pid}) for {seconds:.0f}s with JFR settings '{profiler.jfr_settings}'...")
+            recording = profiler.record(seconds, interval)
+            jfr_path = Path(recording.jfr_path)
+            seconds = recording.seconds
+            typer.echo(f"Recording saved to {jfr_path}")
+            if recording.thread_dumps_path:
+                typer.echo(f"{recording.thread_dumps} thread dumps saved to {recording.thread_dumps_path}")
+        summary = profiler.summarize(jfr_path, seconds, top)
+    except (InvalidCliArgument, ProfileError) as e:
+        typer.echo(f"Error: {e}")
+        raise typer.Exit(code=1)
+    except KeyboardInterrupt:
+        typer.echo("Interrupted.")
+        raise typer.Exit(code=130)
+
+    typer.echo(f"\n🔥  Hot methods ({summary.samples} execution samples)")
+    for method, samples in summary.hot_methods:
+        typer.echo(f"   {100 * samples / summary.samples:5.1f}%  {samples:>7}  {method}")
+    if not summary.hot_methods:
+        typer.echo("   no samples")
+
+    typer.echo("\n🗑️  Garbage collection")
+    typer.echo(f"   {summary.gc_count} collections, {summary.gc_pause_total_ms:.0f} ms paused in total "
+               f"({100 * summary.gc_pause_total_ms / 1000 / max(summary.seconds, 0.001):.2f}% of the time), "
+               f"longest pause {summary.gc_pause_max_ms:.1f} ms")
+    typer.echo(f"   allocation rate {human_size(summary.allocation_rate)}/s")
+
+    typer.echo("\n🧵  Thread CPU (average % of one core)")
+    for thread, percent in summary.thread_cpu:
+        typer.echo(f"   {percent:5.1f}%  {thread}")
+    if not summary.thread_cpu:
+        typer.echo("   no samples")
@@ -0,0 +1,49 @@
+from typing import List, Optional
+
+import typer
+
+from mctl.core.constants import DEFAULT_HOME_PATH
+
+app = typer.Typer()
+
+
+@app.command()
+def rcon(
+        args: List[str] = typer.Argument(
+            ...,
+            help="SERVER followed by the console command, or just the command with --all/--group.",
+            metavar="[SERVER] COMMAND...",
+        ),
+        all_servers: bool = typer.Option(False, "--all", help="Send the command to every installed server."),
+        group: Optional[str] = typer.Option(None, "--group", "-g", help="Send the command to every server in this group."),
+        max_parallel: int = typer.Option(16, "--max-parallel", help="Servers contacted at the same time."),
+    ) -> None:
+    """Run a console command over RCON on one or many servers."""
+    from mctl.core.servers.rcon import broadcast
+    from mctl.core.servers.registry import ServerRegistry
+
+    if all_servers or group:
+        names = ServerRegistry(DEFAULT_HOME_PATH).select(group)
+        command = " ".join(args)
+    elif len(args) >= 2:
+        names, command = [args[0]], " ".join(args[1:])
+    else:
+        typer.echo("Give a SERVER and a COMMAND, or a COMMAND with --all/--group.")
+        raise typer.Exit(code=1)
+
+    if not names:
+        typer.echo("No matching servers.")
+        raise typer.Exit(code=1)
+
+    responses = broadcast(names, command, max_parallel)
+    for name, response in responses.items():
+        if isinstance(response, Exception):
+            typer.echo(f"[{name}] ERROR: {response}")
+        elif len(names) == 1:
+            typer.echo(response)
+        else:
+            for line in response.splitlines() or [""]:
+                typer.echo(f"[{name}] {line}")
+
+    if any(isinstance(r, Exception) for r in responses.values()):
+        raise typer.Exit(code=1)
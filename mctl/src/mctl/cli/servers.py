@@ -1,18 +1,21 @@
+import time
+from pathlib import Path
+from typing import List, Optional
+
 import typer
 
 from mctl.core.constants import DEFAULT_HOME_PATH
-from mctl.core.servers.installer import ServerInstaller, InstallArguments
-from mctl.core.servers.registry import ServerRegistry
-from mctl.core.utils.validators import validate_arg_alphanumeric
+from mctl.core.utils.timing import span
+from mctl.core.utils.validators import validate_arg_alphanumeric, validate_optional_arg_alphanumeric
 
 app = typer.Typer(help="Server tools: install new server, remove it, print server info")
 
 @app.command()
-def install( # pylint: disable=too-many-positional-arguments,too-many-arguments
-        name: str = typer.Argument(
-            ...,
-            help="Name of the server instance.",
-            callback=validate_arg_alphanumeric,
+def install( # pylint: disable=too-many-positional-arguments,too-many-arguments,too-many-locals
+        name: Optional[str] = typer.Argument(
+            None,
+            help="Name of the server instance. Omit when installing a fleet with --from.",
+            callback=validate_optional_arg_alphanumeric,
         ),
 
         server_type: str = typer.Option(
@@ -33,11 +36,11 @@ def install( # pylint: disable=too-many-positional-arguments,too-many-arguments
             help="Minecraft version (e.g., 1.21.1). Use 'latest' for newest version."
         ),
 
-        memory: str = typer.Option(
-            "2G",
+        memory: Optional[str] = typer.Option(
+            None,
             "--memory",
             "-m",
-            help="Maximum server memory allocation."
+            help="Maximum server memory allocation (default: the image's, or 'memory' from config.yaml)."
         ),
 
         eula: bool = typer.Option(
@@ -51,11 +54,79 @@ def install( # pylint: disable=too-many-positional-arguments,too-many-arguments
             "--first-start",
             help="Optional first start to generate world and configs and gracefully exit."
         ),
+
+        group: Optional[str] = typer.Option(
+            None,
+            "--group",
+            "-g",
+            help="Group the server belongs to, for fleet-wide start/stop."
+        ),
+
+        jvm_profile: Optional[str] = typer.Option(
+            None,
+            "--jvm-profile",
+            help="JVM tuning profile: default, aikar, zgc or shenandoah."
+        ),
+
+        offline: bool = typer.Option(
+            False,
+            "--offline",
+            help="Resolve versions and builds from the local metadata cache only (also MCTL_OFFLINE=1)."
+        ),
+
+        mirror: Optional[str] = typer.Option(
+            None,
+            "--mirror",
+            help="Resolve metadata and jars from an 'mctl mirror serve' URL instead of upstream (also MCTL_MIRROR).",
+        ),
+
+        image: Optional[str] = typer.Option(
+            None,
+            "--from-image",
+            help="Clone the server from an image made with 'mctl image create' instead of downloading it.",
+        ),
+
+        link: str = typer.Option(
+            "auto",
+            "--link",
+            help="--from-image: auto, reflink, hardlink or copy. Only jars and libraries are ever hardlinked.",
+        ),
+
+        fleet_spec: Optional[Path] = typer.Option(
+            None,
+            "--from",
+            help="Install every server listed in a fleet spec YAML file.",
+            exists=True,
+            dir_okay=False,
+        ),
+
+        workers: int = typer.Option(
+            4,
+            "--workers",
+            help="Fleet installs: servers provisioned in parallel."
+        ),
+
+        first_start_workers: int = typer.Option(
+            2,
+            "--first-start-workers",
+            help="Fleet installs: first starts running in parallel."
+        ),
     ) -> None:
-    typer.echo(f"Installing server: {server_type} {version}")
+    if fleet_spec is not None:
+        _install_fleet(fleet_spec, workers, first_start_workers, offline, mirror)
+        return
+    if name is None:
+        typer.echo("Provide a server NAME or a fleet spec with --from.")
+        raise typer.Exit(code=1)
+
+    with span("import modules"):
+        from mctl.core.servers.installer import ServerInstaller, InstallArguments
+
+    if image is None:
+        typer.echo(f"Installing server: {server_type} {version}")
 
     try:
-        ServerInstaller(DEFAULT_HOME_PATH).install(
+        ServerInstaller(DEFAULT_HOME_PATH, offline=offline, mirror=mirror).install(
             InstallArguments(
                 name=name.lower(),
                 server_type=server_type,
@@ -63,12 +134,107 @@ def install( # pylint: disable=too-many-positional-arguments,too-many-arguments
                 memory=memory,
                 eula=eula,
                 first_start=first_start,
+                group=group,
+                jvm_profile=jvm_profile,
+                image=image,
+                link=link,
             )
         )
     except Exception as e:
         typer.echo(str(e))
         raise typer.Exit(code=1)
 
+def _install_fleet(spec_path: Path, workers: int, first_start_workers: int, offline: bool, mirror: Optional[str]) -> None: # pylint: disable=too-many-positional-arguments,too-many-arguments
+    with span("import modules"):
+        from mctl.core.servers.fleet import FleetInstaller, load_fleet_spec
+
+    started = time.perf_counter()
+    try:
+        specs = load_fleet_spec(spec_path)
+    except Exception as e:
+        typer.echo(f"Invalid fleet spec: {e}")
+        raise typer.Exit(code=1)
+
+    typer.echo(f"Installing {len(specs)} servers from {spec_path}")
+    installer = FleetInstaller(DEFAULT_HOME_PATH, workers=workers, first_start_workers=first_start_workers, offline=offline, mirror=mirror)
+    results = installer.install(specs)
+
+    typer.echo("")
+    typer.echo(f"{'SERVER':<24} {'TYPE':<8} {'VERSION':<12} {'RESULT':<8} {'TIME':>8}")
+    for result in results:
+        status = "ok" if result.ok else "FAILED"
+        typer.echo(f"{result.name:<24} {result.server_type:<8} {result.version:<12} {status:<8} {result.seconds:>7.1f}s")
+        if result.error:
+            typer.echo(f"    {result.error}")
+
+    failed = sum(1 for r in results if not r.ok)
+    typer.echo(f"\n{len(results) - failed}/{len(results)} servers installed in {time.perf_counter() - started:.1f}s")
+    if failed:
+        raise typer.Exit(code=1)
+
+@app.command()
+def upgrade( # pylint: disable=too-many-positional-arguments,too-many-arguments,too-many-locals
+        names: Optional[List[str]] = typer.Argument(None, help="Servers to upgrade, also comma separated.", metavar="[SERVERS]..."),
+        version: str = typer.Option(..., "--version", "-v", help="Version to move to, e.g. 1.21.1 or latest."),
+        all_servers: bool = typer.Option(False, "--all", help="Upgrade every installed server."),
+        group: Optional[str] = typer.Option(None, "--group", "-g", help="Upgrade every server in this group."),
+        batch_size: int = typer.Option(1, "--batch-size", help="Running servers restarted at the same time, per wave."),
+        timeout: Optional[float] = typer.Option(
+            None,
+            "--timeout",
+            help="Seconds a restarted server has to report readiness before it is rolled back (default depends on server type).",
+        ),
+        workers: int = typer.Option(4, "--workers", help="Releases downloaded and servers staged in parallel."),
+        offline: bool = typer.Option(False, "--offline", help="Resolve versions and builds from the local metadata cache only."),
+        mirror: Optional[str] = typer.Option(None, "--mirror", help="Resolve metadata and jars from an 'mctl mirror serve' URL."),
+        dry_run: bool = typer.Option(False, "--dry-run", help="Only show which servers would move to which version."),
+    ) -> None:
+    """
+    Move servers to another version with one restart each, rolling back servers that do not become ready.
+    """
+    from mctl.core.servers.registry import ServerRegistry
+    from mctl.core.servers.upgrade import ServerUpgrader
+
+    selected = [n.strip() for item in names or [] for n in item.split(",") if n.strip()]
+    if selected and (all_servers or group):
+        typer.echo("Give either SERVERS, --all or --group.")
+        raise typer.Exit(code=1)
+    if not selected:
+        if not all_servers and not group:
+            typer.echo("Give SERVERS, --all or --group.")
+            raise typer.Exit(code=1)
+        selected = ServerRegistry(DEFAULT_HOME_PATH).select(group)
+    try:
+        for name in selected:
+            validate_arg_alphanumeric(name)
+    except typer.BadParameter as e:
+        typer.echo(f"Invalid server name: {e}")
+        raise typer.Exit(code=1)
+    if not selected:
+        typer.echo("No matching servers.")
+        raise typer.Exit(code=1)
+
+    began = time.perf_counter()
+    upgrader = ServerUpgrader(DEFAULT_HOME_PATH, batch_size=batch_size, timeout=timeout, workers=workers, offline=offline, mirror=mirror)
+    results = upgrader.upgrade(selected, version, dry_run=dry_run)
+
+    typer.echo("")
+    typer.echo(f"{'SERVER':<24} {'TYPE':<8} {'FROM':<12} {'TO':<12} {'RESULT':<12} {'DOWNTIME':>9}")
+    for r in results:
+        status = "will upgrade" if dry_run and r.status == "planned" else r.status
+        downtime = f"{r.downtime:.1f}s" if r.downtime is not None else "-"
+        typer.echo(f"{r.name:<24} {r.server_type:<8} {r.from_version or '-':<12} {r.to_version or '-':<12} {status:<12} {downtime:>9}")
+        if r.error:
+            typer.echo(f"    {r.error}")
+    if dry_run:
+        return
+
+    upgraded = sum(r.status == "upgraded" for r in results)
+    typer.echo(f"\n{upgraded}/{len(results)} servers upgraded in {time.perf_counter() - began:.1f}s")
+    if any(r.status not in ("upgraded", "up to date") for r in results):
+        raise typer.Exit(code=1)
+
+
 @app.command()
 def remove(
         name: str = typer.Argument(
@@ -77,6 +243,8 @@ def remove(
             callback=validate_arg_alphanumeric,
         ),
     ) -> None:
+    from mctl.core.servers.registry import ServerRegistry
+
     server_registry = ServerRegistry(DEFAULT_HOME_PATH.resolve())
 
     try:
@@ -99,6 +267,8 @@ def info(
             callback=validate_arg_alphanumeric,
         ),
     ) -> None:
+    from mctl.core.servers.registry import ServerRegistry
+
     server_registry = ServerRegistry(DEFAULT_HOME_PATH.resolve())
 
     try:
@@ -117,4 +287,83 @@ def info(
     typer.echo(f"   Memory:    {server_info.memory}")
     typer.echo(f"   Jar:       {server_info.jar}")
     typer.echo(f"   Java:      {server_info.java}")
+    _echo_live_state(name, server_registry.is_running(name))
     typer.echo("")
+
+
+def _echo_live_state(name: str, running: bool) -> None:
+    from mctl.core.daemon.client import DaemonClient
+    from mctl.core.exceptions import DaemonError
+
+    client = DaemonClient.connect()
+    if client is None:
+        typer.echo(f"   State:     {'running' if running else 'stopped'}")
+        return
+    try:
+        with client:
+            status = client.status(name)[0]
+    except DaemonError as e:
+        typer.echo(f"   State:     unknown ({e})")
+        return
+    state = status.state + (" (adopted)" if status.adopted else "")
+    if status.pid is not None and status.started_at is not None:
+        state += f", PID {status.pid}, up {time.time() - status.started_at:.0f}s"
+    if status.exit_code is not None:
+        state += f", last exit code {status.exit_code}"
+    typer.echo(f"   State:     {state}")
+    if status.time_to_ready is not None:
+        typer.echo(f"   Ready in:  {status.time_to_ready:.1f}s")
+    typer.echo(f"   Restarts:  {status.restarts} (policy {status.restart_policy})")
+    if status.next_restart is not None:
+        typer.echo(f"   Restart:   in {max(0.0, status.next_restart - time.time()):.0f}s")
+    if status.error:
+        typer.echo(f"   Error:     {status.error}")
+
+
+@app.command("list")
+def list_servers(
+        server_type: Optional[str] = typer.Option(None, "--type", "-t", help="Only servers of this type."),
+        version: Optional[str] = typer.Option(None, "--version", "-v", help="Only servers on this Minecraft version."),
+        group: Optional[str] = typer.Option(None, "--group", "-g", help="Only servers in this group."),
+        running: Optional[bool] = typer.Option(None, "--running/--stopped", help="Only running or only stopped servers."),
+    ) -> None:
+    """List installed servers."""
+    from mctl.core.servers.registry import ServerRegistry
+
+    servers = ServerRegistry(DEFAULT_HOME_PATH).list_servers(server_type=server_type, version=version, group=group, running=running)
+    if not servers:
+        typer.echo("No matching servers.")
+        return
+
+    typer.echo(f"{'NAME':<24} {'TYPE':<8} {'VERSION':<10} {'MEMORY':<7} {'GROUP':<12} STATUS")
+    for s in servers:
+        typer.echo(f"{s.name:<24} {s.type or '-':<8} {s.version or '-':<10} {s.memory or '-':<7} {s.group or '-':<12} "
+                   f"{'running' if s.running else 'stopped'}")
+
+
+@app.command("launch-cmd")
+def launch_cmd(
+        name: Optional[str] = typer.Argument(
+            None,
+            help="Name of the server instance.",
+            callback=validate_optional_arg_alphanumeric,
+        ),
+        all_servers: bool = typer.Option(False, "--all", help="Print the command of every installed server."),
+    ) -> None:
+    """Print the resolved java command line a server is started with."""
+    import shlex
+    from mctl.core.servers.manager import ServerManager
+    from mctl.core.servers.registry import ServerRegistry
+
+    if name is None and not all_servers:
+        typer.echo("Give a server NAME or --all.")
+        raise typer.Exit(code=1)
+
+    names = [name] if name is not None else ServerRegistry(DEFAULT_HOME_PATH).names()
+    for server in names:
+        try:
+            cmd = shlex.join(ServerManager(server).launch_command())
+        except Exception as e:
+            typer.echo(f"Cannot resolve launch command for '{server}': {e}")
+            raise typer.Exit(code=1)
+        typer.echo(cmd if name is not None else f"{server}: {cmd}")
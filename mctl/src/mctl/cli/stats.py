@@ -0,0 +1,112 @@
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import typer
+
+from mctl.core.constants import DEFAULT_HOME_PATH
+from mctl.core.interfaces import ProcessSample
+from mctl.core.utils.validators import validate_optional_arg_alphanumeric
+
+if TYPE_CHECKING:
+    from mctl.core.servers.registry import ServerRegistry
+
+app = typer.Typer()
+
+
+def _human(size: Optional[int]) -> str:
+    if size is None:
+        return "-"
+    value = float(size)
+    for unit in ("B", "K", "M", "G"):
+        if value < 1024:
+            return f"{value:.0f}{unit}" if unit == "B" else f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{value:.1f}T"
+
+
+def _server_pids(registry: "ServerRegistry", name: Optional[str], group: Optional[str]) -> Dict[str, Optional[int]]:
+    """
+    Resolve the PIDs of the selected servers from one read of the registry and their pid files.
+    """
+    names = [name] if name is not None else registry.select(group)
+    if not names:
+        typer.echo("No matching servers.")
+        raise typer.Exit(code=1)
+    return {n: registry.pid(n) for n in names}
+
+
+def _print_table(samples: List[ProcessSample], running_only: bool) -> None:
+    typer.echo(f"{'SERVER':<24} {'PID':>8} {'CPU%':>7} {'RSS':>8} {'PSS':>8} {'THR':>5} {'FDS':>6} {'READ':>8} {'WRITE':>8}")
+    for s in samples:
+        if not s.running:
+            if not running_only:
+                typer.echo(f"{s.name:<24} {'-':>8} {'stopped':>7}")
+            continue
+        cpu = f"{s.cpu_percent:.1f}" if s.cpu_percent is not None else "-"
+        typer.echo(
+            f"{s.name:<24} {s.pid:>8} {cpu:>7} {_human(s.rss_bytes):>8} {_human(s.pss_bytes):>8} {s.threads:>5} "
+            f"{s.open_fds if s.open_fds is not None else '-':>6} {_human(s.read_bytes):>8} {_human(s.write_bytes):>8}"
+        )
+
+
+@app.command()
+def stats(
+        name: Optional[str] = typer.Argument(
+            None,
+            help="Name of the server instance, all servers if omitted.",
+            callback=validate_optional_arg_alphanumeric,
+        ),
+        group: Optional[str] = typer.Option(None, "--group", "-g", help="Only servers in this group."),
+        interval: float = typer.Option(1.0, "--interval", help="Seconds between the two samples CPU usage is measured over."),
+        textfile: Optional[Path] = typer.Option(None, "--textfile", help="Also write a Prometheus textfile-collector file."),
+        quiet: bool = typer.Option(False, "--quiet", "-q", help="Do not print the table, e.g. when only writing --textfile."),
+    ) -> None:
+    """Show CPU, memory, threads, open files and I/O of running servers."""
+    from mctl.core.servers.metrics import MetricsSampler, write_textfile
+
+    from mctl.core.servers.registry import ServerRegistry
+
+    pids = _server_pids(ServerRegistry(DEFAULT_HOME_PATH), name, group)
+    with MetricsSampler() as sampler:
+        sampler.sample(pids)
+        time.sleep(max(0.0, interval))
+        samples = sampler.sample(pids)
+
+    if textfile is not None:
+        write_textfile(textfile, samples)
+    if not quiet:
+        _print_table(samples, running_only=False)
+
+
+@app.command()
+def top(
+        group: Optional[str] = typer.Option(None, "--group", "-g", help="Only servers in this group."),
+        interval: float = typer.Option(2.0, "--interval", help="Seconds between refreshes."),
+        textfile: Optional[Path] = typer.Option(None, "--textfile", help="Rewrite a Prometheus textfile-collector file on every refresh."),
+        iterations: int = typer.Option(0, "--iterations", "-n", help="Stop after this many refreshes, 0 runs until interrupted."),
+    ) -> None:
+    """Continuously show resource usage of running servers."""
+    from mctl.core.servers.metrics import MetricsSampler, write_textfile
+    from mctl.core.servers.registry import ServerRegistry
+
+    refreshes = 0
+    with MetricsSampler() as sampler:
+        # prime CPU deltas so the first screen already shows usage
+        sampler.sample(_server_pids(ServerRegistry(DEFAULT_HOME_PATH), None, group))
+        try:
+            while True:
+                time.sleep(max(0.1, interval))
+                # a fresh registry every round picks up added servers, and the pid files restarted ones
+                samples = sampler.sample(_server_pids(ServerRegistry(DEFAULT_HOME_PATH), None, group))
+                if textfile is not None:
+                    write_textfile(textfile, samples)
+
+                typer.echo("\x1b[H\x1b[2J", nl=False)
+                typer.echo(f"mctl top - {time.strftime('%H:%M:%S')}, {sum(s.running for s in samples)}/{len(samples)} servers running\n")
+                _print_table(samples, running_only=True)
+                refreshes += 1
+                if iterations and refreshes >= iterations:
+                    break
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,70 @@
+from typing import Dict, List, Optional
+
+import typer
+
+from mctl.core.utils.formatting import human_size
+from mctl.core.utils.validators import validate_arg_alphanumeric
+
+app = typer.Typer(help="World tools: analyze region files, prune unvisited chunks")
+
+
+@app.command()
+def analyze(
+        name: str = typer.Argument(..., help="Name of the server instance.", callback=validate_arg_alphanumeric),
+    ) -> None:
+    """Report chunk counts, sizes and wasted space per dimension, from region headers only."""
+    from mctl.core.exceptions import WorldError
+    from mctl.core.world.manager import WorldManager
+
+    try:
+        stats = WorldManager(name).analyze()
+    except WorldError as e:
+        typer.echo(f"Error: {e}")
+        raise typer.Exit(code=1)
+    if not stats:
+        typer.echo(f"No region files found for '{name}'.")
+        return
+
+    typer.echo(f"{'DIMENSION':<24} {'REGIONS':>8} {'CHUNKS':>8} {'ON DISK':>11} {'CHUNK DATA':>11} {'FREE':>10} {'SLACK':>10} {'WASTED':>7}")
+    for d in stats:
+        wasted = (d.free_bytes + d.slack_bytes) / d.file_bytes * 100 if d.file_bytes else 0.0
+        typer.echo(f"{d.dimension:<24} {d.regions:>8} {d.chunks:>8} {human_size(d.file_bytes):>11} {human_size(d.data_bytes):>11} "
+                   f"{human_size(d.free_bytes):>10} {human_size(d.slack_bytes):>10} {wasted:>6.1f}%")
+
+
+@app.command()
+def prune( # pylint: disable=too-many-locals
+        name: str = typer.Argument(..., help="Name of the server instance.", callback=validate_arg_alphanumeric),
+        min_inhabited: int = typer.Option(
+            ...,
+            "--min-inhabited",
+            help="Drop chunks players spent fewer ticks than this in (20 ticks = 1 second, 0 only compacts).",
+        ),
+        dry_run: bool = typer.Option(False, "--dry-run", help="Only report what would be removed."),
+        workers: Optional[int] = typer.Option(None, "--workers", help="Processes working on regions (default: CPUs)."),
+    ) -> None:
+    """Remove rarely visited chunks and compact region files. The server must be stopped; take a backup first."""
+    from mctl.core.exceptions import WorldError
+    from mctl.core.world.manager import WorldManager
+
+    try:
+        results = WorldManager(name).prune(min_inhabited, workers=workers, dry_run=dry_run)
+    except WorldError as e:
+        typer.echo(f"Error: {e}")
+        raise typer.Exit(code=1)
+
+    totals: Dict[str, List[int]] = {}
+    for r in results:
+        t = totals.setdefault(r.dimension, [0, 0, 0, 0, 0])
+        for i, value in enumerate((r.chunks, r.removed, r.unreadable, r.bytes_before, r.bytes_after)):
+            t[i] += value
+
+    typer.echo(f"{'DIMENSION':<24} {'CHUNKS':>8} {'REMOVED':>8} {'UNREADABLE':>10} {'BEFORE':>11} {'AFTER':>11}")
+    for dimension, t in totals.items():
+        typer.echo(f"{dimension:<24} {t[0]:>8} {t[1]:>8} {t[2]:>10} {human_size(t[3]):>11} {human_size(t[4]):>11}")
+    freed = sum(r.bytes_before - r.bytes_after for r in results)
+    verb = "would free" if dry_run else "freed"
+    typer.echo(f"\n{sum(r.removed for r in results)} chunks removed, {verb} {human_size(freed)}.")
+    corrupt = sum(r.corrupt for r in results)
+    if corrupt:
+        typer.echo(f"{corrupt} corrupt chunk entries (pointing into the header or past the end of the file) {'would be' if dry_run else 'were'} dropped.")
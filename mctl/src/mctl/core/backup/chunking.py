@@ -0,0 +1,47 @@
+import zlib
+from pathlib import Path
+from typing import Iterator
+
+# Region files (.mca) store every Minecraft chunk in whole 4 KiB sectors, so cut points are only
+# considered on sector boundaries: a changed chunk then only changes the backup chunks around its
+# own sectors, and boundary detection runs one crc32 per sector instead of a rolling hash per byte.
+SECTOR_SIZE = 4096
+MIN_CHUNK_SIZE = 16 * 1024
+MAX_CHUNK_SIZE = 1024 * 1024
+# a sector ends a chunk when the low bits of its crc32 are zero: on average every 16th sector past the minimum
+BOUNDARY_MASK = 0xF
+
+
+def find_cut(data: memoryview) -> int:
+    """
+    Return the end of the first content-defined chunk of data.
+    """
+    limit = min(len(data), MAX_CHUNK_SIZE)
+    pos = MIN_CHUNK_SIZE
+    while pos < limit:
+        if zlib.crc32(data[pos - SECTOR_SIZE:pos]) & BOUNDARY_MASK == 0:
+            return pos
+        pos += SECTOR_SIZE
+    return limit
+
+
+def file_chunks(path: Path) -> Iterator[bytes]:
+    """
+    Yield the content-defined chunks of a file, reading at most MAX_CHUNK_SIZE ahead.
+    """
+    with open(path, "rb", buffering=0) as f:
+        buffer = bytearray()
+        eof = False
+        while True:
+            while not eof and len(buffer) < MAX_CHUNK_SIZE:
+                block = f.read(MAX_CHUNK_SIZE - len(buffer))
+                if not block:
+                    eof = True
+                buffer += block
+            if not buffer:
+                return
+            with memoryview(buffer) as view:
+                cut = find_cut(view)
+                chunk = bytes(view[:cut])
+            del buffer[:cut]
+            yield chunk
@@ -0,0 +1,413 @@
+import hashlib
+import json
+import os
+import stat
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple, TypeVar
+
+from mctl.core.backup.chunking import file_chunks
+from mctl.core.backup.store import ChunkStore
+from mctl.core.constants import BACKUP_EXCLUDE_DIRS, BACKUP_EXCLUDE_FILES, DEFAULT_HOME_PATH
+from mctl.core.exceptions import BackupError, RconError
+from mctl.core.interfaces import BackupReport, BackupSnapshot
+from mctl.core.servers.manager import ServerManager
+from mctl.core.servers.rcon import rcon_settings, server_command
+from mctl.core.settings import load_settings
+from mctl.core.utils.filelock import file_lock
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# chunks being hashed/compressed or decompressed at once, per worker
+WINDOW_PER_WORKER = 4
+
+
+def _ordered_map(pool: Executor, fn: Callable[[T], R], items: Iterable[T], window: int) -> Iterator[R]:
+    """
+    Like pool.map, but with at most window items in flight so large inputs are streamed.
+    """
+    pending: Deque[Future] = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _retained(newest_first: List[BackupSnapshot], keep_last: int, keep_per_period: Dict[str, int]) -> Set[str]:
+    """
+    Ids of the newest keep_last snapshots plus the newest snapshot in each of the last N periods,
+    with periods given as strftime formats (e.g. '%Y-%m-%d' for days) mapped to N.
+    """
+    keep = {s.id for s in newest_first[:keep_last]}
+    for period_format, count in keep_per_period.items():
+        periods: Set[str] = set()
+        for s in newest_first:
+            period = datetime.fromisoformat(s.created).strftime(period_format)
+            if period in periods:
+                continue
+            if len(periods) >= count:
+                break
+            periods.add(period)
+            keep.add(s.id)
+    return keep
+
+
+def _snapshot_order(snapshot: BackupSnapshot) -> Tuple[str, str, int]:
+    """
+    Sort key for snapshots, oldest first. Ids taken within the same second are '<time>-1', '<time>-2', ...
+    which have to come after '<time>' and in numeric order, unlike their file names.
+    """
+    base, _, suffix = snapshot.id.partition("-")
+    return snapshot.created, base, int(suffix) if suffix.isdigit() else 0
+
+
+def _write_json(path: Path, data: Any) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+class _ChunkWriter:
+    """
+    Hashes and stores chunks on a thread pool while the caller keeps reading the next ones.
+    At most window chunks are queued, and a digest seen twice in one run is only written once.
+    """
+
+    def __init__(self, store: ChunkStore, pool: Executor, window: int):
+        self.store = store
+        self.pool = pool
+        self.window = window
+        self._inflight: Deque[Future] = deque()
+        self._pending: List[Tuple[Dict[str, Any], List[Future]]] = []
+        self._claimed: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def _put(self, data: bytes) -> Tuple[str, int, int]:
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if digest in self._claimed:
+                return digest, len(data), 0
+            self._claimed.add(digest)
+        return digest, len(data), self.store.put(digest, data)
+
+    def add_file(self, path: Path, entry: Dict[str, Any]) -> int:
+        """
+        Queue every chunk of a file; entry["chunks"] is filled in by finish().
+        :return: the number of bytes read
+        """
+        futures = []
+        read = 0
+        for data in file_chunks(path):
+            read += len(data)
+            future = self.pool.submit(self._put, data)
+            futures.append(future)
+            self._inflight.append(future)
+            if len(self._inflight) >= self.window:
+                self._inflight.popleft().result()
+        self._pending.append((entry, futures))
+        return read
+
+    def finish(self, snapshot: BackupSnapshot) -> None:
+        """
+        Wait for all queued chunks, record them in their file entries and count new ones in snapshot.
+        """
+        for entry, futures in self._pending:
+            entry["chunks"] = []
+            for future in futures:
+                digest, size, stored = future.result()
+                entry["chunks"].append([digest, size])
+                snapshot.chunks_new += bool(stored)
+                snapshot.bytes_stored += stored
+        self._pending.clear()
+
+
+class BackupManager:
+    """
+    Incremental, deduplicated backups of server directories.
+
+    Files are split into content-defined chunks that are stored once in a chunk store shared by
+    all servers. A snapshot is a manifest listing every file with its size, mtime and chunks;
+    files whose size and mtime match the previous snapshot reuse its chunk list without being read.
+
+    Layout under backups_root:
+        chunks/ab/abcd...                compressed chunks, named by sha256
+        snapshots/<server>/<id>.json     snapshot summary
+        snapshots/<server>/<id>.files.json  file manifest
+    """
+
+    def __init__(self, base_path: Path = DEFAULT_HOME_PATH, workers: Optional[int] = None):
+        self.base_path = base_path
+        root = Path(str(load_settings(base_path)["backups_root"])).expanduser()
+        self.root = root if root.is_absolute() else base_path / root
+        self.store = ChunkStore(self.root)
+        self.snapshots_dir = self.root / "snapshots"
+        self.lock_path = self.root / ".lock"
+        self.workers = max(1, workers or min(8, os.cpu_count() or 1))
+
+    def _server_dir(self, server: str) -> Path:
+        return self.base_path / "servers" / server
+
+    # snapshots
+
+    def snapshots(self, server: str) -> List[BackupSnapshot]:
+        """
+        Return the snapshots of a server, oldest first.
+        """
+        server_dir = self.snapshots_dir / server
+        if not server_dir.exists():
+            return []
+        result = []
+        for path in server_dir.glob("*.json"):
+            if path.name.endswith(".files.json"):
+                continue
+            with open(path, encoding="utf-8") as f:
+                result.append(BackupSnapshot(**json.load(f)))
+        return sorted(result, key=_snapshot_order)
+
+    def get_snapshot(self, server: str, snapshot_id: Optional[str] = None) -> BackupSnapshot:
+        """
+        Return a snapshot by id, or the latest one if no id is given.
+        """
+        snapshots = self.snapshots(server)
+        if not snapshots:
+            raise BackupError(f"No backups of server '{server}'")
+        if snapshot_id is None:
+            return snapshots[-1]
+        for snapshot in snapshots:
+            if snapshot.id == snapshot_id:
+                return snapshot
+        raise BackupError(f"Backup '{snapshot_id}' of server '{server}' not found")
+
+    def _load_files(self, server: str, snapshot_id: str) -> Dict[str, Dict[str, Any]]:
+        with open(self.snapshots_dir / server / f"{snapshot_id}.files.json", encoding="utf-8") as f:
+            files: Dict[str, Dict[str, Any]] = json.load(f)
+        return files
+
+    def _walk(self, root: Path) -> Iterator[Tuple[str, os.stat_result]]:
+        """
+        Yield (relative posix path, stat) of every regular file to back up.
+        """
+        for dirpath, dirnames, filenames in os.walk(root):
+            if dirpath == str(root):
+                dirnames[:] = [d for d in dirnames if d not in BACKUP_EXCLUDE_DIRS]
+            dirnames.sort()
+            for name in sorted(filenames):
+                if name in BACKUP_EXCLUDE_FILES or (name.startswith(".") and name.endswith(".tmp")):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.lstat(path)
+                except FileNotFoundError:
+                    continue
+                if stat.S_ISREG(st.st_mode):
+                    yield Path(os.path.relpath(path, root)).as_posix(), st
+
+    @contextmanager
+    def _quiesced(self, server: str) -> Iterator[None]:
+        """
+        Flush the world and pause autosave on a running server for the duration of the snapshot.
+        """
+        if ServerManager(server, self.base_path).pid() is None:
+            yield
+            return
+        if rcon_settings(server, self.base_path) is None:
+            print(f"⚠️ Server '{server}' is running without RCON, the backup may catch region files mid-write.")
+            yield
+            return
+
+        server_command(server, "save-off", base_path=self.base_path)
+        try:
+            server_command(server, "save-all flush", base_path=self.base_path)
+            yield
+        finally:
+            try:
+                server_command(server, "save-on", base_path=self.base_path)
+            except RconError as e:
+                print(f"⚠️ Could not re-enable autosave on '{server}': {e}")
+
+    def create(self, server: str) -> BackupSnapshot:
+        """
+        Snapshot a server directory. Only files changed since the previous snapshot are read.
+        """
+        server_dir = self._server_dir(server)
+        if not server_dir.exists():
+            raise BackupError(f"Server '{server}' not found in {server_dir}")
+
+        began = time.monotonic()
+        now = datetime.now(timezone.utc)
+        snapshot = BackupSnapshot(id=self._new_snapshot_id(server, now), server=server, created=now.isoformat(timespec="seconds"))
+        previous = self.snapshots(server)
+        previous_files = self._load_files(server, previous[-1].id) if previous else {}
+        files: Dict[str, Dict[str, Any]] = {}
+
+        # a chunk is only referenced by a manifest after it was written, and the shared lock keeps
+        # pruning from deleting chunks this snapshot is about to reuse
+        with file_lock(self.lock_path, shared=True), self._quiesced(server), \
+                ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="backup") as pool:
+            writer = _ChunkWriter(self.store, pool, self.workers * WINDOW_PER_WORKER)
+            for rel, st in self._walk(server_dir):
+                entry: Dict[str, Any] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "mode": st.st_mode & 0o7777}
+                prev = previous_files.get(rel)
+                if prev is not None and prev["size"] == st.st_size and prev["mtime_ns"] == st.st_mtime_ns:
+                    entry["chunks"] = prev["chunks"]
+                else:
+                    try:
+                        snapshot.bytes_read += writer.add_file(server_dir / rel, entry)
+                    except FileNotFoundError:
+                        continue
+                    snapshot.files_changed += 1
+                files[rel] = entry
+                snapshot.files += 1
+                snapshot.bytes_total += st.st_size
+
+            writer.finish(snapshot)
+            snapshot.seconds = round(time.monotonic() - began, 3)
+            _write_json(self.snapshots_dir / server / f"{snapshot.id}.files.json", files)
+            _write_json(self.snapshots_dir / server / f"{snapshot.id}.json", asdict(snapshot))
+        return snapshot
+
+    def _new_snapshot_id(self, server: str, now: datetime) -> str:
+        (self.snapshots_dir / server).mkdir(parents=True, exist_ok=True)
+        base = snapshot_id = now.strftime("%Y%m%dT%H%M%SZ")
+        suffix = 1
+        while (self.snapshots_dir / server / f"{snapshot_id}.json").exists():
+            snapshot_id = f"{base}-{suffix}"
+            suffix += 1
+        return snapshot_id
+
+    # restore
+
+    def _read_chunk(self, digest: str) -> bytes:
+        data = self.store.get(digest)
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise BackupError(f"Chunk {digest} is corrupted")
+        return data
+
+    def restore(self, server: str, snapshot_id: Optional[str] = None, target: Optional[Path] = None) -> Tuple[BackupSnapshot, int]:
+        """
+        Restore a snapshot into the (stopped) server directory, or into target.
+
+        Files are streamed chunk by chunk into temporary files and renamed into place. Files that
+        already match the snapshot's size and mtime are left alone. When restoring in place, files
+        the snapshot does not contain are removed (logs and other excluded paths are kept).
+        :return: the snapshot and the number of files written
+        """
+        snapshot = self.get_snapshot(server, snapshot_id)
+        files = self._load_files(server, snapshot.id)
+        in_place = target is None
+        target = self._server_dir(server) if target is None else target
+        if in_place and ServerManager(server, self.base_path).pid() is not None:
+            raise BackupError(f"Server '{server}' is running, stop it before restoring")
+        target.mkdir(parents=True, exist_ok=True)
+
+        written = 0
+        with file_lock(self.lock_path, shared=True), ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="restore") as pool:
+            for rel, entry in files.items():
+                dest = target / rel
+                try:
+                    st = dest.stat()
+                    if st.st_size == entry["size"] and st.st_mtime_ns == entry["mtime_ns"]:
+                        continue
+                except FileNotFoundError:
+                    pass
+
+                self._restore_file(pool, dest, entry)
+                written += 1
+
+        if in_place:
+            for rel, _ in list(self._walk(target)):
+                if rel not in files:
+                    (target / rel).unlink()
+        return snapshot, written
+
+    def _restore_file(self, pool: Executor, dest: Path, entry: Dict[str, Any]) -> None:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            digests = [digest for digest, _ in entry["chunks"]]
+            for data in _ordered_map(pool, self._read_chunk, digests, self.workers * WINDOW_PER_WORKER):
+                f.write(data)
+        os.chmod(tmp, entry["mode"])
+        os.utime(tmp, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+        os.replace(tmp, dest)
+
+    # retention
+
+    def prune(self, server: str, keep_last: int = 0, keep_daily: int = 0, keep_weekly: int = 0, keep_monthly: int = 0) -> Tuple[List[str], int, int]:
+        """
+        Delete snapshots outside the retention policy, then chunks no snapshot references any more.
+        Keeps the newest keep_last snapshots plus the newest snapshot of each of the last
+        keep_daily days, keep_weekly ISO weeks and keep_monthly months.
+        :return: removed snapshot ids, number of chunks deleted, bytes freed
+        """
+        if not any((keep_last, keep_daily, keep_weekly, keep_monthly)):
+            raise BackupError("Refusing to delete every backup, give at least one keep rule")
+
+        newest_first = list(reversed(self.snapshots(server)))
+        keep = _retained(newest_first, keep_last, {"%Y-%m-%d": keep_daily, "%G-W%V": keep_weekly, "%Y-%m": keep_monthly})
+
+        removed = []
+        with file_lock(self.lock_path):
+            for s in newest_first:
+                if s.id not in keep:
+                    (self.snapshots_dir / server / f"{s.id}.json").unlink()
+                    (self.snapshots_dir / server / f"{s.id}.files.json").unlink(missing_ok=True)
+                    removed.append(s.id)
+            chunks, freed = self._collect_garbage() if removed else (0, 0)
+        return removed, chunks, freed
+
+    def _referenced_chunks(self) -> Dict[str, int]:
+        """
+        Map every chunk referenced by any snapshot of any server to its uncompressed size.
+        """
+        referenced: Dict[str, int] = {}
+        if not self.snapshots_dir.exists():
+            return referenced
+        for manifest in self.snapshots_dir.glob("*/*.files.json"):
+            with open(manifest, encoding="utf-8") as f:
+                for entry in json.load(f).values():
+                    for digest, size in entry["chunks"]:
+                        referenced[digest] = size
+        return referenced
+
+    def _collect_garbage(self) -> Tuple[int, int]:
+        referenced = self._referenced_chunks()
+        chunks = freed = 0
+        for digest, _ in list(self.store.digests()):
+            if digest not in referenced:
+                size = self.store.delete(digest)
+                if size is not None:
+                    chunks += 1
+                    freed += size
+        return chunks, freed
+
+    # reporting
+
+    def report(self) -> BackupReport:
+        """
+        Summarise the backup store: logical size of all snapshots against unique and stored bytes.
+        """
+        report = BackupReport(codec=self.store.codec)
+        if self.snapshots_dir.exists():
+            for server_dir in sorted(p for p in self.snapshots_dir.iterdir() if p.is_dir()):
+                snapshots = self.snapshots(server_dir.name)
+                if snapshots:
+                    report.servers[server_dir.name] = len(snapshots)
+                    report.snapshots += len(snapshots)
+                    report.logical_bytes += sum(s.bytes_total for s in snapshots)
+
+        referenced = self._referenced_chunks()
+        report.chunks = len(referenced)
+        report.unique_bytes = sum(referenced.values())
+        report.stored_bytes = sum(size for _, size in self.store.digests())
+        return report
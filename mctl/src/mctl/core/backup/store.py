@@ -0,0 +1,118 @@
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Iterator, Optional, Tuple
+
+from mctl.core.exceptions import BackupError
+
+try:
+    import zstandard
+except ImportError:  # optional dependency, chunks fall back to zlib
+    zstandard = None
+
+ZSTD_LEVEL = 3
+ZLIB_LEVEL = 6
+
+# first byte of every stored chunk names its encoding
+RAW = b"r"
+ZLIB = b"z"
+ZSTD = b"s"
+
+
+class ChunkStore:
+    """
+    Content-addressed store of compressed chunks, shared by the backups of all servers.
+
+    Chunks are named by the sha256 of their uncompressed data and stored as chunks/ab/abcd...,
+    compressed with zstd if the zstandard package is installed and zlib otherwise. Chunks that do
+    not compress are kept raw. Compression releases the GIL, so put() scales across threads.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root / "chunks"
+        self._local = threading.local()
+
+    @property
+    def codec(self) -> str:
+        return "zstd" if zstandard is not None else "zlib"
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def has(self, digest: str) -> bool:
+        return self.path(digest).exists()
+
+    def _compress(self, data: bytes) -> Tuple[bytes, bytes]:
+        if zstandard is not None:
+            # compressor objects are not thread-safe, keep one per thread
+            compressor = getattr(self._local, "compressor", None)
+            if compressor is None:
+                compressor = self._local.compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+            return ZSTD, compressor.compress(data)
+        return ZLIB, zlib.compress(data, ZLIB_LEVEL)
+
+    def put(self, digest: str, data: bytes) -> int:
+        """
+        Store a chunk unless it is already present.
+        :return: bytes written to disk, 0 if the chunk already existed
+        """
+        path = self.path(digest)
+        if path.exists():
+            return 0
+        codec, payload = self._compress(data)
+        if len(payload) >= len(data):
+            codec, payload = RAW, data
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{digest}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(codec)
+            f.write(payload)
+        os.replace(tmp, path)
+        return len(payload) + 1
+
+    def get(self, digest: str) -> bytes:
+        try:
+            blob = self.path(digest).read_bytes()
+        except FileNotFoundError:
+            raise BackupError(f"Chunk {digest} is missing from the backup store")
+
+        codec, payload = blob[:1], blob[1:]
+        if codec == RAW:
+            return payload
+        if codec == ZLIB:
+            return zlib.decompress(payload)
+        if codec == ZSTD:
+            if zstandard is None:
+                raise BackupError("Backup chunks are zstd-compressed, install the 'zstandard' package to read them")
+            decompressor: Any = getattr(self._local, "decompressor", None)
+            if decompressor is None:
+                decompressor = self._local.decompressor = zstandard.ZstdDecompressor()
+            return bytes(decompressor.decompress(payload))
+        raise BackupError(f"Chunk {digest} has an unknown encoding")
+
+    def digests(self) -> Iterator[Tuple[str, int]]:
+        """
+        Yield (digest, stored size) of every chunk in the store.
+        """
+        if not self.root.exists():
+            return
+        for bucket in os.scandir(self.root):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if not entry.name.startswith("."):
+                    yield entry.name, entry.stat().st_size
+
+    def delete(self, digest: str) -> Optional[int]:
+        """
+        Remove a chunk, returning the bytes freed or None if it did not exist.
+        """
+        path = self.path(digest)
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return None
+        return size
@@ -2,3 +2,31 @@ from pathlib import Path
 
 DEFAULT_HOME_PATH = Path("~/.mctl").expanduser()
 SERVERS_PATH = DEFAULT_HOME_PATH / "servers"
+
+# Readiness detection when starting a server: every server type logs the vanilla "Done (12.3s)!" line,
+# only the timeout differs per type. Both can be overridden per server in mctl.yaml with the
+# 'ready_pattern' and 'start_timeout' keys.
+DEFAULT_READY_PATTERN = r"Done \([\d.,]+s\)!"
+DEFAULT_START_TIMEOUT = 120
+START_TIMEOUTS = {
+    "vanilla": 120,
+    "paper": 120,
+    "purpur": 120,
+    "fabric": 300,
+}
+
+# First start: how long world generation may take, and how long 'stop' may take afterwards
+FIRST_START_TIMEOUT = 600
+SHUTDOWN_TIMEOUT = 60
+
+# Paths inside a server directory that backups skip (top-level names, or file names anywhere)
+BACKUP_EXCLUDE_DIRS = {"logs", "crash-reports", "cache", "debug"}
+BACKUP_EXCLUDE_FILES = {"pid", "session.lock"}
+
+# Paths inside a server directory that images skip; mctl.yaml is stored in the image metadata instead
+IMAGE_EXCLUDE_DIRS = {"logs", "crash-reports", "debug"}
+IMAGE_EXCLUDE_FILES = {"pid", "session.lock", "mctl.yaml"}
+# Top-level directories whose files a server only ever reads, plus every *.jar. Servers cloned from
+# an image may hardlink these; everything else (worlds, configs, and cache/, where Paper writes its
+# patched jar at runtime) is always a private copy.
+IMAGE_IMMUTABLE_DIRS = {"libraries", "versions", "bundler", ".fabric"}
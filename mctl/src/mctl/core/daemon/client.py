@@ -0,0 +1,102 @@
+import json
+import os
+import socket
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, List, Optional
+
+from mctl.core.constants import DEFAULT_HOME_PATH
+from mctl.core.exceptions import DaemonError
+from mctl.core.interfaces import LagReport, ServerStatus, StartResult, StopResult, WatchdogAlert
+
+SOCKET_NAME = "mctld.sock"
+CONNECT_TIMEOUT = 2.0
+
+
+def socket_path(base_path: Path = DEFAULT_HOME_PATH) -> Path:
+    return base_path / SOCKET_NAME
+
+
+def encode(message: Any) -> bytes:
+    """One request or response per line of JSON; dataclasses are sent as objects."""
+    return json.dumps(message, default=asdict, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class DaemonClient:
+    """
+    Blocking client for mctld's Unix socket. One request at a time per client; threads need their own.
+    """
+
+    def __init__(self, base_path: Path = DEFAULT_HOME_PATH):
+        self.path = socket_path(base_path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            self._sock.connect(str(self.path))
+        except OSError as e:
+            self._sock.close()
+            raise DaemonError(f"mctld is not running ({self.path}: {e})")
+        # a start may legitimately wait for readiness or memory for minutes
+        self._sock.settimeout(None)
+        self._reader = self._sock.makefile("rb")
+
+    @classmethod
+    def connect(cls, base_path: Path = DEFAULT_HOME_PATH) -> Optional["DaemonClient"]:
+        """
+        Return a client if mctld is running, None to fall back to managing servers directly.
+        MCTL_NO_DAEMON=1 always falls back.
+        """
+        if os.environ.get("MCTL_NO_DAEMON", "").lower() in ("1", "true", "yes") or not socket_path(base_path).exists():
+            return None
+        try:
+            return cls(base_path)
+        except DaemonError:
+            return None
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def call(self, op: str, **args: Any) -> Any:
+        """
+        Run one operation on the daemon and return its result.
+        :raises DaemonError: if the daemon reports an error or the connection drops
+        """
+        try:
+            self._sock.sendall(encode({"op": op, "args": args}))
+            line = self._reader.readline()
+        except OSError as e:
+            raise DaemonError(f"Lost connection to mctld: {e}")
+        if not line:
+            raise DaemonError("mctld closed the connection")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise DaemonError(response.get("error") or "mctld request failed")
+        return response.get("result")
+
+    def ping(self) -> Any:
+        return self.call("ping")
+
+    def status(self, name: Optional[str] = None) -> List[ServerStatus]:
+        return [ServerStatus(**s) for s in self.call("status", name=name)]
+
+    def start(self, name: str, timeout: Optional[float] = None, admission: Optional[str] = None, wait: bool = True) -> StartResult:
+        return StartResult(**self.call("start", name=name, timeout=timeout, admission=admission, wait=wait))
+
+    def stop(self, name: str, timeout: Optional[float] = None) -> StopResult:
+        return StopResult(**self.call("stop", name=name, timeout=timeout))
+
+    def lag(self, name: str) -> LagReport:
+        report = LagReport(**self.call("lag", name=name))
+        report.cpu = [(float(s[0]), float(s[1])) for s in report.cpu]
+        report.alerts = [WatchdogAlert(**a) for a in report.alerts]  # type: ignore[arg-type]
+        return report
+
+    def shutdown(self) -> None:
+        self.call("shutdown")
+
+    def close(self) -> None:
+        self._reader.close()
+        self._sock.close()
@@ -0,0 +1,482 @@
+import asyncio
+import contextlib
+import json
+import os
+import re
+import signal
+import time
+from asyncio.subprocess import PIPE, STDOUT, Process
+from collections import deque
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from mctl.core.constants import DEFAULT_HOME_PATH, SHUTDOWN_TIMEOUT
+from mctl.core.daemon.client import DaemonClient, encode, socket_path
+from mctl.core.exceptions import AdmissionError, DaemonError, PortAllocationError
+from mctl.core.daemon.watchdog import WATCHDOG_INTERVAL, Watchdog
+from mctl.core.interfaces import LagReport, ServerStatus, StartResult, StopResult, WatchdogAlert
+from mctl.core.servers.manager import ServerManager
+from mctl.core.servers.registry import ServerRegistry
+from mctl.core.servers.lag import LagAnalyzer
+from mctl.core.settings import SETTINGS_DEFAULTS, load_settings
+from mctl.core.utils.logtail import LogFollower
+
+RESTART_POLICIES = ("no", "on-failure", "always")
+# a server that ran this long since its last launch counts as healthy again, its backoff starts over
+STABLE_SECONDS = 300
+# last log lines kept per server for crash reports
+LOG_TAIL_LINES = 20
+# a day of CPU samples, the watchdog samples every WATCHDOG_INTERVAL seconds
+CPU_HISTORY = 24 * 3600 // WATCHDOG_INTERVAL
+ALERT_HISTORY = 100
+
+
+class ManagedServer: # pylint: disable=too-many-instance-attributes
+    """
+    A server process started or adopted by the supervisor.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.status = ServerStatus(name=name, state="stopped")
+        self.process: Optional[Process] = None
+        self.watcher: Optional["asyncio.Task[None]"] = None
+        self.pending_restart: Optional["asyncio.Task[None]"] = None
+        # set once the server logged readiness or is gone again
+        self.ready = asyncio.Event()
+        self.exited = asyncio.Event()
+        # serialises start and stop of this server
+        self.lock = asyncio.Lock()
+        self.stop_requested = False
+        self.failures = 0
+        self.tail: Deque[str] = deque(maxlen=LOG_TAIL_LINES)
+        self.lag = LagAnalyzer(window=float(SETTINGS_DEFAULTS["watchdog_window"]))
+        # (time, CPU %) sampled by the watchdog
+        self.cpu: Deque[Tuple[float, float]] = deque(maxlen=CPU_HISTORY)
+        self.alerts: Deque[WatchdogAlert] = deque(maxlen=ALERT_HISTORY)
+        # watchdog problems (lag, hang) the server has now, and since when
+        self.problems: Dict[str, float] = {}
+
+    @property
+    def alive(self) -> bool:
+        return self.watcher is not None and not self.watcher.done()
+
+    def cancel_restart(self) -> None:
+        if self.pending_restart is not None:
+            self.pending_restart.cancel()
+            self.pending_restart = None
+            self.status.next_restart = None
+
+
+def _pidfd(pid: int) -> Optional[int]:
+    try:
+        return os.pidfd_open(pid)
+    except (AttributeError, OSError):
+        return None
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Supervisor:
+    """
+    Owns the server processes for as long as mctld runs and serves start/stop/status over a Unix socket.
+
+    Servers still write straight to logs/latest.log, so they outlive a daemon restart. The daemon keeps
+    their stdin open for the console 'stop', follows their logs through inotify to see readiness, and
+    reaps them, so every exit code is known. A server that exits without being stopped is restarted
+    according to its restart policy with exponential backoff. Servers already running when the daemon
+    starts (or started with MCTL_NO_DAEMON) are adopted: watched through a pidfd and stopped over RCON.
+    """
+
+    def __init__(self, base_path: Path = DEFAULT_HOME_PATH):
+        self.base_path = base_path
+        self.socket = socket_path(base_path)
+        self.servers: Dict[str, ManagedServer] = {}
+        self.started_at = time.time()
+        self._clients: Set[asyncio.StreamWriter] = set()
+        self._ops: Dict[str, Callable[..., Awaitable[Any]]] = {
+            "ping": self.op_ping,
+            "status": self.op_status,
+            "start": self.op_start,
+            "stop": self.op_stop,
+            "lag": self.op_lag,
+            "shutdown": self.op_shutdown,
+        }
+        self._shutdown: Optional[asyncio.Event] = None
+
+    async def run(self) -> None:
+        """
+        Serve until SIGTERM, SIGINT or a shutdown request. Servers keep running after the daemon exits.
+        """
+        self._shutdown = asyncio.Event()
+        if self.socket.exists():
+            try:
+                DaemonClient(self.base_path).close()
+            except DaemonError:
+                self.socket.unlink()
+            else:
+                raise DaemonError(f"mctld is already running on {self.socket}")
+
+        for name in ServerRegistry(self.base_path).names():
+            self._server(name)
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        listener = await asyncio.start_unix_server(self._handle, path=str(self.socket))
+        watchdog = asyncio.create_task(Watchdog(self).run())
+        os.chmod(self.socket, 0o600)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self._shutdown.set)
+
+        adopted = sum(server.alive for server in self.servers.values())
+        print(f"mctld (PID {os.getpid()}) listening on {self.socket}, {adopted} running servers adopted", flush=True)
+        try:
+            await self._shutdown.wait()
+        finally:
+            listener.close()
+            watchdog.cancel()
+            for writer in list(self._clients):
+                writer.close()
+            self.socket.unlink(missing_ok=True)
+            for server in self.servers.values():
+                server.cancel_restart()
+                if server.watcher is not None:
+                    server.watcher.cancel()
+            print("mctld stopped, servers keep running", flush=True)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._clients.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                writer.write(encode(await self._dispatch(line)))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        except asyncio.CancelledError:
+            # connections still open when the daemon exits; asyncio would log the cancellation as an error
+            pass
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    async def _dispatch(self, line: bytes) -> Dict[str, Any]:
+        try:
+            request = json.loads(line)
+            handler = self._ops.get(request.get("op"))
+            if handler is None:
+                raise DaemonError(f"Unknown operation '{request.get('op')}'")
+            return {"ok": True, "result": await handler(**(request.get("args") or {}))}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+
+    def _server(self, name: str) -> ManagedServer:
+        """
+        Return the tracked server, adopting it if it was started behind the daemon's back.
+        """
+        server = self.servers.get(name)
+        if server is None:
+            server = self.servers[name] = ManagedServer(name)
+            server.status.restart_policy = self._policy(name)
+        if not server.alive and server.pending_restart is None:
+            pid = ServerManager(name, self.base_path).pid()
+            if pid is not None:
+                self._adopt(server, pid)
+        return server
+
+    def _policy(self, name: str) -> str:
+        policy = ServerManager(name, self.base_path).load_meta().get("restart", load_settings(self.base_path)["restart_policy"])
+        # YAML reads a bare 'no' as false
+        policy = "no" if policy in (False, None) else str(policy)
+        return policy if policy in RESTART_POLICIES else "no"
+
+    def _adopt(self, server: ManagedServer, pid: int) -> None:
+        status = server.status
+        status.state, status.pid, status.adopted, status.exit_code, status.error = "running", pid, True, None, None
+        status.restart_policy = self._policy(server.name)
+        with contextlib.suppress(OSError):
+            status.started_at = ServerManager(server.name, self.base_path).pid_file.stat().st_mtime
+        server.stop_requested = False
+        server.ready.set()
+        server.exited.clear()
+        server.watcher = asyncio.create_task(self._watch_adopted(server, pid))
+
+    async def _watch_adopted(self, server: ManagedServer, pid: int) -> None:
+        """
+        Wait for a process that is not our child to exit: through a pidfd where available, else by polling.
+        """
+        loop = asyncio.get_running_loop()
+        gone = asyncio.Event()
+        fd = _pidfd(pid)
+        if fd is not None:
+            loop.add_reader(fd, gone.set)
+        try:
+            while not gone.is_set() and _alive(pid):
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(gone.wait(), None if fd is not None else 1.0)
+        finally:
+            if fd is not None:
+                loop.remove_reader(fd)
+                os.close(fd)
+        self._exited(server, pid, None)
+
+    async def _launch(self, server: ManagedServer, timeout: Optional[float], admission: Optional[str]) -> Tuple[StartResult, float]:
+        """
+        Launch a server as a child of the daemon.
+        :return: the result and how long to wait for readiness
+        """
+        manager = ServerManager(server.name, self.base_path)
+        result = StartResult(name=server.name, started=False, ready=False)
+        meta = await asyncio.to_thread(manager.load_meta)
+        result.error = await asyncio.to_thread(manager.prepare_start, meta)
+        pattern, timeout = manager.readiness(meta, timeout)
+        if result.error:
+            return result, timeout
+
+        cmd = manager.launch_command(meta)
+        follower = LogFollower(manager.log_file)
+        try:
+            with contextlib.ExitStack() as admitted:
+                # queueing for memory blocks, so admission runs in a thread; it is released once the pid file exists
+                await asyncio.to_thread(admitted.enter_context, manager.admit(meta, admission))
+                with open(manager.log_file, "a", encoding="utf-8") as log_fh:
+                    process = await asyncio.create_subprocess_exec(
+                        *cmd,
+                        cwd=manager.server_path,
+                        stdin=PIPE,
+                        stdout=log_fh,
+                        stderr=STDOUT,
+                        # signals for the daemon (Ctrl-C in a terminal) must not reach the servers
+                        start_new_session=True,
+                    )
+                manager.pid_file.write_text(str(process.pid))
+        except (AdmissionError, PortAllocationError, OSError) as e:
+            follower.close()
+            result.error = str(e)
+            return result, timeout
+
+        status = server.status
+        status.state, status.pid, status.started_at, status.adopted = "starting", process.pid, time.time(), False
+        status.time_to_ready, status.exit_code, status.error = None, None, None
+        status.restart_policy = self._policy(server.name)
+        server.lag.reset(time.time())
+        server.problems.clear()
+        server.process = process
+        server.stop_requested = False
+        server.ready.clear()
+        server.exited.clear()
+        server.watcher = asyncio.create_task(self._watch(server, process, follower, pattern))
+        print(f"Started server '{server.name}' (PID {process.pid})", flush=True)
+        result.started, result.pid = True, process.pid
+        return result, timeout
+
+    async def _watch(self, server: ManagedServer, process: Process, follower: LogFollower, pattern: "re.Pattern[str]") -> None:
+        """
+        Follow a child's log until it exits, marking it ready when the ready pattern shows up.
+        """
+        loop = asyncio.get_running_loop()
+        launched = time.monotonic()
+        changed = asyncio.Event()
+
+        def log_changed() -> None:
+            follower.drain()
+            changed.set()
+
+        fd = follower.fileno()
+        if fd is not None:
+            loop.add_reader(fd, log_changed)
+        exit_wait = asyncio.ensure_future(process.wait())
+        exit_wait.add_done_callback(lambda _: changed.set())
+        try:
+            while True:
+                changed.clear()
+                for line in follower.read_lines():
+                    server.tail.append(line)
+                    server.lag.feed(line, time.time())
+                    if server.status.state == "starting" and pattern.search(line):
+                        server.status.state = "running"
+                        server.status.time_to_ready = time.monotonic() - launched
+                        server.ready.set()
+                if exit_wait.done():
+                    break
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(changed.wait(), 1.0 if fd is not None else 0.25)
+        finally:
+            if fd is not None:
+                loop.remove_reader(fd)
+            follower.close()
+            if not exit_wait.done():
+                exit_wait.cancel()
+        self._exited(server, process.pid, process.returncode)
+
+    def _exited(self, server: ManagedServer, pid: int, code: Optional[int]) -> None:
+        status = server.status
+        ran = time.time() - (status.started_at or time.time())
+        was_ready = status.time_to_ready is not None or status.adopted
+        pid_file = ServerManager(server.name, self.base_path).pid_file
+        with contextlib.suppress(OSError, ValueError):
+            if int(pid_file.read_text().strip()) == pid:
+                pid_file.unlink()
+        status.pid, status.exit_code = None, code
+        server.process = None
+        server.problems.clear()
+        server.ready.set()
+        server.exited.set()
+        if server.stop_requested:
+            status.state = "stopped"
+            print(f"Server '{server.name}' stopped (exit code {code})", flush=True)
+            return
+
+        failed = code is not None and code != 0
+        status.state = "crashed" if failed else "exited"
+        print(f"Server '{server.name}' {status.state} (exit code {'unknown' if code is None else code})", flush=True)
+        for line in server.tail:
+            print(f"  {line}", flush=True)
+        # a server that never became ready is broken, not crashed: only restart servers that were up,
+        # or that are already being restarted. Adopted servers have no exit code, they may well have
+        # been stopped by a direct 'mctl stop', so only 'always' restarts them.
+        wants_restart = status.restart_policy == "always" or (status.restart_policy == "on-failure" and failed)
+        if wants_restart and (was_ready or server.failures > 0):
+            self._schedule_restart(server, ran)
+
+    def _schedule_restart(self, server: ManagedServer, ran: float) -> None:
+        settings = load_settings(self.base_path)
+        if ran >= STABLE_SECONDS:
+            server.failures = 0
+        if server.failures >= int(settings["restart_max"]):
+            server.status.state = "failed"
+            server.status.error = f"gave up after {server.failures} restarts"
+            print(f"Server '{server.name}' {server.status.error}", flush=True)
+            return
+        delay = min(float(settings["restart_backoff_max"]), float(settings["restart_backoff"]) * 2 ** server.failures)
+        server.failures += 1
+        server.status.state = "backoff"
+        server.status.next_restart = time.time() + delay
+        print(f"Restarting '{server.name}' in {delay:.0f}s (attempt {server.failures})", flush=True)
+        server.pending_restart = asyncio.create_task(self._restart_later(server, delay))
+
+    async def _restart_later(self, server: ManagedServer, delay: float) -> None:
+        await asyncio.sleep(delay)
+        async with server.lock:
+            server.pending_restart = None
+            server.status.next_restart = None
+            server.status.restarts += 1
+            result, _ = await self._launch(server, None, None)
+        if not result.started:
+            server.status.state = "crashed"
+            server.status.error = result.error
+            print(f"Restart of '{server.name}' failed: {result.error}", flush=True)
+            self._schedule_restart(server, 0)
+
+    async def op_ping(self) -> Dict[str, Any]:
+        return {"pid": os.getpid(), "started_at": self.started_at, "running": sum(s.alive for s in self.servers.values())}
+
+    async def op_status(self, name: Optional[str] = None) -> List[ServerStatus]:
+        if name is not None:
+            if name not in self.servers and not (self.base_path / "servers" / name).is_dir():
+                raise DaemonError(f"Server '{name}' not found")
+            return [self._server(name).status]
+        names = sorted(set(ServerRegistry(self.base_path).names()) | set(self.servers))
+        return [self._server(n).status for n in names]
+
+    async def op_start(self, name: str, timeout: Optional[float] = None, admission: Optional[str] = None, wait: bool = True) -> StartResult:
+        server = self._server(name)
+        async with server.lock:
+            if server.alive:
+                return StartResult(name=name, started=False, ready=False, pid=server.status.pid, error=f"Server '{name}' is already running")
+            server.cancel_restart()
+            server.failures = 0
+            result, ready_timeout = await self._launch(server, timeout, admission)
+        if not result.started or not wait:
+            return result
+
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(server.ready.wait(), ready_timeout)
+        if server.status.time_to_ready is not None and server.status.pid == result.pid:
+            result.ready, result.time_to_ready = True, server.status.time_to_ready
+        elif server.exited.is_set():
+            result.started = False
+            result.error = (f"Server process exited prematurely (exit code {server.status.exit_code}), "
+                            f"check log file at '{ServerManager(name, self.base_path).log_file}'")
+        return result
+
+    async def op_stop(self, name: str, timeout: Optional[float] = None) -> StopResult:
+        timeout = SHUTDOWN_TIMEOUT if timeout is None else timeout
+        server = self._server(name)
+        result = StopResult(name=name, stopped=False)
+        async with server.lock:
+            if server.pending_restart is not None:
+                server.cancel_restart()
+                server.status.state = "stopped"
+                result.stopped, result.seconds = True, 0.0
+                return result
+            if not server.alive:
+                result.error = f"Server '{name}' is not running."
+                return result
+
+            began = time.monotonic()
+            server.stop_requested = True
+            server.status.state = "stopping"
+            if server.process is None:
+                # adopted servers have no console we can write to
+                await asyncio.to_thread(ServerManager(name, self.base_path).stop, timeout)
+            else:
+                await self._stop_child(server, server.process, timeout)
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(server.exited.wait(), 5)
+            result.stopped, result.seconds = server.exited.is_set(), time.monotonic() - began
+        return result
+
+    async def _stop_child(self, server: ManagedServer, process: Process, timeout: float) -> None:
+        """
+        'stop' on the console saves the worlds; fall back to SIGTERM and finally SIGKILL.
+        """
+        with contextlib.suppress(ConnectionError, AttributeError):
+            assert process.stdin is not None
+            process.stdin.write(b"stop\n")
+            await process.stdin.drain()
+        if await self._wait_exited(server, timeout):
+            return
+        for sig, grace in ((signal.SIGTERM, timeout), (signal.SIGKILL, 5.0)):
+            print(f"Server '{server.name}' did not stop in time, sending {signal.Signals(sig).name}", flush=True)
+            with contextlib.suppress(ProcessLookupError):
+                process.send_signal(sig)
+            if await self._wait_exited(server, grace):
+                return
+
+    @staticmethod
+    async def _wait_exited(server: ManagedServer, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(server.exited.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def op_lag(self, name: str) -> LagReport:
+        server = self._server(name)
+        now = time.time()
+        return LagReport(
+            name=name,
+            behind_ms=server.lag.behind_ms(now),
+            window=server.lag.window,
+            silent_for=server.lag.silent_for(now) if server.process is not None else None,
+            cpu=list(server.cpu),
+            alerts=list(server.alerts),
+        )
+
+    async def op_shutdown(self) -> None:
+        assert self._shutdown is not None
+        self._shutdown.set()
+
+
+def run(base_path: Path = DEFAULT_HOME_PATH) -> None:
+    asyncio.run(Supervisor(base_path).run())
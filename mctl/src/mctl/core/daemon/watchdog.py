@@ -0,0 +1,153 @@
+import asyncio
+import os
+import signal
+import time
+from typing import TYPE_CHECKING, Any, Coroutine, Dict, Optional, Set
+
+from mctl.core.exceptions import RconError
+from mctl.core.interfaces import WatchdogAlert
+from mctl.core.servers.lag import WATCHDOG_ACTIONS
+from mctl.core.servers.manager import ServerManager
+from mctl.core.servers.metrics import MetricsSampler
+from mctl.core.servers.rcon import rcon_settings, server_command
+from mctl.core.settings import load_settings
+
+if TYPE_CHECKING:
+    from mctl.core.daemon.supervisor import ManagedServer, Supervisor
+
+# seconds between two watchdog rounds, also the CPU sampling interval
+WATCHDOG_INTERVAL = 15
+# below this CPU usage a silent server without RCON is considered stalled
+HANG_CPU_PERCENT = 0.5
+WATCHDOG_KEYS = (
+    "watchdog_lag_ms", "watchdog_window", "watchdog_hang_seconds", "watchdog_lag_action",
+    "watchdog_hang_action", "watchdog_deadline", "watchdog_hook",
+)
+
+
+class Watchdog:
+    """
+    Checks the servers mctld launched for sustained lag and hangs, and acts on them.
+
+    Lag comes from the "Can't keep up!" warnings the supervisor feeds into each server's LagAnalyzer.
+    Silence alone is not a hang, idle servers log nothing for hours: a silent server is probed with an
+    RCON 'list', which runs on the server thread and so times out when the server is wedged, or without
+    RCON, counted as stalled when it uses no CPU. Adopted servers are only sampled for CPU, their logs
+    are not followed.
+    """
+
+    def __init__(self, supervisor: "Supervisor"):
+        self.supervisor = supervisor
+        # the loop only keeps weak references to tasks
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    def _spawn(self, coro: Coroutine[Any, Any, None]) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def run(self) -> None:
+        with MetricsSampler(pss=False) as sampler:
+            while True:
+                await asyncio.sleep(WATCHDOG_INTERVAL)
+                servers = self.supervisor.servers
+                pids = {name: s.status.pid for name, s in servers.items() if s.status.state == "running"}
+                now = time.time()
+                for sample in sampler.sample(pids):
+                    if sample.running and sample.cpu_percent is not None:
+                        servers[sample.name].cpu.append((now, sample.cpu_percent))
+                for name in pids:
+                    if servers[name].process is None:
+                        continue
+                    try:
+                        await self.check(servers[name], now)
+                    except Exception as e:
+                        print(f"Watchdog check of '{name}' failed: {e}", flush=True)
+
+    def settings(self, name: str) -> Dict[str, Any]:
+        settings = load_settings(self.supervisor.base_path)
+        meta = ServerManager(name, self.supervisor.base_path).load_meta()
+        return {key: meta.get(key, settings[key]) for key in WATCHDOG_KEYS}
+
+    async def check(self, server: "ManagedServer", now: float) -> None:
+        settings = self.settings(server.name)
+        server.lag.window = float(settings["watchdog_window"])
+        problems = {}
+        behind = server.lag.behind_ms(now)
+        if behind >= int(settings["watchdog_lag_ms"]):
+            problems["lag"] = f"{behind} ms behind within {server.lag.window:.0f}s"
+        silent = server.lag.silent_for(now)
+        if silent is not None and silent >= float(settings["watchdog_hang_seconds"]):
+            hung = await self._probe(server)
+            if hung is not None:
+                problems["hang"] = f"no log output for {silent:.0f}s, {hung}"
+
+        for kind in [k for k in server.problems if k not in problems]:
+            del server.problems[kind]
+            print(f"Watchdog: '{server.name}' recovered from {kind}", flush=True)
+        for kind, detail in problems.items():
+            await self._act(server, kind, detail, settings, now)
+
+    async def _probe(self, server: "ManagedServer") -> Optional[str]:
+        """
+        Return why a silent server looks hung, None if it still responds.
+        """
+        cpu = server.cpu[-1][1] if server.cpu else None
+        cpu_text = "CPU unknown" if cpu is None else f"CPU {cpu:.1f}%"
+        if rcon_settings(server.name, self.supervisor.base_path) is not None:
+            try:
+                await asyncio.to_thread(server_command, server.name, "list", base_path=self.supervisor.base_path)
+                return None
+            except RconError as e:
+                return f"RCON does not answer ({e}), {cpu_text}"
+        if cpu is not None and cpu < HANG_CPU_PERCENT:
+            return cpu_text
+        return None
+
+    async def _act(self, server: "ManagedServer", kind: str, detail: str, settings: Dict[str, Any], now: float) -> None: # pylint: disable=too-many-positional-arguments,too-many-arguments
+        action = str(settings[f"watchdog_{kind}_action"])
+        if action not in WATCHDOG_ACTIONS:
+            print(f"Watchdog: unknown watchdog_{kind}_action '{action}' for '{server.name}', only alerting", flush=True)
+            action = "alert"
+        if action == "off":
+            return
+        deadline = float(settings["watchdog_deadline"])
+        since = server.problems.get(kind)
+        if since is None:
+            server.problems[kind] = now
+            self._alert(server, kind, detail, action, settings)
+            if action == "restart":
+                self._spawn(self._restart(server, deadline))
+        elif action == "kill" and now - since >= deadline and server.process is not None:
+            self._alert(server, kind, f"still {detail} after {now - since:.0f}s, killed", action, settings)
+            server.process.send_signal(signal.SIGKILL)
+
+    def _alert(self, server: "ManagedServer", kind: str, detail: str, action: str, settings: Dict[str, Any]) -> None: # pylint: disable=too-many-positional-arguments,too-many-arguments
+        server.alerts.append(WatchdogAlert(at=time.time(), kind=kind, detail=detail, action=action))
+        print(f"Watchdog: '{server.name}' {kind}: {detail} (action: {action})", flush=True)
+        if settings["watchdog_hook"]:
+            env = dict(os.environ, MCTL_SERVER=server.name, MCTL_EVENT=kind, MCTL_ACTION=action, MCTL_DETAIL=detail)
+            self._spawn(self._run_hook(str(settings["watchdog_hook"]), env))
+
+    @staticmethod
+    async def _run_hook(command: str, env: Dict[str, str]) -> None:
+        try:
+            process = await asyncio.create_subprocess_shell(command, env=env)
+            code = await process.wait()
+        except OSError as e:
+            print(f"Watchdog hook failed: {e}", flush=True)
+            return
+        if code != 0:
+            print(f"Watchdog hook exited with code {code}", flush=True)
+
+    async def _restart(self, server: "ManagedServer", deadline: float) -> None:
+        """
+        Stop gracefully, escalating to SIGTERM and SIGKILL after deadline seconds each, then start again.
+        """
+        stopped = await self.supervisor.op_stop(server.name, timeout=deadline)
+        if not stopped.stopped:
+            print(f"Watchdog: could not stop '{server.name}': {stopped.error}", flush=True)
+            return
+        result = await self.supervisor.op_start(server.name, wait=False)
+        if not result.started:
+            print(f"Watchdog: could not restart '{server.name}': {result.error}", flush=True)
@@ -1,2 +1,46 @@
 class InvalidCliArgument(Exception):
     pass
+
+
+class ChecksumMismatchError(Exception):
+    pass
+
+
+class OfflineCacheMissError(Exception):
+    pass
+
+
+class RconError(Exception):
+    pass
+
+
+class PortAllocationError(Exception):
+    pass
+
+
+class BackupError(Exception):
+    pass
+
+
+class WorldError(Exception):
+    pass
+
+
+class ImageError(Exception):
+    pass
+
+
+class AdmissionError(Exception):
+    pass
+
+
+class DaemonError(Exception):
+    pass
+
+
+class ProfileError(Exception):
+    pass
+
+
+class UpgradeError(Exception):
+    pass
@@ -0,0 +1,143 @@
+import os
+import shutil
+import stat
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+import yaml
+
+from mctl.core.constants import DEFAULT_HOME_PATH, IMAGE_EXCLUDE_DIRS, IMAGE_EXCLUDE_FILES, IMAGE_IMMUTABLE_DIRS
+from mctl.core.exceptions import ImageError
+from mctl.core.interfaces import CloneStats, ServerImage
+from mctl.core.servers.manager import ServerManager
+from mctl.core.utils.fsclone import LINK_MODES, clone_tree, walk_files
+
+# per-server settings that are not carried over into servers cloned from an image
+_SERVER_META_KEYS = ("name", "group", "server_port", "rcon_port")
+
+
+def is_immutable(path: str) -> bool:
+    """
+    True for files in an image that servers only read: top-level jars and anything under the
+    library/version directories. Only these may be hardlinked into a new server.
+    """
+    top, _, rest = path.partition("/")
+    return (not rest and top.endswith(".jar")) or (bool(rest) and top in IMAGE_IMMUTABLE_DIRS)
+
+
+class ImageManager:
+    """
+    Captures initialised servers as reusable images and materialises new servers from them.
+
+    An image is images/<name>/ holding image.yaml and a files/ tree with the server directory
+    without logs, runtime files and mctl.yaml. Immutable files in the tree are made read-only so
+    servers cloned from the image can share them through hardlinks.
+    """
+
+    def __init__(self, base_path: Optional[Path] = None):
+        self.base_path = base_path or DEFAULT_HOME_PATH
+        self.images_dir = self.base_path / "images"
+        self.servers_dir = self.base_path / "servers"
+
+    def _image_dir(self, name: str) -> Path:
+        return self.images_dir / name
+
+    def get(self, name: str) -> ServerImage:
+        try:
+            with open(self._image_dir(name) / "image.yaml", encoding="utf-8") as f:
+                return ServerImage(**(yaml.safe_load(f) or {}))
+        except FileNotFoundError:
+            raise ImageError(f"Image '{name}' not found in {self.images_dir}")
+
+    def list(self) -> List[ServerImage]:
+        if not self.images_dir.exists():
+            return []
+        names = sorted(e.name for e in os.scandir(self.images_dir) if e.is_dir() and not e.name.startswith("."))
+        return [self.get(name) for name in names if (self._image_dir(name) / "image.yaml").exists()]
+
+    def create(self, server: str, name: Optional[str] = None, force: bool = False) -> ServerImage:
+        """
+        Capture a stopped server as an image (named after the server by default).
+        Files are reflinked where the filesystem supports it and copied otherwise, never hardlinked,
+        so the image stays independent of the server it was taken from.
+        """
+        name = name or server
+        server_dir = self.servers_dir / server
+        if not (server_dir / "mctl.yaml").exists():
+            raise ImageError(f"Server '{server}' not found in {server_dir}")
+        if ServerManager(server, self.base_path).pid() is not None:
+            raise ImageError(f"Server '{server}' is running, stop it before creating an image")
+        image_dir = self._image_dir(name)
+        if image_dir.exists() and not force:
+            raise ImageError(f"Image '{name}' already exists, use --force to replace it")
+
+        with open(server_dir / "mctl.yaml", encoding="utf-8") as f:
+            meta = yaml.safe_load(f) or {}
+        for key in _SERVER_META_KEYS:
+            meta.pop(key, None)
+        if meta.get("jar"):
+            meta["jar"] = Path(meta["jar"]).name
+
+        staging = self.images_dir / f".{name}.{os.getpid()}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        files = list(walk_files(server_dir, IMAGE_EXCLUDE_DIRS, IMAGE_EXCLUDE_FILES))
+        stats = clone_tree(server_dir, staging / "files", files, mode="reflink")
+        for rel in files:
+            path = staging / "files" / rel
+            if is_immutable(rel) and not path.is_symlink():
+                path.chmod(stat.S_IMODE(path.stat().st_mode) & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+        image = ServerImage(
+            name=name,
+            server=server,
+            type=meta.get("type", ""),
+            version=str(meta.get("version", "")),
+            created=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            files=stats.files,
+            bytes=stats.bytes,
+            meta=meta,
+        )
+        with open(staging / "image.yaml", "w", encoding="utf-8") as f:
+            yaml.safe_dump(image.__dict__, f, sort_keys=False)
+
+        if image_dir.exists():
+            self.remove(name)
+        os.rename(staging, image_dir)
+        return image
+
+    def remove(self, name: str) -> None:
+        """
+        Delete an image. Servers cloned from it keep their files, hardlinked ones included.
+        """
+        image_dir = self._image_dir(name)
+        if not image_dir.exists():
+            raise ImageError(f"Image '{name}' not found in {self.images_dir}")
+        # rename first so a half-deleted image is never picked up
+        trash = self.images_dir / f".{name}.{os.getpid()}.deleted"
+        os.rename(image_dir, trash)
+        shutil.rmtree(trash)
+
+    def materialise(self, name: str, target: Path, mode: str = "auto") -> CloneStats:
+        """
+        Create target as a copy of an image's files: reflinks where possible, hardlinks for
+        immutable files, real copies for everything a server writes to. The directory is built
+        next to target and renamed into place once complete.
+        """
+        if mode not in LINK_MODES:
+            raise ImageError(f"Unknown link mode '{mode}', use one of: {', '.join(LINK_MODES)}")
+        files_dir = self._image_dir(name) / "files"
+        if not files_dir.exists():
+            raise ImageError(f"Image '{name}' not found in {self.images_dir}")
+        if target.exists():
+            raise ImageError(f"{target} already exists")
+
+        staging = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        try:
+            stats = clone_tree(files_dir, staging, walk_files(files_dir), mode=mode, is_immutable=is_immutable)
+            os.rename(staging, target)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return stats
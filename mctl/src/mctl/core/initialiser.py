@@ -3,8 +3,8 @@ import yaml
 
 from mctl.core.interfaces import InitialiserResponse
 
-DEFAULT_DIRS = ["servers", "downloads", "templates", "logs"]
-DEFAULT_CONFIG = {"java_path": "java", "memory": "2G"}
+DEFAULT_DIRS = ["servers", "downloads", "templates", "logs", "backups", "images"]
+DEFAULT_CONFIG = {"java_path": "java", "memory": "2G", "rcon_port_start": 25575, "backups_root": "backups"}
 
 class ProjectInitialiser:
 
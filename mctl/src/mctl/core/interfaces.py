@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
 
 @dataclass()
 class InitialiserResponse:
@@ -9,7 +9,7 @@ class InitialiserResponse:
 
 
 @dataclass()
-class ServerInfoResponse:
+class ServerInfoResponse: # pylint: disable=too-many-instance-attributes
     name: str
     path: str
     type: str
@@ -17,3 +17,299 @@ class ServerInfoResponse:
     memory: str
     jar: str
     java: str
+    group: Optional[str] = None
+    running: Optional[bool] = None
+
+
+@dataclass()
+class DownloadInfo:
+    url: str
+    checksums: Dict[str, str] = field(default_factory=dict)
+    size: Optional[int] = None
+    build: Optional[str] = None
+
+
+@dataclass()
+class FleetInstallResult:
+    name: str
+    server_type: str
+    version: str
+    ok: bool
+    seconds: float
+    error: Optional[str] = None
+
+
+@dataclass()
+class StartResult:
+    name: str
+    started: bool
+    ready: bool
+    pid: Optional[int] = None
+    time_to_ready: Optional[float] = None
+    error: Optional[str] = None
+
+
+@dataclass()
+class FirstStartTimings:
+    jvm_up: Optional[float] = None
+    world_generated: Optional[float] = None
+    shutdown_complete: Optional[float] = None
+    exit_code: Optional[int] = None
+    error: Optional[str] = None
+
+
+@dataclass()
+class StopResult:
+    name: str
+    stopped: bool
+    seconds: Optional[float] = None
+    error: Optional[str] = None
+
+
+@dataclass()
+class ProcessSample: # pylint: disable=too-many-instance-attributes
+    name: str
+    pid: Optional[int]
+    running: bool
+    cpu_seconds: float = 0.0
+    cpu_percent: Optional[float] = None
+    rss_bytes: int = 0
+    pss_bytes: Optional[int] = None
+    threads: int = 0
+    open_fds: Optional[int] = None
+    read_bytes: Optional[int] = None
+    write_bytes: Optional[int] = None
+
+
+@dataclass()
+class BackupSnapshot: # pylint: disable=too-many-instance-attributes
+    id: str
+    server: str
+    created: str
+    files: int = 0
+    files_changed: int = 0
+    bytes_total: int = 0
+    bytes_read: int = 0
+    chunks_new: int = 0
+    bytes_stored: int = 0
+    seconds: float = 0.0
+
+
+@dataclass()
+class BackupReport:
+    codec: str
+    servers: Dict[str, int] = field(default_factory=dict)
+    snapshots: int = 0
+    logical_bytes: int = 0
+    chunks: int = 0
+    unique_bytes: int = 0
+    stored_bytes: int = 0
+
+
+@dataclass()
+class DimensionStats: # pylint: disable=too-many-instance-attributes
+    dimension: str
+    path: str
+    regions: int = 0
+    chunks: int = 0
+    file_bytes: int = 0
+    data_bytes: int = 0
+    free_bytes: int = 0
+    slack_bytes: int = 0
+
+
+@dataclass()
+class RegionPruneResult: # pylint: disable=too-many-instance-attributes
+    path: str
+    chunks: int = 0
+    removed: int = 0
+    unreadable: int = 0
+    # entries pointing into the header or past the end of the file, dropped by compaction
+    corrupt: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    dimension: str = ""
+
+
+@dataclass()
+class CloneStats:
+    reflink: int = 0
+    hardlink: int = 0
+    copy: int = 0
+    symlink: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def files(self) -> int:
+        return self.reflink + self.hardlink + self.copy + self.symlink
+
+
+@dataclass()
+class ServerImage: # pylint: disable=too-many-instance-attributes
+    name: str
+    server: str
+    type: str
+    version: str
+    created: str
+    files: int = 0
+    bytes: int = 0
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass()
+class ArtifactInfo:
+    sha256: str
+    size: int
+    last_used: float
+    names: List[str] = field(default_factory=list)
+    referenced: bool = False
+
+
+@dataclass()
+class MirrorSyncResult:
+    server_type: str
+    version: str
+    resolved: Optional[str] = None
+    url: Optional[str] = None
+    size: Optional[int] = None
+    error: Optional[str] = None
+
+
+@dataclass()
+class MemoryBudget:
+    """Host memory as seen by admission control, all in MiB."""
+    available: int
+    resident: int
+    committed: Dict[str, int] = field(default_factory=dict)
+    reserve: int = 0
+
+    @property
+    def free(self) -> int:
+        """What another server may still commit: memory mctl servers can use minus what running ones are promised."""
+        return self.available + self.resident - self.reserve - sum(self.committed.values())
+
+
+@dataclass()
+class ServerStatus: # pylint: disable=too-many-instance-attributes
+    """Live state of a server as tracked by mctld; times are epoch seconds."""
+    name: str
+    state: str
+    pid: Optional[int] = None
+    started_at: Optional[float] = None
+    time_to_ready: Optional[float] = None
+    exit_code: Optional[int] = None
+    restarts: int = 0
+    restart_policy: str = "no"
+    next_restart: Optional[float] = None
+    # running before mctld took it over: no console and no exit code
+    adopted: bool = False
+    error: Optional[str] = None
+
+
+@dataclass()
+class LagEvent:
+    """One "Can't keep up!" warning; at is epoch seconds."""
+    at: float
+    behind_ms: int
+    ticks: int
+
+
+@dataclass()
+class LagBucket: # pylint: disable=too-many-instance-attributes
+    """Lag and load of a server during one interval of its lag timeline."""
+    start: float
+    warnings: int = 0
+    behind_ms: int = 0
+    ticks: int = 0
+    worst_ms: int = 0
+    # most players online at once, from join/leave lines; None before the first server start seen
+    players: Optional[int] = None
+    # average CPU usage as sampled by mctld, None without samples
+    cpu_percent: Optional[float] = None
+
+
+@dataclass()
+class WatchdogAlert:
+    at: float
+    kind: str
+    detail: str
+    action: str
+
+
+@dataclass()
+class LagReport:
+    """What mctld currently knows about a server's lag; times are epoch seconds."""
+    name: str
+    behind_ms: int
+    window: float
+    silent_for: Optional[float] = None
+    # (time, CPU %) samples taken by the watchdog
+    cpu: List[Tuple[float, float]] = field(default_factory=list)
+    alerts: List[WatchdogAlert] = field(default_factory=list)
+
+
+@dataclass()
+class ProfileRecording:
+    name: str
+    jfr_path: str
+    seconds: float
+    thread_dumps_path: Optional[str] = None
+    thread_dumps: int = 0
+
+
+@dataclass()
+class ProfileSummary: # pylint: disable=too-many-instance-attributes
+    """What a JFR recording says about a server, durations in milliseconds."""
+    seconds: float
+    samples: int = 0
+    # (class.method, execution samples with it on top of the stack)
+    hot_methods: List[Tuple[str, int]] = field(default_factory=list)
+    gc_count: int = 0
+    gc_pause_total_ms: float = 0.0
+    gc_pause_max_ms: float = 0.0
+    allocated_bytes: int = 0
+    # (thread name, average CPU % of one core)
+    thread_cpu: List[Tuple[str, float]] = field(default_factory=list)
+
+    @property
+    def allocation_rate(self) -> float:
+        """Bytes allocated per second, estimated from allocation samples."""
+        return self.allocated_bytes / self.seconds if self.seconds > 0 else 0.0
+
+
+@dataclass()
+class Span: # pylint: disable=too-many-instance-attributes
+    """A timed phase; start_ns is relative to when timings were enabled."""
+    name: str
+    # names of the enclosing spans in the same thread, ending with this one
+    path: Tuple[str, ...]
+    start_ns: int
+    duration_ns: int
+    thread_id: int
+    thread_name: str
+    args: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass()
+class PhaseTiming:
+    """All spans with the same path, aggregated."""
+    name: str
+    depth: int
+    calls: int
+    total_ms: float
+    max_ms: float
+
+
+@dataclass()
+class UpgradeResult: # pylint: disable=too-many-instance-attributes
+    name: str
+    server_type: str
+    from_version: Optional[str]
+    to_version: Optional[str] = None
+    # planned, up to date, staged, upgraded, rolled back, failed or skipped
+    status: str = "planned"
+    was_running: bool = False
+    # seconds from the stop until the server was ready again
+    downtime: Optional[float] = None
+    error: Optional[str] = None
@@ -0,0 +1,144 @@
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from mctl.core.constants import DEFAULT_HOME_PATH
+from mctl.core.exceptions import AdmissionError, InvalidCliArgument
+from mctl.core.interfaces import MemoryBudget
+from mctl.core.servers.jvm import parse_memory
+from mctl.core.servers.registry import ServerRegistry
+from mctl.core.settings import load_settings
+from mctl.core.utils.filelock import file_lock
+
+ADMISSION_MODES = ("refuse", "queue", "off")
+# how often a queued start re-checks memory
+QUEUE_POLL_SECONDS = 2.0
+
+_THREAD_LOCK = threading.Lock()
+
+
+def footprint(meta: Dict[str, Any], settings: Dict[str, Any]) -> int:
+    """
+    Estimate the memory a server commits in MiB: its heap plus an off-heap allowance.
+    """
+    heap = parse_memory(str(meta.get("memory") or settings["memory"]))
+    if meta.get("offheap"):
+        return heap + parse_memory(str(meta["offheap"]))
+    return heap + max(parse_memory(str(settings["offheap_min"])), int(heap * float(settings["offheap_fraction"])))
+
+
+def _meminfo_available() -> int:
+    with open("/proc/meminfo", encoding="ascii") as f:
+        for line in f:
+            if line.startswith("MemAvailable:"):
+                return int(line.split()[1]) // 1024
+    raise AdmissionError("MemAvailable missing from /proc/meminfo")
+
+
+def _cgroup_available() -> Optional[int]:
+    """
+    Return the room left under this process's cgroup v2 memory limit in MiB, None without a limit.
+    """
+    try:
+        with open("/proc/self/cgroup", encoding="ascii") as f:
+            path = next(line.split("::", 1)[1].strip() for line in f if line.startswith("0::"))
+        group = Path("/sys/fs/cgroup") / path.lstrip("/")
+        limit = (group / "memory.max").read_text(encoding="ascii").strip()
+        if limit == "max":
+            return None
+        return (int(limit) - int((group / "memory.current").read_text(encoding="ascii"))) // (1024 * 1024)
+    except (OSError, StopIteration, ValueError):
+        return None
+
+
+def host_available() -> int:
+    """
+    Return the memory that can be allocated without swapping in MiB, capped by the cgroup limit.
+    """
+    available = _meminfo_available()
+    cgroup = _cgroup_available()
+    return available if cgroup is None else min(available, cgroup)
+
+
+def _resident(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return 0
+
+
+class AdmissionController:
+    """
+    Decides whether the host has memory for another server before it is launched.
+
+    Every running server is counted with the larger of its resident size and its estimated
+    footprint (heap + off-heap), since a JVM grows into its heap over time. What running servers
+    already use is added back to the host's available memory, so only the part they have not
+    touched yet is subtracted. A start is admitted if its footprint fits into the rest minus
+    memory_reserve. Checks and launches hold a lock in the mctl home, so concurrent starts from
+    any number of mctl processes cannot all be admitted against the same free memory.
+    """
+
+    def __init__(self, base_path: Path = DEFAULT_HOME_PATH):
+        self.base_path = base_path
+        self.settings = load_settings(base_path)
+
+    def budget(self, exclude: Optional[str] = None) -> MemoryBudget:
+        """
+        Return the current memory budget, leaving out the server named exclude.
+        """
+        budget = MemoryBudget(
+            available=host_available(),
+            resident=0,
+            reserve=parse_memory(str(self.settings["memory_reserve"])),
+        )
+        servers = self.base_path / "servers"
+        for name, entry in ServerRegistry(self.base_path).entries().items():
+            if name == exclude:
+                continue
+            try:
+                pid = int((servers / name / "pid").read_text().strip())
+            except (OSError, ValueError):
+                continue
+            rss = _resident(pid)
+            if rss == 0:
+                continue
+            budget.resident += rss
+            budget.committed[name] = max(rss, footprint(entry["meta"], self.settings))
+        return budget
+
+    @contextmanager
+    def admit(self, name: str, meta: Dict[str, Any], mode: Optional[str] = None) -> Iterator[MemoryBudget]:
+        """
+        Wait until a server fits into the memory budget and hold the admission lock while the caller
+        launches it, which must record the pid file before leaving the block.
+        :param mode: refuse, queue or off; defaults to the 'admission' setting
+        :raises AdmissionError: if the server does not fit (after admission_queue_timeout when queueing)
+        """
+        mode = mode or str(self.settings["admission"])
+        if mode not in ADMISSION_MODES:
+            raise InvalidCliArgument(f"Unknown admission mode '{mode}' (available: {', '.join(ADMISSION_MODES)})")
+        need = footprint(meta, self.settings)
+        deadline = time.monotonic() + float(self.settings["admission_queue_timeout"])
+        queued = False
+        while True:
+            with file_lock(self.base_path / ".admission.lock", _THREAD_LOCK):
+                budget = self.budget(exclude=name)
+                if mode == "off" or need <= budget.free:
+                    yield budget
+                    return
+            reason = (f"'{name}' needs {need} MiB (heap + off-heap) but only {max(0, budget.free)} MiB are free "
+                      f"({budget.available} MiB available, {sum(budget.committed.values())} MiB committed to "
+                      f"{len(budget.committed)} running servers, {budget.reserve} MiB reserved)")
+            if mode == "refuse" or time.monotonic() >= deadline:
+                raise AdmissionError(reason)
+            if not queued:
+                print(f"Waiting for memory: {reason}")
+                queued = True
+            time.sleep(QUEUE_POLL_SECONDS)
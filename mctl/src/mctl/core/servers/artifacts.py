@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, ContextManager, Dict, List, Optional, Set
+
+from mctl.core.constants import DEFAULT_HOME_PATH
+from mctl.core.interfaces import ArtifactInfo, DownloadInfo
+from mctl.core.utils.downloader import Downloader
+from mctl.core.utils.filelock import file_lock
+from mctl.core.utils.fsclone import clone_file
+
+INDEX_VERSION = 1
+
+_THREAD_LOCK = threading.Lock()
+
+
+class ArtifactStore:
+    """
+    Content-addressed cache of downloaded jars.
+
+    Blobs are stored read-only as blobs/<ab>/<sha256>, so servers can share them through reflinks
+    or hardlinks. index.json maps each download URL (which pins a build) to its blob together with
+    type, version and build, and records size and last use of every blob for LRU eviction.
+    Blobs a server or image still records as its 'artifact' in mctl.yaml, or that are hardlinked
+    somewhere, are never evicted.
+    """
+
+    def __init__(self, base_path: Optional[Path] = None, max_bytes: Optional[int] = None, mirror: Optional[str] = None):
+        self.root = (base_path or DEFAULT_HOME_PATH) / "artifacts"
+        self.base_path = base_path or DEFAULT_HOME_PATH
+        self.index_path = self.root / "index.json"
+        self.max_bytes = max_bytes
+        self.mirror = mirror
+
+    def _locked(self) -> ContextManager[None]:
+        return file_lock(self.root / ".index.lock", _THREAD_LOCK)
+
+    def _read_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                index = json.load(f)
+        except (FileNotFoundError, ValueError):
+            index = {}
+        if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+            index = {}
+        return {"blobs": index.get("blobs") or {}, "artifacts": index.get("artifacts") or {}}
+
+    def _write_index(self, index: Dict[str, Dict[str, Any]]) -> None:
+        tmp = self.index_path.with_name(f".{self.index_path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, **index}, f, separators=(",", ":"))
+        os.replace(tmp, self.index_path)
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.root / "blobs" / sha256[:2] / sha256
+
+    def _lookup(self, index: Dict[str, Dict[str, Any]], info: DownloadInfo) -> Optional[str]:
+        """
+        Return the digest of a stored blob for info: by URL, or by a published checksum matching one we hold.
+        """
+        known = index["artifacts"].get(info.url)
+        if known and self.blob_path(known["sha256"]).exists():
+            return str(known["sha256"])
+        for sha256, blob in index["blobs"].items():
+            digests = {"sha256": sha256, "sha1": blob.get("sha1")}
+            matches = [digests[algorithm] == value.lower() for algorithm, value in info.checksums.items() if digests.get(algorithm)]
+            if matches and all(matches) and self.blob_path(sha256).exists():
+                return str(sha256)
+        return None
+
+    def fetch(self, info: DownloadInfo, server_type: str, version: str, dest: Optional[Path] = None) -> str:
+        """
+        Make sure the artifact described by info is stored, downloading it if needed.
+        :param dest: also materialise it there, under the same index lock, so that collect_garbage in
+            another process cannot evict it in between
+        :return: its sha256
+        """
+        cached = self._cached(info, server_type, version, dest)
+        if cached is not None:
+            return cached
+
+        # download outside the index lock, parallel fetches of other artifacts should not wait; the staging
+        # name follows the URL so an interrupted download resumes, and its own lock keeps two processes
+        # fetching the same URL from writing the same parts
+        staging = self.root / "tmp" / f"{hashlib.sha1(info.url.encode()).hexdigest()[:20]}.jar"
+        with file_lock(staging.with_name(f"{staging.name}.lock")):
+            # whoever held the lock may have stored it in the meantime
+            cached = self._cached(info, server_type, version, dest)
+            if cached is not None:
+                return cached
+            print(f"Downloading {server_type} {version}{f' build {info.build}' if info.build else ''}...")
+            downloader = Downloader(mirror=self.mirror)
+            downloader.fetch(info, staging)
+            marker = downloader.marker_path(staging)
+            digests = json.loads(marker.read_text(encoding="utf-8"))["checksums"]
+            marker.unlink()
+            sha256 = digests["sha256"]
+
+            blob = self.blob_path(sha256)
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            staging.chmod(0o444)
+            os.replace(staging, blob)
+            self._store(info, server_type, version, sha256, digests, dest)
+        if self.max_bytes:
+            self.collect_garbage(self.max_bytes, keep={sha256})
+        return str(sha256)
+
+    def _cached(self, info: DownloadInfo, server_type: str, version: str, dest: Optional[Path] = None) -> Optional[str]:
+        with self._locked():
+            index = self._read_index()
+            sha256 = self._lookup(index, info)
+            if sha256 is None:
+                return None
+            if dest is not None:
+                self._clone(sha256, dest)
+            self._record(index, info, server_type, version, sha256)
+            self._write_index(index)
+        print(f"Using cached {server_type} {version}{f' build {info.build}' if info.build else ''}")
+        return sha256
+
+    def _store(self, info: DownloadInfo, server_type: str, version: str, sha256: str, digests: Dict[str, str], dest: Optional[Path] = None) -> None: # pylint: disable=too-many-positional-arguments,too-many-arguments
+        blob = self.blob_path(sha256)
+        with self._locked():
+            if dest is not None:
+                self._clone(sha256, dest)
+            index = self._read_index()
+            index["blobs"][sha256] = {"size": blob.stat().st_size, "sha1": digests.get("sha1"), "last_used": time.time()}
+            self._record(index, info, server_type, version, sha256)
+            self._write_index(index)
+
+    @staticmethod
+    def _record(index: Dict[str, Dict[str, Any]], info: DownloadInfo, server_type: str, version: str, sha256: str) -> None:
+        index["artifacts"][info.url] = {"sha256": sha256, "type": server_type, "version": version, "build": info.build}
+        index["blobs"].setdefault(sha256, {})["last_used"] = time.time()
+
+    def materialise(self, sha256: str, dest: Path) -> str:
+        """
+        Place a blob at dest: reflinked or hardlinked (blobs are never written to), copied across filesystems.
+        :return: the method that was used
+        """
+        # collect_garbage deletes blobs under the index lock, never while one is being cloned
+        with self._locked():
+            method = self._clone(sha256, dest)
+            index = self._read_index()
+            if sha256 in index["blobs"]:
+                index["blobs"][sha256]["last_used"] = time.time()
+                self._write_index(index)
+        return method
+
+    def _clone(self, sha256: str, dest: Path) -> str:
+        return clone_file(self.blob_path(sha256), dest, immutable=True)
+
+    def _referenced(self) -> Set[str]:
+        """
+        Digests recorded as 'artifact' by installed servers and images.
+        """
+        from mctl.core.images.manager import ImageManager
+        from mctl.core.servers.registry import ServerRegistry
+
+        metas = [entry["meta"] for entry in ServerRegistry(self.base_path).entries().values()]
+        metas += [image.meta for image in ImageManager(self.base_path).list()]
+        return {str(meta["artifact"]) for meta in metas if meta.get("artifact")}
+
+    def list(self) -> List[ArtifactInfo]:
+        """
+        Return every stored blob with the artifacts it was downloaded as, most recently used first.
+        """
+        index = self._read_index()
+        referenced = self._referenced()
+        result = []
+        for sha256, blob in index["blobs"].items():
+            path = self.blob_path(sha256)
+            if not path.exists():
+                continue
+            names = [f"{a['type']} {a['version']}{' build ' + str(a['build']) if a.get('build') else ''}"
+                     for a in index["artifacts"].values() if a["sha256"] == sha256]
+            result.append(ArtifactInfo(
+                sha256=sha256,
+                size=int(blob.get("size") or path.stat().st_size),
+                last_used=float(blob.get("last_used") or 0),
+                names=sorted(set(names)),
+                referenced=sha256 in referenced or path.stat().st_nlink > 1,
+            ))
+        return sorted(result, key=lambda a: a.last_used, reverse=True)
+
+    def collect_garbage(self, max_bytes: int, keep: Optional[Set[str]] = None) -> List[ArtifactInfo]:
+        """
+        Delete least recently used blobs until the store is at most max_bytes, skipping blobs that are
+        referenced or hardlinked into a server directory (deleting those would free no space).
+        :param keep: digests to keep regardless, e.g. one that is about to be installed
+        :return: the evicted blobs
+        """
+        with self._locked():
+            blobs = self.list()
+            total = sum(b.size for b in blobs)
+            evicted = []
+            for blob in reversed(blobs):
+                if total <= max_bytes:
+                    break
+                if blob.referenced or blob.sha256 in (keep or set()):
+                    continue
+                self.blob_path(blob.sha256).unlink(missing_ok=True)
+                total -= blob.size
+                evicted.append(blob)
+
+            if evicted:
+                gone = {b.sha256 for b in evicted}
+                index = self._read_index()
+                index["blobs"] = {k: v for k, v in index["blobs"].items() if k not in gone}
+                index["artifacts"] = {k: v for k, v in index["artifacts"].items() if v["sha256"] not in gone}
+                self._write_index(index)
+        return evicted
@@ -1,49 +1,82 @@
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
 
 from mctl.core.constants import DEFAULT_HOME_PATH
+from mctl.core.servers.properties import Properties
+from mctl.core.utils.timing import span
+
+Changes = Dict[str, Tuple[Optional[str], str]]
 
 
 class ServerConfigManager:
     """
     Handles reading and updating Minecraft server.properties files.
+    The file is parsed once; every write replaces it atomically.
     """
 
-    def __init__(self, server_name: str):
-        self.server_dir = DEFAULT_HOME_PATH / "servers" / server_name
+    def __init__(self, server_name: str, base_path: Optional[Path] = None):
+        self.server_dir = (base_path or DEFAULT_HOME_PATH) / "servers" / server_name
         self.config_path = self.server_dir / "server.properties"
 
         if not self.config_path.exists():
             raise FileNotFoundError(f"server.properties not found for '{server_name}'")
+        with span("read properties"):
+            self.properties = Properties.load(self.config_path)
 
     def get(self, key: str) -> Optional[str]:
         """Return the value for a given key, or None if not found."""
-        with open(self.config_path, encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                if "=" in line:
-                    k, v = line.split("=", 1)
-                    if k.strip() == key:
-                        return v.strip()
-        return None
+        return self.properties.get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Return the values for several keys, None for missing ones."""
+        return self.properties.get_many(keys)
 
     def set(self, key: str, value: str) -> None:
         """Set or update a key=value pair in server.properties."""
-        lines = []
-        found = False
-
-        if self.config_path.exists():
-            with open(self.config_path, encoding="utf-8") as f:
-                for line in f:
-                    if line.strip().startswith(f"{key}="):
-                        lines.append(f"{key}={value}\n")
-                        found = True
-                    else:
-                        lines.append(line)
-
-        if not found:
-            lines.append(f"{key}={value}\n")
-
-        with open(self.config_path, "w", encoding="utf-8") as f:
-            f.writelines(lines)
+        self.update({key: value})
+
+    def update(self, values: Mapping[str, str], dry_run: bool = False) -> Changes:
+        """
+        Set several keys with a single write. The file is only rewritten if something changed.
+        :return: changed keys mapped to (old value, new value)
+        """
+        changes = self.properties.update(values)
+        if self.properties.dirty and not dry_run:
+            with span("write properties"):
+                self.properties.save(self.config_path)
+        return changes
+
+
+def format_value(value: Any) -> str:
+    """
+    Convert a YAML value to its server.properties form, e.g. True -> 'true'.
+    """
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return "" if value is None else str(value)
+
+
+def apply_patch(
+        server_names: List[str],
+        patch: Mapping[str, Any],
+        base_path: Optional[Path] = None,
+        max_parallel: int = 16,
+        dry_run: bool = False,
+    ) -> Dict[str, Union[Changes, Exception]]:
+    """
+    Apply the same properties to many servers concurrently, writing only files that change.
+    Maps each server to its changes, or to the error.
+    """
+    values = {str(key): format_value(value) for key, value in patch.items()}
+
+    def apply(name: str) -> Union[Changes, Exception]:
+        try:
+            return ServerConfigManager(name, base_path).update(values, dry_run=dry_run)
+        except Exception as e:
+            return e
+
+    if not server_names:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(server_names)))) as pool:
+        return dict(zip(server_names, pool.map(apply, server_names)))
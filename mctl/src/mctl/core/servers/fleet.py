@@ -0,0 +1,177 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+from mctl.core.exceptions import InvalidCliArgument
+from mctl.core.interfaces import FleetInstallResult
+from mctl.core.servers.installer import ServerInstaller, InstallArguments
+from mctl.core.servers.jvm import parse_memory
+
+SPEC_DEFAULTS: Dict[str, Any] = {
+    "type": "vanilla",
+    "version": "latest",
+    "memory": "2G",
+    "eula": False,
+    "first_start": False,
+}
+
+
+def _keys(mapping: Dict[Any, Any]) -> Dict[str, Any]:
+    # 'first-start' and 'first_start' are both accepted, and must override the defaults alike
+    return {str(key).replace("-", "_"): value for key, value in mapping.items()}
+
+
+def load_fleet_spec(path: Path) -> List[InstallArguments]:
+    """
+    Read a fleet spec. Either a list of servers, or a mapping with optional 'defaults' and a 'servers' list:
+
+        defaults: {type: paper, version: 1.21.1, memory: 4G, eula: true, group: lobby}
+        servers:
+          - name: lobby-1
+          - name: survival
+            memory: 8G
+            first_start: true
+    """
+    with open(path, encoding="utf-8") as f:
+        raw = yaml.safe_load(f) or {}
+
+    if isinstance(raw, list):
+        raw = {"servers": raw}
+    if not isinstance(raw, dict) or not isinstance(raw.get("defaults") or {}, dict) or not isinstance(raw.get("servers") or [], list):
+        raise InvalidCliArgument(f"Fleet spec {path} must be a list of servers, or a mapping with 'defaults' and a 'servers' list")
+    defaults = {**SPEC_DEFAULTS, **_keys(raw.get("defaults") or {})}
+
+    specs: List[InstallArguments] = []
+    seen = set()
+    for entry in raw.get("servers") or []:
+        if not isinstance(entry, dict):
+            raise InvalidCliArgument(f"Every server in fleet spec {path} must be a mapping with a 'name', got: {entry!r}")
+        item = {**defaults, **_keys(entry)}
+        name = str(item.get("name", "")).lower()
+        if not re.match(r"^[a-z0-9-]+$", name):
+            raise InvalidCliArgument(f"Invalid server name in fleet spec: '{item.get('name')}'")
+        if name in seen:
+            raise InvalidCliArgument(f"Server '{name}' is listed twice in fleet spec")
+        seen.add(name)
+        # 'memory:' without a value falls back to the configured default like an install without --memory
+        memory = None if item.get("memory") is None else str(item["memory"])
+        if memory is not None:
+            try:
+                parse_memory(memory)
+            except InvalidCliArgument:
+                raise InvalidCliArgument(f"Invalid memory size for server '{name}' in fleet spec: '{memory}'")
+        specs.append(InstallArguments(
+            name=name,
+            server_type=str(item["type"]).lower(),
+            version=str(item["version"]),
+            memory=memory,
+            eula=bool(item["eula"]),
+            first_start=bool(item["first_start"]),
+            group=item.get("group"),
+            jvm_profile=item.get("jvm_profile"),
+        ))
+
+    if not specs:
+        raise InvalidCliArgument(f"Fleet spec {path} does not list any servers")
+    return specs
+
+
+class FleetInstaller:
+    """
+    Provisions many servers at once. Each distinct type+version is downloaded once up front, servers are then
+    installed through a bounded thread pool and first starts run in a separate, smaller pool.
+    """
+
+    def __init__(self, base_path: Path, workers: int = 4, first_start_workers: int = 2, offline: bool = False, mirror: Optional[str] = None): # pylint: disable=too-many-positional-arguments,too-many-arguments
+        self.installer = ServerInstaller(base_path, offline=offline, mirror=mirror)
+        self.workers = max(1, workers)
+        self.first_start_workers = max(1, first_start_workers)
+
+    def install(self, specs: List[InstallArguments]) -> List[FleetInstallResult]:
+        started = {spec.name: time.perf_counter() for spec in specs}
+        results: Dict[str, FleetInstallResult] = {}
+        lock = threading.Lock()
+
+        def finish(spec: InstallArguments, error: Optional[str] = None) -> None:
+            with lock:
+                results[spec.name] = FleetInstallResult(
+                    name=spec.name,
+                    server_type=spec.server_type,
+                    version=spec.version,
+                    ok=error is None,
+                    seconds=time.perf_counter() - started[spec.name],
+                    error=error,
+                )
+
+        resolved = self._prefetch(specs)
+
+        first_start_pool = ThreadPoolExecutor(max_workers=self.first_start_workers, thread_name_prefix="first-start")
+        pending: List[Future] = []
+
+        def first_start(spec: InstallArguments) -> None:
+            try:
+                timings = self.installer.first_start(spec.name)
+                finish(spec, timings.error and f"first start failed: {timings.error}")
+            except Exception as e:
+                finish(spec, str(e))
+
+        def install_one(spec: InstallArguments) -> None:
+            key = (spec.server_type, spec.version)
+            if isinstance(resolved[key], Exception):
+                finish(spec, f"download failed: {resolved[key]}")
+                return
+            # the caller's specs keep the version they asked for, results report the one installed
+            spec = replace(spec, version=str(resolved[key]))
+            try:
+                self.installer.install(replace(spec, first_start=False))
+            except Exception as e:
+                finish(spec, str(e))
+                return
+            if spec.first_start:
+                with lock:
+                    pending.append(first_start_pool.submit(first_start, spec))
+            else:
+                finish(spec)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="install") as pool:
+            list(pool.map(install_one, specs))
+        for future in pending:
+            future.result()
+        first_start_pool.shutdown()
+
+        return [results[spec.name] for spec in specs]
+
+    def _prefetch(self, specs: List[InstallArguments]) -> Dict[Tuple[str, str], Any]:
+        """
+        Download every distinct type+version once. Maps each requested key to its resolved version, or the error.
+        """
+        keys = list(dict.fromkeys((spec.server_type, spec.version) for spec in specs))
+
+        def resolve(key: Tuple[str, str]) -> Any:
+            try:
+                return self.installer.resolve_version(*key)
+            except Exception as e:
+                return e
+
+        def fetch(key: Tuple[str, str]) -> Any:
+            try:
+                return self.installer.prefetch(*key)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="prefetch") as pool:
+            resolved = dict(zip(keys, pool.map(resolve, keys)))
+            # 'latest' and an explicit version may point at the same artifact
+            downloads = list(dict.fromkeys((key[0], v) for key, v in resolved.items() if not isinstance(v, Exception)))
+            fetched = dict(zip(downloads, pool.map(fetch, downloads)))
+
+        for key, version in resolved.items():
+            if not isinstance(version, Exception):
+                resolved[key] = fetched[(key[0], version)]
+        return resolved
@@ -1,129 +1,317 @@
-import pkgutil
-import importlib
+import secrets
 import shutil
 import subprocess
+import threading
 import time
+from collections import deque
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Dict, cast, Optional
+from typing import IO, Any, Deque, Dict, List, Set, Tuple, cast, Optional
 
-import requests
 import yaml
 
-from mctl.core.exceptions import InvalidCliArgument
+from mctl.core.constants import FIRST_START_TIMEOUT, SHUTDOWN_TIMEOUT
+from mctl.core.exceptions import ImageError
+from mctl.core.images.manager import ImageManager
+from mctl.core.interfaces import FirstStartTimings
+from mctl.core.servers.artifacts import ArtifactStore
+from mctl.core.servers.configurator import ServerConfigManager
+from mctl.core.servers.jvm import build_launch_command
+from mctl.core.servers.manager import ServerManager
+from mctl.core.servers.ports import PortAllocator
+from mctl.core.servers.registry import ServerRegistry
+from mctl.core.settings import load_settings
+
+from mctl.core.servers.types import load_installer_class
 from mctl.core.servers.types.base import BaseInstaller
 from mctl.core.servers.types.fabric import FabricInstaller
+from mctl.core.utils.http_cache import MetadataCache
+from mctl.core.utils.mirror import mirror_from_env
+from mctl.core.utils.timing import span
+
+
+def _fmt(seconds: Optional[float]) -> str:
+    return "-" if seconds is None else f"{seconds:.1f}s"
+
+
+def _report_first_start(timings: FirstStartTimings, tail: List[str]) -> None:
+    if timings.error:
+        print(f"Server initialisation failed: {timings.error}")
+        for line in tail:
+            print(f"  | {line}")
+    elif timings.world_generated is None:
+        print("Server exited before generating a world (is the EULA accepted?). Configs were generated.")
+    else:
+        print("Server initialised successfully")
+    print(
+        "First start phases: "
+        f"JVM up {_fmt(timings.jvm_up)}, world generated {_fmt(timings.world_generated)}, "
+        f"shutdown complete {_fmt(timings.shutdown_complete)}"
+    )
 
 
 @dataclass
-class InstallArguments:
+class InstallArguments: # pylint: disable=too-many-instance-attributes
     name: str
     server_type: str
     version: str
-    memory: str
+    memory: Optional[str]
     eula: bool
     first_start: bool
+    group: Optional[str] = None
+    jvm_profile: Optional[str] = None
+    image: Optional[str] = None
+    link: str = "auto"
 
 class ServerInstaller:
 
-    SERVER_TYPES: Dict[str, BaseInstaller] = {}
-
-    def __init__(self, base_path: Path):
-        #
-        # fill up the server types
+    def __init__(self, base_path: Path, offline: bool = False, mirror: Optional[str] = None):
+        settings = load_settings(base_path)
+        mirror = mirror or mirror_from_env() or settings.get("mirror")
+        self.metadata = MetadataCache(base_path / "cache" / "metadata", offline=offline, mirror=mirror)
 
-        types_dir = (Path(__file__).parent / "types").resolve()
-        for module_info in pkgutil.iter_modules([str(types_dir)]):
-            module = importlib.import_module(f"mctl.core.servers.types.{module_info.name}")
-            for obj_name in dir(module):
-                obj = getattr(module, obj_name)
-                if isinstance(obj, type) and hasattr(obj, "name"):
-                    self.SERVER_TYPES[obj.name] = obj()
+        # server types are instantiated on first use
+        self.server_types: Dict[str, BaseInstaller] = {}
 
         # set props
         self.base_path = base_path
-        self.downloads = self.base_path / "downloads"
+        self.artifacts = ArtifactStore(self.base_path, max_bytes=int(settings["artifacts_max_bytes"]), mirror=mirror)
         self.servers = self.base_path / "servers"
         self.templates = self.base_path / "templates"
+        self.ports = PortAllocator(self.base_path)
+
+
+    def _get_type(self, server_type: str) -> BaseInstaller:
+        if server_type not in self.server_types:
+            self.server_types[server_type] = load_installer_class(server_type)(self.metadata)
+        return self.server_types[server_type]
 
+    def resolve_version(self, server_type: str, version: str) -> str:
+        return self._get_type(server_type).resolve_version(version)
+
+    def prefetch(self, server_type: str, version: str) -> str:
+        """
+        Resolve the version and make sure its artifact is in the artifact store, without installing anything.
+        :return: the resolved version
+        """
+        with span("prefetch", type=server_type, version=version):
+            impl = self._get_type(server_type)
+            with span("resolve version"):
+                version = impl.resolve_version(version)
+            if isinstance(impl, FabricInstaller):
+                impl.fetch_installer(self.artifacts, version)
+                impl.fetch_game(self.artifacts, version)
+            else:
+                self._download_jar(impl, version)
+        return version
 
     def install(self, args: InstallArguments) -> None:
-        if args.server_type not in self.SERVER_TYPES:
-            raise InvalidCliArgument(f"Unsupported server type: {args.server_type}")
+        with span("install", server=args.name, type=args.server_type):
+            if args.image:
+                self._install_from_image(args)
+            else:
+                self._install(args)
 
-        impl = self.SERVER_TYPES[args.server_type]
+    def _install(self, args: InstallArguments) -> None:
+        impl = self._get_type(args.server_type)
+        with span("resolve version"):
+            version = impl.resolve_version(args.version)
+        if version != args.version:
+            print(f"Resolved {args.server_type} '{args.version}' to {version}")
 
         target_dir = self.servers / args.name
         target_dir.mkdir(parents=True, exist_ok=True)
 
-        if args.server_type == "fabric":
-            impl = cast(FabricInstaller, impl)
-            impl.setup(self.downloads, args.version, java_path="java", dest_dir=target_dir)
-        else:
-            jar_path = self._download_jar(impl, args.version)
-            shutil.copy(jar_path, target_dir / "server.jar") # type: ignore
+        artifact, jar = self.materialise_release(args.server_type, version, target_dir)
 
-        # copy templates and update eula
-        for template in self.templates.glob("*"):
-            shutil.copy(template, target_dir / template.name)
+        # copy templates (files and directories) and update eula
+        with span("copy templates"):
+            for template in self.templates.glob("*"):
+                if template.is_dir():
+                    shutil.copytree(template, target_dir / template.name, dirs_exist_ok=True)
+                else:
+                    shutil.copy(template, target_dir / template.name)
         if args.eula:
             (target_dir / "eula.txt").write_text("eula=true\n")
 
         # keep metadata
-        meta = {
+        meta: Dict[str, Any] = {
             "name": args.name,
             "type": args.server_type,
-            "version": args.version,
-            "memory": args.memory,
-            "jar": str(target_dir / "server.jar"),
+            "version": version,
+            "memory": args.memory or load_settings(self.base_path)["memory"],
+            "jar": str(target_dir / jar),
+            "artifact": artifact,
         }
-        with open(target_dir / "mctl.yaml", "w", encoding="utf-8") as f:
-            yaml.dump(meta, f)
+        self._register(args, meta)
 
         print(f"Server installed at {target_dir}")
 
         if args.first_start:
-            self._initialise_server(target_dir, args.memory)
+            with span("first start"):
+                self._initialise_server(target_dir)
         else:
             print("Skipping server start (--first-start).")
 
-    def _initialise_server(self, target_dir: Path, memory: str) -> None:
+    def materialise_release(self, server_type: str, version: str, dest_dir: Path) -> Tuple[str, str]:
+        """
+        Place what a server needs to run a version in dest_dir: the server jar, or the files the Fabric installer generates.
+        :return: sha256 of the artifact used and the name of the jar to launch
+        """
+        impl = self._get_type(server_type)
+        if isinstance(impl, FabricInstaller):
+            artifact = impl.setup(self.artifacts, version, java_path=str(load_settings(self.base_path)["java_path"]), dest_dir=dest_dir)
+            return artifact, "fabric-server-launch.jar"
+        artifact = self._download_jar(impl, version, dest_dir / "server.jar")
+        return artifact, "server.jar"
+
+    def _install_from_image(self, args: InstallArguments) -> None:
+        """
+        Materialise a server from an image instead of downloading and initialising it.
+        """
+        images = ImageManager(self.base_path)
+        image = images.get(cast(str, args.image))
+        target_dir = self.servers / args.name
+        if target_dir.exists():
+            raise ImageError(f"Server '{args.name}' already exists in {target_dir}")
+
+        with span("materialise image", image=image.name):
+            stats = images.materialise(image.name, target_dir, args.link)
+        print(f"Cloned image '{image.name}' ({image.type} {image.version}): {stats.files} files, "
+              f"{stats.reflink} reflinked, {stats.hardlink} hardlinked, {stats.copy} copied in {stats.seconds:.2f}s")
+        if args.eula:
+            (target_dir / "eula.txt").write_text("eula=true\n")
+
+        meta: Dict[str, Any] = dict(image.meta)
+        meta["name"] = args.name
+        meta["memory"] = args.memory or meta.get("memory") or load_settings(self.base_path)["memory"]
+        if meta.get("jar"):
+            meta["jar"] = str(target_dir / meta["jar"])
+        self._register(args, meta)
+        print(f"Server installed at {target_dir}")
+
+    def _register(self, args: InstallArguments, meta: Dict[str, Any]) -> None:
+        """
+        Give a freshly installed server its own game, query and RCON ports and an RCON password, write mctl.yaml and index it.
+        """
+        if args.jvm_profile:
+            meta["jvm_profile"] = args.jvm_profile
+        if args.group:
+            meta["group"] = args.group
+        with span("register"), self.ports.locked():
+            (self.servers / args.name / "server.properties").touch()
+            meta["server_port"] = self.ports.assign_game_port(args.name)
+            meta["rcon_port"] = self._enable_rcon(args.name, taken={meta["server_port"]})
+            with open(self.servers / args.name / "mctl.yaml", "w", encoding="utf-8") as f:
+                yaml.dump(meta, f)
+        ServerRegistry(self.base_path).update(args.name)
+
+    def _enable_rcon(self, name: str, taken: Set[int]) -> int:
+        """
+        Enable RCON on a fresh port from rcon_port_start with a random password.
+        :param taken: ports already given to this server
+        """
+        port = self.ports.next_free(int(load_settings(self.base_path)["rcon_port_start"]), taken=taken)
+        ServerConfigManager(name, self.base_path).update({
+            "enable-rcon": "true",
+            "rcon.port": str(port),
+            "rcon.password": secrets.token_urlsafe(18),
+        })
+        return port
+
+    @staticmethod
+    def _read_meta(target_dir: Path) -> Dict[str, Any]:
+        with open(target_dir / "mctl.yaml", encoding="utf-8") as f:
+            return cast(Dict[str, Any], yaml.safe_load(f) or {})
+
+    def launch_command(self, target_dir: Path) -> List[str]:
+        return build_launch_command(target_dir, self._read_meta(target_dir), load_settings(self.base_path))
+
+    def first_start(self, name: str) -> FirstStartTimings:
+        """
+        Run the first start for an already installed server.
+        """
+        with span("first start", server=name):
+            return self._initialise_server(self.servers / name)
+
+    def _initialise_server(self, target_dir: Path) -> FirstStartTimings:
+        """
+        Start the server, stream its output until world generation is done, then stop it right away.
+        :return: phase timings in seconds since launch
+        """
         print("Starting server for initial setup...")
+        timings = FirstStartTimings()
+        tail: Deque[str] = deque(maxlen=20)
+        jvm_up = threading.Event()
+        world_ready = threading.Event()
+        ready_pattern, _ = ServerManager.readiness(self._read_meta(target_dir))
+
         try:
+            cmd = self.launch_command(target_dir)
+            launched = time.monotonic()
             proc = subprocess.Popen(
-                ["java", f"-Xmx{memory}", "-jar", "server.jar", "nogui"],
+                cmd,
                 cwd=target_dir,
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
                 text=True,
+                errors="replace",
             )
-
-            # Wait till it generates files
-            time.sleep(10)
-            if proc.stdin is not None:
-                proc.stdin.write("stop\n")
-                proc.stdin.flush()
-                proc.wait(timeout=30)
-            print("Server initialised successfully")
         except Exception as e:
             print(f"Server initialisation failed: {e}")
+            timings.error = str(e)
+            return timings
+
+        def pump() -> None:
+            # keep draining stdout so a chatty server never blocks on a full pipe; stdout=PIPE always sets it
+            for line in cast(IO[str], proc.stdout):
+                tail.append(line.rstrip())
+                if not jvm_up.is_set():
+                    timings.jvm_up = time.monotonic() - launched
+                    jvm_up.set()
+                if not world_ready.is_set() and ready_pattern.search(line):
+                    timings.world_generated = time.monotonic() - launched
+                    world_ready.set()
+            world_ready.set()
 
-    def _download_jar(self, impl: BaseInstaller, version: str) -> Optional[Path]:
-        dest_path = self.downloads / impl.get_file_name(version)
-        if dest_path.exists():
-            print(f"Using cached {dest_path}")
-            return dest_path
+        reader = threading.Thread(target=pump, name=f"first-start-{target_dir.name}", daemon=True)
+        reader.start()
 
-        print(f"Downloading {impl.name} {version}...")
+        try:
+            world_ready.wait(FIRST_START_TIMEOUT)
+            if timings.world_generated is not None and proc.poll() is None and proc.stdin is not None:
+                proc.stdin.write("stop\n")
+                proc.stdin.flush()
+            elif proc.poll() is None:
+                timings.error = f"no world generation within {FIRST_START_TIMEOUT}s"
+                proc.terminate()
+            proc.wait(timeout=SHUTDOWN_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            timings.error = timings.error or f"server did not stop within {SHUTDOWN_TIMEOUT}s"
+            proc.kill()
+            proc.wait()
+        except Exception as e:
+            timings.error = str(e)
+            proc.kill()
+            proc.wait()
+        reader.join(timeout=5)
 
-        download_url = impl.get_download_url(version)
-        r = requests.get(download_url, stream=True, timeout=120)
-        r.raise_for_status()
+        timings.shutdown_complete = time.monotonic() - launched
+        timings.exit_code = proc.returncode
+        if timings.error is None and timings.world_generated is None and proc.returncode != 0:
+            timings.error = f"server exited with code {proc.returncode}"
 
-        with open(dest_path, "wb") as f:
-            for chunk in r.iter_content(chunk_size=8192):
-                f.write(chunk)
+        _report_first_start(timings, list(tail))
+        return timings
 
-        print(f"Saved to {dest_path}")
-        return dest_path
+    def _download_jar(self, impl: BaseInstaller, version: str, dest: Optional[Path] = None) -> str:
+        """
+        Make sure the server jar is in the artifact store.
+        :param dest: also place it there
+        :return: its sha256
+        """
+        with span("metadata"):
+            info = impl.get_download(version)
+        with span("download jar", version=version):
+            return self.artifacts.fetch(info, impl.name, version, dest)
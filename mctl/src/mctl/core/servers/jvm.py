@@ -0,0 +1,111 @@
+import functools
+import re
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from mctl.core.exceptions import InvalidCliArgument
+
+# G1 tuning for Minecraft servers as published by Aikar (https://docs.papermc.io/paper/aikars-flags)
+AIKAR_FLAGS = [
+    "-XX:+UseG1GC",
+    "-XX:+ParallelRefProcEnabled",
+    "-XX:MaxGCPauseMillis=200",
+    "-XX:+UnlockExperimentalVMOptions",
+    "-XX:+DisableExplicitGC",
+    "-XX:+AlwaysPreTouch",
+    "-XX:G1HeapWastePercent=5",
+    "-XX:G1MixedGCCountTarget=4",
+    "-XX:G1MixedGCLiveThresholdPercent=90",
+    "-XX:G1RSetUpdatingPauseTimePercent=5",
+    "-XX:SurvivorRatio=32",
+    "-XX:+PerfDisableSharedMem",
+    "-XX:MaxTenuringThreshold=1",
+    "-Dusing.aikars.flags=https://mcflags.emc.gs",
+    "-Daikars.new.flags=true",
+]
+
+# Aikar's young generation/region sizing, below and above 12 GiB of heap
+AIKAR_SMALL_HEAP = ["-XX:G1NewSizePercent=30", "-XX:G1MaxNewSizePercent=40", "-XX:G1HeapRegionSize=8M",
+                    "-XX:G1ReservePercent=20", "-XX:InitiatingHeapOccupancyPercent=15"]
+AIKAR_LARGE_HEAP = ["-XX:G1NewSizePercent=40", "-XX:G1MaxNewSizePercent=50", "-XX:G1HeapRegionSize=16M",
+                    "-XX:G1ReservePercent=15", "-XX:InitiatingHeapOccupancyPercent=20"]
+LARGE_HEAP_MIB = 12 * 1024
+
+JVM_PROFILES: Dict[str, List[str]] = {
+    # JVM defaults, only heap size is set
+    "default": [],
+    "aikar": AIKAR_FLAGS,
+    # low-pause collectors for big heaps
+    "zgc": ["-XX:+UseZGC", "-XX:+AlwaysPreTouch", "-XX:+DisableExplicitGC", "-XX:+PerfDisableSharedMem"],
+    "shenandoah": ["-XX:+UseShenandoahGC", "-XX:+AlwaysPreTouch", "-XX:+DisableExplicitGC", "-XX:+PerfDisableSharedMem"],
+}
+
+# Generational ZGC is opt-in on JDK 21 and 22 only: older JDKs reject the flag, 23+ make it the default
+# (and deprecate, later drop, the flag)
+ZGC_GENERATIONAL_FLAG = "-XX:+ZGenerational"
+ZGC_GENERATIONAL_OPT_IN = range(21, 23)
+
+# lets JFR ('mctl profile') attribute samples to the method actually running instead of the last safepoint;
+# jcmd attaches on demand, so nothing else is needed to profile a running server
+DIAGNOSTIC_FLAGS = ["-XX:+UnlockDiagnosticVMOptions", "-XX:+DebugNonSafepoints"]
+
+_UNITS = {"": 1 / (1024 * 1024), "K": 1 / 1024, "M": 1, "G": 1024, "T": 1024 * 1024}
+
+
+def parse_memory(value: str) -> int:
+    """
+    Convert a JVM memory size such as '512M' or '4G' to MiB.
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*([KMGT]?)B?\s*", str(value).upper())
+    if not match:
+        raise InvalidCliArgument(f"Invalid memory size: {value}")
+    return int(int(match.group(1)) * _UNITS[match.group(2)])
+
+
+@functools.lru_cache(maxsize=None)
+def java_major_version(java: str) -> Optional[int]:
+    """
+    Return the feature release of a java binary from 'java -version' (8 for "1.8.0_402", 21 for "21.0.4"),
+    or None if it cannot be run or its output is not recognised.
+    """
+    try:
+        proc = subprocess.run([java, "-version"], capture_output=True, text=True, timeout=10, check=False)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = re.search(r'version "(?:1\.)?(\d+)', proc.stderr + proc.stdout)
+    return int(match.group(1)) if match else None
+
+
+def build_launch_command(server_dir: Path, meta: Dict[str, Any], settings: Dict[str, Any]) -> List[str]:
+    """
+    Build the java command line for a server from its mctl.yaml and the global settings.
+
+    mctl.yaml keys: memory, java, jvm_profile, pretouch, large_pages, diagnostics, jvm_args (list), jar.
+    Heap is always fixed (Xms = Xmx) so the JVM never resizes it at runtime.
+    """
+    java = meta.get("java") or settings.get("java_path") or "java"
+    memory = str(meta.get("memory") or settings.get("memory") or "2G")
+    profile = meta.get("jvm_profile") or settings.get("jvm_profile") or "default"
+    if profile not in JVM_PROFILES:
+        raise InvalidCliArgument(f"Unknown JVM profile '{profile}' (available: {', '.join(JVM_PROFILES)})")
+
+    flags = [f"-Xms{memory}", f"-Xmx{memory}", *JVM_PROFILES[profile]]
+    if profile == "aikar":
+        flags += AIKAR_LARGE_HEAP if parse_memory(memory) >= LARGE_HEAP_MIB else AIKAR_SMALL_HEAP
+    if profile == "zgc" and java_major_version(str(java)) in ZGC_GENERATIONAL_OPT_IN:
+        flags.insert(flags.index("-XX:+UseZGC") + 1, ZGC_GENERATIONAL_FLAG)
+    if meta.get("pretouch") and "-XX:+AlwaysPreTouch" not in flags:
+        flags.append("-XX:+AlwaysPreTouch")
+    if meta.get("pretouch") is False:
+        flags = [f for f in flags if f != "-XX:+AlwaysPreTouch"]
+    if meta.get("diagnostics", True):
+        flags += DIAGNOSTIC_FLAGS
+    if meta.get("large_pages"):
+        flags.append("-XX:+UseLargePages" if meta["large_pages"] == "explicit" else "-XX:+UseTransparentHugePages")
+    flags += [str(arg) for arg in meta.get("jvm_args") or []]
+
+    jar = Path(str(meta.get("jar") or "server.jar"))
+    if not jar.is_absolute():
+        jar = server_dir / jar
+    return [str(java), *flags, "-jar", str(jar), "nogui"]
@@ -0,0 +1,151 @@
+import re
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from mctl.core.interfaces import LagBucket, LagEvent
+from mctl.core.servers.logs import search
+
+# vanilla and Paper: "Can't keep up! Is the server overloaded? Running 5012ms or 100 ticks behind"
+CANT_KEEP_UP = re.compile(r"Can't keep up! Is the server overloaded\? Running (\d+)ms or (\d+) ticks behind")
+PLAYER_JOINED = re.compile(r"\]: \S+ joined the game")
+PLAYER_LEFT = re.compile(r"\]: \S+ left the game")
+SERVER_DONE = re.compile(r"\]: Done \(")
+# every line lag_timeline needs, searched over the logs in one pass
+TIMELINE_LINES = "|".join(p.pattern for p in (CANT_KEEP_UP, PLAYER_JOINED, PLAYER_LEFT, SERVER_DONE))
+# lines returned by logs.search: '2024-05-01 [12:34:56] ...' or '2024-05-01 [12:34:56 INFO]: ...'
+DATED_LINE = re.compile(r"^(\d{4}-\d{2}-\d{2}) \[(\d{2}:\d{2}:\d{2})")
+
+WATCHDOG_ACTIONS = ("off", "alert", "restart", "kill")
+
+
+def parse_lag(line: str, at: float) -> Optional[LagEvent]:
+    match = CANT_KEEP_UP.search(line)
+    if match is None:
+        return None
+    return LagEvent(at=at, behind_ms=int(match.group(1)), ticks=int(match.group(2)))
+
+
+class LagAnalyzer:
+    """
+    Streaming lag state of one server, fed every log line as it is written.
+
+    Keeps the recent "Can't keep up!" warnings and when the server last logged anything, which is
+    all the watchdog needs: the behind-time summed over a sliding window, and how long it has been silent.
+    """
+
+    def __init__(self, window: float, history: int = 1000):
+        self.window = window
+        self.events: Deque[LagEvent] = deque(maxlen=history)
+        self.last_line_at: Optional[float] = None
+
+    def feed(self, line: str, now: float) -> Optional[LagEvent]:
+        self.last_line_at = now
+        event = parse_lag(line, now)
+        if event is not None:
+            self.events.append(event)
+        return event
+
+    def behind_ms(self, now: float) -> int:
+        """
+        Return the milliseconds the server reported falling behind within the window.
+        """
+        return sum(e.behind_ms for e in self.events if e.at > now - self.window)
+
+    def silent_for(self, now: float) -> Optional[float]:
+        return None if self.last_line_at is None else now - self.last_line_at
+
+    def reset(self, now: float) -> None:
+        """
+        Forget earlier warnings and start counting silence from now, e.g. after a launch.
+        """
+        self.events.clear()
+        self.last_line_at = now
+
+
+def _timestamp(line: str) -> Optional[float]:
+    match = DATED_LINE.match(line)
+    if match is None:
+        return None
+    return datetime.strptime(f"{match.group(1)} {match.group(2)}", "%Y-%m-%d %H:%M:%S").timestamp()
+
+
+def lag_timeline( # pylint: disable=too-many-positional-arguments,too-many-arguments,too-many-locals
+        log_dir: Path,
+        since: datetime,
+        until: Optional[datetime] = None,
+        bucket_seconds: float = 60,
+        cpu: Iterable[Tuple[float, float]] = (),
+        workers: Optional[int] = None,
+    ) -> Tuple[List[LagEvent], List[LagBucket]]:
+    """
+    Build a server's lag timeline from its logs, including archives.
+    :param cpu: (time, CPU %) samples to average into the buckets
+    :return: every lag warning and one bucket per bucket_seconds from since to until (or now)
+    """
+    end = (until or datetime.now()).timestamp()
+    # rows start on whole minutes (hours, ...) so they line up with other metrics
+    start = since.timestamp() // bucket_seconds * bucket_seconds
+    buckets = [LagBucket(start=start + i * bucket_seconds) for i in range(max(1, int((end - start) // bucket_seconds) + 1))]
+
+    def bucket(at: float) -> Optional[LagBucket]:
+        i = int((at - start) // bucket_seconds)
+        return buckets[i] if 0 <= i < len(buckets) else None
+
+    events: List[LagEvent] = []
+    # players are counted from the last server start, so the day before since is searched as well;
+    # (time, players online) after every join, leave and start
+    online: Optional[int] = None
+    changes: List[Tuple[float, int]] = []
+    for line in search(log_dir, TIMELINE_LINES, since=since - timedelta(days=1), until=until, workers=workers):
+        at = _timestamp(line)
+        if at is None:
+            continue
+        if SERVER_DONE.search(line):
+            online = 0
+        elif online is not None and PLAYER_JOINED.search(line):
+            online += 1
+        elif online is not None and PLAYER_LEFT.search(line):
+            online = max(0, online - 1)
+        if online is not None:
+            changes.append((at, online))
+
+        event = parse_lag(line, at)
+        b = bucket(at)
+        if event is None or b is None:
+            continue
+        events.append(event)
+        b.warnings += 1
+        b.behind_ms += event.behind_ms
+        b.ticks += event.ticks
+        b.worst_ms = max(b.worst_ms, event.behind_ms)
+
+    _fill_players(buckets, changes, bucket_seconds)
+    _fill_cpu(buckets, cpu, bucket_seconds)
+    return events, buckets
+
+
+def _fill_players(buckets: List[LagBucket], changes: List[Tuple[float, int]], bucket_seconds: float) -> None:
+    """
+    Give each bucket the players online when it began, or the most that were online during it.
+    """
+    pos = 0
+    current: Optional[int] = None
+    for b in buckets:
+        b.players = current
+        while pos < len(changes) and changes[pos][0] < b.start + bucket_seconds:
+            at, current = changes[pos]
+            b.players = max(b.players or 0, current) if at >= b.start else current
+            pos += 1
+
+
+def _fill_cpu(buckets: List[LagBucket], cpu: Iterable[Tuple[float, float]], bucket_seconds: float) -> None:
+    start = buckets[0].start
+    samples: Dict[int, List[float]] = {}
+    for at, percent in cpu:
+        i = int((at - start) // bucket_seconds)
+        if 0 <= i < len(buckets):
+            samples.setdefault(i, []).append(percent)
+    for i, values in samples.items():
+        buckets[i].cpu_percent = sum(values) / len(values)
@@ -0,0 +1,96 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from mctl.core.constants import DEFAULT_HOME_PATH, SHUTDOWN_TIMEOUT
+from mctl.core.daemon.client import DaemonClient
+from mctl.core.interfaces import StartResult, StopResult
+from mctl.core.servers.manager import ServerManager
+from mctl.core.utils.timing import span
+
+
+def start_server(name: str, timeout: Optional[float] = None, admission: Optional[str] = None, wait: bool = True,
+                 base_path: Optional[Path] = None) -> StartResult:
+    """
+    Start a server through mctld when it runs, so the daemon owns and supervises the process,
+    otherwise launch it from this process.
+    """
+    client = DaemonClient.connect(base_path or DEFAULT_HOME_PATH)
+    if client is None:
+        with span("start", server=name):
+            return ServerManager(name, base_path).start(timeout=timeout, admission=admission, wait=wait)
+    # the phases run in mctld, only the round trip is seen here
+    with client, span("start via mctld", server=name):
+        result = client.start(name, timeout=timeout, admission=admission, wait=wait)
+    # ServerManager reports what happened when it runs here, mctld's output goes to its own log
+    if result.error:
+        print(result.error)
+    if result.ready:
+        print(f"✅ Server '{name}' started by mctld (PID {result.pid}) in {result.time_to_ready:.1f}s.")
+    elif result.started:
+        print(f"Server '{name}' started by mctld (PID {result.pid}){', not ready yet' if wait else ''}.")
+    return result
+
+
+def stop_server(name: str, timeout: float = SHUTDOWN_TIMEOUT, base_path: Optional[Path] = None) -> StopResult:
+    """
+    Stop a server through mctld when it runs, otherwise directly.
+    """
+    client = DaemonClient.connect(base_path or DEFAULT_HOME_PATH)
+    if client is None:
+        with span("stop", server=name):
+            return ServerManager(name, base_path).stop(timeout=timeout)
+    with client, span("stop via mctld", server=name):
+        result = client.stop(name, timeout=timeout)
+    print(result.error or f"Server '{name}' stopped by mctld in {result.seconds or 0:.1f}s.")
+    return result
+
+
+class FleetLifecycle:
+    """
+    Starts or stops many servers concurrently.
+
+    At most max_parallel servers are between launch and readiness at any time, and consecutive
+    launches are spaced at least stagger seconds apart, so JVM warm-up does not hit CPU and disk
+    all at once while readiness waits still overlap. Each server goes through mctld when it runs.
+    """
+
+    def __init__(self, max_parallel: int = 4, stagger: float = 0.0):
+        self.max_parallel = max(1, max_parallel)
+        self.stagger = max(0.0, stagger)
+        self._slot_lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def _wait_for_slot(self) -> None:
+        with self._slot_lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.stagger
+        if slot > now:
+            time.sleep(slot - now)
+
+    def start(self, names: List[str], timeout: Optional[float] = None, admission: Optional[str] = None) -> List[StartResult]:
+        def start_one(name: str) -> StartResult:
+            self._wait_for_slot()
+            try:
+                return start_server(name, timeout=timeout, admission=admission)
+            except Exception as e:
+                print(f"Failed to start '{name}': {e}")
+                return StartResult(name=name, started=False, ready=False, error=str(e))
+
+        self._next_slot = 0.0
+        with ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="start") as pool:
+            return list(pool.map(start_one, names))
+
+    def stop(self, names: List[str], timeout: float = SHUTDOWN_TIMEOUT) -> List[StopResult]:
+        def stop_one(name: str) -> StopResult:
+            try:
+                return stop_server(name, timeout=timeout)
+            except Exception as e:
+                print(f"Failed to stop '{name}': {e}")
+                return StopResult(name=name, stopped=False, error=str(e))
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="stop") as pool:
+            return list(pool.map(stop_one, names))
@@ -0,0 +1,279 @@
+import gzip
+import os
+import re
+import shutil
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from mctl.core.exceptions import InvalidCliArgument
+
+# archives use the same naming as the server's own log rotation: <date of last write>-<n>.log.gz
+ARCHIVE_NAME = re.compile(r"^(\d{4}-\d{2}-\d{2})-(\d+)\.log\.gz$")
+# vanilla '[12:34:56] [Server thread/INFO]: ...' and Paper '[12:34:56 INFO]: ...'
+LINE_TIME = re.compile(r"^\[(\d{2}:\d{2}:\d{2})", re.MULTILINE)
+TIME_KEY = "%Y-%m-%d %H:%M:%S"
+RELATIVE_TIME = re.compile(r"^(\d+)([smhdw])$")
+_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+
+
+def rotate(log_file: Path, max_bytes: int, max_age_days: float, retention_days: float = 0) -> Optional[Path]:
+    """
+    Move log_file to a gzip archive next to it if it is larger than max_bytes or was last written
+    more than max_age_days ago, and delete archives older than retention_days (0 keeps them all).
+    Called before a server is launched, so the log mctl follows for readiness stays small.
+    :return: the new archive, or None if the log was not rotated
+    """
+    archive = None
+    try:
+        st = log_file.stat()
+    except FileNotFoundError:
+        st = None
+
+    if st is not None and st.st_size > 0:
+        age_days = (datetime.now().timestamp() - st.st_mtime) / 86400
+        if (max_bytes and st.st_size > max_bytes) or (max_age_days and age_days > max_age_days):
+            day = date.fromtimestamp(st.st_mtime).isoformat()
+            n = 1 + max((int(m.group(2)) for m, _ in _archives(log_file.parent) if m.group(1) == day), default=0)
+            archive = log_file.with_name(f"{day}-{n}.log.gz")
+            tmp = archive.with_name(f".{archive.name}.tmp")
+            with open(log_file, "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            os.utime(tmp, (st.st_atime, st.st_mtime))
+            os.replace(tmp, archive)
+            log_file.unlink()
+
+    if retention_days:
+        cutoff = date.today() - timedelta(days=retention_days)
+        for match, path in _archives(log_file.parent):
+            if date.fromisoformat(match.group(1)) < cutoff:
+                path.unlink(missing_ok=True)
+    return archive
+
+
+def _archives(log_dir: Path) -> List[Tuple[re.Match, Path]]:
+    if not log_dir.exists():
+        return []
+    found = [(m, log_dir / name) for name in os.listdir(log_dir) if (m := ARCHIVE_NAME.match(name))]
+    return sorted(found, key=lambda item: (item[0].group(1), int(item[0].group(2))))
+
+
+def log_files(
+        log_dir: Path,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        archives: bool = True,
+    ) -> List[Tuple[Path, date]]:
+    """
+    Return (file, date of its last line) for the archives and latest.log, oldest first, skipping
+    files that cannot contain lines between since and until.
+    :param archives: False to only return latest.log
+    """
+    files = [(path, date.fromisoformat(m.group(1))) for m, path in _archives(log_dir)] if archives else []
+    latest = log_dir / "latest.log"
+    if latest.exists():
+        files.append((latest, date.fromtimestamp(latest.stat().st_mtime)))
+
+    selected = []
+    previous_end: Optional[date] = None
+    for path, end in files:
+        # a file ends on its date and starts no earlier than the day the previous one ended
+        if since is not None and end < since.date():
+            previous_end = end
+            continue
+        if until is not None and previous_end is not None and previous_end > until.date():
+            break
+        selected.append((path, end))
+        previous_end = end
+    return selected
+
+
+def parse_duration(value: str) -> float:
+    """
+    Parse a duration such as '90', '30s', '5m' or '1h' into seconds.
+    """
+    value = value.strip()
+    relative = RELATIVE_TIME.match(value)
+    if relative:
+        return timedelta(**{_UNITS[relative.group(2)]: int(relative.group(1))}).total_seconds()
+    try:
+        return float(value)
+    except ValueError:
+        raise InvalidCliArgument(f"Cannot parse duration '{value}', use e.g. '30s', '5m' or '1h'")
+
+
+def parse_time(value: str, now: Optional[datetime] = None) -> datetime:
+    """
+    Parse '2024-05-01', '2024-05-01 13:00[:00]', '13:00' (today) or a relative time such as '2h' or '7d' ago.
+    """
+    now = now or datetime.now()
+    value = value.strip()
+    relative = RELATIVE_TIME.match(value)
+    if relative:
+        return now - timedelta(**{_UNITS[relative.group(2)]: int(relative.group(1))})
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    for fmt in ("%H:%M:%S", "%H:%M"):
+        try:
+            return datetime.combine(now.date(), datetime.strptime(value, fmt).time())
+        except ValueError:
+            pass
+    raise InvalidCliArgument(f"Cannot parse time '{value}', use e.g. '2024-05-01 13:00', '13:00' or '2h'")
+
+
+def _day_starts(text: str, end: date) -> Tuple[List[int], List[date]]:
+    """
+    Split a log that ends on the given day into days. Lines only carry a time of day, so earlier
+    days are found where the time goes backwards (midnight).
+    :return: start offset of each day in text and its date
+    """
+    times = LINE_TIME.findall(text)
+    rollovers = {i + 1 for i, (a, b) in enumerate(zip(times, times[1:])) if b < a}
+    starts, days = [0], [end - timedelta(days=len(rollovers))]
+    if rollovers:
+        for i, match in enumerate(LINE_TIME.finditer(text)):
+            if i in rollovers:
+                starts.append(match.start())
+                days.append(days[-1] + timedelta(days=1))
+    return starts, days
+
+
+def _time_range(text: str, starts: List[int], days: List[date], since: Optional[datetime], until: Optional[datetime]) -> Tuple[int, int]:
+    """
+    Return the slice of text with lines between since and until. Lines without a time (stack traces)
+    belong to the line before them, lines before the first time to the start of the first day.
+    """
+    offsets, keys = [], []
+    day = 0
+    for match in LINE_TIME.finditer(text):
+        while day + 1 < len(starts) and match.start() >= starts[day + 1]:
+            day += 1
+        offsets.append(match.start())
+        keys.append(f"{days[day].isoformat()} {match.group(1)}")
+
+    lo, hi = 0, len(text)
+    if since is not None:
+        since_key = since.strftime(TIME_KEY)
+        if since_key > f"{days[0].isoformat()} 00:00:00":
+            i = bisect_left(keys, since_key)
+            lo = offsets[i] if i < len(offsets) else len(text)
+    if until is not None:
+        i = bisect_right(keys, until.strftime(TIME_KEY))
+        hi = offsets[i] if i < len(offsets) else len(text)
+    return lo, hi
+
+
+def complete_size(path: Path) -> int:
+    """
+    Return the size of path up to and including its last newline, 0 if it does not exist. Reading that
+    much never ends in a line the server is still writing.
+    """
+    try:
+        with open(path, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            pos = size
+            while pos > 0:
+                block = min(pos, 65536)
+                f.seek(pos - block)
+                newline = f.read(block).rfind(b"\n")
+                if newline >= 0:
+                    return pos - block + newline + 1
+                pos -= block
+            return 0
+    except FileNotFoundError:
+        return 0
+
+
+def _read_text(path: str, limit: Optional[int] = None) -> str:
+    """
+    Return the decoded text of a log file, decompressing archives, and only its first limit bytes if given.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        return f.read(-1 if limit is None else limit).decode("utf-8", errors="replace")
+
+
+def _scan(job: Tuple[str, date, Optional[str], bool, Optional[datetime], Optional[datetime], Optional[int]]) -> List[str]:
+    """
+    Read one log file and return its matching lines prefixed with their date. Runs in a worker process.
+    The pattern is searched over the whole file at once, so files without a match cost little more than
+    their decompression.
+    """
+    path, end, pattern, ignore_case, since, until, limit = job
+    text = _read_text(path, limit)
+    regex = re.compile(pattern, re.MULTILINE | (re.IGNORECASE if ignore_case else 0)) if pattern else None
+    if regex is not None and regex.search(text) is None:
+        return []
+    starts, days = _day_starts(text, end)
+    lo, hi = _time_range(text, starts, days, since, until) if since is not None or until is not None else (0, len(text))
+
+    if regex is None:
+        return _all_lines(text, starts, days, lo, hi)
+    return _matching_lines(text, regex, starts, days, lo, hi)
+
+
+def _all_lines(text: str, starts: List[int], days: List[date], lo: int, hi: int) -> List[str]:
+    """
+    Return the lines of text[lo:hi] prefixed with their date.
+    """
+    result: List[str] = []
+    for day, start, stop in zip(days, starts, starts[1:] + [len(text)]):
+        result.extend(f"{day.isoformat()} {line}" for line in text[max(lo, start):min(hi, stop)].splitlines())
+    return result
+
+
+def _matching_lines(text: str, regex: re.Pattern, starts: List[int], days: List[date], lo: int, hi: int) -> List[str]: # pylint: disable=too-many-positional-arguments,too-many-arguments
+    """
+    Return the lines of text[lo:hi] that match regex prefixed with their date, searching the text
+    as a whole rather than line by line.
+    """
+    result: List[str] = []
+    pos = lo
+    while pos < hi:
+        match = regex.search(text, pos, hi)
+        if match is None:
+            break
+        line_start = text.rfind("\n", 0, match.start()) + 1
+        line_end = text.find("\n", match.start(), hi)
+        line_end = hi if line_end < 0 else line_end
+        line = text[line_start:line_end].rstrip("\r")
+        result.append(f"{days[bisect_right(starts, line_start) - 1].isoformat()} {line}")
+        pos = line_end + 1
+    return result
+
+
+def search( # pylint: disable=too-many-positional-arguments,too-many-arguments
+        log_dir: Path,
+        pattern: Optional[str] = None,
+        ignore_case: bool = False,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        workers: Optional[int] = None,
+        archives: bool = True,
+        latest_bytes: Optional[int] = None,
+    ) -> Iterator[str]:
+    """
+    Yield matching lines, prefixed with their date, from all archives and latest.log in order. Files are decompressed and
+    filtered in parallel worker processes; results are streamed as soon as earlier files are done.
+    :param latest_bytes: only search this much of latest.log, e.g. up to where a LogFollower starts
+    """
+    if pattern:
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise InvalidCliArgument(f"Invalid regular expression: {e}")
+    jobs = [(str(path), end, pattern, ignore_case, since, until, latest_bytes if path.name == "latest.log" else None)
+            for path, end in log_files(log_dir, since, until, archives)]
+    if not jobs:
+        return
+    if len(jobs) == 1:
+        yield from _scan(jobs[0])
+        return
+    with ProcessPoolExecutor(max_workers=max(1, min(len(jobs), workers or os.cpu_count() or 1))) as pool:
+        for lines in pool.map(_scan, jobs):
+            yield from lines
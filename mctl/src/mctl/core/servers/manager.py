@@ -1,96 +1,253 @@
 import os
+import re
 import time
 import signal
 import subprocess
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from mctl.core.constants import SERVERS_PATH
+import yaml
+
+from mctl.core.constants import DEFAULT_HOME_PATH, DEFAULT_READY_PATTERN, DEFAULT_START_TIMEOUT, START_TIMEOUTS, SHUTDOWN_TIMEOUT
+from mctl.core.exceptions import AdmissionError, PortAllocationError, RconError
+from mctl.core.interfaces import StartResult, StopResult
+from mctl.core.servers.admission import AdmissionController
+from mctl.core.servers.jvm import build_launch_command
+from mctl.core.servers.logs import rotate
+from mctl.core.servers.ports import PortAllocator
+from mctl.core.servers.rcon import rcon_settings, server_command
+from mctl.core.settings import load_settings
+from mctl.core.utils.logtail import LogFollower
+from mctl.core.utils.timing import span
 
 
 class ServerManager:
 
-    def __init__(self, server_name: str):
+    def __init__(self, server_name: str, base_path: Optional[Path] = None):
         self.server_name = server_name
-        self.server_path = SERVERS_PATH / server_name
-        self.jar_path = self.server_path / "server.jar"
+        self.base_path = base_path or DEFAULT_HOME_PATH
+        self.server_path = self.base_path / "servers" / server_name
         self.pid_file = self.server_path / "pid"
         self.log_file = self.server_path / "logs" / "latest.log"
 
-    def _is_running(self) -> bool:
-        if not self.pid_file.exists():
-            return False
+    def pid(self) -> Optional[int]:
+        """
+        Return the PID of the running server, or None if it is not running.
+        """
         try:
             pid = int(self.pid_file.read_text().strip())
             os.kill(pid, 0)
-            return True
-        except (ValueError, ProcessLookupError, PermissionError):
-            return False
+        except (FileNotFoundError, ValueError, ProcessLookupError, PermissionError):
+            return None
+        return pid
+
+    def _is_running(self) -> bool:
+        return self.pid() is not None
 
-    def start(self) -> None:
+    def load_meta(self) -> Dict[str, Any]:
+        meta_path = self.server_path / "mctl.yaml"
+        if not meta_path.exists():
+            return {}
+        with open(meta_path, encoding="utf-8") as f:
+            return yaml.safe_load(f) or {}
+
+    def launch_command(self, meta: Optional[Dict[str, Any]] = None) -> List[str]:
         """
-        Starts a server, save pid into a text file and verify if it's running.
-        :return:
+        Return the java command line this server is started with.
         """
-        if not self.jar_path.exists():
-            print("Server does not exist")
-            return
+        return build_launch_command(self.server_path, self.load_meta() if meta is None else meta, load_settings(self.base_path))
 
-        if self._is_running():
-            print(f"Server '{self.server_name}' is already running")
-            return
+    def start(self, timeout: Optional[float] = None, admission: Optional[str] = None, wait: bool = True) -> StartResult:
+        """
+        Starts a server, save pid into a text file and wait until the log reports it is ready.
+        Servers whose ports are taken, or that do not fit into the host's memory, are not launched.
+        :param timeout: seconds to wait for readiness, defaults to the server type's start timeout
+        :param admission: refuse, queue or off, see AdmissionController; defaults to the 'admission' setting
+        :param wait: wait for readiness, otherwise return right after the launch
+        :return: StartResult with the measured time-to-ready
+        """
+        result = StartResult(name=self.server_name, started=False, ready=False)
+        meta = self.load_meta()
+        with span("prepare"):
+            result.error = self.prepare_start(meta)
+        if result.error:
+            print(result.error)
+            return result
 
-        self.log_file.parent.mkdir(exist_ok=True)
+        ready_pattern, timeout = self.readiness(meta, timeout)
+        cmd = self.launch_command(meta)
 
-        cmd = ["java", "-Xmx2G", "-Xms1G", "-jar", str(self.jar_path), "nogui"]
-        with open(self.log_file, "a", encoding="utf-8") as log_fh:
-            process = subprocess.Popen(
-                cmd,
-                cwd=self.server_path,
-                stdout=log_fh,
-                stderr=subprocess.STDOUT,
-            )
-        self.pid_file.write_text(str(process.pid))
-        print(f"Started server '{self.server_name}' (PID {process.pid})")
-
-        # --- Safeguard: wait up to 10 seconds ---
-        success = False
-        for _ in range(20):  # check every 0.5s → ~10 seconds
-            time.sleep(0.5)
-            if process.poll() is not None:
-                print("Server process exited prematurely.")
-                print(f"Check log file at '{self.log_file}'")
-                self.pid_file.unlink(missing_ok=True)
-                return
+        # follow the log from its current end, earlier runs not yet rotated are before this point
+        with LogFollower(self.log_file) as follower:
             try:
-                # Look for "Done" in the latest log content
-                if self.log_file.exists():
-                    log_text = self.log_file.read_text(errors="ignore")
-                    if "Done (" in log_text:
-                        success = True
+                # the pid file must exist before admission is released, later checks count this server by it
+                with span("admission and launch"), self.admit(meta, admission):
+                    launched = time.monotonic()
+                    with open(self.log_file, "a", encoding="utf-8") as log_fh:
+                        process = subprocess.Popen(
+                            cmd,
+                            cwd=self.server_path,
+                            stdout=log_fh,
+                            stderr=subprocess.STDOUT,
+                        )
+                    self.pid_file.write_text(str(process.pid))
+            except (AdmissionError, PortAllocationError) as e:
+                result.error = str(e)
+                print(f"Not starting: {e}")
+                return result
+            print(f"Started server '{self.server_name}' (PID {process.pid})")
+            result.started = True
+            result.pid = process.pid
+            if not wait:
+                return result
+
+            deadline = launched + timeout
+            with span("wait until ready"):
+                while True:
+                    if any(ready_pattern.search(line) for line in follower.read_lines()):
+                        result.ready = True
+                        result.time_to_ready = time.monotonic() - launched
+                        break
+                    if process.poll() is not None:
+                        print("Server process exited prematurely.")
+                        print(f"Check log file at '{self.log_file}'")
+                        self.pid_file.unlink(missing_ok=True)
+                        result.started = False
+                        return result
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
                         break
-            except Exception:
-                pass
+                    # wake up at least once a second to notice a crashed process
+                    follower.wait(min(remaining, 1.0))
 
-        if success:
-            print(f"✅ Server '{self.server_name}' started successfully.")
+        if result.ready:
+            print(f"✅ Server '{self.server_name}' started successfully in {result.time_to_ready:.1f}s.")
         else:
-            print(f"⚠️ Server '{self.server_name}' did not report 'Done' after 10s.")
+            print(f"⚠️ Server '{self.server_name}' did not report readiness after {timeout:.0f}s.")
             print(f"Check logs at: {self.log_file}")
+        return result
 
-    def stop(self) -> None:
+    def prepare_start(self, meta: Dict[str, Any]) -> Optional[str]:
         """
-        Stopping a server based on the pid saved in a text file.
-        :return: None
+        Everything that happens before a launch: make sure the server exists and is not running, record the
+        game port of servers installed before ports were allocated, then rotate its log.
+        :return: why the server cannot be started, None if it can
         """
+        cmd = self.launch_command(meta)
+        if not Path(cmd[cmd.index("-jar") + 1]).exists():
+            return "Server does not exist"
+        if self._is_running():
+            return f"Server '{self.server_name}' is already running"
+
+        notice = PortAllocator(self.base_path).ensure_assigned(self.server_name)
+        if notice:
+            print(notice)
+        self._rotate_log(meta)
+        return None
+
+    @contextmanager
+    def admit(self, meta: Dict[str, Any], admission: Optional[str] = None) -> Iterator[None]:
+        """
+        Hold the admission lock while the caller launches the server and writes its pid file. Its ports are
+        checked under the same lock, so concurrent starts cannot both take a port or the same free memory.
+        :raises AdmissionError: if the server does not fit into memory
+        :raises PortAllocationError: if a port the server listens on is taken
+        """
+        with AdmissionController(self.base_path).admit(self.server_name, meta, admission):
+            conflicts = PortAllocator(self.base_path).check(self.server_name)
+            if conflicts:
+                raise PortAllocationError("; ".join(conflicts))
+            yield
+
+    @staticmethod
+    def readiness(meta: Dict[str, Any], timeout: Optional[float] = None) -> Tuple["re.Pattern[str]", float]:
+        """
+        Return the log line pattern that means the server is ready and how long to wait for it.
+        """
+        if timeout is None:
+            timeout = float(meta.get("start_timeout") or START_TIMEOUTS.get(meta.get("type", ""), DEFAULT_START_TIMEOUT))
+        return re.compile(meta.get("ready_pattern") or DEFAULT_READY_PATTERN), timeout
+
+    def _rotate_log(self, meta: Dict[str, Any]) -> None:
+        self.log_file.parent.mkdir(exist_ok=True)
+        settings = load_settings(self.base_path)
+        archive = rotate(
+            self.log_file,
+            int(meta.get("log_max_bytes", settings["log_max_bytes"])),
+            float(meta.get("log_max_age_days", settings["log_max_age_days"])),
+            float(meta.get("log_retention_days", settings["log_retention_days"])),
+        )
+        if archive is not None:
+            print(f"Archived previous log to '{archive.name}'")
+
+    def stop(self, timeout: float = SHUTDOWN_TIMEOUT) -> StopResult:
+        """
+        Stop a server gracefully with save-all/stop over RCON, falling back to SIGTERM and finally SIGKILL.
+        :param timeout: seconds each shutdown step may take before falling back to the next one
+        :return: StopResult
+        """
+        result = StopResult(name=self.server_name, stopped=False)
         if not self._is_running():
             print(f"Server '{self.server_name}' is not running.")
-            return
+            return result
 
         pid = int(self.pid_file.read_text().strip())
+        began = time.monotonic()
 
         try:
-            os.kill(pid, signal.SIGTERM)
-            os.remove(self.pid_file)
+            with span("rcon stop"):
+                stopped = self._stop_via_rcon(pid, timeout)
+            if not stopped:
+                with span("signal stop"):
+                    os.kill(pid, signal.SIGTERM)
+                    if not _wait_for_exit(pid, timeout):
+                        print(f"Server '{self.server_name}' did not stop within {timeout:.0f}s, killing it.")
+                        os.kill(pid, signal.SIGKILL)
+                        _wait_for_exit(pid, 5)
+            # mctld may already have removed it when it saw the process exit
+            self.pid_file.unlink(missing_ok=True)
+            result.stopped = True
+            result.seconds = time.monotonic() - began
             print(f"Server '{self.server_name}' stopped.")
         except ProcessLookupError:
             print("Process not found — removing stale pid file.")
             self.pid_file.unlink(missing_ok=True)
+        return result
+
+    def _stop_via_rcon(self, pid: int, timeout: float) -> bool:
+        """
+        Returns True once the process exited after save-all/stop, False if the caller should fall back to signals.
+        """
+        if rcon_settings(self.server_name, self.base_path) is None:
+            return False
+        try:
+            server_command(self.server_name, "save-all", base_path=self.base_path)
+            server_command(self.server_name, "stop", retry=False, base_path=self.base_path)
+        except RconError as e:
+            # 'stop' may close the connection before it answers
+            if not _wait_for_exit(pid, 1):
+                print(f"RCON stop failed for '{self.server_name}' ({e}), sending SIGTERM.")
+                return False
+            return True
+        return _wait_for_exit(pid, timeout)
+
+
+def _wait_for_exit(pid: int, timeout: float) -> bool:
+    """
+    Poll until a process that is not our child disappears. Returns False on timeout.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        try:
+            # reap it if it happens to be our own child
+            if os.waitpid(pid, os.WNOHANG)[0] == pid:
+                return True
+        except ChildProcessError:
+            pass
+        time.sleep(0.1)
+    return False
@@ -0,0 +1,198 @@
+import errno
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from mctl.core.interfaces import ProcessSample
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+# 0-based positions in /proc/<pid>/stat after the ')' that closes the command name
+_STAT_UTIME = 11
+_STAT_STIME = 12
+_STAT_THREADS = 17
+_STAT_RSS = 21
+
+_READ_SIZE = 4096
+
+
+class _ProcHandles:
+    """
+    Open descriptors on the /proc files of one process, re-read with pread on every sample.
+
+    The descriptors stay bound to the process they were opened for, so once it exits (even if
+    the PID is reused) reads fail and the handles are dropped instead of reporting another process.
+    """
+
+    def __init__(self, pid: int, pss: bool, proc: Path):
+        self.pid = pid
+        self.path = proc / str(pid)
+        self.stat = os.open(self.path / "stat", os.O_RDONLY | os.O_CLOEXEC)
+        self.io = self._open_optional(self.path / "io")
+        self.smaps = self._open_optional(self.path / "smaps_rollup") if pss else None
+        self.last: Optional[Tuple[float, float]] = None  # (monotonic time, cpu seconds)
+
+    @staticmethod
+    def _open_optional(path: Path) -> Optional[int]:
+        # io and smaps_rollup need ptrace access and smaps_rollup needs Linux 4.14+
+        try:
+            return os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+        except OSError:
+            return None
+
+    @staticmethod
+    def _read(fd: int) -> str:
+        chunks = []
+        offset = 0
+        while True:
+            chunk = os.pread(fd, _READ_SIZE, offset)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            offset += len(chunk)
+        return b"".join(chunks).decode("ascii", errors="replace")
+
+    @staticmethod
+    def _fields(text: str) -> Dict[str, int]:
+        fields = {}
+        for line in text.splitlines():
+            key, _, value = line.partition(":")
+            parts = value.split()
+            if parts and parts[0].isdigit():
+                fields[key] = int(parts[0])
+        return fields
+
+    def read(self, sample: ProcessSample) -> None:
+        stat = self._read(self.stat)
+        values = stat[stat.rindex(")") + 2:].split()
+        sample.cpu_seconds = (int(values[_STAT_UTIME]) + int(values[_STAT_STIME])) / CLOCK_TICKS
+        sample.threads = int(values[_STAT_THREADS])
+        sample.rss_bytes = int(values[_STAT_RSS]) * PAGE_SIZE
+
+        if self.smaps is not None:
+            pss = self._fields(self._read(self.smaps)).get("Pss")
+            sample.pss_bytes = pss * 1024 if pss is not None else None
+        if self.io is not None:
+            io = self._fields(self._read(self.io))
+            sample.read_bytes, sample.write_bytes = io.get("read_bytes"), io.get("write_bytes")
+        try:
+            sample.open_fds = len(os.listdir(self.path / "fd"))
+        except PermissionError:
+            sample.open_fds = None
+
+    def close(self) -> None:
+        for fd in (self.stat, self.io, self.smaps):
+            if fd is not None:
+                os.close(fd)
+
+
+class MetricsSampler:
+    """
+    Samples CPU, memory, threads, open files and I/O of server processes from /proc.
+
+    Meant to be kept around and called repeatedly: /proc files are opened once per process and
+    re-read in place, and CPU usage is the delta against the previous sample of the same process.
+    """
+
+    def __init__(self, pss: bool = True, proc: Path = Path("/proc")):
+        self.pss = pss
+        self.proc = proc
+        self._handles: Dict[int, _ProcHandles] = {}
+
+    def __enter__(self) -> "MetricsSampler":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def sample(self, pids: Dict[str, Optional[int]]) -> List[ProcessSample]:
+        """
+        Sample every server in one pass.
+        :param pids: server name to PID, None for servers that are not running
+        :return: one ProcessSample per server, in the given order
+        """
+        samples = []
+        for name, pid in pids.items():
+            sample = ProcessSample(name=name, pid=pid, running=False)
+            if pid is not None:
+                sample.running = self._sample_pid(pid, sample)
+            samples.append(sample)
+
+        # forget processes that are gone or no longer asked for
+        alive = {s.pid for s in samples if s.running}
+        for pid in [p for p in self._handles if p not in alive]:
+            self._handles.pop(pid).close()
+        return samples
+
+    def _sample_pid(self, pid: int, sample: ProcessSample) -> bool:
+        handles = self._handles.get(pid)
+        try:
+            if handles is None:
+                handles = self._handles[pid] = _ProcHandles(pid, self.pss, self.proc)
+            now = time.monotonic()
+            handles.read(sample)
+        except (FileNotFoundError, ProcessLookupError):
+            return False
+        except OSError as e:
+            # pread fails with ESRCH once the process is gone
+            if e.errno == errno.ESRCH:
+                return False
+            raise
+
+        if handles.last is not None and now > handles.last[0]:
+            sample.cpu_percent = 100.0 * (sample.cpu_seconds - handles.last[1]) / (now - handles.last[0])
+        handles.last = (now, sample.cpu_seconds)
+        return True
+
+    def close(self) -> None:
+        for handles in self._handles.values():
+            handles.close()
+        self._handles.clear()
+
+
+_METRICS = [
+    # (metric name, type, help, sample attribute)
+    ("mctl_server_up", "gauge", "Whether the server process is running.", "running"),
+    ("mctl_server_cpu_seconds_total", "counter", "User and system CPU time of the server process.", "cpu_seconds"),
+    ("mctl_server_resident_memory_bytes", "gauge", "Resident set size of the server process.", "rss_bytes"),
+    ("mctl_server_pss_memory_bytes", "gauge", "Proportional set size of the server process.", "pss_bytes"),
+    ("mctl_server_threads", "gauge", "Number of threads of the server process.", "threads"),
+    ("mctl_server_open_fds", "gauge", "Number of open file descriptors of the server process.", "open_fds"),
+    ("mctl_server_read_bytes_total", "counter", "Bytes the server process read from storage.", "read_bytes"),
+    ("mctl_server_written_bytes_total", "counter", "Bytes the server process wrote to storage.", "write_bytes"),
+]
+
+
+def _format(value: Union[bool, int, float]) -> str:
+    if isinstance(value, float):
+        return repr(value)
+    return str(int(value))
+
+
+def render_textfile(samples: List[ProcessSample]) -> str:
+    """
+    Render samples in the Prometheus text exposition format.
+    """
+    lines = []
+    for metric, kind, help_text, attr in _METRICS:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for sample in samples:
+            value = getattr(sample, attr)
+            if metric != "mctl_server_up" and (not sample.running or value is None):
+                continue
+            lines.append(f'{metric}{{server="{sample.name}"}} {_format(value)}')
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path: Path, samples: List[ProcessSample]) -> None:
+    """
+    Write samples for node_exporter's textfile collector.
+    The file is replaced atomically so the collector never reads a partial file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(render_textfile(samples), encoding="utf-8")
+    os.replace(tmp, path)
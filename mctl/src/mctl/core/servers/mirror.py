@@ -0,0 +1,149 @@
+import os
+import re
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import DefaultDict, List, Optional, Tuple, Type
+
+from mctl.core.interfaces import MirrorSyncResult
+from mctl.core.servers.types import load_installer_class
+from mctl.core.servers.types.fabric import FabricInstaller
+from mctl.core.utils.downloader import Downloader
+from mctl.core.utils.http_cache import MetadataCache
+from mctl.core.utils.mirror import local_path, mirror_path
+
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def sync(root: Path, items: List[Tuple[str, str]], workers: int = 4) -> List[MirrorSyncResult]:
+    """
+    Copy what installing each (type, version) needs into a mirror directory: every metadata document
+    the installer reads plus the verified jars. Jars already in the mirror are not downloaded again.
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    # documents are cached next to the mirror so repeated syncs only revalidate them
+    metadata = MetadataCache(root / ".metadata", record_to=root)
+    # 'latest' and an explicit version can resolve to the same jar; only one of them downloads it
+    jar_locks: DefaultDict[str, threading.Lock] = defaultdict(threading.Lock)
+
+    def sync_one(item: Tuple[str, str]) -> MirrorSyncResult:
+        server_type, version = item
+        result = MirrorSyncResult(server_type=server_type, version=version)
+        try:
+            impl = load_installer_class(server_type)(metadata)
+            result.resolved = impl.resolve_version(version)
+            info = impl.get_download(result.resolved)
+            downloads = [info]
+            if isinstance(impl, FabricInstaller):
+                # the vanilla server jar fabric-server-launch.jar starts
+                downloads.append(impl.get_game_download(result.resolved))
+            for download in downloads:
+                with jar_locks[download.url]:
+                    Downloader().fetch(download, mirror_path(root, download.url))
+            result.url = info.url
+            result.size = sum(mirror_path(root, d.url).stat().st_size for d in downloads)
+        except Exception as e:
+            result.error = str(e)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="mirror") as pool:
+        return list(pool.map(sync_one, list(dict.fromkeys(items))))
+
+
+def _parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Return the (first, last) byte of a single-range request, None to send the whole file.
+    :raises ValueError: if the range cannot be satisfied
+    """
+    match = RANGE.match(header or "")
+    if not match or not (match.group(1) or match.group(2)):
+        return None
+    if not match.group(1):
+        first, last = max(0, size - int(match.group(2))), size - 1
+    else:
+        first = int(match.group(1))
+        last = min(size - 1, int(match.group(2))) if match.group(2) else size - 1
+    if first > last or first >= size:
+        raise ValueError(header)
+    return first, last
+
+
+class MirrorRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves a mirror directory: GET/HEAD of /<host>/<path> with ETag/If-Modified-Since revalidation
+    and single byte ranges, so installers can revalidate metadata and download jars in segments.
+    File bodies are sent with sendfile.
+    """
+    root: Path
+    server_version = "mctl-mirror"
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self) -> None: # pylint: disable=invalid-name
+        self._serve(body=False)
+
+    def do_GET(self) -> None: # pylint: disable=invalid-name
+        self._serve(body=True)
+
+    def _not_modified(self, etag: str, mtime: float) -> bool:
+        if self.headers.get("If-None-Match"):
+            return self.headers["If-None-Match"] == etag
+        since = self.headers.get("If-Modified-Since")
+        if since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _serve(self, body: bool) -> None:
+        try:
+            f = open(local_path(self.root, self.path), "rb") # pylint: disable=consider-using-with
+        except (ValueError, OSError):
+            self.send_error(404)
+            return
+        with f:
+            st = os.fstat(f.fileno())
+            etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+            if self._not_modified(etag, st.st_mtime):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            try:
+                span = _parse_range(self.headers.get("Range"), st.st_size)
+            except ValueError:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{st.st_size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            first, last = span or (0, st.st_size - 1)
+            self.send_response(206 if span else 200)
+            # jars start with a zip header, everything else mirrored is JSON or text
+            jar = os.pread(f.fileno(), 2, 0) == b"PK"
+            self.send_header("Content-Type", "application/java-archive" if jar else "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(last - first + 1))
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", formatdate(st.st_mtime, usegmt=True))
+            if span:
+                self.send_header("Content-Range", f"bytes {first}-{last}/{st.st_size}")
+            self.end_headers()
+            if body and last >= first:
+                self.wfile.flush()
+                self.connection.sendfile(f, first, last - first + 1)
+
+
+def serve(root: Path, host: str = "127.0.0.1", port: int = 8780) -> None:
+    """
+    Serve a mirror directory over HTTP until interrupted.
+    """
+    handler: Type[MirrorRequestHandler] = type("BoundMirrorRequestHandler", (MirrorRequestHandler,), {"root": root.resolve()})
+    with ThreadingHTTPServer((host, port), handler) as httpd:
+        httpd.daemon_threads = True
+        print(f"Serving mirror {root} on http://{host}:{port}/ (install with --mirror http://<this host>:{port})")
+        httpd.serve_forever()
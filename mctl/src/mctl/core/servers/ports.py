@@ -0,0 +1,154 @@
+import socket
+import threading
+from pathlib import Path
+from typing import ContextManager, Dict, List, Optional, Set, Tuple
+
+import yaml
+
+from mctl.core.exceptions import PortAllocationError
+from mctl.core.servers.configurator import ServerConfigManager
+from mctl.core.servers.registry import ServerRegistry
+from mctl.core.settings import load_settings
+from mctl.core.utils.filelock import file_lock
+
+_THREAD_LOCK = threading.Lock()
+
+# mctl.yaml keys ports are recorded under; a port recorded under any of them is taken
+PORT_KEYS = ("server_port", "rcon_port", "query_port")
+# Minecraft's defaults when server.properties does not set a port
+DEFAULT_GAME_PORT = 25565
+DEFAULT_RCON_PORT = 25575
+
+
+def is_port_free(port: int, host: str = "0.0.0.0", udp: bool = False) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM if udp else socket.SOCK_STREAM) as s:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            s.bind((host, port))
+        except OSError:
+            return False
+    return True
+
+
+def _port(value: Optional[str], default: int) -> int:
+    try:
+        return int(value) if value else default
+    except ValueError:
+        return default
+
+
+class PortAllocator:
+    """
+    Hands out ports recorded in each server's mctl.yaml, so two servers never get the same one.
+    Allocation is serialised across threads and processes with a lock file in the mctl home.
+
+    The game port is also used as the query port (query answers on UDP), so a server with query
+    enabled needs nothing else.
+    """
+
+    def __init__(self, base_path: Path):
+        self.base_path = base_path
+
+    def locked(self) -> ContextManager[None]:
+        return file_lock(self.base_path / ".ports.lock", _THREAD_LOCK)
+
+    def used_ports(self, exclude: Optional[str] = None) -> Dict[int, str]:
+        """
+        Return every port recorded in a server's mctl.yaml, mapped to the server it belongs to.
+        """
+        used = {}
+        for name, entry in ServerRegistry(self.base_path).entries().items():
+            if name == exclude:
+                continue
+            for key in PORT_KEYS:
+                if isinstance(entry["meta"].get(key), int):
+                    used[entry["meta"][key]] = name
+        return used
+
+    def next_free(self, start: int, udp: bool = False, taken: Optional[Set[int]] = None) -> int:
+        """
+        Return the lowest port from start that no server has recorded and nothing is listening on.
+        Call while holding locked() and record the port before releasing it.
+        :param udp: the port must also be free for UDP
+        :param taken: further ports to skip
+        """
+        used = set(self.used_ports()) | (taken or set())
+        port = start
+        while port in used or not is_port_free(port) or (udp and not is_port_free(port, udp=True)):
+            port += 1
+            if port > 65535:
+                raise PortAllocationError(f"No free port left from {start}")
+        return port
+
+    def assign_game_port(self, name: str, taken: Optional[Set[int]] = None) -> int:
+        """
+        Give a server a game port of its own from server_port_start and point query.port at it.
+        Call while holding locked().
+        """
+        port = self.next_free(int(load_settings(self.base_path)["server_port_start"]), udp=True, taken=taken)
+        ServerConfigManager(name, self.base_path).update({"server-port": str(port), "query.port": str(port)})
+        return port
+
+    def _configured(self, name: str) -> Tuple[str, List[Tuple[str, int, bool]]]:
+        """
+        Return the bind address and the (key, port, udp) a server will listen on according to server.properties.
+        """
+        values = ServerConfigManager(name, self.base_path).get_many(
+            ["server-ip", "server-port", "enable-rcon", "rcon.port", "enable-query", "query.port"]
+        )
+        game = _port(values["server-port"], DEFAULT_GAME_PORT)
+        ports = [("server-port", game, False)]
+        if (values["enable-rcon"] or "").lower() == "true":
+            ports.append(("rcon.port", _port(values["rcon.port"], DEFAULT_RCON_PORT), False))
+        if (values["enable-query"] or "").lower() == "true":
+            ports.append(("query.port", _port(values["query.port"], game), True))
+        return values["server-ip"] or "0.0.0.0", ports
+
+    def ensure_assigned(self, name: str) -> Optional[str]:
+        """
+        Record the game port of a server installed before ports were allocated. It keeps the port in
+        server.properties unless another server has it recorded, then it is given a free one.
+        :return: a notice if the server's port was changed
+        """
+        meta_path = self.base_path / "servers" / name / "mctl.yaml"
+        with self.locked():
+            with open(meta_path, encoding="utf-8") as f:
+                meta = yaml.safe_load(f) or {}
+            if isinstance(meta.get("server_port"), int):
+                return None
+            _, ports = self._configured(name)
+            current = ports[0][1]
+            owner = self.used_ports(exclude=name).get(current)
+            notice = None
+            if owner is None:
+                meta["server_port"] = current
+            else:
+                meta["server_port"] = self.assign_game_port(name, taken={p for _, p, _ in ports})
+                notice = f"Game port {current} belongs to '{owner}', assigned port {meta['server_port']} to '{name}'"
+            with open(meta_path, "w", encoding="utf-8") as f:
+                yaml.dump(meta, f)
+        ServerRegistry(self.base_path).update(name)
+        return notice
+
+    def check(self, name: str) -> List[str]:
+        """
+        Return why a server could not bind its ports right now, empty if it can start.
+        """
+        host, ports = self._configured(name)
+        registry = ServerRegistry(self.base_path)
+        running: Dict[int, str] = {}
+        for other in registry.names():
+            if other != name and registry.is_running(other):
+                running.update({port: other for _, port, _ in self._configured(other)[1]})
+
+        problems = []
+        seen: Dict[Tuple[int, bool], str] = {}
+        for key, port, udp in ports:
+            if (port, udp) in seen:
+                problems.append(f"{key} {port} is the same as {seen[(port, udp)]}")
+            elif port in running:
+                problems.append(f"{key} {port} is used by running server '{running[port]}'")
+            elif not is_port_free(port, host, udp):
+                problems.append(f"{key} {port} is already in use by another process")
+            seen[(port, udp)] = key
+        return problems
@@ -0,0 +1,164 @@
+import json
+import re
+import shutil
+import subprocess
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from mctl.core.exceptions import ProfileError
+from mctl.core.interfaces import ProfileRecording, ProfileSummary
+from mctl.core.servers.manager import ServerManager
+from mctl.core.settings import load_settings
+
+# JFR events the summary is built from
+SUMMARY_EVENTS = ["jdk.ExecutionSample", "jdk.GarbageCollection", "jdk.ObjectAllocationSample", "jdk.ThreadCPULoad"]
+# ISO-8601 durations as written by 'jfr print --json', e.g. PT0.012S or PT1M3.5S
+_ISO_DURATION = re.compile(r"^PT(?:(\d+)H)?(?:(\d+)M)?(?:([\d.]+)S)?$")
+JCMD_TIMEOUT = 60
+_JCMD_ERROR = re.compile(r"^[\w.$]+(Exception|Error)\b")
+
+
+def jdk_tool(tool: str, meta: Dict[str, Any], settings: Dict[str, Any]) -> str:
+    """
+    Find a JDK tool (jcmd, jfr) belonging to the java a server runs on: the '<tool>_path' setting,
+    else next to the java executable (also behind a symlink such as /usr/bin/java), else on PATH.
+    """
+    if settings.get(f"{tool}_path"):
+        return str(settings[f"{tool}_path"])
+    java = shutil.which(str(meta.get("java") or settings.get("java_path") or "java"))
+    if java is not None:
+        for directory in (Path(java).parent, Path(java).resolve().parent):
+            if (directory / tool).exists():
+                return str(directory / tool)
+    return tool
+
+
+def _duration_ms(value: Any) -> float:
+    if value is None:
+        return 0.0
+    if isinstance(value, (int, float)):
+        # plain numbers are nanoseconds
+        return value / 1e6
+    match = _ISO_DURATION.match(str(value))
+    if match is None:
+        return 0.0
+    hours, minutes, seconds = (float(g) if g else 0.0 for g in match.groups())
+    return (hours * 3600 + minutes * 60 + seconds) * 1000
+
+
+def _method_name(frame: Dict[str, Any]) -> str:
+    method = frame.get("method") or {}
+    owner = str((method.get("type") or {}).get("name") or "?").replace("/", ".")
+    return f"{owner}.{method.get('name') or '?'}"
+
+
+class JvmProfiler:
+    """
+    Profiles a running server with Java Flight Recorder through jcmd, which attaches to the PID in
+    its pid file. jcmd must run as the user the server runs as.
+    """
+
+    def __init__(self, server_name: str):
+        self.manager = ServerManager(server_name)
+        self.name = server_name
+        meta = self.manager.load_meta()
+        settings = load_settings()
+        self.jcmd = jdk_tool("jcmd", meta, settings)
+        self.jfr = jdk_tool("jfr", meta, settings)
+        self.jfr_settings = str(settings["jfr_settings"])
+        self.pid = self.manager.pid()
+
+    def _run(self, *args: str, timeout: float = JCMD_TIMEOUT) -> str:
+        if self.pid is None:
+            raise ProfileError(f"Server '{self.name}' is not running")
+        try:
+            done = subprocess.run([self.jcmd, str(self.pid), *args], capture_output=True, text=True, timeout=timeout, check=False)
+        except FileNotFoundError:
+            raise ProfileError(f"jcmd not found ({self.jcmd}), set jcmd_path in config.yaml")
+        except subprocess.TimeoutExpired:
+            raise ProfileError(f"jcmd {args[0]} did not answer within {timeout:.0f}s")
+        output = (done.stdout + done.stderr).strip()
+        # jcmd may exit 0 when the JVM rejects the command: the exception follows the '<pid>:' line
+        if done.returncode != 0 or any(_JCMD_ERROR.match(line) for line in output.splitlines()[:2]):
+            raise ProfileError(f"jcmd {args[0]} failed for PID {self.pid}: {output}")
+        return done.stdout
+
+    def record(self, seconds: float, thread_dump_interval: Optional[float] = None) -> ProfileRecording:
+        """
+        Record for the given seconds and dump the recording to profiles/ in the server directory,
+        optionally appending a thread dump to a text file next to it every thread_dump_interval seconds.
+        The recording is stopped even if waiting is interrupted.
+        """
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        profiles = self.manager.server_path / "profiles"
+        profiles.mkdir(exist_ok=True)
+        recording = ProfileRecording(name=f"mctl-{stamp}", jfr_path=str(profiles / f"{stamp}.jfr"), seconds=0.0)
+
+        self._run("JFR.start", f"name={recording.name}", f"settings={self.jfr_settings}")
+        began = time.monotonic()
+        try:
+            if thread_dump_interval:
+                recording.thread_dumps_path = str(profiles / f"{stamp}-threads.txt")
+                with open(recording.thread_dumps_path, "w", encoding="utf-8") as dumps:
+                    while time.monotonic() - began < seconds:
+                        dumps.write(f"=== {time.strftime('%Y-%m-%d %H:%M:%S')} ===\n{self._run('Thread.print', '-l')}\n")
+                        dumps.flush()
+                        recording.thread_dumps += 1
+                        time.sleep(max(0.0, min(thread_dump_interval, seconds - (time.monotonic() - began))))
+            else:
+                time.sleep(seconds)
+        finally:
+            recording.seconds = time.monotonic() - began
+            # stopping with a filename dumps the recording first
+            self._run("JFR.stop", f"name={recording.name}", f"filename={recording.jfr_path}")
+        return recording
+
+    def summarize(self, jfr_path: Path, seconds: float, top: int = 15) -> ProfileSummary:
+        """
+        Summarize a recording with 'jfr print'. Only the top frame of each stack is read, which keeps
+        the output small even for long recordings.
+        """
+        try:
+            done = subprocess.run(
+                [self.jfr, "print", "--json", "--stack-depth", "1", "--events", ",".join(SUMMARY_EVENTS), str(jfr_path)],
+                capture_output=True, text=True, check=False,
+            )
+        except FileNotFoundError:
+            raise ProfileError(f"jfr not found ({self.jfr}), set jfr_path in config.yaml")
+        if done.returncode != 0:
+            raise ProfileError(f"jfr print failed: {done.stderr.strip()}")
+        try:
+            events = json.loads(done.stdout)["recording"]["events"]
+        except (ValueError, KeyError, TypeError) as e:
+            raise ProfileError(f"Cannot read jfr print output: {e}")
+        return summarize_events(events, seconds, top)
+
+
+def summarize_events(events: List[Dict[str, Any]], seconds: float, top: int = 15) -> ProfileSummary:
+    summary = ProfileSummary(seconds=seconds)
+    methods: Counter = Counter()
+    thread_load: Dict[str, List[float]] = defaultdict(list)
+    for event in events:
+        kind, values = event.get("type"), event.get("values") or {}
+        if kind == "jdk.ExecutionSample":
+            frames = (values.get("stackTrace") or {}).get("frames") or []
+            if frames:
+                summary.samples += 1
+                methods[_method_name(frames[0])] += 1
+        elif kind == "jdk.GarbageCollection":
+            summary.gc_count += 1
+            summary.gc_pause_total_ms += _duration_ms(values.get("sumOfPauses"))
+            summary.gc_pause_max_ms = max(summary.gc_pause_max_ms, _duration_ms(values.get("longestPause")))
+        elif kind == "jdk.ObjectAllocationSample":
+            summary.allocated_bytes += int(values.get("weight") or 0)
+        elif kind == "jdk.ThreadCPULoad":
+            thread = values.get("eventThread") or {}
+            name = str(thread.get("javaName") or thread.get("osName") or "?")
+            thread_load[name].append(100.0 * (float(values.get("user") or 0) + float(values.get("system") or 0)))
+
+    summary.hot_methods = methods.most_common(top)
+    averages = [(name, sum(loads) / len(loads)) for name, loads in thread_load.items()]
+    summary.thread_cpu = sorted(averages, key=lambda item: item[1], reverse=True)[:top]
+    return summary
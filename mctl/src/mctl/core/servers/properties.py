@@ -0,0 +1,126 @@
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+# key, separator (with surrounding whitespace) and value of a property line;
+# the key ends at the first unescaped '=', ':' or whitespace
+_LINE = re.compile(r"^(?P<indent>\s*)(?P<key>(?:\\.|[^\s=:\\])+)(?P<sep>\s*[=:]\s*|\s+|$)(?P<value>.*?)\s*$")
+
+
+class Properties:
+    """
+    Parsed server.properties that preserves comments, blank lines and key order.
+
+    Values are kept exactly as written (no escape processing), so unchanged lines are written back
+    byte for byte, with the file's own line endings. If a key occurs more than once the last
+    occurrence wins, as in Java.
+    """
+
+    def __init__(self, text: str = ""):
+        self._lines: List[str] = text.splitlines()
+        self.newline = "\r\n" if "\r\n" in text else "\n"
+        self._index: Dict[str, int] = {}
+        self._reindex()
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: Path) -> "Properties":
+        # no newline translation, a file written on Windows keeps its CRLF
+        with open(path, encoding="utf-8", newline="") as f:
+            return cls(f.read())
+
+    @staticmethod
+    def _key(line: str) -> Optional[str]:
+        stripped = line.lstrip()
+        if not stripped or stripped[0] in "#!":
+            return None
+        match = _LINE.match(line)
+        return match.group("key") if match else None
+
+    @staticmethod
+    def _value(line: str) -> str:
+        match = _LINE.match(line)
+        return match.group("value") if match else ""
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def keys(self) -> List[str]:
+        return sorted(self._index, key=self._index.__getitem__)
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the value for a given key, or None if not found."""
+        i = self._index.get(key)
+        return None if i is None else self._value(self._lines[i])
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        return {key: self.get(key) for key in keys}
+
+    def set(self, key: str, value: str) -> bool:
+        """
+        Set a value, keeping the line's position. Returns False if it already had this value.
+        """
+        return bool(self.update({key: value}))
+
+    def update(self, values: Mapping[str, str]) -> Dict[str, Tuple[Optional[str], str]]:
+        """
+        Set several values at once.
+        :return: the keys that actually changed, mapped to (old value, new value)
+        """
+        changes: Dict[str, Tuple[Optional[str], str]] = {}
+        for key, value in values.items():
+            value = str(value)
+            old = self.get(key)
+            duplicates = [i for i, line in enumerate(self._lines) if self._key(line) == key][:-1]
+            if old == value and not duplicates:
+                continue
+
+            self.dirty = True
+            if duplicates:
+                # drop earlier copies of the key, e.g. appended by older tools that missed 'key = value'
+                drop = set(duplicates)
+                self._lines = [line for i, line in enumerate(self._lines) if i not in drop]
+                self._reindex()
+            i = self._index.get(key)
+            if i is None:
+                self._index[key] = len(self._lines)
+                self._lines.append(f"{key}={value}")
+            else:
+                match = _LINE.match(self._lines[i])
+                assert match is not None
+                sep = match.group("sep") if match.group("sep").strip() else "="
+                self._lines[i] = f"{match.group('indent')}{key}{sep}{value}"
+            if old != value:
+                changes[key] = (old, value)
+        return changes
+
+    def _reindex(self) -> None:
+        self._index = {}
+        for i, line in enumerate(self._lines):
+            key = self._key(line)
+            if key is not None:
+                self._index[key] = i
+
+    def dumps(self) -> str:
+        return self.newline.join(self._lines) + self.newline if self._lines else ""
+
+    def save(self, path: Path) -> None:
+        """
+        Write to a temporary file next to path and rename it into place, so readers never see a partial file.
+        """
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8", newline="") as f:
+                f.write(self.dumps())
+                f.flush()
+                os.fsync(f.fileno())
+            try:
+                os.chmod(tmp, path.stat().st_mode & 0o7777)
+            except FileNotFoundError:
+                pass
+            os.replace(tmp, path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        self.dirty = False
@@ -0,0 +1,210 @@
+import itertools
+import socket
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from mctl.core.exceptions import RconError
+from mctl.core.servers.configurator import ServerConfigManager
+
+# Source RCON packet types as used by Minecraft
+AUTH = 3
+AUTH_RESPONSE = 2
+EXEC_COMMAND = 2
+RESPONSE_VALUE = 0
+
+# Minecraft splits responses into packets of at most this many body bytes
+MAX_FRAGMENT = 4096
+# Unknown packet type, answered with a single packet - used to find the end of a fragmented response
+SENTINEL_TYPE = 200
+
+
+class RconClient:
+    """
+    Minimal, blocking RCON client for a single server connection.
+    """
+
+    def __init__(self, host: str, port: int, password: str, timeout: float = 5.0):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._ids = itertools.count(1)
+
+    def __enter__(self) -> "RconClient":
+        self.connect()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    @property
+    def connected(self) -> bool:
+        return self._sock is not None
+
+    def connect(self) -> None:
+        if self._sock is not None:
+            return
+        try:
+            self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        except OSError as e:
+            raise RconError(f"Cannot connect to RCON at {self.host}:{self.port}: {e}")
+        request_id = next(self._ids)
+        self._send(request_id, AUTH, self.password)
+        # some servers send an empty RESPONSE_VALUE before the auth response
+        while True:
+            response_id, kind, _ = self._receive()
+            if kind == AUTH_RESPONSE:
+                break
+        if response_id == -1 or response_id != request_id:
+            self.close()
+            raise RconError(f"RCON authentication failed for {self.host}:{self.port}")
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
+
+    def command(self, command: str) -> str:
+        """
+        Run a console command and return its output.
+        """
+        self.connect()
+        request_id = next(self._ids)
+        self._send(request_id, EXEC_COMMAND, command)
+        response_id, _, body = self._receive()
+        if response_id != request_id:
+            raise RconError(f"Unexpected RCON response id {response_id} (expected {request_id})")
+        if len(body) < MAX_FRAGMENT:
+            return body.decode("utf-8", errors="replace")
+
+        # possibly fragmented: everything up to the sentinel's reply belongs to this command
+        sentinel_id = next(self._ids)
+        self._send(sentinel_id, SENTINEL_TYPE, "")
+        parts = [body]
+        while True:
+            response_id, _, body = self._receive()
+            if response_id == sentinel_id:
+                break
+            parts.append(body)
+        return b"".join(parts).decode("utf-8", errors="replace")
+
+    def _send(self, request_id: int, kind: int, body: str) -> None:
+        payload = struct.pack("<ii", request_id, kind) + body.encode("utf-8") + b"\x00\x00"
+        try:
+            assert self._sock is not None
+            self._sock.sendall(struct.pack("<i", len(payload)) + payload)
+        except OSError as e:
+            self.close()
+            raise RconError(f"RCON send failed: {e}")
+
+    def _receive(self) -> Tuple[int, int, bytes]:
+        (length,) = struct.unpack("<i", self._read_exact(4))
+        packet = self._read_exact(length)
+        request_id, kind = struct.unpack("<ii", packet[:8])
+        return request_id, kind, packet[8:-2]
+
+    def _read_exact(self, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            try:
+                assert self._sock is not None
+                chunk = self._sock.recv(size - len(data))
+            except OSError as e:
+                self.close()
+                raise RconError(f"RCON receive failed: {e}")
+            if not chunk:
+                self.close()
+                raise RconError("RCON connection closed by server")
+            data.extend(chunk)
+        return bytes(data)
+
+
+class RconPool:
+    """
+    Keeps one authenticated connection per server and serialises commands on it.
+    A broken connection is re-established once before the error is raised.
+    """
+
+    def __init__(self, timeout: float = 5.0):
+        self.timeout = timeout
+        self._clients: Dict[Tuple[str, int], RconClient] = {}
+        self._locks: Dict[Tuple[str, int], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def command(self, host: str, port: int, password: str, command: str, retry: bool = True) -> str: # pylint: disable=too-many-positional-arguments,too-many-arguments
+        """
+        :param retry: resend the command once on a fresh connection if the pooled one broke; off for
+            commands that must not run twice, such as 'stop', which may close the connection itself
+        """
+        key = (host, port)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None or client.password != password:
+                client = self._clients[key] = RconClient(host, port, password, timeout=self.timeout)
+            lock = self._locks.setdefault(key, threading.Lock())
+
+        with lock:
+            was_connected = client.connected
+            try:
+                return client.command(command)
+            except RconError:
+                # a pooled connection may have gone stale, e.g. after a server restart
+                if retry and was_connected and not client.connected:
+                    return client.command(command)
+                raise
+
+    def close(self) -> None:
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+
+
+POOL = RconPool()
+
+
+def rcon_settings(server_name: str, base_path: Optional[Path] = None) -> Optional[Tuple[str, int, str]]:
+    """
+    Return (host, port, password) from server.properties, or None if RCON is not enabled.
+    """
+    try:
+        cfg = ServerConfigManager(server_name, base_path)
+    except FileNotFoundError:
+        return None
+    values = cfg.get_many(["enable-rcon", "rcon.port", "rcon.password", "server-ip"])
+    if (values["enable-rcon"] or "").lower() != "true":
+        return None
+    port, password = values["rcon.port"], values["rcon.password"]
+    if not port or not port.isdigit() or not password:
+        return None
+    return values["server-ip"] or "127.0.0.1", int(port), password
+
+
+def server_command(server_name: str, command: str, retry: bool = True, base_path: Optional[Path] = None) -> str:
+    """
+    Run a console command on a managed server over its pooled RCON connection.
+    """
+    settings = rcon_settings(server_name, base_path)
+    if settings is None:
+        raise RconError(f"RCON is not enabled for server '{server_name}'")
+    return POOL.command(*settings, command, retry=retry)
+
+
+def broadcast(server_names: List[str], command: str, max_parallel: int = 16) -> Dict[str, Union[str, Exception]]:
+    """
+    Send a command to many servers concurrently. Maps each server to its response, or to the error.
+    """
+    def send(name: str) -> Union[str, Exception]:
+        try:
+            return server_command(name, command)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(server_names)))) as pool:
+        return dict(zip(server_names, pool.map(send, server_names)))
@@ -1,45 +1,187 @@
-from pathlib import Path
+import json
+import os
 import shutil
+import threading
+from pathlib import Path
+from typing import Any, ContextManager, Dict, List, Optional
 
 import yaml
 
 from mctl.core.constants import DEFAULT_HOME_PATH
 from mctl.core.interfaces import ServerInfoResponse
+from mctl.core.utils.filelock import file_lock
+
+INDEX_VERSION = 1
+
+_THREAD_LOCK = threading.Lock()
 
 
 class ServerRegistry:
+    """
+    Looks up installed servers through an index of their mctl.yaml files.
+
+    The index (registry.json in the mctl home) caches each server's metadata together with the
+    mtime and size of its mctl.yaml. Reading it costs one stat per server; only files that changed
+    since they were indexed are parsed again, and servers added or deleted by hand are picked up
+    on the next read. Only writers (install, remove, upgrade, port changes) rewrite the index.
+    """
 
     def __init__(self, base_path: Path):
         self.base = (base_path or DEFAULT_HOME_PATH).expanduser().resolve()
+        self.servers = self.base / "servers"
+        self.index_path = self.base / "registry.json"
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
 
-    def get_info(self, name: str) -> ServerInfoResponse:
-        """
-        Return metadata for a given server.
-        Raises ServerNotFoundError if not found.
-        """
-        server_dir = self.base / "servers" / name
-        meta_path = server_dir / "mctl.yaml"
+    def _locked(self) -> ContextManager[None]:
+        return file_lock(self.base / ".registry.lock", _THREAD_LOCK)
+
+    def _read_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                index = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+            return {}
+        return index.get("servers") or {}
 
-        if not meta_path.exists():
-            raise FileNotFoundError(f"Server '{name}' not found in {server_dir}")
+    def _write_index(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        tmp = self.index_path.with_name(f".{self.index_path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "servers": entries}, f, separators=(",", ":"), default=str)
+        os.replace(tmp, self.index_path)
 
+    def _index_entry(self, name: str, cached: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Return the index entry for a server, re-parsing mctl.yaml only if it changed. None if it is gone.
+        """
+        meta_path = self.servers / name / "mctl.yaml"
+        try:
+            st = meta_path.stat()
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        if cached is not None and cached.get("mtime_ns") == st.st_mtime_ns and cached.get("size") == st.st_size:
+            return cached
         with open(meta_path, encoding="utf-8") as f:
             meta = yaml.safe_load(f) or {}
+        return {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "meta": meta}
+
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the up-to-date index, server name to {"mtime_ns", "size", "meta"}, revalidating it against disk.
+        """
+        if self._entries is not None:
+            return self._entries
+
+        cached = self._read_index()
+        try:
+            names = sorted(e.name for e in os.scandir(self.servers) if e.is_dir())
+        except FileNotFoundError:
+            names = []
+
+        # revalidated in memory only: reads never take the lock or rewrite registry.json
+        entries = {}
+        for name in names:
+            entry = self._index_entry(name, cached.get(name))
+            if entry is not None:
+                entries[name] = entry
+        self._entries = entries
+        return entries
+
+    def update(self, name: str) -> None:
+        """
+        Re-index a single server after its mctl.yaml was written, or drop it if it no longer exists.
+        """
+        with self._locked():
+            entries = self._read_index()
+            entry = self._index_entry(name, None)
+            if entry is None:
+                entries.pop(name, None)
+            else:
+                entries[name] = entry
+            self._write_index(entries)
+        self._entries = None
 
+    def _to_info(self, name: str, meta: Dict[str, Any]) -> ServerInfoResponse:
         return ServerInfoResponse(**{
             "name": name,
-            "path": str(server_dir),
+            "path": str(self.servers / name),
             "type": meta.get("type"),
             "version": meta.get("version"),
             "memory": meta.get("memory"),
             "jar": meta.get("jar"),
             "java": meta.get("java", "java"),
+            "group": meta.get("group"),
         })
 
+    def get_info(self, name: str) -> ServerInfoResponse:
+        """
+        Return metadata for a given server.
+        Raises FileNotFoundError if not found.
+        """
+        entry = self._index_entry(name, self._read_index().get(name) if self._entries is None else self._entries.get(name))
+        if entry is None:
+            raise FileNotFoundError(f"Server '{name}' not found in {self.servers / name}")
+        return self._to_info(name, entry["meta"])
+
+    def names(self) -> List[str]:
+        """
+        Return the names of all installed servers.
+        """
+        return list(self.entries())
+
+    def select(self, group: Optional[str] = None) -> List[str]:
+        """
+        Return installed servers, optionally only those in the given group.
+        """
+        return [name for name, entry in self.entries().items() if group is None or entry["meta"].get("group") == group]
+
+    def list_servers(
+            self,
+            server_type: Optional[str] = None,
+            version: Optional[str] = None,
+            group: Optional[str] = None,
+            running: Optional[bool] = None,
+        ) -> List[ServerInfoResponse]:
+        """
+        Return installed servers matching all given filters.
+        :param running: True/False to only return running/stopped servers, None for both
+        """
+        result = []
+        for name, entry in self.entries().items():
+            meta = entry["meta"]
+            if server_type is not None and str(meta.get("type")).lower() != server_type.lower():
+                continue
+            if version is not None and str(meta.get("version")) != version:
+                continue
+            if group is not None and meta.get("group") != group:
+                continue
+            info = self._to_info(name, meta)
+            info.running = self.is_running(name)
+            if running is not None and info.running != running:
+                continue
+            result.append(info)
+        return result
+
+    def pid(self, name: str) -> Optional[int]:
+        """
+        Return the PID of a running server from its pid file, or None if it is not running.
+        """
+        try:
+            pid = int((self.servers / name / "pid").read_text().strip())
+            os.kill(pid, 0)
+        except (FileNotFoundError, ValueError, ProcessLookupError, PermissionError):
+            return None
+        return pid
+
+    def is_running(self, name: str) -> bool:
+        return self.pid(name) is not None
+
     def remove(self, name: str) -> None:
-        server_dir = self.base / "servers" / name
+        server_dir = self.servers / name
 
         if not server_dir.exists():
             raise FileNotFoundError(f"Server '{name}' not found in {self.base}/servers/ directory")
 
         shutil.rmtree(server_dir)
+        self.update(name)
@@ -0,0 +1,39 @@
+import importlib
+from importlib.metadata import entry_points
+from typing import TYPE_CHECKING, Dict, List, Type, cast
+
+from mctl.core.exceptions import InvalidCliArgument
+
+if TYPE_CHECKING:
+    from mctl.core.servers.types.base import BaseInstaller
+
+# Built-in types are listed statically so resolving one imports only its own module.
+# Third-party types register through this entry point group, which is only consulted
+# for names that are not built in.
+ENTRY_POINT_GROUP = "mctl.server_types"
+
+BUILTIN_TYPES: Dict[str, str] = {
+    "vanilla": "mctl.core.servers.types.vanilla:VanillaInstaller",
+    "paper": "mctl.core.servers.types.paper:PaperInstaller",
+    "purpur": "mctl.core.servers.types.purpur:PurpurInstaller",
+    "fabric": "mctl.core.servers.types.fabric:FabricInstaller",
+}
+
+
+def available_types() -> List[str]:
+    return list(BUILTIN_TYPES) + [ep.name for ep in entry_points(group=ENTRY_POINT_GROUP) if ep.name not in BUILTIN_TYPES]
+
+
+def load_installer_class(name: str) -> Type["BaseInstaller"]:
+    """
+    Import and return the installer class registered under name.
+    """
+    if name in BUILTIN_TYPES:
+        module_name, class_name = BUILTIN_TYPES[name].split(":")
+        return cast(Type["BaseInstaller"], getattr(importlib.import_module(module_name), class_name))
+
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        if ep.name == name:
+            return cast(Type["BaseInstaller"], ep.load())
+
+    raise InvalidCliArgument(f"Unsupported server type: {name} (available: {', '.join(available_types())})")
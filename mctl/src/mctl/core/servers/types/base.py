@@ -1,6 +1,24 @@
+from typing import Optional
+
+from mctl.core.constants import DEFAULT_HOME_PATH
+from mctl.core.interfaces import DownloadInfo
+from mctl.core.utils.http_cache import MetadataCache
+
+
 class BaseInstaller:
     name: str
 
+    def __init__(self, metadata: Optional[MetadataCache] = None):
+        self.metadata = metadata or MetadataCache(DEFAULT_HOME_PATH / "cache" / "metadata")
+
+    def resolve_version(self, version: str) -> str:
+        """
+        Turn an alias such as 'latest' into a concrete version.
+        :param version:
+        :return:
+        """
+        return version
+
     def get_download_url(self, version: str) -> str:
         """
         Return the URL to download the server jar for the given version.
@@ -9,10 +27,10 @@ class BaseInstaller:
         """
         raise NotImplementedError
 
-    def get_file_name(self, version: str) -> str:
+    def get_download(self, version: str) -> DownloadInfo:
         """
-        Returns file name for caching.
+        Return the download URL together with the checksums upstream publishes for it.
         :param version:
         :return:
         """
-        return f"{self.name}-{version}.jar"
+        return DownloadInfo(url=self.get_download_url(version))
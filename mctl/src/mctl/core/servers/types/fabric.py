@@ -1,19 +1,46 @@
 import subprocess
 from pathlib import Path
+from typing import Optional
 
 import typer
 import requests
 
+from mctl.core.exceptions import OfflineCacheMissError
+from mctl.core.interfaces import DownloadInfo
+from mctl.core.servers.artifacts import ArtifactStore
+from mctl.core.utils.http_cache import IMMUTABLE_TTL
+from mctl.core.utils.timing import span
 from .base import BaseInstaller
+from .vanilla import VanillaInstaller
+
+META = "https://meta.fabricmc.net/v2/versions"
 
 class FabricInstaller(BaseInstaller):
     name = "fabric"
 
+    def resolve_version(self, version: str) -> str:
+        if version != "latest":
+            return version
+        games = self.metadata.get_json(f"{META}/game")
+        return str(next(g["version"] for g in games if g.get("stable")))
+
     def get_download_url(self, version: str) -> str:
-        url = "https://meta.fabricmc.net/v2/versions/installer"
-        data = requests.get(url, timeout=10).json()
-        latest_installer = data[0]["version"]
-        return f"https://meta.fabricmc.net/v2/versions/installer/{latest_installer}"
+        return self.get_download(version).url
+
+    def get_download(self, version: str) -> DownloadInfo:
+        data = self.metadata.get_json(f"{META}/installer")
+        latest_installer = data[0]
+        jar_url = latest_installer.get("url") or f"{META}/installer/{latest_installer['version']}"
+
+        # Fabric's maven publishes a .sha1 next to every artifact
+        checksums = {}
+        try:
+            sha1 = self.metadata.get_text(f"{jar_url}.sha1", ttl=IMMUTABLE_TTL).strip()
+            if len(sha1) == 40:
+                checksums["sha1"] = sha1
+        except (requests.RequestException, OfflineCacheMissError):
+            pass
+        return DownloadInfo(url=jar_url, checksums=checksums)
 
     def install_fabric_server(self, java_path: str, dest_dir: Path, mc_version: str) -> None:
         """
@@ -28,37 +55,52 @@ class FabricInstaller(BaseInstaller):
             "server",
             "-mcversion",
             mc_version,
-            "-downloadMinecraft"
         ]
-        subprocess.run(cmd, cwd=dest_dir, check=True)
+        with span("fabric installer"):
+            subprocess.run(cmd, cwd=dest_dir, check=True)
         typer.echo("Fabric server generated successfully.")
 
-    def setup(self, base_downloads: Path, version: str, java_path: str, dest_dir: Path) -> None:
+    def get_game_download(self, version: str) -> DownloadInfo:
         """
-        Handles downloading the installer, caching it, and running it.
+        The vanilla server jar the Fabric launcher starts. mctl provides it instead of letting the
+        installer download it from Mojang, so it comes from the mirror and the artifact store.
         """
-        dest_dir.mkdir(parents=True, exist_ok=True)
-        installer_file = base_downloads / "fabric-installer.jar"
+        return VanillaInstaller(self.metadata).get_download(version)
 
-        # Download and cache the installer if not already
-        if not installer_file.exists():
-            typer.echo("Downloading Fabric installer...")
-            url = self.get_download_url(version)
-            r = requests.get(url, stream=True, timeout=120)
-            r.raise_for_status()
-            with open(installer_file, "wb") as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            typer.echo(f"Saved Fabric installer to {installer_file}")
-        else:
-            typer.echo("Using cached Fabric installer.")
+    def fetch_game(self, store: ArtifactStore, version: str, dest: Optional[Path] = None) -> str:
+        """
+        Download the vanilla server jar into the artifact store if not already there.
+        :param dest: also place it there
+        :return: its sha256
+        """
+        with span("metadata"):
+            info = self.get_game_download(version)
+        with span("download jar", version=version):
+            return store.fetch(info, VanillaInstaller.name, version, dest)
 
-        # Copy installer into destination
-        dest_copy = dest_dir / "fabric-installer.jar"
-        if not dest_copy.exists():
-            typer.echo("Copying installer to server directory.")
-            dest_copy.write_bytes(installer_file.read_bytes())
+    def fetch_installer(self, store: ArtifactStore, version: str, dest: Optional[Path] = None) -> str:
+        """
+        Download the installer into the artifact store if not already there.
+        :param dest: also place it there
+        :return: its sha256
+        """
+        with span("metadata"):
+            info = self.get_download(version)
+        with span("download installer", version=version):
+            return store.fetch(info, f"{self.name}-installer", version, dest)
+
+    def setup(self, store: ArtifactStore, version: str, java_path: str, dest_dir: Path) -> str:
+        """
+        Handles downloading the installer and the vanilla server jar, caching them, and running the installer.
+        :return: sha256 of the installer used
+        """
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        # Link the installer and the server jar into the destination, both are only read;
+        # fabric-server-launch.jar starts the server.jar next to it
+        sha256 = self.fetch_installer(store, version, dest_dir / "fabric-installer.jar")
+        self.fetch_game(store, version, dest_dir / "server.jar")
 
         # Run the installer
         self.install_fabric_server(java_path, dest_dir, version)
         typer.echo("Fabric server setup complete.")
+        return sha256
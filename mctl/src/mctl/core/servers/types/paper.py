@@ -1,14 +1,30 @@
-import requests
+from mctl.core.interfaces import DownloadInfo
 from .base import BaseInstaller
 
+API = "https://api.papermc.io/v2/projects/paper"
+
 
 class PaperInstaller(BaseInstaller):
     name = "paper"
 
+    def resolve_version(self, version: str) -> str:
+        if version != "latest":
+            return version
+        return str(self.metadata.get_json(API)["versions"][-1])
+
     def get_download_url(self, version: str) -> str:
-        api = f"https://api.papermc.io/v2/projects/paper/versions/{version}/builds"
-        builds = requests.get(api, timeout=10).json()["builds"]
+        return self.get_download(version).url
+
+    def get_download(self, version: str) -> DownloadInfo:
+        version = self.resolve_version(version)
+        api = f"{API}/versions/{version}/builds"
+        builds = self.metadata.get_json(api)["builds"]
         latest = builds[-1]
         build = latest["build"]
-        file_name = latest["downloads"]["application"]["name"]
-        return f"https://api.papermc.io/v2/projects/paper/versions/{version}/builds/{build}/downloads/{file_name}"
+        application = latest["downloads"]["application"]
+        file_name = application["name"]
+        return DownloadInfo(
+            url=f"{API}/versions/{version}/builds/{build}/downloads/{file_name}",
+            checksums={"sha256": application["sha256"]} if "sha256" in application else {},
+            build=str(build),
+        )
@@ -1,9 +1,30 @@
+from mctl.core.interfaces import DownloadInfo
 from .base import BaseInstaller
 
+API = "https://api.purpurmc.org/v2/purpur"
+
 class PurpurInstaller(BaseInstaller):
     name = "purpur"
 
+    def resolve_version(self, version: str) -> str:
+        if version != "latest":
+            return version
+        return str(self.metadata.get_json(API)["versions"][-1])
+
     def get_download_url(self, version: str) -> str:
-        url = f"https://api.purpurmc.org/v2/purpur/{version}/latest/download"
+        url = f"{API}/{version}/latest/download"
         # The Purpur API redirects to a binary, so we can return it directly
         return url
+
+    def get_download(self, version: str) -> DownloadInfo:
+        version = self.resolve_version(version)
+        # Pin the build so the published md5 matches the file we fetch
+        latest = self.metadata.get_json(f"{API}/{version}/latest")
+        build = latest.get("build")
+        if not build:
+            return DownloadInfo(url=self.get_download_url(version))
+        return DownloadInfo(
+            url=f"{API}/{version}/{build}/download",
+            checksums={"md5": latest["md5"]} if latest.get("md5") else {},
+            build=str(build),
+        )
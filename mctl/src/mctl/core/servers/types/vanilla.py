@@ -1,17 +1,43 @@
-import requests
+from typing import Any, Dict
+
+from mctl.core.interfaces import DownloadInfo
+from mctl.core.utils.http_cache import IMMUTABLE_TTL
 from .base import BaseInstaller
 
+MANIFEST_URL = "https://piston-meta.mojang.com/mc/game/version_manifest_v2.json"
+
 class VanillaInstaller(BaseInstaller):
     name = "vanilla"
 
+    def resolve_version(self, version: str) -> str:
+        if version != "latest":
+            return version
+        return str(self.metadata.get_json(MANIFEST_URL)["latest"]["release"])
+
+    def _version_info(self, version: str) -> Dict[str, Any]:
+        # A stale manifest is fine for versions it already lists - released versions never change
+        found = None
+        cached = self.metadata.peek_json(MANIFEST_URL)
+        if cached is not None:
+            found = next((v for v in cached["versions"] if v["id"] == version), None)
+        if found is None:
+            manifest = self.metadata.get_json(MANIFEST_URL)
+            found = next((v for v in manifest["versions"] if v["id"] == version), None)
+        if found is None:
+            raise FileNotFoundError(f"Version {version} does not exist")
+        return dict(found)
+
     def get_download_url(self, version: str) -> str:
-        manifest_url = "https://piston-meta.mojang.com/mc/game/version_manifest_v2.json"
-        manifest = requests.get(manifest_url, timeout=10).json()
+        return self.get_download(version).url
 
-        try:
-            version_info = next(v for v in manifest["versions"] if v["id"] == version)
-        except StopIteration as e:
-            raise FileNotFoundError(f"Version {version} does not exist") from e
+    def get_download(self, version: str) -> DownloadInfo:
+        version_info = self._version_info(self.resolve_version(version))
 
-        version_json = requests.get(version_info["url"], timeout=10).json()
-        return str(version_json["downloads"]["server"]["url"])
+        # per-version documents are content-addressed by Mojang, so they can be cached for long
+        version_json = self.metadata.get_json(version_info["url"], ttl=IMMUTABLE_TTL)
+        server = version_json["downloads"]["server"]
+        return DownloadInfo(
+            url=str(server["url"]),
+            checksums={"sha1": server["sha1"]} if "sha1" in server else {},
+            size=server.get("size"),
+        )
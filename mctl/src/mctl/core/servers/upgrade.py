@@ -0,0 +1,334 @@
+import hashlib
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+import yaml
+
+from mctl.core.exceptions import UpgradeError
+from mctl.core.interfaces import UpgradeResult
+from mctl.core.servers.installer import ServerInstaller
+from mctl.core.servers.lifecycle import start_server, stop_server
+from mctl.core.servers.manager import ServerManager
+from mctl.core.servers.registry import ServerRegistry
+from mctl.core.utils.fsclone import clone_tree, walk_files
+from mctl.core.utils.timing import span
+
+# in a server directory while it is upgraded: new/ holds the staged files, previous/ the ones they replaced
+UPGRADE_DIR = ".upgrade"
+JAR_MAGIC = b"PK\x03\x04"
+
+# (directory with the files of a release, sha256 of its artifact, jar to launch)
+Release = Tuple[Path, str, str]
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path)
+    else:
+        path.unlink(missing_ok=True)
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ServerUpgrader: # pylint: disable=too-many-instance-attributes
+    """
+    Moves servers to another version with a single restart each.
+
+    Every release (type and version) is downloaded and verified once, then cloned into each server's
+    .upgrade/new while the servers keep running. Running servers are then restarted in waves of
+    batch_size: stop, swap the staged files in with renames, update mctl.yaml and start. A server
+    that does not become ready gets its previous files and mctl.yaml back and is started again, and
+    no further waves run. Stopped servers are only switched over, after all waves succeeded.
+    """
+
+    def __init__(self, base_path: Path, batch_size: int = 1, timeout: Optional[float] = None, workers: int = 4, # pylint: disable=too-many-positional-arguments,too-many-arguments
+                 offline: bool = False, mirror: Optional[str] = None):
+        self.installer = ServerInstaller(base_path, offline=offline, mirror=mirror)
+        self.registry = ServerRegistry(base_path)
+        self.base_path = base_path
+        self.servers = base_path / "servers"
+        self.staging = base_path / "tmp" / f"upgrade-{os.getpid()}"
+        self.batch_size = max(1, batch_size)
+        self.timeout = timeout
+        self.workers = max(1, workers)
+        self._meta: Dict[str, Dict[str, Any]] = {}
+        self._staged: Dict[str, Tuple[str, str]] = {}
+        self._swapped: Dict[str, List[str]] = {}
+        # servers whose previous files could not be put back: their .upgrade directory holds the only copy
+        self._unrestored: Set[str] = set()
+
+    def upgrade(self, names: List[str], version: str, dry_run: bool = False) -> List[UpgradeResult]:
+        results = self.plan(names, version)
+        if dry_run:
+            return results
+        try:
+            with span("stage"):
+                self.stage(results)
+            self.roll_out(results)
+        finally:
+            shutil.rmtree(self.staging, ignore_errors=True)
+        return results
+
+    def plan(self, names: List[str], version: str) -> List[UpgradeResult]:
+        """
+        Resolve the target version for every server type involved; servers already on it are left alone.
+        """
+        entries = self.registry.entries()
+        results = []
+        for name in names:
+            meta = (entries.get(name) or {}).get("meta")
+            if meta is None:
+                results.append(UpgradeResult(name=name, server_type="-", from_version=None, status="failed", error="not installed"))
+            elif not meta.get("type"):
+                results.append(UpgradeResult(name=name, server_type="-", from_version=None, status="failed", error="no type in mctl.yaml"))
+            else:
+                self._meta[name] = meta
+                results.append(UpgradeResult(name=name, server_type=str(meta["type"]), from_version=meta.get("version"),
+                                             was_running=ServerManager(name, self.base_path).pid() is not None))
+
+        def resolve(server_type: str) -> Union[str, Exception]:
+            try:
+                return self.installer.resolve_version(server_type, version)
+            except Exception as e:
+                return e
+
+        types = sorted({r.server_type for r in results if r.status == "planned"})
+        with span("resolve versions"), ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="resolve") as pool:
+            resolved = dict(zip(types, pool.map(resolve, types)))
+        for result in results:
+            if result.status != "planned":
+                continue
+            target = resolved[result.server_type]
+            if isinstance(target, Exception):
+                result.status, result.error = "failed", f"cannot resolve {result.server_type} {version}: {target}"
+                continue
+            result.to_version = target
+            if str(result.from_version) == target:
+                result.status = "up to date"
+        return results
+
+    def stage(self, results: List[UpgradeResult]) -> None:
+        """
+        Build every release once, in parallel, and clone it into the servers moving to it.
+        """
+        planned = [r for r in results if r.status == "planned"]
+        keys = sorted({(r.server_type, str(r.to_version)) for r in planned})
+
+        def build(key: Tuple[str, str]) -> Union[Release, Exception]:
+            try:
+                return self._build_release(*key)
+            except Exception as e:
+                return e
+
+        def stage_one(result: UpgradeResult) -> None:
+            release = releases[(result.server_type, str(result.to_version))]
+            if isinstance(release, Exception):
+                result.status, result.error = "failed", f"{result.server_type} {result.to_version}: {release}"
+                return
+            try:
+                self._stage_server(result.name, release)
+                result.status = "staged"
+            except (OSError, UpgradeError) as e:
+                result.status, result.error = "failed", f"staging failed: {e}"
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="release") as pool:
+            releases = dict(zip(keys, pool.map(build, keys)))
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="stage") as pool:
+            list(pool.map(stage_one, planned))
+
+    def _build_release(self, server_type: str, version: str) -> Release:
+        release = self.staging / f"{server_type}-{version}"
+        _remove(release)
+        release.mkdir(parents=True)
+        with span("build release", type=server_type, version=version):
+            artifact, jar = self.installer.materialise_release(server_type, version, release)
+        # the store verified the download against upstream's checksums, make sure the blob is still intact
+        with span("verify release"):
+            if _sha256(self.installer.artifacts.blob_path(artifact)) != artifact:
+                raise UpgradeError(f"artifact {artifact[:12]} in the store is corrupt")
+            try:
+                with open(release / jar, "rb") as f:
+                    if f.read(len(JAR_MAGIC)) != JAR_MAGIC:
+                        raise UpgradeError(f"{jar} is not a jar")
+            except FileNotFoundError:
+                raise UpgradeError(f"{jar} was not created")
+        return release, artifact, jar
+
+    def _stage_server(self, name: str, release: Release) -> None:
+        path, artifact, jar = release
+        upgrade = self.servers / name / UPGRADE_DIR
+        if (upgrade / "previous").exists():
+            raise UpgradeError(f"an earlier upgrade was interrupted, restore or remove {upgrade / 'previous'} first")
+        _remove(upgrade)
+        with span("clone release", server=name):
+            clone_tree(path, upgrade / "new", walk_files(path), is_immutable=lambda rel: rel.endswith(".jar"))
+        if (upgrade / "new" / jar).stat().st_size != (path / jar).stat().st_size:
+            raise UpgradeError(f"staged {jar} differs from the release")
+        self._staged[name] = (artifact, jar)
+
+    def roll_out(self, results: List[UpgradeResult]) -> None:
+        """
+        Restart the staged servers that are running in waves, then switch over the stopped ones.
+        """
+        staged = [r for r in results if r.status == "staged"]
+        for result in staged:
+            result.was_running = ServerManager(result.name, self.base_path).pid() is not None
+        running = [r for r in staged if r.was_running]
+        waves = [running[i:i + self.batch_size] for i in range(0, len(running), self.batch_size)]
+        halted = False
+        for number, wave in enumerate(waves, 1):
+            print(f"Wave {number}/{len(waves)}: {', '.join(r.name for r in wave)}")
+            with span("wave", number=number), ThreadPoolExecutor(max_workers=len(wave), thread_name_prefix="upgrade") as pool:
+                list(pool.map(self._restart_one, wave))
+            if any(r.status != "upgraded" for r in wave):
+                halted = True
+                print("Stopping the rollout, a server in this wave was not upgraded.")
+                break
+
+        for result in staged:
+            if result.status != "staged":
+                continue
+            if halted:
+                result.status, result.error = "skipped", "an earlier wave failed"
+                self._clean(result.name)
+                continue
+            self._switch_stopped(result)
+
+    def _restart_one(self, result: UpgradeResult) -> None:
+        began = time.monotonic()
+        try:
+            with span("upgrade", server=result.name):
+                self._restart_upgraded(result, began)
+        except Exception as e:
+            result.status, result.error = "failed", str(e)
+            if not self._restore(result):
+                return
+            # the server was running before the upgrade, do not leave it down
+            if result.was_running and ServerManager(result.name, self.base_path).pid() is None:
+                self._start_again(result)
+        self._clean(result.name)
+
+    def _start_again(self, result: UpgradeResult) -> None:
+        try:
+            restarted = start_server(result.name, timeout=self.timeout, base_path=self.base_path)
+        except Exception as e:
+            result.error = f"{result.error}; starting it again failed: {e}"
+            return
+        if not restarted.ready:
+            result.error = f"{result.error}; not ready again on {result.from_version}"
+
+    def _switch_stopped(self, result: UpgradeResult) -> None:
+        try:
+            self._swap(result)
+            result.status = "upgraded"
+        except OSError as e:
+            result.status, result.error = "failed", f"swap failed: {e}"
+            if not self._restore(result):
+                return
+        self._clean(result.name)
+
+    def _restore(self, result: UpgradeResult) -> bool:
+        """
+        Put back the previous files of a server that failed halfway. Returns False if that failed too,
+        its .upgrade directory is then kept for a manual restore.
+        """
+        try:
+            if result.name in self._swapped:
+                self._revert(result)
+        except OSError as e:
+            self._unrestored.add(result.name)
+            result.error = f"{result.error}; restoring the previous files failed ({e}), see {self.servers / result.name / UPGRADE_DIR}"
+            return False
+        return True
+
+    def _restart_upgraded(self, result: UpgradeResult, began: float) -> None:
+        stopped = stop_server(result.name, base_path=self.base_path)
+        if not stopped.stopped:
+            result.status, result.error = "failed", stopped.error or "could not be stopped"
+            return
+        try:
+            self._swap(result)
+        except OSError as e:
+            result.status, result.error = "failed", f"swap failed: {e}"
+            if self._restore(result):
+                start_server(result.name, timeout=self.timeout, base_path=self.base_path)
+            return
+
+        started = start_server(result.name, timeout=self.timeout, base_path=self.base_path)
+        result.downtime = time.monotonic() - began
+        if started.ready:
+            result.status = "upgraded"
+            return
+
+        print(f"'{result.name}' did not become ready on {result.to_version}, rolling back to {result.from_version}")
+        result.status, result.error = "failed", started.error or f"not ready on {result.to_version}"
+        if started.started:
+            stop_server(result.name, base_path=self.base_path)
+        if not self._restore(result):
+            return
+        restarted = start_server(result.name, timeout=self.timeout, base_path=self.base_path)
+        result.downtime = time.monotonic() - began
+        result.status = "rolled back"
+        if not restarted.ready:
+            result.error += f", and not ready again on {result.from_version}"
+
+    def _swap(self, result: UpgradeResult) -> None:
+        """
+        Move the staged files into place, keeping the ones they replace, and point mctl.yaml at the new version.
+        Each file or directory is switched with a rename, so the server directory is never half-written.
+        """
+        server_dir = self.servers / result.name
+        new, previous = server_dir / UPGRADE_DIR / "new", server_dir / UPGRADE_DIR / "previous"
+        previous.mkdir()
+        swapped = self._swapped.setdefault(result.name, [])
+        for entry in sorted(os.listdir(new)):
+            target = server_dir / entry
+            if target.exists() or target.is_symlink():
+                os.replace(target, previous / entry)
+            swapped.append(entry)
+            os.replace(new / entry, target)
+
+        artifact, jar = self._staged[result.name]
+        meta = dict(self._meta[result.name], version=result.to_version, artifact=artifact, jar=str(server_dir / jar))
+        self._write_meta(result.name, meta)
+
+    def _revert(self, result: UpgradeResult) -> None:
+        """
+        Put the previous files back, last swapped first. An entry is forgotten only once it is back, so
+        after a failure nothing counts as reverted that is not.
+        """
+        server_dir = self.servers / result.name
+        previous = server_dir / UPGRADE_DIR / "previous"
+        swapped = self._swapped.get(result.name, [])
+        while swapped:
+            entry = swapped[-1]
+            _remove(server_dir / entry)
+            if (previous / entry).exists() or (previous / entry).is_symlink():
+                os.replace(previous / entry, server_dir / entry)
+            swapped.pop()
+        self._write_meta(result.name, self._meta[result.name])
+        del self._swapped[result.name]
+
+    def _write_meta(self, name: str, meta: Dict[str, Any]) -> None:
+        path = self.servers / name / "mctl.yaml"
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            yaml.dump(meta, f)
+        os.replace(tmp, path)
+        self.registry.update(name)
+
+    def _clean(self, name: str) -> None:
+        if name in self._unrestored:
+            return
+        self._swapped.pop(name, None)
+        shutil.rmtree(self.servers / name / UPGRADE_DIR, ignore_errors=True)
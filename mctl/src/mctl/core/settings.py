@@ -0,0 +1,70 @@
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import yaml
+
+from mctl.core.constants import DEFAULT_HOME_PATH
+
+# Values used when config.yaml does not define them
+SETTINGS_DEFAULTS: Dict[str, Any] = {
+    "java_path": "java",
+    "memory": "2G",
+    "server_port_start": 25565,
+    "rcon_port_start": 25575,
+    # starting a server is refused ('refuse'), delayed ('queue') or never checked ('off') when the
+    # heap plus estimated off-heap memory of all running servers would not fit next to memory_reserve
+    "admission": "refuse",
+    "admission_queue_timeout": 600,
+    "memory_reserve": "1G",
+    # off-heap memory (metaspace, code cache, thread stacks, direct buffers) estimated per server
+    # as this fraction of its heap, at least offheap_min; 'offheap' in mctl.yaml overrides both
+    "offheap_fraction": 0.25,
+    "offheap_min": "512M",
+    # what mctld does when a server it started exits without being stopped: no, on-failure or always
+    # ('restart' in mctl.yaml overrides it); restarts back off exponentially up to restart_backoff_max
+    # seconds and stop after restart_max consecutive failures
+    "restart_policy": "on-failure",
+    "restart_backoff": 5,
+    "restart_backoff_max": 300,
+    "restart_max": 10,
+    # mctld's watchdog: sustained lag is watchdog_lag_ms of "Can't keep up!" behind-time within
+    # watchdog_window seconds; a hang is watchdog_hang_seconds without a log line while RCON does not
+    # answer (without RCON: while the process uses no CPU). Actions are off, alert (run watchdog_hook),
+    # restart (graceful, killed after watchdog_deadline seconds) or kill (if the problem persists
+    # watchdog_deadline seconds after the alert); mctl.yaml may override any of these
+    "watchdog_lag_ms": 30000,
+    "watchdog_window": 300,
+    "watchdog_hang_seconds": 120,
+    "watchdog_lag_action": "alert",
+    "watchdog_hang_action": "restart",
+    "watchdog_deadline": 60,
+    # shell command run on every watchdog alert, with MCTL_SERVER, MCTL_EVENT, MCTL_ACTION and MCTL_DETAIL set
+    "watchdog_hook": None,
+    # JDK tools for 'mctl profile', found next to java_path (or on PATH) when not set
+    "jcmd_path": None,
+    "jfr_path": None,
+    # JFR settings file recordings use: 'profile' samples methods every 10-20 ms, 'default' is lighter
+    "jfr_settings": "profile",
+    "backups_root": "backups",
+    # the artifact store evicts least recently used jars no server or image uses beyond this size
+    "artifacts_max_bytes": 4 * 1024 ** 3,
+    # base URL of an 'mctl mirror serve' instance to install from instead of upstream
+    "mirror": None,
+    # logs/latest.log is archived at launch when larger than this or last written longer ago
+    "log_max_bytes": 50 * 1024 * 1024,
+    "log_max_age_days": 1,
+    # archived logs older than this are deleted at launch, 0 keeps them forever
+    "log_retention_days": 0,
+}
+
+
+def load_settings(base_path: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Return the global config.yaml merged over the defaults.
+    """
+    config_path = (base_path or DEFAULT_HOME_PATH) / "config.yaml"
+    settings = dict(SETTINGS_DEFAULTS)
+    if config_path.exists():
+        with open(config_path, encoding="utf-8") as f:
+            settings.update(yaml.safe_load(f) or {})
+    return settings
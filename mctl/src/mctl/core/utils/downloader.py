@@ -0,0 +1,245 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from mctl.core.exceptions import ChecksumMismatchError
+from mctl.core.interfaces import DownloadInfo
+from mctl.core.utils.mirror import mirror_from_env, mirror_url
+
+CHUNK_SIZE = 1024 * 1024
+MIN_SEGMENT_SIZE = 4 * 1024 * 1024
+DEFAULT_CONNECTIONS = 4
+POOL_SIZE = 16
+
+_SESSION_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _build_session() -> requests.Session:
+    retry = Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "HEAD"),
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Returns a process-wide HTTP session with connection pooling and retries on transient errors.
+    """
+    with _SESSION_LOCK:
+        return _build_session()
+
+
+class Downloader:
+    """
+    Downloads files over HTTP using parallel range requests.
+
+    Segments are written to ``<file>.part.<n>`` so an interrupted transfer resumes where it stopped.
+    The final file only appears (atomically) once its size and checksums are verified, and a
+    ``<file>.verified`` marker records what it was verified against.
+    With a mirror, files are fetched from {mirror}/{host}/{path} instead of upstream.
+    """
+
+    def __init__(self, connections: int = DEFAULT_CONNECTIONS, session: Optional[requests.Session] = None, mirror: Optional[str] = None):
+        self.connections = max(1, connections)
+        self.session = session or get_session()
+        self.mirror = mirror or mirror_from_env()
+
+    @staticmethod
+    def marker_path(dest: Path) -> Path:
+        return dest.with_name(dest.name + ".verified")
+
+    def is_cached(self, dest: Path, info: Optional[DownloadInfo] = None) -> bool:
+        """
+        Return True if dest was downloaded and verified, and still matches the expected checksums.
+        """
+        marker = self.marker_path(dest)
+        if not dest.exists() or not marker.exists():
+            return False
+        try:
+            meta = json.loads(marker.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        if meta.get("size") != dest.stat().st_size:
+            return False
+        if info is not None:
+            known = meta.get("checksums", {})
+            for algorithm, expected in info.checksums.items():
+                if algorithm in known and known[algorithm] != expected.lower():
+                    return False
+        return True
+
+    def fetch(self, info: DownloadInfo, dest: Path) -> Path:
+        """
+        Download info.url to dest unless a verified copy is already there.
+        :param info: URL plus the checksums/size published by upstream
+        :param dest: final file location
+        :return: dest
+        """
+        if self.is_cached(dest, info):
+            print(f"Using cached {dest}")
+            return dest
+
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        url, size, ranges = self._probe(mirror_url(info.url, self.mirror))
+        if info.size is not None and size is not None and info.size != size:
+            raise ChecksumMismatchError(f"Upstream size mismatch for {info.url}: expected {info.size}, got {size}")
+
+        segments = self._plan_segments(size, ranges)
+        self._prepare_state(dest, url, size, segments)
+
+        if len(segments) > 1:
+            with ThreadPoolExecutor(max_workers=len(segments)) as pool:
+                list(pool.map(lambda item: self._fetch_segment(url, dest, *item), enumerate(segments)))
+        else:
+            self._fetch_segment(url, dest, 0, segments[0] if segments else None)
+
+        part = dest.with_name(dest.name + ".part")
+        digests = self._assemble(dest, part, len(segments) or 1)
+        try:
+            self._verify(info, part, size, digests)
+        except ChecksumMismatchError:
+            self._state_path(dest).unlink(missing_ok=True)
+            raise
+
+        os.replace(part, dest)
+        self.marker_path(dest).write_text(
+            json.dumps({"url": info.url, "size": dest.stat().st_size, "checksums": digests}), encoding="utf-8"
+        )
+        self._state_path(dest).unlink(missing_ok=True)
+        print(f"Saved to {dest}")
+        return dest
+
+    def _probe(self, url: str) -> Tuple[str, Optional[int], bool]:
+        """
+        Follow redirects once and find out the size and whether byte ranges are supported.
+        """
+        try:
+            r = self.session.head(url, allow_redirects=True, timeout=30)
+            r.raise_for_status()
+        except requests.RequestException:
+            return url, None, False
+        length = r.headers.get("Content-Length")
+        size = int(length) if length and length.isdigit() else None
+        ranges = r.headers.get("Accept-Ranges", "").lower() == "bytes"
+        return r.url or url, size, ranges
+
+    def _plan_segments(self, size: Optional[int], ranges: bool) -> List[Tuple[int, int]]:
+        if size is None:
+            return []
+        if not ranges or size < 2 * MIN_SEGMENT_SIZE:
+            return [(0, size - 1)] if size else []
+        count = min(self.connections, size // MIN_SEGMENT_SIZE)
+        step = size // count
+        bounds = [i * step for i in range(count)] + [size]
+        return [(bounds[i], bounds[i + 1] - 1) for i in range(count)]
+
+    @staticmethod
+    def _state_path(dest: Path) -> Path:
+        return dest.with_name(dest.name + ".part.json")
+
+    @staticmethod
+    def _segment_path(dest: Path, index: int) -> Path:
+        return dest.with_name(f"{dest.name}.part.{index}")
+
+    def _prepare_state(self, dest: Path, url: str, size: Optional[int], segments: List[Tuple[int, int]]) -> None:
+        """
+        Keep partial segments only if they belong to the same transfer layout, otherwise start over.
+        """
+        state = {"url": url, "size": size, "segments": [list(s) for s in segments]}
+        state_path = self._state_path(dest)
+        previous = None
+        if state_path.exists():
+            try:
+                previous = json.loads(state_path.read_text(encoding="utf-8"))
+            except ValueError:
+                previous = None
+
+        resumable = size is not None and previous is not None \
+            and previous.get("size") == size and previous.get("segments") == state["segments"]
+        if not resumable:
+            for part in dest.parent.glob(f"{dest.name}.part.*"):
+                if part != state_path:
+                    part.unlink()
+        state_path.write_text(json.dumps(state), encoding="utf-8")
+
+    def _fetch_segment(self, url: str, dest: Path, index: int, segment: Optional[Tuple[int, int]]) -> None:
+        part = self._segment_path(dest, index)
+        done = part.stat().st_size if part.exists() else 0
+        headers: Dict[str, str] = {}
+
+        if segment is not None:
+            start, end = segment
+            if done == end - start + 1:
+                return
+            if done > end - start + 1:
+                part.unlink()
+                done = 0
+            if done:
+                print(f"Resuming {dest.name} segment {index} at {done} bytes")
+            headers["Range"] = f"bytes={start + done}-{end}"
+        else:
+            done = 0
+
+        with self.session.get(url, headers=headers, stream=True, timeout=120) as r:
+            r.raise_for_status()
+            if "Range" in headers and r.status_code != 206:
+                if segment is not None and segment[0] != 0:
+                    raise requests.HTTPError(f"Server ignored range request for {url}")
+                done = 0
+            with open(part, "ab" if done else "wb") as f:
+                for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                    f.write(chunk)
+
+    def _assemble(self, dest: Path, part: Path, count: int) -> Dict[str, str]:
+        """
+        Concatenate segments into <file>.part while computing SHA-1/SHA-256 in the same pass.
+        """
+        hashers = {"sha1": hashlib.sha1(), "sha256": hashlib.sha256()}
+        with open(part, "wb") as out:
+            for index in range(count):
+                segment = self._segment_path(dest, index)
+                with open(segment, "rb") as f:
+                    while block := f.read(CHUNK_SIZE):
+                        for h in hashers.values():
+                            h.update(block)
+                        out.write(block)
+        for index in range(count):
+            self._segment_path(dest, index).unlink(missing_ok=True)
+        return {name: h.hexdigest() for name, h in hashers.items()}
+
+    def _verify(self, info: DownloadInfo, part: Path, size: Optional[int], digests: Dict[str, str]) -> None:
+        actual_size = part.stat().st_size
+        expected_size = info.size if info.size is not None else size
+        problem = None
+        if expected_size is not None and actual_size != expected_size:
+            problem = f"size {actual_size} != {expected_size}"
+        for algorithm, expected in info.checksums.items():
+            actual = digests.get(algorithm)
+            if actual is None:
+                h = hashlib.new(algorithm)
+                with open(part, "rb") as f:
+                    while block := f.read(CHUNK_SIZE):
+                        h.update(block)
+                actual = h.hexdigest()
+            if actual != expected.lower():
+                problem = f"{algorithm} {actual} != {expected.lower()}"
+        if problem:
+            part.unlink(missing_ok=True)
+            raise ChecksumMismatchError(f"Download of {info.url} failed verification: {problem}")
@@ -0,0 +1,27 @@
+import fcntl
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+
+@contextmanager
+def file_lock(path: Path, thread_lock: Optional[threading.Lock] = None, shared: bool = False) -> Iterator[None]:
+    """
+    Hold a lock on path across processes with flock, exclusive unless shared is set.
+    Every call opens its own descriptor, so threads exclude each other too; thread_lock can
+    additionally serialise threads of this process.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if thread_lock is not None:
+        thread_lock.acquire()
+    try:
+        with open(path, "a", encoding="utf-8") as lock:
+            fcntl.flock(lock, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+    finally:
+        if thread_lock is not None:
+            thread_lock.release()
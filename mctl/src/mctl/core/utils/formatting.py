@@ -0,0 +1,9 @@
+def human_size(size: float) -> str:
+    """
+    Format a byte count with binary units, e.g. 1536 -> '1.5 KiB'.
+    """
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TiB"
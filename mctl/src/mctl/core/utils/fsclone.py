@@ -0,0 +1,120 @@
+import errno
+import fcntl
+import os
+import shutil
+import stat
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Set
+
+from mctl.core.interfaces import CloneStats
+
+# ioctl(dst, FICLONE, src) shares all extents of src with dst (btrfs, XFS, bcachefs, overlayfs on those)
+FICLONE = 0x40049409
+LINK_MODES = ("auto", "reflink", "hardlink", "copy")
+
+# st_dev of filesystems that refused a reflink, so it is not attempted for every file
+_NO_REFLINK: Set[int] = set()
+_UNSUPPORTED = {errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.EXDEV, errno.ENOSYS, errno.EPERM}
+
+
+def reflink(src: Path, dst: Path) -> bool:
+    """
+    Create dst as a copy-on-write clone of src. False if the filesystem cannot do it.
+    """
+    device = os.stat(src.parent).st_dev
+    if device in _NO_REFLINK:
+        return False
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED:
+                raise
+            _NO_REFLINK.add(device)
+            failed = True
+        else:
+            failed = False
+    if failed:
+        dst.unlink()
+        return False
+    shutil.copystat(src, dst)
+    return True
+
+
+def clone_file(src: Path, dst: Path, mode: str = "auto", immutable: bool = False) -> str:
+    """
+    Materialise src at dst as cheaply as mode allows:
+
+    - reflink: shares data blocks copy-on-write, safe for any file
+    - hardlink: shares the inode, only used for immutable files since writes would show up in both
+    - copy: a real copy
+
+    'auto' tries a reflink, then a hardlink for immutable files, then copies.
+    An existing dst is unlinked first, never written through, as it may itself be a hardlink.
+    :return: the method that was used
+    """
+    dst.unlink(missing_ok=True)
+    if mode in ("auto", "reflink") and reflink(src, dst):
+        return "reflink"
+    if mode in ("auto", "hardlink") and immutable:
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.EOPNOTSUPP):
+                raise
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+def walk_files(root: Path, exclude_dirs: Iterable[str] = (), exclude_files: Iterable[str] = ()) -> Iterable[str]:
+    """
+    Yield relative posix paths of the regular files and symlinks under root. exclude_dirs only
+    applies to top-level directories, exclude_files to file names anywhere.
+    """
+    skip_dirs, skip_files = set(exclude_dirs), set(exclude_files)
+    for dirpath, dirnames, filenames in os.walk(root):
+        if dirpath == str(root):
+            dirnames[:] = [d for d in dirnames if d not in skip_dirs]
+        relative = os.path.relpath(dirpath, root)
+        # symlinked directories are not descended into, they are recreated as links
+        links = [d for d in dirnames if os.path.islink(os.path.join(dirpath, d))]
+        dirnames[:] = sorted(d for d in dirnames if d not in links)
+        filenames += links
+        for name in sorted(filenames):
+            if name in skip_files or (name.startswith(".") and name.endswith(".tmp")):
+                continue
+            yield name if relative == "." else f"{relative}/{name}"
+
+
+def clone_tree(
+        src: Path,
+        dst: Path,
+        files: Iterable[str],
+        mode: str = "auto",
+        is_immutable: Callable[[str], bool] = lambda path: False,
+    ) -> CloneStats:
+    """
+    Clone the given relative paths from src into dst with clone_file, recreating directories and symlinks.
+    """
+    began = time.monotonic()
+    stats = CloneStats()
+    made: Set[str] = set()
+    for rel in files:
+        source = src / rel
+        target = dst / rel
+        parent = os.path.dirname(rel)
+        if parent not in made:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            made.add(parent)
+        st = os.lstat(source)
+        if stat.S_ISLNK(st.st_mode):
+            os.symlink(os.readlink(source), target)
+            stats.symlink += 1
+            continue
+        method = clone_file(source, target, mode, is_immutable(rel))
+        setattr(stats, method, getattr(stats, method) + 1)
+        stats.bytes += st.st_size
+    stats.seconds = time.monotonic() - began
+    return stats
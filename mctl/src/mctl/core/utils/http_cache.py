@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import requests
+
+from mctl.core.exceptions import OfflineCacheMissError
+from mctl.core.utils.downloader import get_session
+from mctl.core.utils.mirror import mirror_from_env, mirror_path, mirror_url
+
+# How long upstream metadata is trusted before it is revalidated
+MUTABLE_TTL = 10 * 60
+IMMUTABLE_TTL = 30 * 24 * 60 * 60
+
+
+def offline_from_env() -> bool:
+    return os.environ.get("MCTL_OFFLINE", "").lower() in ("1", "true", "yes")
+
+
+class MetadataCache:
+    """
+    On-disk cache for upstream version metadata.
+
+    Entries younger than their TTL are served from disk without touching the network. Older
+    entries are revalidated with If-None-Match/If-Modified-Since, so an unchanged upstream costs a
+    304 instead of the full document. In offline mode only the cache is consulted.
+
+    With a mirror, documents are requested from the mirror instead of upstream; entries stay keyed
+    by the upstream URL. record_to additionally writes every document served into a mirror directory.
+    """
+
+    def __init__(
+            self,
+            cache_dir: Path,
+            offline: bool = False,
+            session: Optional[requests.Session] = None,
+            mirror: Optional[str] = None,
+            record_to: Optional[Path] = None,
+        ):
+        self.cache_dir = cache_dir
+        self.offline = offline or offline_from_env()
+        self.session = session or get_session()
+        self.mirror = mirror or mirror_from_env()
+        self.record_to = record_to
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _entry_path(self, url: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json"
+
+    def _load(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if url in self._memory:
+                return self._memory[url]
+        try:
+            entry: Dict[str, Any] = json.loads(self._entry_path(url).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self._memory[url] = entry
+        return entry
+
+    def _store(self, url: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[url] = entry
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp, self._entry_path(url))
+
+    def peek_text(self, url: str) -> Optional[str]:
+        """Return the cached body regardless of its age, or None."""
+        entry = self._load(url)
+        return None if entry is None else str(entry["body"])
+
+    def peek_json(self, url: str) -> Any:
+        text = self.peek_text(url)
+        return None if text is None else json.loads(text)
+
+    def get_text(self, url: str, ttl: float = MUTABLE_TTL) -> str:
+        """
+        Return the body for url, using the cache while it is fresh and revalidating it otherwise.
+        :param url:
+        :param ttl: seconds the cached body is trusted without asking upstream
+        :return:
+        """
+        body = self._get_text(url, ttl)
+        if self.record_to is not None:
+            path = mirror_path(self.record_to, url)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(body)
+            os.replace(tmp, path)
+        return body
+
+    def _get_text(self, url: str, ttl: float) -> str:
+        entry = self._load(url)
+        if entry is not None and (self.offline or time.time() - entry["fetched_at"] < ttl):
+            return str(entry["body"])
+        if self.offline:
+            raise OfflineCacheMissError(f"No cached metadata for {url} (offline mode)")
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            headers["If-Modified-Since"] = entry.get("last_modified") or formatdate(entry["fetched_at"], usegmt=True)
+
+        try:
+            r = self.session.get(mirror_url(url, self.mirror), headers=headers, timeout=10)
+            if r.status_code == 304 and entry is not None:
+                entry["fetched_at"] = time.time()
+                self._store(url, entry)
+                return str(entry["body"])
+            r.raise_for_status()
+        except requests.RequestException:
+            if entry is not None:
+                print(f"Warning: could not revalidate {url}, using cached copy")
+                return str(entry["body"])
+            raise
+
+        self._store(url, {
+            "url": url,
+            "etag": r.headers.get("ETag"),
+            "last_modified": r.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+            "body": r.text,
+        })
+        return r.text
+
+    def get_json(self, url: str, ttl: float = MUTABLE_TTL) -> Any:
+        return json.loads(self.get_text(url, ttl))
@@ -0,0 +1,123 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import time
+from pathlib import Path
+from typing import List, Optional
+
+# inotify(7) event masks
+IN_MODIFY = 0x00000002
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+
+POLL_MIN_INTERVAL = 0.05
+POLL_MAX_INTERVAL = 0.5
+
+
+class _Inotify:
+    """
+    Minimal ctypes binding to Linux inotify, watching a single directory.
+    """
+
+    def __init__(self, directory: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), IN_MODIFY | IN_CREATE | IN_MOVED_TO) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout: float) -> None:
+        ready, _, _ = select.select([self.fd], [], [], max(0.0, timeout))
+        if ready:
+            self.drain()
+
+    def drain(self) -> None:
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class LogFollower:
+    """
+    Follows a growing log file from an offset, returning only complete new lines.
+
+    Waiting for new data uses inotify on Linux and falls back to polling the file size with a
+    short backoff elsewhere. Truncation and replacement of the file (log rotation) are detected
+    and reading restarts from the beginning of the new file.
+    """
+
+    def __init__(self, path: Path, offset: Optional[int] = None):
+        self.path = path
+        self.offset = offset if offset is not None else (path.stat().st_size if path.exists() else 0)
+        self._inode: Optional[int] = None
+        self._buffer = b""
+        self._poll_interval = POLL_MIN_INTERVAL
+        self._inotify: Optional[_Inotify] = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._inotify = _Inotify(path.parent)
+        except (OSError, AttributeError):
+            self._inotify = None
+
+    def __enter__(self) -> "LogFollower":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def read_lines(self) -> List[str]:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return []
+
+        if (self._inode is not None and st.st_ino != self._inode) or st.st_size < self.offset:
+            self.offset = 0
+            self._buffer = b""
+        self._inode = st.st_ino
+        if st.st_size == self.offset:
+            return []
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(st.st_size - self.offset)
+        self.offset += len(data)
+        self._poll_interval = POLL_MIN_INTERVAL
+
+        self._buffer += data
+        *lines, self._buffer = self._buffer.split(b"\n")
+        return [line.decode("utf-8", errors="ignore").rstrip("\r") for line in lines]
+
+    def wait(self, timeout: float) -> None:
+        """
+        Block until the log directory changes or timeout seconds pass.
+        """
+        if self._inotify is not None:
+            self._inotify.wait(timeout)
+            return
+        time.sleep(min(timeout, self._poll_interval))
+        self._poll_interval = min(POLL_MAX_INTERVAL, self._poll_interval * 2)
+
+    def fileno(self) -> Optional[int]:
+        """
+        Return a descriptor that becomes readable when the log may have grown (call drain() once it
+        did), or None if changes can only be found by polling. Lets an event loop wait instead of wait().
+        """
+        return self._inotify.fd if self._inotify is not None else None
+
+    def drain(self) -> None:
+        if self._inotify is not None:
+            self._inotify.drain()
+
+    def close(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
@@ -0,0 +1,45 @@
+import os
+from pathlib import Path
+from typing import Optional
+from urllib.parse import unquote, urlsplit
+
+# Upstream paths can be both a document and a directory ('/v2/purpur' and '/v2/purpur/1.21.1/latest'),
+# so every mirrored document is stored as '<host>/<path>.mirror'
+MIRROR_SUFFIX = ".mirror"
+
+
+def mirror_from_env() -> Optional[str]:
+    return os.environ.get("MCTL_MIRROR") or None
+
+
+def mirror_url(url: str, mirror: Optional[str]) -> str:
+    """
+    Rewrite an upstream URL to its location on a mirror: {mirror}/{host}/{path}. Unchanged without a mirror.
+    """
+    if not mirror:
+        return url
+    parts = urlsplit(url)
+    rewritten = f"{mirror.rstrip('/')}/{parts.netloc}{parts.path}"
+    return f"{rewritten}?{parts.query}" if parts.query else rewritten
+
+
+def mirror_path(root: Path, url: str) -> Path:
+    """
+    Return where a mirror directory stores the document for an upstream URL.
+    """
+    parts = urlsplit(url)
+    return local_path(root, f"/{parts.netloc}{parts.path}")
+
+
+def local_path(root: Path, request_path: str) -> Path:
+    """
+    Map a request path on the mirror ('/<host>/<path>') to the file serving it, refusing paths that
+    would leave root, also through a symlink.
+    """
+    segments = [s for s in unquote(request_path.split("?", 1)[0]).split("/") if s]
+    if not segments or any(s in (".", "..") for s in segments):
+        raise ValueError(f"Invalid mirror path: {request_path}")
+    path = root.joinpath(*segments[:-1], segments[-1] + MIRROR_SUFFIX)
+    if not path.resolve().is_relative_to(root.resolve()):
+        raise ValueError(f"Invalid mirror path: {request_path}")
+    return path
@@ -0,0 +1,133 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Tuple
+
+from mctl.core.interfaces import PhaseTiming, Span
+
+# MCTL_TIMINGS=1 prints the per-phase breakdown, MCTL_TRACE=<file> writes a Chrome/Perfetto trace
+TIMINGS_ENV = "MCTL_TIMINGS"
+TRACE_ENV = "MCTL_TRACE"
+
+# a single, reusable no-op context manager: a disabled span costs one global lookup and a call
+_NOOP: ContextManager[None] = nullcontext()
+
+
+class Tracer:
+    """
+    Collects nested, timed spans from any thread. Each thread keeps its own stack, so spans in
+    worker threads start a tree of their own.
+    """
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+        self.began = time.perf_counter_ns()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[str]:
+        stack: Optional[List[str]] = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[None]:
+        stack = self._stack()
+        path = (*stack, name)
+        stack.append(name)
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter_ns() - start
+            stack.pop()
+            thread = threading.current_thread()
+            with self._lock:
+                self.spans.append(Span(name=name, path=path, start_ns=start - self.began, duration_ns=duration,
+                                       thread_id=thread.ident or 0, thread_name=thread.name, args=args))
+
+    def wall_ns(self) -> int:
+        return time.perf_counter_ns() - self.began
+
+    def phases(self) -> List[PhaseTiming]:
+        """
+        Aggregate the spans by their path, ordered depth first with children in the order they first ran.
+        """
+        grouped: Dict[Tuple[str, ...], List[Span]] = defaultdict(list)
+        for recorded in sorted(self.spans, key=lambda s: s.start_ns):
+            grouped[recorded.path].append(recorded)
+        children: Dict[Tuple[str, ...], List[Tuple[str, ...]]] = defaultdict(list)
+        for path in grouped:
+            children[path[:-1]].append(path)
+        # a phase may only have run in a thread whose parents were never recorded
+        roots = [path for path in grouped if path[:-1] not in grouped]
+
+        phases: List[PhaseTiming] = []
+
+        def visit(path: Tuple[str, ...], depth: int) -> None:
+            spans = grouped[path]
+            phases.append(PhaseTiming(name=path[-1], depth=depth, calls=len(spans),
+                                      total_ms=sum(s.duration_ns for s in spans) / 1e6,
+                                      max_ms=max(s.duration_ns for s in spans) / 1e6))
+            for child in children[path]:
+                visit(child, depth + 1)
+
+        for root in roots:
+            visit(root, 0)
+        return phases
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """
+        Return the spans in the Chrome trace event format, which chrome://tracing and ui.perfetto.dev open.
+        """
+        pid = os.getpid()
+        events: List[Dict[str, Any]] = []
+        threads: Dict[int, str] = {}
+        for recorded in self.spans:
+            threads.setdefault(recorded.thread_id, recorded.thread_name)
+            events.append({
+                "name": recorded.name, "cat": "mctl", "ph": "X", "pid": pid, "tid": recorded.thread_id,
+                "ts": recorded.start_ns / 1000, "dur": recorded.duration_ns / 1000,
+                "args": {key: str(value) for key, value in recorded.args.items()},
+            })
+        for tid, name in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_trace(self, path: Path) -> None:
+        path.write_text(json.dumps(self.chrome_trace()), encoding="utf-8")
+
+
+_TRACER: Optional[Tracer] = None
+
+
+def enable() -> Tracer:
+    """
+    Start recording spans in this process. Spans opened before this are not recorded.
+    """
+    global _TRACER # pylint: disable=global-statement
+    if _TRACER is None:
+        _TRACER = Tracer()
+    return _TRACER
+
+
+def span(name: str, **args: Any) -> ContextManager[None]:
+    """
+    Time a phase: 'with span("download", version=version): ...'. Does nothing unless timings are enabled.
+    """
+    if _TRACER is None:
+        return _NOOP
+    return _TRACER.span(name, **args)
+
+
+def timings_from_env() -> bool:
+    return os.environ.get(TIMINGS_ENV, "").lower() in ("1", "true", "yes")
+
+
+def trace_from_env() -> Optional[str]:
+    return os.environ.get(TRACE_ENV) or None
@@ -1,4 +1,6 @@
 import re
+from typing import Optional
+
 import typer
 
 def validate_arg_alphanumeric(name: str) -> str:
@@ -10,3 +12,7 @@ def validate_arg_alphanumeric(name: str) -> str:
             "This argument can contain only letters, numbers, or dashes (e.g., survival-1, myserver)."
         )
     return name
+
+
+def validate_optional_arg_alphanumeric(name: Optional[str]) -> Optional[str]:
+    return None if name is None else validate_arg_alphanumeric(name)
@@ -0,0 +1,137 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from mctl.core.constants import DEFAULT_HOME_PATH
+from mctl.core.exceptions import WorldError
+from mctl.core.interfaces import DimensionStats, RegionPruneResult
+from mctl.core.servers.configurator import ServerConfigManager
+from mctl.core.servers.manager import ServerManager
+from mctl.core.world.nbt import NbtError, find_long
+from mctl.core.world.region import SECTOR_SIZE, compact, iter_chunks, read_header
+
+# region-format folders next to 'region' that hold per-chunk data for the same coordinates (1.17+)
+CHUNK_DATA_DIRS = ("entities", "poi")
+
+
+def dimension_name(path: str) -> str:
+    """
+    Map a dimension folder relative to the server (e.g. 'world_nether/DIM-1') to its id.
+    """
+    parts = path.split("/")
+    if "dimensions" in parts and len(parts) >= parts.index("dimensions") + 3:
+        i = parts.index("dimensions")
+        return f"{parts[i + 1]}:{'/'.join(parts[i + 2:])}"
+    if parts[-1] == "DIM-1":
+        return "minecraft:the_nether"
+    if parts[-1] == "DIM1":
+        return "minecraft:the_end"
+    return "minecraft:overworld"
+
+
+def _prune_region(job: Tuple[str, int, bool]) -> RegionPruneResult:
+    """
+    Drop chunks with InhabitedTime below the threshold from one region and compact it.
+    Runs in a worker process.
+    """
+    path, min_inhabited, dry_run = job
+    region = Path(path)
+    result = RegionPruneResult(path=path)
+    drop = set()
+    for chunk, nbt in iter_chunks(region):
+        result.chunks += 1
+        inhabited = None
+        if nbt is not None:
+            try:
+                inhabited = find_long(nbt, "InhabitedTime", ("Level",))
+            except NbtError:
+                pass
+        if inhabited is None:
+            # never drop what cannot be read
+            result.unreadable += 1
+        elif inhabited < min_inhabited:
+            drop.add(chunk.index)
+    result.removed = len(drop)
+
+    targets = [region] + [p for p in (region.parent.parent / d / region.name for d in CHUNK_DATA_DIRS) if p.exists()]
+    for target in targets:
+        # only rewrite files that get smaller, i.e. lose chunks, holes or slack, or have corrupt entries
+        before, after, corrupt = compact(target, drop, dry_run=True)
+        if not dry_run and (after < before or corrupt):
+            before, after, corrupt = compact(target, drop)
+        result.bytes_before += before
+        result.bytes_after += after
+        result.corrupt += corrupt
+    return result
+
+
+class WorldManager:
+    """
+    Inspects and prunes the Anvil region files of a server's worlds.
+    """
+
+    def __init__(self, server_name: str, base_path: Optional[Path] = None):
+        self.server_name = server_name
+        self.base_path = base_path or DEFAULT_HOME_PATH
+        self.server_dir = self.base_path / "servers" / server_name
+        if not self.server_dir.exists():
+            raise WorldError(f"Server '{server_name}' not found in {self.server_dir}")
+
+    def _level_name(self) -> str:
+        try:
+            return ServerConfigManager(self.server_name, self.base_path).get("level-name") or "world"
+        except FileNotFoundError:
+            return "world"
+
+    def regions(self) -> Dict[str, List[Path]]:
+        """
+        Map each dimension folder (relative to the server directory) to its region files.
+        Covers vanilla layouts (world/DIM-1) and Bukkit-style ones (world_nether/DIM-1).
+        """
+        level = self._level_name()
+        result: Dict[str, List[Path]] = {}
+        for world in (level, f"{level}_nether", f"{level}_the_end"):
+            root = self.server_dir / world
+            if not root.is_dir():
+                continue
+            for region_dir in sorted(p for p in root.rglob("region") if p.is_dir()):
+                files = sorted(region_dir.glob("r.*.*.mca"))
+                if files:
+                    result[region_dir.parent.relative_to(self.server_dir).as_posix()] = files
+        return result
+
+    def analyze(self) -> List[DimensionStats]:
+        """
+        Per dimension chunk counts, sizes and wasted space, read from region headers only.
+        """
+        stats = []
+        for folder, files in self.regions().items():
+            dim = DimensionStats(dimension=dimension_name(folder), path=folder)
+            for path in files:
+                header = read_header(path)
+                dim.regions += 1
+                dim.chunks += len(header.chunks)
+                dim.file_bytes += header.file_size
+                dim.data_bytes += header.data_bytes
+                dim.free_bytes += header.free_sectors * SECTOR_SIZE
+                dim.slack_bytes += header.slack_sectors * SECTOR_SIZE
+            stats.append(dim)
+        return stats
+
+    def prune(self, min_inhabited: int, workers: Optional[int] = None, dry_run: bool = False) -> List[RegionPruneResult]:
+        """
+        Remove chunks players spent less than min_inhabited ticks in (20 ticks = 1 second), from
+        region files and the matching entities/poi files, and compact every region. Regions are
+        processed in parallel across a process pool.
+        """
+        if not dry_run and ServerManager(self.server_name, self.base_path).pid() is not None:
+            raise WorldError(f"Server '{self.server_name}' is running, stop it before pruning")
+
+        folders = {str(path): folder for folder, files in self.regions().items() for path in files}
+        jobs = [(path, min_inhabited, dry_run) for path in folders]
+        with ProcessPoolExecutor(max_workers=max(1, workers or os.cpu_count() or 1)) as pool:
+            results = list(pool.map(_prune_region, jobs, chunksize=4))
+        for result in results:
+            result.dimension = dimension_name(folders[result.path])
+        return results
@@ -0,0 +1,94 @@
+import struct
+from typing import Optional, Tuple
+
+# NBT tag ids
+TAG_END = 0
+TAG_BYTE = 1
+TAG_SHORT = 2
+TAG_INT = 3
+TAG_LONG = 4
+TAG_FLOAT = 5
+TAG_DOUBLE = 6
+TAG_BYTE_ARRAY = 7
+TAG_STRING = 8
+TAG_LIST = 9
+TAG_COMPOUND = 10
+TAG_INT_ARRAY = 11
+TAG_LONG_ARRAY = 12
+
+_FIXED_SIZE = {TAG_BYTE: 1, TAG_SHORT: 2, TAG_INT: 4, TAG_LONG: 8, TAG_FLOAT: 4, TAG_DOUBLE: 8}
+_ARRAY_ITEM_SIZE = {TAG_BYTE_ARRAY: 1, TAG_INT_ARRAY: 4, TAG_LONG_ARRAY: 8}
+
+
+class NbtError(ValueError):
+    pass
+
+
+def _read_name(data: bytes, pos: int) -> Tuple[str, int]:
+    (length,) = struct.unpack_from(">H", data, pos)
+    pos += 2
+    return data[pos:pos + length].decode("utf-8", errors="replace"), pos + length
+
+
+def _skip(data: bytes, pos: int, tag: int) -> int:
+    """
+    Return the position after a payload of the given tag, without decoding it.
+    """
+    if tag in _FIXED_SIZE:
+        return pos + _FIXED_SIZE[tag]
+    if tag in _ARRAY_ITEM_SIZE:
+        length: int = struct.unpack_from(">i", data, pos)[0]
+        return pos + 4 + length * _ARRAY_ITEM_SIZE[tag]
+    if tag == TAG_STRING:
+        length = struct.unpack_from(">H", data, pos)[0]
+        return pos + 2 + length
+    if tag == TAG_LIST:
+        item_tag: int = data[pos]
+        length = struct.unpack_from(">i", data, pos + 1)[0]
+        pos += 5
+        if item_tag in _FIXED_SIZE:
+            return pos + max(0, length) * _FIXED_SIZE[item_tag]
+        for _ in range(length):
+            pos = _skip(data, pos, item_tag)
+        return pos
+    if tag == TAG_COMPOUND:
+        while True:
+            child = data[pos]
+            pos += 1
+            if child == TAG_END:
+                return pos
+            (name_length,) = struct.unpack_from(">H", data, pos)
+            pos = _skip(data, pos + 2 + name_length, child)
+    raise NbtError(f"Unknown NBT tag {tag} at {pos}")
+
+
+def find_long(data: bytes, name: str, parents: Tuple[str, ...] = ()) -> Optional[int]:
+    """
+    Return a TAG_Long named name from a chunk's root compound, or from the first of parents
+    (nested compounds, e.g. 'Level' in pre-1.18 chunks) that contains it. Everything else is skipped
+    without being decoded.
+    """
+    try:
+        if data[0] != TAG_COMPOUND:
+            raise NbtError("Chunk data does not start with a compound")
+        _, pos = _read_name(data, 1)
+        return _find_in_compound(data, pos, name, parents)
+    except (IndexError, struct.error) as e:
+        raise NbtError(f"Truncated NBT data: {e}")
+
+
+def _find_in_compound(data: bytes, pos: int, name: str, parents: Tuple[str, ...]) -> Optional[int]:
+    while True:
+        tag = data[pos]
+        pos += 1
+        if tag == TAG_END:
+            return None
+        key, pos = _read_name(data, pos)
+        if tag == TAG_LONG and key == name:
+            value: int = struct.unpack_from(">q", data, pos)[0]
+            return value
+        if tag == TAG_COMPOUND and key in parents:
+            found = _find_in_compound(data, pos, name, ())
+            if found is not None:
+                return found
+        pos = _skip(data, pos, tag)
@@ -0,0 +1,222 @@
+import gzip
+import mmap
+import os
+import re
+import struct
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Set, Tuple, Union
+
+SECTOR_SIZE = 4096
+HEADER_SECTORS = 2
+CHUNKS_PER_REGION = 1024
+
+# compression byte of a chunk; +128 means the data lives in an external c.<x>.<z>.mcc file
+GZIP = 1
+ZLIB = 2
+NONE = 3
+LZ4 = 4
+EXTERNAL = 128
+
+REGION_NAME = re.compile(r"^r\.(-?\d+)\.(-?\d+)\.mca$")
+
+
+@dataclass()
+class ChunkLocation:
+    index: int
+    offset: int       # in sectors from the start of the file
+    sectors: int
+    timestamp: int
+    length: Optional[int] = None  # bytes after the length prefix, None if the entry points outside the file
+
+    @property
+    def x(self) -> int:
+        return self.index % 32
+
+    @property
+    def z(self) -> int:
+        return self.index // 32
+
+
+@dataclass()
+class RegionHeader:
+    file_size: int
+    chunks: List[ChunkLocation]
+
+    @property
+    def used_sectors(self) -> int:
+        """Sectors allocated to chunks, leaving out corrupt entries that point into the header or past the end of the file."""
+        return sum(c.sectors for c in self.chunks if c.offset >= HEADER_SECTORS and c.offset * SECTOR_SIZE < self.file_size)
+
+    @property
+    def free_sectors(self) -> int:
+        """Sectors in the file that no chunk uses (holes left by chunks that grew and moved)."""
+        return max(0, -(-self.file_size // SECTOR_SIZE) - HEADER_SECTORS - self.used_sectors)
+
+    @property
+    def slack_sectors(self) -> int:
+        """Whole sectors allocated to chunks beyond what their data needs."""
+        return sum(c.sectors - -(-(c.length + 4) // SECTOR_SIZE) for c in self.chunks if c.length is not None)
+
+    @property
+    def data_bytes(self) -> int:
+        return sum(c.length + 4 for c in self.chunks if c.length is not None)
+
+
+def read_header(path: Path) -> RegionHeader:
+    """
+    Read the location and timestamp tables of a region file plus each chunk's length prefix.
+    The file is memory-mapped, so only the header and one page per chunk are actually read.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < HEADER_SECTORS * SECTOR_SIZE:
+            return RegionHeader(file_size=size, chunks=[])
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            locations = struct.unpack_from(">1024I", mapped, 0)
+            timestamps = struct.unpack_from(">1024i", mapped, SECTOR_SIZE)
+            chunks = []
+            for index, location in enumerate(locations):
+                offset, sectors = location >> 8, location & 0xFF
+                if offset == 0 and sectors == 0:
+                    continue
+                chunk = ChunkLocation(index=index, offset=offset, sectors=sectors, timestamp=timestamps[index])
+                start = offset * SECTOR_SIZE
+                if offset >= HEADER_SECTORS and start + 5 <= size:
+                    (length,) = struct.unpack_from(">I", mapped, start)
+                    if 0 < length <= sectors * SECTOR_SIZE - 4 and start + 4 + length <= size:
+                        chunk.length = length
+                chunks.append(chunk)
+    return RegionHeader(file_size=size, chunks=chunks)
+
+
+def region_coords(path: Path) -> Optional[Tuple[int, int]]:
+    match = REGION_NAME.match(path.name)
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def _external_path(path: Path, chunk: ChunkLocation) -> Path:
+    rx, rz = region_coords(path) or (0, 0)
+    return path.with_name(f"c.{rx * 32 + chunk.x}.{rz * 32 + chunk.z}.mcc")
+
+
+def read_chunk(path: Path, data: Union[bytes, mmap.mmap], chunk: ChunkLocation) -> Optional[bytes]:
+    """
+    Return the decompressed NBT of a chunk, or None if its compression is not supported (LZ4).
+    :param data: contents of the region file, or the file memory-mapped
+    """
+    if chunk.length is None:
+        return None
+    start = chunk.offset * SECTOR_SIZE
+    compression = data[start + 4]
+    payload = data[start + 5:start + 4 + chunk.length]
+    if compression & EXTERNAL:
+        payload = _external_path(path, chunk).read_bytes()
+        compression &= ~EXTERNAL
+    if compression == ZLIB:
+        return zlib.decompress(payload)
+    if compression == GZIP:
+        return gzip.decompress(payload)
+    if compression == NONE:
+        return bytes(payload)
+    return None
+
+
+def iter_chunks(path: Path) -> Iterator[Tuple[ChunkLocation, Optional[bytes]]]:
+    """
+    Yield every chunk of a region file with its decompressed NBT (None if it cannot be read).
+    """
+    header = read_header(path)
+    if not header.chunks:
+        return
+    # mapped like in read_header: only the pages of the chunks are read, not the whole file at once
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for chunk in header.chunks:
+            try:
+                yield chunk, read_chunk(path, data, chunk)
+            except (OSError, zlib.error, EOFError):
+                yield chunk, None
+
+
+def _copy_size(chunk: ChunkLocation, file_size: int) -> int:
+    """
+    Bytes compact copies for a chunk: its data without the slack after it, or, if its length cannot be
+    read, whatever is allocated to it within the file. 0 for an entry pointing into the header or past
+    the end of the file, which has nothing to copy and is dropped as corrupt.
+    """
+    if chunk.offset < HEADER_SECTORS:
+        return 0
+    if chunk.length is not None:
+        return chunk.length + 4
+    start = chunk.offset * SECTOR_SIZE
+    return max(0, min(file_size, start + chunk.sectors * SECTOR_SIZE) - start)
+
+
+def _plan(header: RegionHeader, drop: Set[int]) -> Tuple[List[Tuple[ChunkLocation, int]], int, int]:
+    """
+    Decide what compact keeps, shared by real and dry runs so both report the same result.
+    :return: the chunks kept in file order with the bytes copied for each, the size of the new file
+             and the number of corrupt entries dropped
+    """
+    keep: List[Tuple[ChunkLocation, int]] = []
+    corrupt = 0
+    for chunk in sorted((c for c in header.chunks if c.index not in drop), key=lambda c: c.offset):
+        size = _copy_size(chunk, header.file_size)
+        if size:
+            keep.append((chunk, size))
+        else:
+            corrupt += 1
+    after = (HEADER_SECTORS + sum(-(-size // SECTOR_SIZE) for _, size in keep)) * SECTOR_SIZE if keep else 0
+    return keep, after, corrupt
+
+
+def _pack(data: Union[bytes, mmap.mmap], keep: List[Tuple[ChunkLocation, int]]) -> Tuple[List[int], List[int], bytearray]:
+    """
+    Lay the kept chunks out back to back after the header.
+    :return: the location and timestamp tables and the sectors that follow them
+    """
+    locations = [0] * CHUNKS_PER_REGION
+    timestamps = [0] * CHUNKS_PER_REGION
+    body = bytearray()
+    for chunk, size in keep:
+        start = chunk.offset * SECTOR_SIZE
+        sectors = -(-size // SECTOR_SIZE)
+        locations[chunk.index] = ((HEADER_SECTORS + len(body) // SECTOR_SIZE) << 8) | sectors
+        timestamps[chunk.index] = chunk.timestamp
+        body += data[start:start + size]
+        body += bytes(sectors * SECTOR_SIZE - size)
+    return locations, timestamps, body
+
+
+def compact(path: Path, drop: Set[int], dry_run: bool = False) -> Tuple[int, int, int]:
+    """
+    Rewrite a region file without the chunks whose index is in drop, packing the remaining chunks
+    back to back (in their current order) with no free sectors and no slack after each chunk.
+    Entries that point into the header or past the end of the file are dropped too.
+    The new file replaces the old one atomically; a region left without chunks is deleted.
+    :param dry_run: only compute the result, which is exactly what a real run produces
+    :return: file size before and after, and the number of corrupt entries dropped
+    """
+    header = read_header(path)
+    keep, after, corrupt = _plan(header, drop)
+    if dry_run:
+        return header.file_size, after, corrupt
+
+    data = path.read_bytes()
+    for chunk in header.chunks:
+        if chunk.index in drop and chunk.length is not None and data[chunk.offset * SECTOR_SIZE + 4] & EXTERNAL:
+            _external_path(path, chunk).unlink(missing_ok=True)
+
+    if not keep:
+        path.unlink()
+        return header.file_size, 0, corrupt
+
+    locations, timestamps, body = _pack(data, keep)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(struct.pack(">1024I", *locations))
+        f.write(struct.pack(">1024i", *timestamps))
+        f.write(body)
+    os.replace(tmp, path)
+    return header.file_size, HEADER_SECTORS * SECTOR_SIZE + len(body), corrupt
@@ -0,0 +1,92 @@
+import importlib.util
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+from mctl.core import settings
+from mctl.core.servers import configurator, manager
+from mctl.core.servers.rcon import POOL
+
+from tests.fake_rcon import FakeRconServer
+
+BENCHMARKS = Path(__file__).parents[1] / "benchmarks"
+FAKE_JAVA = BENCHMARKS / "fake_java.py"
+# a server whose jar contains b"crash" exits before it is ready
+JAVA_WRAPPER = """
+import runpy
+import sys
+from pathlib import Path
+
+args = sys.argv[1:]
+if "-jar" in args and b"crash" in Path(args[args.index("-jar") + 1]).read_bytes():
+    sys.exit("Exception in server tick loop")
+sys.argv = [{fake!r}] + args
+runpy.run_path({fake!r}, run_name="__main__")
+"""
+
+
+@pytest.fixture
+def rcon_server() -> Iterator[FakeRconServer]:
+    server = FakeRconServer()
+    yield server
+    POOL.close()
+    server.close()
+
+
+@pytest.fixture
+def upstream() -> Iterator[Any]:
+    """
+    benchmarks/upstream.py serving its documents and jars (256 KiB here) on a free local port; its
+    ``base_url`` is the mirror to download them through.
+    """
+    spec = importlib.util.spec_from_file_location("upstream", BENCHMARKS / "upstream.py")
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    with module.Upstream(jar_size=256 * 1024) as server:
+        server.base_url = server.start()
+        yield server
+
+
+@pytest.fixture
+def live_pid() -> Iterator[int]:
+    """
+    The PID of a process that runs for the test, for pid files of servers that only have to look running.
+    """
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])  # pylint: disable=consider-using-with
+    yield process.pid
+    process.kill()
+    process.wait()
+
+
+@pytest.fixture
+def mctl_home(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """
+    An empty mctl home; servers, their server.properties and config.yaml are looked up below it.
+    """
+    home = tmp_path / ".mctl"
+    (home / "servers").mkdir(parents=True)
+    monkeypatch.setattr(manager, "DEFAULT_HOME_PATH", home)
+    monkeypatch.setattr(configurator, "DEFAULT_HOME_PATH", home)
+    monkeypatch.setattr(settings, "DEFAULT_HOME_PATH", home)
+    return home
+
+
+@pytest.fixture
+def fake_java(mctl_home: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """
+    Servers of mctl_home run on benchmarks/fake_java.py, ready in a fraction of a second, and are
+    started from the test process rather than through mctld.
+    """
+    java = tmp_path / "java"
+    java.write_text(f"#!{sys.executable}\n" + JAVA_WRAPPER.format(fake=str(FAKE_JAVA)), encoding="utf-8")
+    java.chmod(0o755)
+    with open(mctl_home / "config.yaml", "a", encoding="utf-8") as f:
+        # fake servers hardly use memory, admission would count what their -Xmx reserves
+        f.write(f"java_path: {java}\nadmission: \"off\"\n")
+    monkeypatch.setenv("FAKE_JAVA_STARTUP", "0.05")
+    monkeypatch.setenv("MCTL_NO_DAEMON", "1")
+    return java
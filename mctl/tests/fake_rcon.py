@@ -0,0 +1,102 @@
+import socket
+import struct
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from mctl.core.servers.rcon import AUTH, AUTH_RESPONSE, EXEC_COMMAND, MAX_FRAGMENT, RESPONSE_VALUE
+
+
+class FakeRconServer: # pylint: disable=too-many-instance-attributes
+    """
+    In-process RCON server that behaves like Minecraft's: an empty RESPONSE_VALUE before the auth
+    response, responses split into MAX_FRAGMENT byte packets, and a single packet for unknown types.
+    """
+
+    def __init__(self, password: str = "secret", responses: Optional[Dict[str, str]] = None):
+        self.password = password
+        self.responses = responses or {}
+        self.commands: List[str] = []
+        self.connections = 0
+        # called when 'stop' arrives; with close_on_stop the connection is closed instead of answered
+        self.on_stop: Optional[Callable[[], None]] = None
+        self.close_on_stop = False
+        self._open: List[socket.socket] = []
+        self._sock = socket.create_server(("127.0.0.1", 0))
+        self.port = self._sock.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            self._open.append(conn)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn: socket.socket) -> None:
+        with conn:
+            while True:
+                try:
+                    request_id, kind, body = self._receive(conn)
+                except (OSError, struct.error):
+                    return
+                if kind == AUTH:
+                    self._send(conn, request_id, RESPONSE_VALUE, "")
+                    self._send(conn, request_id if body == self.password else -1, AUTH_RESPONSE, "")
+                elif kind == EXEC_COMMAND:
+                    self.commands.append(body)
+                    if body == "stop":
+                        if self.on_stop is not None:
+                            self.on_stop()
+                        if self.close_on_stop:
+                            return
+                    response = self.responses.get(body, "").encode()
+                    fragments = [response[i:i + MAX_FRAGMENT] for i in range(0, len(response), MAX_FRAGMENT)] or [b""]
+                    for fragment in fragments:
+                        self._send(conn, request_id, RESPONSE_VALUE, fragment)
+                else:
+                    self._send(conn, request_id, RESPONSE_VALUE, f"Unknown request {kind:x}")
+
+    @staticmethod
+    def _receive(conn: socket.socket) -> Tuple[int, int, str]:
+        def read(size: int) -> bytes:
+            data = b""
+            while len(data) < size:
+                chunk = conn.recv(size - len(data))
+                if not chunk:
+                    raise OSError("closed")
+                data += chunk
+            return data
+
+        (length,) = struct.unpack("<i", read(4))
+        packet = read(length)
+        request_id, kind = struct.unpack("<ii", packet[:8])
+        return request_id, kind, packet[8:-2].decode()
+
+    @staticmethod
+    def _send(conn: socket.socket, request_id: int, kind: int, body: object) -> None:
+        data = body if isinstance(body, bytes) else str(body).encode()
+        payload = struct.pack("<ii", request_id, kind) + data + b"\x00\x00"
+        conn.sendall(struct.pack("<i", len(payload)) + payload)
+
+    def drop_connections(self) -> None:
+        """
+        Close every open connection, like a server restart does.
+        """
+        for conn in self._open:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self._open.clear()
+
+    def close(self) -> None:
+        self.drop_connections()
+        # closing alone leaves the socket listening until the blocked accept() returns
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
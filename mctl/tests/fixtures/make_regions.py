@@ -0,0 +1,111 @@
+"""
+Writes the region file fixtures in tests/fixtures/world. The output is deterministic; run it again
+after changing the layout below and commit the result:
+
+    python tests/fixtures/make_regions.py
+
+world/region/r.0.0.mca        every storage case compact and the analyzer have to handle:
+    chunk 0   (0, 0)  zlib, InhabitedTime 0
+    chunk 1   (1, 0)  zlib, InhabitedTime 5000, two sectors allocated for one sector of data (slack)
+    -         one free sector (a chunk that grew and moved away)
+    chunk 32  (0, 1)  gzip, pre-1.18 layout with InhabitedTime inside 'Level', 2000
+    chunk 33  (1, 1)  uncompressed, InhabitedTime 10
+    chunk 34  (2, 1)  LZ4, which mctl cannot read
+    chunk 35  (3, 1)  corrupt: points into the header
+    chunk 36  (4, 1)  corrupt: points past the end of the file
+world/region/r.-1.0.mca       chunk 0 (-32, 0) stored externally in c.-32.0.mcc, InhabitedTime 0
+world/entities/r.0.0.mca      entity chunks 0 and 1, matching the region
+world/DIM-1/region/r.0.0.mca  chunk 0 of the nether, InhabitedTime 100
+"""
+import gzip
+import struct
+import zlib
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+SECTOR = 4096
+ROOT = Path(__file__).parent / "world"
+
+# index -> (offset in sectors, sectors, timestamp, stored bytes or None for an entry without data)
+Entries = Dict[int, Tuple[int, int, int, bytes]]
+
+
+def _name(name: str) -> bytes:
+    encoded = name.encode()
+    return struct.pack(">H", len(encoded)) + encoded
+
+
+def _long(name: str, value: int) -> bytes:
+    return b"\x04" + _name(name) + struct.pack(">q", value)
+
+
+def _int(name: str, value: int) -> bytes:
+    return b"\x03" + _name(name) + struct.pack(">i", value)
+
+
+def _string(name: str, value: str) -> bytes:
+    return b"\x08" + _name(name) + _name(value)
+
+
+def _padding(size: int) -> bytes:
+    # an incompressible byte array, so chunks really take up sectors
+    data = bytes((i * 7919 + i // 251) % 256 for i in range(size))
+    return b"\x07" + _name("Padding") + struct.pack(">i", size) + data
+
+
+def chunk_nbt(x: int, z: int, inhabited: int, legacy: bool = False, padding: int = 64) -> bytes:
+    if legacy:
+        level = _int("xPos", x) + _int("zPos", z) + _long("InhabitedTime", inhabited) + _padding(padding) + b"\x00"
+        return b"\x0a" + _name("") + _int("DataVersion", 2586) + b"\x0a" + _name("Level") + level + b"\x00"
+    body = _int("DataVersion", 3955) + _int("xPos", x) + _int("zPos", z) + _string("Status", "minecraft:full")
+    return b"\x0a" + _name("") + body + _long("InhabitedTime", inhabited) + _padding(padding) + b"\x00"
+
+
+def entity_nbt(x: int, z: int) -> bytes:
+    return b"\x0a" + _name("") + _int("DataVersion", 3955) + b"\x0b" + _name("Position") + struct.pack(">iii", 2, x, z) + b"\x00"
+
+
+def stored(compression: int, payload: bytes) -> bytes:
+    """A chunk as stored in a sector: length, compression byte, payload."""
+    return struct.pack(">IB", len(payload) + 1, compression) + payload
+
+
+def write_region(path: Path, entries: Entries, sectors: int) -> None:
+    locations: List[int] = [0] * 1024
+    timestamps: List[int] = [0] * 1024
+    body = bytearray((sectors - 2) * SECTOR)
+    for index, (offset, count, timestamp, data) in entries.items():
+        locations[index] = (offset << 8) | count
+        timestamps[index] = timestamp
+        if data and offset >= 2:
+            start = (offset - 2) * SECTOR
+            body[start:start + len(data)] = data
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(struct.pack(">1024I", *locations) + struct.pack(">1024i", *timestamps) + bytes(body))
+
+
+def main() -> None:
+    write_region(ROOT / "region" / "r.0.0.mca", {
+        0: (2, 1, 1700000000, stored(2, zlib.compress(chunk_nbt(0, 0, 0)))),
+        1: (3, 2, 1700000001, stored(2, zlib.compress(chunk_nbt(1, 0, 5000)))),
+        32: (6, 1, 1700000002, stored(1, gzip.compress(chunk_nbt(0, 1, 2000, legacy=True), mtime=0))),
+        33: (7, 2, 1700000003, stored(3, chunk_nbt(1, 1, 10, padding=5000))),
+        34: (9, 1, 1700000004, stored(4, b"\x04\x22\x4d\x18not really lz4")),
+        35: (1, 1, 1700000005, b""),
+        36: (40, 1, 1700000006, b""),
+    }, sectors=10)
+
+    # external chunks keep only the compression byte in the region file
+    write_region(ROOT / "region" / "r.-1.0.mca", {0: (2, 1, 1700000010, struct.pack(">IB", 1, 2 | 128))}, sectors=3)
+    (ROOT / "region" / "c.-32.0.mcc").write_bytes(zlib.compress(chunk_nbt(-32, 0, 0, padding=8192)))
+
+    write_region(ROOT / "entities" / "r.0.0.mca", {
+        0: (2, 1, 1700000000, stored(2, zlib.compress(entity_nbt(0, 0)))),
+        1: (3, 1, 1700000001, stored(2, zlib.compress(entity_nbt(1, 0)))),
+    }, sectors=4)
+
+    write_region(ROOT / "DIM-1" / "region" / "r.0.0.mca", {0: (2, 1, 1700000020, stored(2, zlib.compress(chunk_nbt(0, 0, 100))))}, sectors=3)
+
+
+if __name__ == "__main__":
+    main()
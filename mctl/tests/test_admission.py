@@ -0,0 +1,86 @@
+import itertools
+from pathlib import Path
+from typing import Dict, Iterator
+
+import pytest
+
+from mctl.core.exceptions import AdmissionError, InvalidCliArgument
+from mctl.core.interfaces import MemoryBudget
+from mctl.core.servers import admission
+from mctl.core.servers.admission import AdmissionController, footprint
+from mctl.core.settings import SETTINGS_DEFAULTS
+
+
+def _server(home: Path, name: str, memory: str, pid: int = 0) -> None:
+    server_dir = home / "servers" / name
+    server_dir.mkdir(parents=True)
+    (server_dir / "mctl.yaml").write_text(f"type: paper\nmemory: {memory}\n", encoding="utf-8")
+    if pid:
+        (server_dir / "pid").write_text(str(pid), encoding="utf-8")
+
+
+@pytest.fixture
+def home(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """A home with 8 GiB available and 1 GiB reserved; running servers are resident with 1 GiB."""
+    monkeypatch.setattr(admission, "host_available", lambda: 8192)
+    monkeypatch.setattr(admission, "_resident", lambda pid: 1024)
+    monkeypatch.setattr(admission, "QUEUE_POLL_SECONDS", 0.01)
+    (tmp_path / "config.yaml").write_text("memory_reserve: 1G\nadmission_queue_timeout: 0.2\n", encoding="utf-8")
+    return tmp_path
+
+
+def test_footprint() -> None:
+    settings = dict(SETTINGS_DEFAULTS)
+    # a quarter of the heap off-heap, at least 512 MiB
+    assert footprint({"memory": "4G"}, settings) == 4096 + 1024
+    assert footprint({"memory": "1G"}, settings) == 1024 + 512
+    assert footprint({}, settings) == 2048 + 512
+    assert footprint({"memory": "4G", "offheap": "300M"}, settings) == 4096 + 300
+
+
+def test_free() -> None:
+    # resident memory of running servers is part of what they are committed, not lost twice
+    budget = MemoryBudget(available=6000, resident=1000, committed={"lobby": 3000}, reserve=1024)
+    assert budget.free == 6000 + 1000 - 1024 - 3000
+
+
+def test_budget_counts_running_servers(home: Path, live_pid: int) -> None:
+    _server(home, "lobby", "2G", live_pid)
+    _server(home, "survival", "4G")
+    budget = AdmissionController(home).budget()
+    assert budget == MemoryBudget(available=8192, resident=1024, committed={"lobby": 2048 + 512}, reserve=1024)
+    assert AdmissionController(home).budget(exclude="lobby").committed == {}
+
+
+def test_admit_refuses(home: Path, live_pid: int) -> None:
+    _server(home, "lobby", "4G", live_pid)
+    controller = AdmissionController(home)
+    # 8192 + 1024 - 1024 - 5120 = 3072 MiB free
+    with controller.admit("small", {"memory": "2G"}) as budget:
+        assert budget.free == 3072
+    with pytest.raises(AdmissionError, match="'big' needs 5120 MiB .* only 3072 MiB are free"):
+        with controller.admit("big", {"memory": "4G"}):
+            pass
+    with controller.admit("big", {"memory": "4G"}, mode="off"):
+        pass
+    with pytest.raises(InvalidCliArgument, match="Unknown admission mode"):
+        with controller.admit("big", {"memory": "4G"}, mode="wait"):
+            pass
+
+
+def test_queue_times_out(home: Path, live_pid: int, capsys: pytest.CaptureFixture[str]) -> None:
+    _server(home, "lobby", "4G", live_pid)
+    with pytest.raises(AdmissionError, match="only 3072 MiB are free"):
+        with AdmissionController(home).admit("big", {"memory": "4G"}, mode="queue"):
+            pass
+    assert capsys.readouterr().out.count("Waiting for memory") == 1
+
+
+def test_queue_admits_once_memory_frees_up(home: Path, live_pid: int, monkeypatch: pytest.MonkeyPatch) -> None:
+    _server(home, "lobby", "4G", live_pid)
+    available: Iterator[int] = itertools.chain([8192, 8192], itertools.repeat(10240))
+    monkeypatch.setattr(admission, "host_available", lambda: next(available))
+    admitted: Dict[str, int] = {}
+    with AdmissionController(home).admit("big", {"memory": "4G"}, mode="queue") as budget:
+        admitted["free"] = budget.free
+    assert admitted == {"free": 5120}
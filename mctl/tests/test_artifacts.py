@@ -0,0 +1,82 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+
+from mctl.core.interfaces import DownloadInfo
+from mctl.core.servers.artifacts import ArtifactStore
+
+
+def _jars(upstream: Any) -> List[DownloadInfo]:
+    """
+    The jars upstream serves, each with the checksum its API publishes.
+    """
+    return [DownloadInfo(url=f"https://{path[1:]}", checksums={"sha1": hashlib.sha1(data).hexdigest()})
+            for path, data in upstream.documents.items() if path.endswith(".jar")]
+
+
+@pytest.fixture
+def store(upstream: Any, tmp_path: Path) -> ArtifactStore:
+    return ArtifactStore(tmp_path / "home", mirror=upstream.base_url)
+
+
+def test_fetch_dedups_by_checksum(upstream: Any, store: ArtifactStore, tmp_path: Path) -> None:
+    info = _jars(upstream)[0]
+    sha256 = store.fetch(info, "vanilla", "1.21.1", tmp_path / "server.jar")
+    assert (tmp_path / "server.jar").read_bytes() == store.blob_path(sha256).read_bytes()
+    gets = upstream.request_count()
+
+    # another URL publishing the same checksum (a re-uploaded build, say) is not downloaded again
+    mirrored = DownloadInfo(url=info.url.replace("piston-data.mojang.com", "mirror.example.com"), checksums=info.checksums)
+    assert store.fetch(mirrored, "vanilla", "1.21.1") == sha256
+    assert upstream.request_count() == gets
+    assert [a.names for a in store.list()] == [["vanilla 1.21.1"]]
+
+
+def test_collect_garbage_evicts_least_recently_used(upstream: Any, store: ArtifactStore, tmp_path: Path) -> None:
+    digests = [store.fetch(info, "paper", str(i)) for i, info in enumerate(_jars(upstream))]
+    assert len(digests) >= 4
+    store.materialise(digests[0], tmp_path / "used.jar")
+    (tmp_path / "used.jar").unlink()
+    assert [a.sha256 for a in store.list()] == [digests[0]] + digests[:0:-1]
+
+    # a server still runs the second oldest, the third is hardlinked into some directory
+    server_dir = store.base_path / "servers" / "lobby"
+    server_dir.mkdir(parents=True)
+    (server_dir / "mctl.yaml").write_text(f"type: paper\nartifact: {digests[1]}\n", encoding="utf-8")
+    os.link(store.blob_path(digests[2]), tmp_path / "linked.jar")
+
+    evicted = store.collect_garbage(0, keep={digests[3]})
+    assert sorted(a.sha256 for a in evicted) == sorted(digests[4:] + [digests[0]])
+    assert sorted(a.sha256 for a in store.list()) == sorted(digests[1:4])
+    assert not store.blob_path(digests[0]).exists()
+
+
+def test_collect_garbage_stops_at_the_limit(upstream: Any, store: ArtifactStore) -> None:
+    digests = [store.fetch(info, "paper", str(i)) for i, info in enumerate(_jars(upstream))]
+    sizes = {a.sha256: a.size for a in store.list()}
+    limit = sum(sizes.values()) - sizes[digests[0]]
+    assert [a.sha256 for a in store.collect_garbage(limit)] == [digests[0]]
+    assert store.collect_garbage(limit) == []
+
+
+def test_fetched_blob_is_placed_before_garbage_collection(upstream: Any, store: ArtifactStore, tmp_path: Path,
+                                                          monkeypatch: pytest.MonkeyPatch) -> None:
+    clone = store._clone  # pylint: disable=protected-access
+    collector = threading.Thread(target=store.collect_garbage, args=(0,))
+
+    def clone_while_collecting(sha256: str, dest: Path) -> str:
+        # another mctl evicting everything has to wait until the blob is in place
+        collector.start()
+        collector.join(0.2)
+        assert collector.is_alive()
+        return clone(sha256, dest)
+
+    monkeypatch.setattr(store, "_clone", clone_while_collecting)
+    info = _jars(upstream)[0]
+    sha256 = store.fetch(info, "vanilla", "1.21.1", tmp_path / "server.jar")
+    collector.join()
+    assert hashlib.sha256((tmp_path / "server.jar").read_bytes()).hexdigest() == sha256
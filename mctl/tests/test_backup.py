@@ -0,0 +1,133 @@
+import os
+import random
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Type
+
+import pytest
+
+from mctl.core.backup import manager as backup_manager
+from mctl.core.backup.manager import BackupManager
+from mctl.core.exceptions import BackupError
+
+from tests.fake_rcon import FakeRconServer
+
+NOW = datetime(2026, 10, 18, tzinfo=timezone.utc)
+
+
+def _clock(now: datetime) -> Type[datetime]:
+    class _FrozenClock(datetime):
+        @classmethod
+        def now(cls, tz=None):  # type: ignore[no-untyped-def]
+            return now.astimezone(tz)
+    return _FrozenClock
+
+
+def test_snapshots_in_the_same_second_keep_their_order(mctl_home: Path, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(backup_manager, "datetime", _clock(NOW))
+    level = mctl_home / "servers" / "lobby" / "world" / "level.dat"
+    level.parent.mkdir(parents=True)
+    backups = BackupManager(mctl_home, workers=2)
+
+    for generation in range(12):
+        level.write_text(f"generation {generation}", encoding="utf-8")
+        backups.create("lobby")
+
+    ids = [s.id for s in backups.snapshots("lobby")]
+    assert ids == ["20261018T000000Z"] + [f"20261018T000000Z-{i}" for i in range(1, 12)]
+    assert backups.get_snapshot("lobby").id == "20261018T000000Z-11"
+
+    # the latest snapshot, and the incremental parent of each one, is the newest
+    backups.restore("lobby", target=tmp_path / "restored")
+    assert (tmp_path / "restored" / "world" / "level.dat").read_text(encoding="utf-8") == "generation 11"
+
+
+def _write(path: Path, data: bytes, mtime: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_unchanged_content_is_stored_once(mctl_home: Path) -> None:
+    region = mctl_home / "servers" / "lobby" / "world" / "region"
+    data = random.Random(1).randbytes(300_000)
+    _write(region / "r.0.0.mca", data, 1_000)
+    backups = BackupManager(mctl_home, workers=2)
+    first = backups.create("lobby")
+    assert first.chunks_new > 1 and first.bytes_read == len(data)
+
+    # a copy under another name is read but adds no chunks
+    _write(region / "r.1.0.mca", data, 2_000)
+    second = backups.create("lobby")
+    assert (second.files_changed, second.bytes_read, second.chunks_new) == (1, len(data), 0)
+
+    # growing a file only stores its new tail; unchanged size and mtime are not even read
+    _write(region / "r.0.0.mca", data + bytes(4096), 3_000)
+    third = backups.create("lobby")
+    assert third.files_changed == 1 and 0 < third.chunks_new <= 2
+    report = backups.report()
+    assert (report.snapshots, report.chunks) == (3, first.chunks_new + third.chunks_new)
+    assert report.logical_bytes == 5 * len(data) + 4096
+
+
+def test_restore_in_place_removes_files_not_in_the_snapshot(mctl_home: Path) -> None:
+    server_dir = mctl_home / "servers" / "lobby"
+    _write(server_dir / "world" / "level.dat", b"level", 1_000)
+    _write(server_dir / "server.properties", b"motd=a\n", 1_000)
+    backups = BackupManager(mctl_home, workers=2)
+    snapshot = backups.create("lobby")
+
+    _write(server_dir / "world" / "level.dat", b"changed", 2_000)
+    _write(server_dir / "world" / "region" / "r.0.0.mca", b"new region", 2_000)
+    _write(server_dir / "logs" / "latest.log", b"log", 2_000)
+    assert backups.restore("lobby") == (snapshot, 1)
+
+    assert (server_dir / "world" / "level.dat").read_bytes() == b"level"
+    assert not (server_dir / "world" / "region" / "r.0.0.mca").exists()
+    # excluded from backups, so never removed by a restore
+    assert (server_dir / "logs" / "latest.log").exists()
+
+
+def test_prune_retention(mctl_home: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    level = mctl_home / "servers" / "lobby" / "world" / "level.dat"
+    backups = BackupManager(mctl_home, workers=2)
+    ids = []
+    for i, created in enumerate(["2026-10-15T10:00", "2026-10-15T12:00", "2026-10-16T10:00", "2026-10-17T10:00"]):
+        monkeypatch.setattr(backup_manager, "datetime", _clock(datetime.fromisoformat(created).replace(tzinfo=timezone.utc)))
+        _write(level, random.Random(i).randbytes(50_000), 1_000 + i)
+        ids.append(backups.create("lobby").id)
+    monkeypatch.undo()
+
+    with pytest.raises(BackupError, match="give at least one keep rule"):
+        backups.prune("lobby")
+    removed, chunks, freed = backups.prune("lobby", keep_last=1, keep_daily=2)
+    # the newest snapshot of each of the last two days is kept, the 15th goes
+    assert removed == [ids[1], ids[0]]
+    assert chunks > 0 and freed > 0
+    assert [s.id for s in backups.snapshots("lobby")] == ids[2:]
+    report = backups.report()
+    assert report.stored_bytes == sum(size for _, size in backups.store.digests())
+    assert report.chunks == len(list(backups.store.digests()))
+    backups.restore("lobby", target=mctl_home / "restored")
+    assert (mctl_home / "restored" / "world" / "level.dat").read_bytes() == random.Random(3).randbytes(50_000)
+
+
+def _running_server(home: Path, pid: int, rcon_port: int) -> Path:
+    server_dir = home / "servers" / "lobby"
+    _write(server_dir / "world" / "level.dat", b"level", 1_000)
+    (server_dir / "pid").write_text(str(pid), encoding="utf-8")
+    (server_dir / "server.properties").write_text(
+        f"enable-rcon=true\nrcon.port={rcon_port}\nrcon.password=secret\nserver-ip=127.0.0.1\n", encoding="utf-8")
+    return server_dir
+
+
+def test_backup_of_running_server_in_another_home(tmp_path: Path, live_pid: int, rcon_server: FakeRconServer) -> None:
+    # no mctl_home fixture: the pid file and server.properties are only found through the base path
+    home = tmp_path / "home"
+    _running_server(home, live_pid, rcon_server.port)
+    backups = BackupManager(home)
+    backups.create("lobby")
+    assert rcon_server.commands == ["save-off", "save-all flush", "save-on"]
+
+    with pytest.raises(BackupError, match="is running"):
+        backups.restore("lobby")
@@ -0,0 +1,159 @@
+import asyncio
+import os
+import signal
+import time
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from mctl.core.daemon.client import socket_path
+from mctl.core.daemon.supervisor import STABLE_SECONDS, Supervisor
+from mctl.core.exceptions import DaemonError
+
+
+def _server(home: Path, name: str, jar: bytes = b"", restart: str = "on-failure") -> Path:
+    server_dir = home / "servers" / name
+    server_dir.mkdir(parents=True)
+    (server_dir / "server.jar").write_bytes(b"PK\x03\x04" + jar)
+    (server_dir / "server.properties").write_text("motd=test\n", encoding="utf-8")
+    (server_dir / "mctl.yaml").write_text(
+        f"name: {name}\ntype: vanilla\nversion: 1.21.1\njar: {server_dir / 'server.jar'}\nrestart: {restart}\n", encoding="utf-8")
+    return server_dir
+
+
+def _configure(home: Path, **settings: object) -> None:
+    with open(home / "config.yaml", "a", encoding="utf-8") as f:
+        f.writelines(f"{key}: {value}\n" for key, value in settings.items())
+
+
+def test_supervisor_uses_its_own_home(tmp_path: Path, live_pid: int) -> None:
+    # no mctl_home fixture: everything has to be found through the supervisor's base path
+    home = tmp_path / "home"
+    server_dir = home / "servers" / "lobby"
+    server_dir.mkdir(parents=True)
+    (server_dir / "mctl.yaml").write_text("type: paper\nrestart: always\n", encoding="utf-8")
+    (server_dir / "pid").write_text(str(live_pid), encoding="utf-8")
+
+    async def adopt_and_stop() -> None:
+        supervisor = Supervisor(home)
+        (status,) = await supervisor.op_status("lobby")
+        assert (status.state, status.pid, status.adopted, status.restart_policy) == ("running", live_pid, True, "always")
+
+        result = await supervisor.op_stop("lobby", timeout=5)
+        assert result.stopped
+        assert status.state == "stopped"
+
+    asyncio.run(adopt_and_stop())
+    assert not (server_dir / "pid").exists()
+
+
+def test_start_waits_for_readiness(mctl_home: Path, fake_java: Path) -> None:  # pylint: disable=unused-argument
+    server_dir = _server(mctl_home, "lobby")
+
+    async def start_and_stop() -> None:
+        supervisor = Supervisor(mctl_home)
+        result = await supervisor.op_start("lobby", timeout=10)
+        assert result.started and result.ready and result.time_to_ready is not None
+        (status,) = await supervisor.op_status("lobby")
+        assert (status.state, status.pid, status.adopted) == ("running", result.pid, False)
+        assert (server_dir / "pid").read_text(encoding="utf-8") == str(result.pid)
+        assert (await supervisor.op_start("lobby")).error == "Server 'lobby' is already running"
+
+        stopped = await supervisor.op_stop("lobby", timeout=5)
+        assert stopped.stopped
+        assert (status.state, status.exit_code) == ("stopped", 0)
+
+    asyncio.run(start_and_stop())
+    assert not (server_dir / "pid").exists()
+
+
+def test_server_exiting_before_ready_is_not_restarted(mctl_home: Path, fake_java: Path) -> None:  # pylint: disable=unused-argument
+    _server(mctl_home, "lobby", jar=b"crash")
+
+    async def start() -> None:
+        supervisor = Supervisor(mctl_home)
+        result = await supervisor.op_start("lobby", timeout=10)
+        assert not result.started and not result.ready
+        assert result.error is not None and "exited prematurely (exit code 1)" in result.error
+        server = supervisor.servers["lobby"]
+        assert (server.status.state, server.pending_restart) == ("crashed", None)
+        assert "Exception in server tick loop" in server.tail
+
+    asyncio.run(start())
+
+
+def test_killed_server_is_restarted(mctl_home: Path, fake_java: Path) -> None:  # pylint: disable=unused-argument
+    _server(mctl_home, "lobby")
+    _configure(mctl_home, restart_backoff=0.1)
+
+    async def kill_and_wait() -> None:
+        supervisor = Supervisor(mctl_home)
+        first = await supervisor.op_start("lobby", timeout=10)
+        assert first.ready and first.pid is not None
+        os.kill(first.pid, signal.SIGKILL)
+        status = supervisor.servers["lobby"].status
+        deadline = time.monotonic() + 10
+        while (status.state != "running" or status.pid == first.pid) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        assert (status.state, status.restarts, status.exit_code) == ("running", 1, None)
+        assert status.pid not in (None, first.pid)
+        assert (await supervisor.op_stop("lobby", timeout=5)).stopped
+
+    asyncio.run(kill_and_wait())
+
+
+def test_restart_backoff(mctl_home: Path) -> None:
+    _server(mctl_home, "lobby")
+    _configure(mctl_home, restart_backoff=5, restart_backoff_max=15, restart_max=3)
+
+    async def exit_repeatedly() -> List[float]:
+        supervisor = Supervisor(mctl_home)
+        server = supervisor._server("lobby")  # pylint: disable=protected-access
+        status = server.status
+        status.started_at, status.time_to_ready = time.time(), 1.0
+
+        def exited(code: int) -> float:
+            supervisor._exited(server, 4242, code)  # pylint: disable=protected-access
+            if server.pending_restart is None:
+                return 0
+            assert status.next_restart is not None
+            delay = round(status.next_restart - time.time())
+            server.cancel_restart()
+            return delay
+
+        # on-failure: a clean exit stays down, so does a server that was told to stop
+        assert (exited(0), status.state) == (0, "exited")
+        server.stop_requested = True
+        assert (exited(1), status.state) == (0, "stopped")
+        server.stop_requested = False
+
+        delays = [exited(1) for _ in range(4)]
+        assert (status.state, status.error) == ("failed", "gave up after 3 restarts")
+        # a server that ran long enough before it crashed starts over
+        status.started_at = time.time() - STABLE_SECONDS
+        delays.append(exited(1))
+        assert server.failures == 1
+        return delays
+
+    assert asyncio.run(exit_repeatedly()) == [5, 10, 15, 0, 5]
+
+
+def test_run_replaces_stale_socket_only(tmp_path: Path) -> None:
+    home = tmp_path / "home"
+    home.mkdir()
+    stale = socket_path(home)
+    stale.write_text("left behind by a killed mctld", encoding="utf-8")
+
+    async def run_twice() -> None:
+        first = Supervisor(home)
+        running = asyncio.create_task(first.run())
+        while not stale.is_socket():
+            await asyncio.sleep(0.01)
+        with pytest.raises(DaemonError, match="already running"):
+            await Supervisor(home).run()
+        await first.op_shutdown()
+        await running
+
+    asyncio.run(run_twice())
+    assert not stale.exists()
@@ -0,0 +1,86 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Tuple
+
+import pytest
+
+from mctl.core.exceptions import ChecksumMismatchError
+from mctl.core.interfaces import DownloadInfo
+from mctl.core.utils import downloader as downloader_module
+from mctl.core.utils.downloader import Downloader
+
+
+@pytest.fixture
+def downloader(upstream: Any, monkeypatch: pytest.MonkeyPatch) -> Downloader:
+    # small segments, so the 256 KiB test jars are fetched as four ranges
+    monkeypatch.setattr(downloader_module, "MIN_SEGMENT_SIZE", 64 * 1024)
+    return Downloader(connections=4, mirror=upstream.base_url)
+
+
+def _jar(upstream: Any) -> Tuple[DownloadInfo, bytes]:
+    path = next(p for p in upstream.documents if p.endswith("/server.jar"))
+    data = upstream.documents[path]
+    return DownloadInfo(url=f"https://{path[1:]}", checksums={"sha1": hashlib.sha1(data).hexdigest()}, size=len(data)), data
+
+
+def _gets(upstream: Any, info: DownloadInfo) -> int:
+    return int(upstream.requests[f"GET /{info.url.split('://', 1)[1]}"])
+
+
+def test_fetch_verifies_and_marks(upstream: Any, downloader: Downloader, tmp_path: Path) -> None:
+    info, data = _jar(upstream)
+    dest = tmp_path / "server.jar"
+    assert downloader.fetch(info, dest) == dest
+    assert dest.read_bytes() == data
+    assert _gets(upstream, info) == 4
+    marker = json.loads(Downloader.marker_path(dest).read_text(encoding="utf-8"))
+    assert marker["size"] == len(data) and marker["checksums"]["sha256"] == hashlib.sha256(data).hexdigest()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["server.jar", "server.jar.verified"]
+
+    # verified copies are not downloaded again, unless upstream now publishes another checksum
+    downloader.fetch(info, dest)
+    assert _gets(upstream, info) == 4
+    assert not downloader.is_cached(dest, DownloadInfo(url=info.url, checksums={"sha1": "0" * 40}))
+    dest.write_bytes(data[:-1])
+    assert not downloader.is_cached(dest, info)
+
+
+def test_fetch_resumes_segments(upstream: Any, downloader: Downloader, tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    info, data = _jar(upstream)
+    dest = tmp_path / "server.jar"
+    url = f"{upstream.base_url}/{info.url.split('://', 1)[1]}"
+    segments = downloader._plan_segments(len(data), True)  # pylint: disable=protected-access
+    state = {"url": url, "size": len(data), "segments": [list(s) for s in segments]}
+    Path(f"{dest}.part.json").write_text(json.dumps(state), encoding="utf-8")
+    # an interrupted transfer: segments 0 and 2 are complete, 1 is half done and 3 never started
+    for index, (start, end) in enumerate(segments[:3]):
+        stop = (start + end) // 2 if index == 1 else end + 1
+        Path(f"{dest}.part.{index}").write_bytes(data[start:stop])
+
+    downloader.fetch(info, dest)
+    assert dest.read_bytes() == data
+    assert _gets(upstream, info) == 2
+    assert "Resuming server.jar segment 1" in capsys.readouterr().out
+    assert not Path(f"{dest}.part.json").exists()
+
+
+def test_fetch_discards_segments_of_another_layout(upstream: Any, downloader: Downloader, tmp_path: Path) -> None:
+    info, data = _jar(upstream)
+    dest = tmp_path / "server.jar"
+    Path(f"{dest}.part.json").write_text(json.dumps({"url": "", "size": len(data) + 1, "segments": [[0, len(data)]]}), encoding="utf-8")
+    Path(f"{dest}.part.0").write_bytes(b"stale" * 1000)
+    downloader.fetch(info, dest)
+    assert dest.read_bytes() == data
+
+
+def test_fetch_rejects_checksum_mismatch(upstream: Any, downloader: Downloader, tmp_path: Path) -> None:
+    info, _ = _jar(upstream)
+    dest = tmp_path / "server.jar"
+    with pytest.raises(ChecksumMismatchError, match="failed verification: sha1"):
+        downloader.fetch(DownloadInfo(url=info.url, checksums={"sha1": "0" * 40}), dest)
+    # nothing that a later fetch could take for a verified or resumable download
+    assert not list(tmp_path.iterdir())
+
+    with pytest.raises(ChecksumMismatchError, match="Upstream size mismatch"):
+        downloader.fetch(DownloadInfo(url=info.url, size=1), dest)
@@ -0,0 +1,59 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from mctl.core.exceptions import InvalidCliArgument
+from mctl.core.servers.fleet import FleetInstaller, load_fleet_spec
+from mctl.core.servers.installer import InstallArguments
+
+
+def _spec(tmp_path: Path, text: str) -> Path:
+    path = tmp_path / "fleet.yaml"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_defaults_apply_to_every_server(tmp_path: Path) -> None:
+    specs = load_fleet_spec(_spec(tmp_path, """
+defaults: {type: Paper, version: 1.21.1, memory: 4G, eula: true, group: lobby}
+servers:
+  - name: Lobby-1
+    jvm-profile: aikar
+  - name: survival
+    memory: 8G
+    group:
+    first-start: true
+"""))
+    assert specs == [
+        InstallArguments(name="lobby-1", server_type="paper", version="1.21.1", memory="4G", eula=True, first_start=False, group="lobby", jvm_profile="aikar"),
+        InstallArguments(name="survival", server_type="paper", version="1.21.1", memory="8G", eula=True, first_start=True, group=None),
+    ]
+    # a bare list of servers takes SPEC_DEFAULTS
+    spec = load_fleet_spec(_spec(tmp_path, "- name: lobby\n  memory:\n"))[0]
+    assert (spec.server_type, spec.version, spec.memory, spec.eula) == ("vanilla", "latest", None, False)
+
+
+@pytest.mark.parametrize("text, error", [
+    ("servers:\n  - lobby-1\n", "must be a mapping with a 'name', got: 'lobby-1'"),
+    ("- [lobby-1]\n", "must be a mapping with a 'name'"),
+    ("just a string\n", "must be a list of servers"),
+    ("servers: {name: lobby}\n", "must be a list of servers"),
+    ("defaults: [paper]\nservers: [{name: lobby}]\n", "must be a list of servers"),
+    ("- name: lobby_1\n", "Invalid server name in fleet spec: 'lobby_1'"),
+    ("- name: lobby\n- name: LOBBY\n", "Server 'lobby' is listed twice"),
+    ("- name: lobby\n  memory: lots\n", "Invalid memory size for server 'lobby' in fleet spec: 'lots'"),
+    ("servers: []\n", "does not list any servers"),
+])
+def test_invalid_specs(tmp_path: Path, text: str, error: str) -> None:
+    with pytest.raises(InvalidCliArgument, match=error):
+        load_fleet_spec(_spec(tmp_path, text))
+
+
+def test_install_leaves_specs_alone(mctl_home: Path, upstream: Any) -> None:
+    specs = load_fleet_spec(_spec(mctl_home, "defaults: {eula: true}\nservers: [{name: lobby}, {name: survival, version: 1.20.6}]\n"))
+    results = FleetInstaller(mctl_home, mirror=upstream.base_url).install(specs)
+    assert [(r.name, r.version, r.ok, r.error) for r in results] == [("lobby", "1.21.1", True, None), ("survival", "1.20.6", True, None)]
+    # the caller's specs still ask for what the spec file said
+    assert [s.version for s in specs] == ["latest", "1.20.6"]
+    assert (mctl_home / "servers" / "lobby" / "server.jar").exists()
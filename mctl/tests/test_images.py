@@ -0,0 +1,44 @@
+import stat
+from pathlib import Path
+
+import pytest
+
+from mctl.core.exceptions import ImageError
+from mctl.core.images.manager import ImageManager
+
+
+def _server(home: Path) -> Path:
+    server_dir = home / "servers" / "base"
+    for rel, content in {
+        "mctl.yaml": "type: paper\nversion: 1.21.1\njar: server.jar\n",
+        "server.jar": "jar",
+        "libraries/com/example/lib.jar": "library",
+        "cache/mojang_1.21.1.jar": "vanilla",
+        "world/level.dat": "level",
+    }.items():
+        (server_dir / rel).parent.mkdir(parents=True, exist_ok=True)
+        (server_dir / rel).write_text(content, encoding="utf-8")
+    return server_dir
+
+
+def test_clone_hardlinks_only_read_only_files(mctl_home: Path) -> None:
+    _server(mctl_home)
+    images = ImageManager(mctl_home)
+    images.create("base")
+    clone = mctl_home / "servers" / "clone"
+    images.materialise("base", clone, mode="hardlink")
+
+    assert (clone / "server.jar").stat().st_nlink == 2
+    assert (clone / "libraries/com/example/lib.jar").stat().st_nlink == 2
+    # Paper rewrites cache/ at runtime, every server needs its own
+    for rel in ("cache/mojang_1.21.1.jar", "world/level.dat"):
+        st = (clone / rel).stat()
+        assert st.st_nlink == 1
+        assert st.st_mode & stat.S_IWUSR
+
+
+def test_create_refuses_running_server_of_its_home(tmp_path: Path, live_pid: int) -> None:
+    home = tmp_path / "home"
+    (_server(home) / "pid").write_text(str(live_pid), encoding="utf-8")
+    with pytest.raises(ImageError, match="is running"):
+        ImageManager(home).create("base")
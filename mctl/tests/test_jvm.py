@@ -0,0 +1,28 @@
+from pathlib import Path
+
+import pytest
+
+from mctl.core.servers.jvm import ZGC_GENERATIONAL_FLAG, build_launch_command, java_major_version
+
+
+def _java(tmp_path: Path, version: str) -> str:
+    java = tmp_path / f"java-{version}"
+    java.write_text(f"#!/bin/sh\necho 'openjdk version \"{version}\" 2024-07-16' >&2\n", encoding="utf-8")
+    java.chmod(0o755)
+    return str(java)
+
+
+@pytest.mark.parametrize("version, major", [("1.8.0_402", 8), ("17.0.12", 17), ("21.0.4", 21), ("23", 23)])
+def test_java_major_version(tmp_path: Path, version: str, major: int) -> None:
+    assert java_major_version(_java(tmp_path, version)) == major
+
+
+def test_java_major_version_unknown(tmp_path: Path) -> None:
+    assert java_major_version(str(tmp_path / "missing")) is None
+
+
+@pytest.mark.parametrize("version, generational", [("17.0.12", False), ("21.0.4", True), ("22.0.2", True), ("23.0.1", False)])
+def test_zgc_generational_only_where_opt_in(tmp_path: Path, version: str, generational: bool) -> None:
+    cmd = build_launch_command(tmp_path, {"jvm_profile": "zgc", "java": _java(tmp_path, version)}, {})
+    assert "-XX:+UseZGC" in cmd
+    assert (ZGC_GENERATIONAL_FLAG in cmd) is generational
@@ -0,0 +1,62 @@
+import gzip
+import os
+from datetime import datetime
+from pathlib import Path
+
+from mctl.core.interfaces import LagEvent
+from mctl.core.servers.lag import LagAnalyzer, lag_timeline, parse_lag
+
+LAG = "[Server thread/WARN]: Can't keep up! Is the server overloaded? Running {ms}ms or {ticks} ticks behind"
+DONE = "[Server thread/INFO]: Done (3.2s)! For help, type \"help\""
+
+
+def _at(clock: str, day: str = "2026-10-17") -> float:
+    return datetime.fromisoformat(f"{day} {clock}").timestamp()
+
+
+def test_parse_lag() -> None:
+    assert parse_lag("[10:00:00] " + LAG.format(ms=5012, ticks=100), 1.0) == LagEvent(at=1.0, behind_ms=5012, ticks=100)
+    assert parse_lag("[10:00:00] [Server thread/INFO]: Steve joined the game", 1.0) is None
+
+
+def test_analyzer_sums_the_window() -> None:
+    lag = LagAnalyzer(window=60)
+    assert lag.silent_for(100) is None
+    lag.feed(LAG.format(ms=2000, ticks=40), 100)
+    lag.feed(LAG.format(ms=3000, ticks=60), 130)
+    lag.feed("[Server thread/INFO]: Steve joined the game", 150)
+    assert (lag.behind_ms(150), lag.behind_ms(165), lag.silent_for(165)) == (5000, 3000, 15)
+    lag.reset(200)
+    assert (lag.behind_ms(200), lag.silent_for(200)) == (0, 0)
+
+
+def test_lag_timeline(tmp_path: Path) -> None:
+    with gzip.open(tmp_path / "2026-10-16-1.log.gz", "wt", encoding="utf-8") as f:
+        # nobody is counted before the first start that was logged
+        f.write("[22:00:00] [Server thread/INFO]: Herobrine joined the game\n")
+        f.write(f"[23:00:00] {DONE}\n[23:10:00] [Server thread/INFO]: Steve joined the game\n")
+        f.write(f"[23:30:00] {LAG.format(ms=9000, ticks=180)}\n")
+    latest = tmp_path / "latest.log"
+    latest.write_text("\n".join([
+        f"[10:00:10] {LAG.format(ms=2000, ticks=40)}",
+        f"[10:00:50] {LAG.format(ms=3000, ticks=60)}",
+        "[10:01:30] [Server thread/INFO]: Alex joined the game",
+        # a restart: everyone is gone
+        f"[10:02:05] {DONE}",
+        "[10:02:20] [Server thread/INFO]: Bob joined the game",
+        f"[10:03:00] {LAG.format(ms=500, ticks=10)}",
+    ]) + "\n", encoding="utf-8")
+    os.utime(latest, (_at("10:05:00"), _at("10:05:00")))
+
+    start = _at("10:00:00")
+    events, buckets = lag_timeline(
+        tmp_path, since=datetime.fromisoformat("2026-10-17 10:00:30"), until=datetime.fromisoformat("2026-10-17 10:03:59"),
+        cpu=[(start + 10, 20.0), (start + 20, 40.0), (start + 200, 5.0), (start - 60, 99.0)], workers=1,
+    )
+    # the earlier warning of the first minute is kept, buckets start on whole minutes
+    assert [(e.at - start, e.behind_ms) for e in events] == [(10, 2000), (50, 3000), (180, 500)]
+    assert [b.start - start for b in buckets] == [0, 60, 120, 180]
+    assert [(b.warnings, b.behind_ms, b.ticks, b.worst_ms) for b in buckets] == [(2, 5000, 100, 3000), (0, 0, 0, 0), (0, 0, 0, 0), (1, 500, 10, 500)]
+    # Steve from yesterday, Alex joins, the restart empties the server and Bob joins
+    assert [b.players for b in buckets] == [1, 2, 2, 1]
+    assert [b.cpu_percent for b in buckets] == [30.0, None, None, 5.0]
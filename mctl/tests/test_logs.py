@@ -0,0 +1,106 @@
+import gzip
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from mctl.core.servers.logs import complete_size, search
+from mctl.core.utils import logtail
+from mctl.core.utils.logtail import LogFollower
+
+
+def _write(path: Path, text: str) -> None:
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_complete_size(tmp_path: Path) -> None:
+    path = tmp_path / "latest.log"
+    assert complete_size(path) == 0
+    _write(path, "[10:00:00] [Server thread/INFO]: one\n[10:00:01] [Server thread/INFO]: tw")
+    assert complete_size(path) == len("[10:00:00] [Server thread/INFO]: one\n")
+    _write(path, "o\n")
+    assert complete_size(path) == path.stat().st_size
+
+
+def test_complete_size_beyond_one_block(tmp_path: Path) -> None:
+    path = tmp_path / "latest.log"
+    _write(path, "x" * 10 + "\n" + "y" * 200_000)
+    assert complete_size(path) == 11
+
+
+def test_search_and_follow_print_every_line_once(tmp_path: Path) -> None:
+    with gzip.open(tmp_path / "2026-10-17-1.log.gz", "wt", encoding="utf-8") as f:
+        f.write("[23:59:00] [Server thread/INFO]: archived\n")
+    latest = tmp_path / "latest.log"
+    _write(latest, "[10:00:00] [Server thread/INFO]: before\n[10:00:01] [Server thread/INFO]: hal")
+
+    with LogFollower(latest, offset=complete_size(latest)) as follower:
+        # written after the follower started but before the search reads the file
+        _write(latest, "f\n[10:00:02] [Server thread/INFO]: during\n")
+        found = [line.split(" ", 1)[1] for line in search(tmp_path, "INFO", workers=1, latest_bytes=follower.offset)]
+        followed = follower.read_lines()
+
+    assert found == ["[23:59:00] [Server thread/INFO]: archived", "[10:00:00] [Server thread/INFO]: before"]
+    assert followed == ["[10:00:01] [Server thread/INFO]: half", "[10:00:02] [Server thread/INFO]: during"]
+
+
+def test_follower_starts_at_the_end_and_buffers_partial_lines(tmp_path: Path) -> None:
+    latest = tmp_path / "logs" / "latest.log"
+    latest.parent.mkdir()
+    _write(latest, "[10:00:00] [Server thread/INFO]: old\n")
+    with LogFollower(latest) as follower:
+        assert follower.read_lines() == []
+        _write(latest, "[10:00:01] [Server thread/INFO]: Done (1.2")
+        assert follower.read_lines() == []
+        _write(latest, "s)!\r\n[10:00:02] [Server thread/INFO]: next\n")
+        assert follower.read_lines() == ["[10:00:01] [Server thread/INFO]: Done (1.2s)!", "[10:00:02] [Server thread/INFO]: next"]
+
+
+def test_follower_wakes_up_through_inotify(tmp_path: Path) -> None:
+    latest = tmp_path / "logs" / "latest.log"
+    with LogFollower(latest) as follower:
+        # the directory is watched, so a log that does not exist yet is picked up too
+        assert follower.fileno() is not None
+        writer = threading.Timer(0.1, _write, (latest, "[10:00:00] [Server thread/INFO]: hello\n"))
+        writer.start()
+        began = time.monotonic()
+        follower.wait(10)
+        writer.join()
+        assert time.monotonic() - began < 5
+        assert follower.read_lines() == ["[10:00:00] [Server thread/INFO]: hello"]
+    assert follower.fileno() is None
+
+
+def test_follower_polls_without_inotify(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def unavailable(directory: Path) -> None:
+        raise OSError("inotify_init1 failed")
+
+    monkeypatch.setattr(logtail, "_Inotify", unavailable)
+    latest = tmp_path / "latest.log"
+    with LogFollower(latest) as follower:
+        assert follower.fileno() is None
+        intervals = []
+        for _ in range(6):
+            intervals.append(follower._poll_interval)  # pylint: disable=protected-access
+            follower.wait(0.01)
+        # backs off while nothing happens, up to POLL_MAX_INTERVAL
+        assert intervals == [0.05, 0.1, 0.2, 0.4, 0.5, 0.5]
+        _write(latest, "[10:00:00] [Server thread/INFO]: hello\n")
+        assert follower.read_lines() == ["[10:00:00] [Server thread/INFO]: hello"]
+        assert follower._poll_interval == logtail.POLL_MIN_INTERVAL  # pylint: disable=protected-access
+
+
+def test_follower_restarts_after_rotation_and_truncation(tmp_path: Path) -> None:
+    latest = tmp_path / "latest.log"
+    _write(latest, "[10:00:00] [Server thread/INFO]: one\n")
+    with LogFollower(latest, offset=0) as follower:
+        assert follower.read_lines() == ["[10:00:00] [Server thread/INFO]: one"]
+        # rotated: a new, longer file under the same name
+        latest.rename(tmp_path / "2026-10-17-1.log")
+        _write(latest, "[11:00:00] [Server thread/INFO]: new file, line one\n")
+        assert follower.read_lines() == ["[11:00:00] [Server thread/INFO]: new file, line one"]
+        # truncated in place
+        latest.write_text("[12:00:00] [Server thread/INFO]: two\n", encoding="utf-8")
+        assert follower.read_lines() == ["[12:00:00] [Server thread/INFO]: two"]
@@ -0,0 +1,93 @@
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+import pytest
+
+from mctl.cli.stats import _server_pids
+from mctl.core.interfaces import ProcessSample
+from mctl.core.servers import metrics
+from mctl.core.servers.metrics import MetricsSampler, render_textfile
+from mctl.core.servers.registry import ServerRegistry
+
+
+def _proc(root: Path, pid: int, ticks: int, io: bool = True, fds: int = 3) -> Path:
+    """
+    Write a fake /proc/<pid> with the given utime+stime, 42 threads and 1000 resident pages.
+    """
+    path = root / str(pid)
+    (path / "fd").mkdir(parents=True, exist_ok=True)
+    for fd in range(fds):
+        (path / "fd" / str(fd)).touch()
+    # the command name may contain spaces and parentheses
+    fields = ["S"] + ["0"] * 10 + [str(ticks), "0"] + ["0"] * 4 + ["42"] + ["0"] * 3 + ["1000"] + ["0"] * 20
+    (path / "stat").write_text(f"{pid} (java (main) x) " + " ".join(fields) + "\n", encoding="ascii")
+    (path / "smaps_rollup").write_text("00400000-7ffd0000 ---p 00000000 00:00 0 [rollup]\nRss: 4000 kB\nPss: 2048 kB\n", encoding="ascii")
+    if io:
+        (path / "io").write_text("rchar: 10\nwchar: 20\nread_bytes: 4096\nwrite_bytes: 8192\n", encoding="ascii")
+    return path
+
+
+def test_sample_reads_proc(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    _proc(tmp_path, 100, ticks=200)
+    clock = iter([10.0, 12.0])
+    monkeypatch.setattr(metrics.time, "monotonic", lambda: next(clock))
+
+    with MetricsSampler(proc=tmp_path) as sampler:
+        samples = sampler.sample({"lobby": 100, "survival": None})
+        assert samples[0] == ProcessSample(
+            name="lobby", pid=100, running=True, cpu_seconds=200 / metrics.CLOCK_TICKS, cpu_percent=None,
+            rss_bytes=1000 * metrics.PAGE_SIZE, pss_bytes=2048 * 1024, threads=42, open_fds=3, read_bytes=4096, write_bytes=8192,
+        )
+        assert samples[1] == ProcessSample(name="survival", pid=None, running=False)
+
+        # rewritten in place, the open descriptors see the new contents
+        _proc(tmp_path, 100, ticks=200 + metrics.CLOCK_TICKS, fds=5)
+        second = sampler.sample({"lobby": 100})[0]
+        assert second.cpu_percent == pytest.approx(50.0)
+        assert second.open_fds == 5
+
+
+def test_optional_files_and_missing_processes(tmp_path: Path) -> None:
+    _proc(tmp_path, 100, ticks=0, io=False)
+    with MetricsSampler(pss=False, proc=tmp_path) as sampler:
+        samples = sampler.sample({"lobby": 100, "gone": 101})
+        lobby, gone = samples[0], samples[1]
+        assert lobby.running and lobby.pss_bytes is None and lobby.read_bytes is None and lobby.write_bytes is None
+        assert not gone.running
+        assert list(sampler._handles) == [100]  # pylint: disable=protected-access
+
+        # processes no longer asked for are closed
+        fd = sampler._handles[100].stat  # pylint: disable=protected-access
+        sampler.sample({"lobby": None})
+        assert not sampler._handles  # pylint: disable=protected-access
+        with pytest.raises(OSError):
+            os.fstat(fd)
+
+
+def test_render_textfile() -> None:
+    samples = [
+        ProcessSample(name="lobby", pid=100, running=True, cpu_seconds=1.5, threads=42, rss_bytes=4096),
+        ProcessSample(name="survival", pid=None, running=False),
+    ]
+    text = render_textfile(samples)
+    assert 'mctl_server_up{server="lobby"} 1\n' in text
+    assert 'mctl_server_up{server="survival"} 0\n' in text
+    assert 'mctl_server_cpu_seconds_total{server="lobby"} 1.5\n' in text
+    assert 'mctl_server_threads{server="lobby"} 42\n' in text
+    # stopped servers and values that could not be read are left out
+    assert [line for line in text.splitlines() if "survival" in line] == ['mctl_server_up{server="survival"} 0']
+    assert "mctl_server_pss_memory_bytes{" not in text
+
+
+def test_server_pids(mctl_home: Path, live_pid: int) -> None:
+    for name, group in (("lobby", "lobby"), ("hub", "lobby"), ("survival", None)):
+        (mctl_home / "servers" / name).mkdir()
+        (mctl_home / "servers" / name / "mctl.yaml").write_text(f"type: paper\ngroup: {group}\n", encoding="utf-8")
+    (mctl_home / "servers" / "lobby" / "pid").write_text(str(live_pid), encoding="utf-8")
+    (mctl_home / "servers" / "hub" / "pid").write_text("999999999", encoding="utf-8")
+
+    registry = ServerRegistry(mctl_home)
+    expected: Dict[str, Optional[int]] = {"hub": None, "lobby": live_pid}
+    assert _server_pids(registry, None, "lobby") == expected
+    assert _server_pids(registry, "survival", None) == {"survival": None}
@@ -0,0 +1,97 @@
+import http.client
+import threading
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+import pytest
+
+from mctl.core.servers.mirror import MirrorRequestHandler
+from mctl.core.utils.mirror import local_path, mirror_path
+
+JAR = b"PK\x03\x04" + bytes(range(256)) * 4
+
+
+@pytest.fixture
+def mirror(tmp_path: Path) -> Iterator[int]:
+    """A mirror of one jar served on a local port; secret.txt next to the mirror directory must stay out of reach."""
+    root = tmp_path / "mirror"
+    jar = mirror_path(root, "https://piston-data.mojang.com/v1/objects/abc/server.jar")
+    jar.parent.mkdir(parents=True)
+    jar.write_bytes(JAR)
+    (tmp_path / "secret.txt").write_text("secret", encoding="utf-8")
+    (tmp_path / "secret.txt.mirror").write_text("secret", encoding="utf-8")
+    handler = type("BoundMirrorRequestHandler", (MirrorRequestHandler,), {"root": root.resolve()})
+    with ThreadingHTTPServer(("127.0.0.1", 0), handler) as httpd:
+        threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        yield httpd.server_address[1]
+        httpd.shutdown()
+
+
+def _get(port: int, path: str, headers: Optional[Dict[str, str]] = None, method: str = "GET") -> Tuple[int, Dict[str, str], bytes]:
+    # http.client sends the path as given, a browser or requests would normalise '..' away
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        conn.request(method, path, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        conn.close()
+
+
+JAR_PATH = "/piston-data.mojang.com/v1/objects/abc/server.jar"
+
+
+def test_local_path(tmp_path: Path) -> None:
+    assert local_path(tmp_path, "/api.papermc.io/v2/projects/paper?x=1") == tmp_path / "api.papermc.io" / "v2" / "projects" / "paper.mirror"
+    # a double-encoded dot stays a literal name
+    assert local_path(tmp_path, "/host/%252e%252e/x") == tmp_path / "host" / "%2e%2e" / "x.mirror"
+    for path in ("/", "/../secret.txt", "/host/%2e%2e/%2E%2E/secret.txt", "/host/./x", "/host/..%2f..%2fsecret.txt"):
+        with pytest.raises(ValueError, match="Invalid mirror path"):
+            local_path(tmp_path / "mirror", path)
+
+
+def test_local_path_refuses_symlinks_out_of_root(tmp_path: Path) -> None:
+    root = tmp_path / "mirror"
+    root.mkdir()
+    (root / "host").symlink_to(tmp_path)
+    with pytest.raises(ValueError, match="Invalid mirror path"):
+        local_path(root, "/host/secret.txt")
+
+
+def test_get_and_head(mirror: int) -> None:
+    status, headers, body = _get(mirror, JAR_PATH)
+    assert (status, body) == (200, JAR)
+    assert (headers["Content-Type"], headers["Content-Length"], headers["Accept-Ranges"]) == ("application/java-archive", str(len(JAR)), "bytes")
+    status, headers, body = _get(mirror, JAR_PATH, method="HEAD")
+    assert (status, headers["Content-Length"], body) == (200, str(len(JAR)), b"")
+    assert _get(mirror, "/piston-data.mojang.com/missing.jar")[0] == 404
+
+
+def test_ranges(mirror: int) -> None:
+    size = len(JAR)
+    status, headers, body = _get(mirror, JAR_PATH, {"Range": "bytes=10-19"})
+    assert (status, headers["Content-Range"], body) == (206, f"bytes 10-19/{size}", JAR[10:20])
+    assert _get(mirror, JAR_PATH, {"Range": "bytes=1000-"})[2] == JAR[1000:]
+    assert _get(mirror, JAR_PATH, {"Range": "bytes=-5"})[2] == JAR[-5:]
+    assert _get(mirror, JAR_PATH, {"Range": f"bytes=0-{size * 2}"})[2] == JAR
+    for unsatisfiable in (f"bytes={size}-", "bytes=20-10"):
+        status, headers, body = _get(mirror, JAR_PATH, {"Range": unsatisfiable})
+        assert (status, headers["Content-Range"], body) == (416, f"bytes */{size}", b"")
+    # not a single byte range: the whole file
+    status, _, body = _get(mirror, JAR_PATH, {"Range": "bytes=0-1,5-6"})
+    assert (status, body) == (200, JAR)
+
+
+def test_revalidation(mirror: int) -> None:
+    _, headers, _ = _get(mirror, JAR_PATH)
+    status, revalidated, body = _get(mirror, JAR_PATH, {"If-None-Match": headers["ETag"]})
+    assert (status, revalidated["ETag"], body) == (304, headers["ETag"], b"")
+    assert _get(mirror, JAR_PATH, {"If-None-Match": '"other"'})[0] == 200
+    assert _get(mirror, JAR_PATH, {"If-Modified-Since": headers["Last-Modified"]})[0] == 304
+
+
+def test_traversal_is_not_served(mirror: int) -> None:
+    for path in ("/../secret.txt", "/%2e%2e/secret.txt", "/piston-data.mojang.com/%2E%2E/../secret.txt", "/%2e%2e%2fsecret.txt"):
+        status, _, body = _get(mirror, path)
+        assert status == 404 and b"secret" not in body
@@ -0,0 +1,96 @@
+import random
+import socket
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pytest
+
+from mctl.core.exceptions import PortAllocationError
+from mctl.core.servers import admission
+from mctl.core.servers.manager import ServerManager
+from mctl.core.servers.ports import PortAllocator, is_port_free
+
+
+def _server(home: Path, name: str, properties: Dict[str, object], recorded: Optional[int] = None, pid: int = 0) -> None:
+    server_dir = home / "servers" / name
+    server_dir.mkdir(parents=True)
+    meta = "type: paper\n" + (f"server_port: {recorded}\n" if recorded is not None else "")
+    (server_dir / "mctl.yaml").write_text(meta, encoding="utf-8")
+    (server_dir / "server.properties").write_text("".join(f"{k}={v}\n" for k, v in properties.items()), encoding="utf-8")
+    if pid:
+        (server_dir / "pid").write_text(str(pid), encoding="utf-8")
+
+
+@pytest.fixture
+def port() -> int:
+    """The first of ten ports nothing on this host listens on."""
+    while True:
+        start = random.randrange(20000, 60000, 10)
+        if all(is_port_free(p) and is_port_free(p, udp=True) for p in range(start, start + 10)):
+            return start
+
+
+def test_next_free_skips_recorded_ports(tmp_path: Path, port: int) -> None:
+    _server(tmp_path, "lobby", {}, recorded=port)
+    (tmp_path / "servers" / "survival" / "mctl.yaml").parent.mkdir()
+    (tmp_path / "servers" / "survival" / "mctl.yaml").write_text(f"rcon_port: {port + 1}\n", encoding="utf-8")
+    ports = PortAllocator(tmp_path)
+    assert ports.used_ports() == {port: "lobby", port + 1: "survival"}
+    assert ports.next_free(port) == port + 2
+    assert ports.next_free(port, taken={port + 2}) == port + 3
+    with socket.socket() as listener:
+        listener.bind(("0.0.0.0", port + 2))
+        listener.listen()
+        assert ports.next_free(port) == port + 3
+
+
+def test_ensure_assigned_keeps_or_reassigns(tmp_path: Path, port: int) -> None:
+    (tmp_path / "config.yaml").write_text(f"server_port_start: {port}\n", encoding="utf-8")
+    _server(tmp_path, "lobby", {"server-port": port}, recorded=port)
+    _server(tmp_path, "survival", {"server-port": port + 5})
+    _server(tmp_path, "creative", {"server-port": port, "motd": "copied from lobby"})
+    ports = PortAllocator(tmp_path)
+
+    assert ports.ensure_assigned("survival") is None
+    assert ServerManager("survival", tmp_path).load_meta()["server_port"] == port + 5
+    notice = ports.ensure_assigned("creative")
+    assert notice == f"Game port {port} belongs to 'lobby', assigned port {port + 1} to 'creative'"
+    assert ServerManager("creative", tmp_path).load_meta()["server_port"] == port + 1
+    properties = (tmp_path / "servers" / "creative" / "server.properties").read_text(encoding="utf-8")
+    assert f"server-port={port + 1}" in properties and f"query.port={port + 1}" in properties
+    # recorded once, later starts leave it alone
+    assert ports.ensure_assigned("creative") is None
+
+
+def test_check(tmp_path: Path, port: int, live_pid: int) -> None:
+    _server(tmp_path, "lobby", {"server-port": port}, pid=live_pid)
+    _server(tmp_path, "survival", {"server-port": port, "enable-rcon": "true", "rcon.port": port + 1,
+                                   "enable-query": "true", "query.port": port + 1})
+    _server(tmp_path, "creative", {"server-port": port + 2})
+    ports = PortAllocator(tmp_path)
+    assert ports.check("survival") == [f"server-port {port} is used by running server 'lobby'"]
+    assert not ports.check("creative")
+    with socket.socket() as listener:
+        listener.bind(("0.0.0.0", port + 2))
+        listener.listen()
+        assert ports.check("creative") == [f"server-port {port + 2} is already in use by another process"]
+    _server(tmp_path, "modded", {"server-port": port + 3, "enable-rcon": "true", "rcon.port": port + 3})
+    assert ports.check("modded") == [f"rcon.port {port + 3} is the same as server-port"]
+
+
+def test_ports_are_checked_under_the_admission_lock(tmp_path: Path, port: int, live_pid: int, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "config.yaml").write_text("admission: \"off\"\n", encoding="utf-8")
+    _server(tmp_path, "lobby", {"server-port": port}, pid=live_pid)
+    _server(tmp_path, "survival", {"server-port": port})
+    check = PortAllocator.check
+
+    def check_locked(self: PortAllocator, name: str) -> List[str]:
+        # a concurrent start waits on this lock until the pid file of the one launching exists
+        assert admission._THREAD_LOCK.locked()  # pylint: disable=protected-access
+        return check(self, name)
+
+    monkeypatch.setattr(PortAllocator, "check", check_locked)
+    manager = ServerManager("survival", tmp_path)
+    with pytest.raises(PortAllocationError, match=f"server-port {port} is used by running server 'lobby'"):
+        with manager.admit(manager.load_meta()):
+            pass
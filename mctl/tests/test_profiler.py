@@ -0,0 +1,169 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from mctl.core.exceptions import ProfileError
+from mctl.core.servers import profiler
+from mctl.core.servers.profiler import JvmProfiler, _duration_ms, summarize_events
+
+FAKE_JCMD = Path(__file__).parents[1] / "benchmarks" / "fake_jcmd.py"
+
+
+def _script(path: Path, body: str) -> None:
+    path.write_text(f"#!/bin/sh\n{body}\n", encoding="utf-8")
+    path.chmod(0o755)
+
+
+@pytest.fixture
+def jdk(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """
+    A JDK bin directory first on PATH whose jcmd and jfr are benchmarks/fake_jcmd.py.
+    """
+    bin_dir = tmp_path / "jdk" / "bin"
+    bin_dir.mkdir(parents=True)
+    _script(bin_dir / "java", "exit 0")
+    for tool in ("jcmd", "jfr"):
+        _script(bin_dir / tool, f'exec "{sys.executable}" "{FAKE_JCMD}" "$@"')
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}")
+    return bin_dir
+
+
+@pytest.fixture
+def server(mctl_home: Path, jdk: Path) -> Iterator[Path]:  # pylint: disable=unused-argument
+    """
+    A running 'lobby' server; any live process will do, fake_jcmd only checks that the PID exists.
+    """
+    server_dir = mctl_home / "servers" / "lobby"
+    server_dir.mkdir()
+    (server_dir / "mctl.yaml").write_text("name: lobby\ntype: paper\n", encoding="utf-8")
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])  # pylint: disable=consider-using-with
+    (server_dir / "pid").write_text(str(process.pid), encoding="utf-8")
+    yield server_dir
+    process.kill()
+    process.wait()
+
+
+def test_jdk_tools_are_found_next_to_java(server: Path, jdk: Path) -> None:  # pylint: disable=unused-argument
+    jvm = JvmProfiler("lobby")
+    assert (jvm.jcmd, jvm.jfr) == (str(jdk / "jcmd"), str(jdk / "jfr"))
+
+
+def test_run(server: Path) -> None:  # pylint: disable=unused-argument
+    jvm = JvmProfiler("lobby")
+    assert "Full thread dump" in jvm._run("Thread.print", "-l")  # pylint: disable=protected-access
+
+
+def test_run_detects_errors_despite_exit_code_0(server: Path) -> None:  # pylint: disable=unused-argument
+    # jcmd exits 0 when the JVM rejects a command
+    with pytest.raises(ProfileError, match=r"(?s)jcmd VM.bogus failed for PID \d+: .*IllegalArgumentException: Unknown diagnostic command"):
+        JvmProfiler("lobby")._run("VM.bogus")  # pylint: disable=protected-access
+
+
+def test_run_fails_when_jcmd_cannot_attach(server: Path) -> None:  # pylint: disable=unused-argument
+    jvm = JvmProfiler("lobby")
+    gone = subprocess.Popen([sys.executable, "-c", ""])  # pylint: disable=consider-using-with
+    gone.wait()
+    jvm.pid = gone.pid
+    with pytest.raises(ProfileError, match="AttachNotSupportedException"):
+        jvm._run("Thread.print")  # pylint: disable=protected-access
+
+
+def test_run_server_not_running(server: Path) -> None:
+    (server / "pid").unlink()
+    with pytest.raises(ProfileError, match="not running"):
+        JvmProfiler("lobby")._run("Thread.print")  # pylint: disable=protected-access
+
+
+def test_run_jcmd_missing(server: Path, mctl_home: Path) -> None:  # pylint: disable=unused-argument
+    (mctl_home / "config.yaml").write_text(f"jcmd_path: {mctl_home / 'missing' / 'jcmd'}\n", encoding="utf-8")
+    with pytest.raises(ProfileError, match="jcmd not found .*set jcmd_path"):
+        JvmProfiler("lobby")._run("Thread.print")  # pylint: disable=protected-access
+
+
+def test_run_timeout(server: Path, jdk: Path) -> None:  # pylint: disable=unused-argument
+    _script(jdk / "jcmd", "sleep 10")
+    with pytest.raises(ProfileError, match="jcmd Thread.print did not answer within 0s"):
+        JvmProfiler("lobby")._run("Thread.print", timeout=0.2)  # pylint: disable=protected-access
+
+
+def test_record_and_summarize(server: Path) -> None:
+    jvm = JvmProfiler("lobby")
+    recording = jvm.record(0.3, thread_dump_interval=0.1)
+    assert Path(recording.jfr_path).parent == server / "profiles"
+    assert recording.seconds >= 0.3
+    assert recording.thread_dumps >= 2
+    assert Path(str(recording.thread_dumps_path)).read_text(encoding="utf-8").count("Full thread dump") == recording.thread_dumps
+
+    summary = jvm.summarize(Path(recording.jfr_path), recording.seconds)
+    recorded = json.loads(Path(recording.jfr_path).read_text(encoding="utf-8"))["seconds"]
+    assert summary.samples == int(recorded * 50) > 0
+    assert summary.hot_methods[0][0] == "net.minecraft.server.level.ServerLevel.tickChunk"
+    assert summary.gc_count == 1
+    assert summary.thread_cpu[0] == ("Server thread", pytest.approx(85.0))
+
+
+def test_record_stops_recording_when_interrupted(server: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    sleep = profiler.time.sleep
+
+    def interrupt(seconds: float) -> None:
+        # subprocess sleeps too while it waits for jcmd
+        if seconds == 60:
+            raise KeyboardInterrupt
+        sleep(seconds)
+
+    jvm = JvmProfiler("lobby")
+    with monkeypatch.context() as patch, pytest.raises(KeyboardInterrupt):
+        patch.setattr(profiler.time, "sleep", interrupt)
+        jvm.record(60)
+
+    # JFR.stop dumped the recording and the recording no longer exists in the JVM
+    (jfr_file,) = (server / "profiles").glob("*.jfr")
+    assert json.loads(jfr_file.read_text(encoding="utf-8"))["seconds"] < 60
+    with pytest.raises(ProfileError, match="Could not find recording"):
+        jvm._run("JFR.stop", f"name=mctl-{jfr_file.stem}")  # pylint: disable=protected-access
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, 0.0),
+    (2_500_000, 2.5),
+    ("PT0.012S", 12.0),
+    ("PT1M3.5S", 63_500.0),
+    ("PT1H", 3_600_000.0),
+    ("P1D", 0.0),
+    ("soon", 0.0),
+])
+def test_duration_ms(value: object, expected: float) -> None:
+    assert _duration_ms(value) == pytest.approx(expected)
+
+
+def _sample(owner: str, method: str) -> dict:
+    return {"type": "jdk.ExecutionSample", "values": {"stackTrace": {"frames": [{"method": {"type": {"name": owner}, "name": method}}]}}}
+
+
+def test_summarize_events() -> None:
+    events = [
+        _sample("net/minecraft/world/entity/Entity", "move"),
+        _sample("net/minecraft/world/entity/Entity", "move"),
+        _sample("java.util.HashMap", "getNode"),
+        {"type": "jdk.ExecutionSample", "values": {"stackTrace": {"frames": []}}},
+        {"type": "jdk.GarbageCollection", "values": {"sumOfPauses": "PT0.010S", "longestPause": "PT0.008S"}},
+        {"type": "jdk.GarbageCollection", "values": {"sumOfPauses": "PT0.030S", "longestPause": "PT0.025S"}},
+        {"type": "jdk.ObjectAllocationSample", "values": {"weight": 1024}},
+        {"type": "jdk.ObjectAllocationSample", "values": {"weight": 2048}},
+        {"type": "jdk.ThreadCPULoad", "values": {"eventThread": {"javaName": "Server thread"}, "user": 0.5, "system": 0.1}},
+        {"type": "jdk.ThreadCPULoad", "values": {"eventThread": {"javaName": "Server thread"}, "user": 0.7, "system": 0.1}},
+        {"type": "jdk.ThreadCPULoad", "values": {"eventThread": {"osName": "G1 Conc#0"}, "user": 0.2, "system": 0.0}},
+        {"type": "jdk.CPULoad", "values": {}},
+    ]
+    summary = summarize_events(events, 10.0, top=1)
+    assert summary.seconds == 10.0
+    assert summary.samples == 3
+    assert summary.hot_methods == [("net.minecraft.world.entity.Entity.move", 2)]
+    assert (summary.gc_count, summary.gc_pause_total_ms, summary.gc_pause_max_ms) == (2, pytest.approx(40.0), pytest.approx(25.0))
+    assert summary.allocated_bytes == 3072
+    assert summary.thread_cpu == [("Server thread", pytest.approx(70.0))]
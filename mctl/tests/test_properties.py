@@ -0,0 +1,99 @@
+import os
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from mctl.cli.config import app
+from mctl.core.servers import properties
+from mctl.core.servers.properties import Properties
+
+TEXT = """#Minecraft server properties
+#Fri Oct 16 10:00:00 UTC 2026
+! also a comment
+
+  motd = A Minecraft Server
+server-port:25565
+level\\:name=world
+max-players=20
+max-players=40
+"""
+
+
+def test_keeps_layout_of_untouched_lines() -> None:
+    props = Properties(TEXT)
+    assert props.keys() == ["motd", "server-port", "level\\:name", "max-players"]
+    assert props.get_many(["motd", "server-port", "level\\:name", "difficulty"]) == {
+        "motd": "A Minecraft Server", "server-port": "25565", "level\\:name": "world", "difficulty": None,
+    }
+    assert props.dumps() == TEXT
+    assert not props.set("motd", "A Minecraft Server") and not props.dirty
+
+
+def test_update_keeps_spacing() -> None:
+    props = Properties(TEXT)
+    assert props.update({"motd": "Lobby", "server-port": "25570", "difficulty": "hard"}) == {
+        "motd": ("A Minecraft Server", "Lobby"), "server-port": ("25565", "25570"), "difficulty": (None, "hard"),
+    }
+    lines = props.dumps().splitlines()
+    assert lines[4:6] == ["  motd = Lobby", "server-port:25570"]
+    assert lines[-1] == "difficulty=hard"
+    assert lines[:4] == TEXT.splitlines()[:4]
+
+
+def test_duplicate_keys() -> None:
+    props = Properties(TEXT)
+    # the last occurrence wins, as in Java
+    assert props.get("max-players") == "40"
+    # setting the value it already has still drops the earlier copy
+    assert not props.update({"max-players": "40"})
+    assert props.dirty
+    assert props.dumps().endswith("level\\:name=world\nmax-players=40\n")
+    props.set("max-players", "50")
+    assert props.dumps().count("max-players") == 1
+
+
+def test_crlf_is_kept(tmp_path: Path) -> None:
+    path = tmp_path / "server.properties"
+    path.write_bytes(TEXT.replace("\n", "\r\n").encode("utf-8"))
+    props = Properties.load(path)
+    props.set("difficulty", "hard")
+    props.save(path)
+    data = path.read_bytes()
+    assert data.endswith(b"max-players=40\r\ndifficulty=hard\r\n")
+    assert data.count(b"\n") == data.count(b"\r\n")
+
+
+def test_save_is_atomic(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "server.properties"
+    path.write_text(TEXT, encoding="utf-8")
+    path.chmod(0o640)
+    props = Properties.load(path)
+    props.set("motd", "Lobby")
+
+    def fail(src: str, dst: str) -> None:
+        raise OSError("disk full")
+
+    with monkeypatch.context() as m:
+        m.setattr(properties.os, "replace", fail)
+        with pytest.raises(OSError, match="disk full"):
+            props.save(path)
+    # readers only ever see the old or the new file, and nothing is left behind
+    assert path.read_text(encoding="utf-8") == TEXT
+    assert os.listdir(tmp_path) == ["server.properties"]
+    assert props.dirty
+
+    props.save(path)
+    assert "  motd = Lobby\n" in path.read_text(encoding="utf-8")
+    assert (path.stat().st_mode & 0o777, props.dirty) == (0o640, False)
+
+
+def test_apply_updates_each_server_once(mctl_home: Path, tmp_path: Path) -> None:
+    for name in ("lobby", "survival"):
+        (mctl_home / "servers" / name).mkdir()
+        (mctl_home / "servers" / name / "server.properties").write_text("motd=old\n", encoding="utf-8")
+    patch = tmp_path / "patch.yaml"
+    patch.write_text("motd: new\n", encoding="utf-8")
+    result = CliRunner().invoke(app, ["apply", str(patch), "--servers", "lobby,survival,lobby", "-s", "survival"])
+    assert result.exit_code == 0, result.output
+    assert result.output.splitlines() == ["[lobby] motd: old -> new", "[survival] motd: old -> new", "2/2 servers changed."]
@@ -0,0 +1,138 @@
+import subprocess
+import sys
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from mctl.core.exceptions import RconError
+from mctl.core.servers.manager import ServerManager
+from mctl.core.servers.rcon import MAX_FRAGMENT, RconClient, RconPool, server_command
+
+from tests.fake_rcon import FakeRconServer
+
+# a stand-in server process; it ignores SIGTERM, so only the RCON 'stop' (which kills it) ends it quickly
+IGNORE_SIGTERM = "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); time.sleep(60)"
+
+
+def _install(home: Path, name: str, server: FakeRconServer, password: str = "secret") -> Path:
+    server_dir = home / "servers" / name
+    server_dir.mkdir()
+    (server_dir / "server.properties").write_text(
+        f"enable-rcon=true\nrcon.port={server.port}\nrcon.password={password}\nserver-ip=127.0.0.1\n", encoding="utf-8")
+    return server_dir
+
+
+@pytest.fixture
+def process() -> Iterator[subprocess.Popen]:
+    proc = subprocess.Popen([sys.executable, "-c", IGNORE_SIGTERM])
+    yield proc
+    if proc.poll() is None:
+        proc.kill()
+    proc.wait()
+
+
+def test_command(rcon_server: FakeRconServer) -> None:
+    rcon_server.responses["list"] = "There are 0 of a max of 20 players online: "
+    with RconClient("127.0.0.1", rcon_server.port, "secret") as client:
+        assert client.command("list") == "There are 0 of a max of 20 players online: "
+    assert rcon_server.commands == ["list"]
+
+
+def test_auth_failure(rcon_server: FakeRconServer) -> None:
+    client = RconClient("127.0.0.1", rcon_server.port, "wrong")
+    with pytest.raises(RconError, match="authentication failed"):
+        client.connect()
+    assert not client.connected
+
+
+def test_connection_refused(rcon_server: FakeRconServer) -> None:
+    port = rcon_server.port
+    rcon_server.close()
+    with pytest.raises(RconError, match="Cannot connect"):
+        RconClient("127.0.0.1", port, "secret", timeout=1).connect()
+
+
+@pytest.mark.parametrize("size", [MAX_FRAGMENT - 1, MAX_FRAGMENT, MAX_FRAGMENT * 2 + 100])
+def test_multi_packet_response(rcon_server: FakeRconServer, size: int) -> None:
+    rcon_server.responses["help"] = "".join(chr(ord("a") + i % 26) for i in range(size))
+    with RconClient("127.0.0.1", rcon_server.port, "secret") as client:
+        assert client.command("help") == rcon_server.responses["help"]
+        # the sentinel's reply was consumed, the next command is answered in order
+        rcon_server.responses["seed"] = "Seed: [42]"
+        assert client.command("seed") == "Seed: [42]"
+
+
+def test_pool_reuses_connection(rcon_server: FakeRconServer) -> None:
+    pool = RconPool()
+    try:
+        for _ in range(3):
+            pool.command("127.0.0.1", rcon_server.port, "secret", "list")
+    finally:
+        pool.close()
+    assert rcon_server.connections == 1
+    assert rcon_server.commands == ["list"] * 3
+
+
+def test_pool_does_not_resend_without_retry(rcon_server: FakeRconServer) -> None:
+    rcon_server.close_on_stop = True
+    pool = RconPool()
+    try:
+        pool.command("127.0.0.1", rcon_server.port, "secret", "list")
+        with pytest.raises(RconError):
+            pool.command("127.0.0.1", rcon_server.port, "secret", "stop", retry=False)
+    finally:
+        pool.close()
+    assert rcon_server.commands == ["list", "stop"]
+
+
+def test_pool_reconnects_stale_connection(rcon_server: FakeRconServer) -> None:
+    rcon_server.responses["list"] = "ok"
+    pool = RconPool()
+    try:
+        pool.command("127.0.0.1", rcon_server.port, "secret", "list")
+        rcon_server.drop_connections()
+        assert pool.command("127.0.0.1", rcon_server.port, "secret", "list") == "ok"
+    finally:
+        pool.close()
+    assert rcon_server.connections == 2
+
+
+def test_server_command_requires_rcon(mctl_home: Path, rcon_server: FakeRconServer) -> None:
+    server_dir = _install(mctl_home, "lobby", rcon_server)
+    (server_dir / "server.properties").write_text("enable-rcon=false\n", encoding="utf-8")
+    with pytest.raises(RconError, match="not enabled"):
+        server_command("lobby", "list")
+
+
+@pytest.mark.parametrize("close_on_stop", [False, True])
+def test_stop_via_rcon(mctl_home: Path, rcon_server: FakeRconServer, process: subprocess.Popen, close_on_stop: bool) -> None:
+    server_dir = _install(mctl_home, "lobby", rcon_server)
+    (server_dir / "pid").write_text(str(process.pid), encoding="utf-8")
+    rcon_server.on_stop = process.kill
+    # 'stop' may close the connection before it answers
+    rcon_server.close_on_stop = close_on_stop
+
+    result = ServerManager("lobby").stop(timeout=10)
+
+    assert result.stopped
+    assert rcon_server.commands == ["save-all", "stop"]
+    # SIGTERM is ignored, so anything but the RCON path would have taken the whole timeout
+    assert result.seconds is not None and result.seconds < 10
+    assert not (server_dir / "pid").exists()
+
+
+def test_stop_falls_back_to_sigterm(mctl_home: Path, rcon_server: FakeRconServer, capsys: pytest.CaptureFixture) -> None:
+    server_dir = _install(mctl_home, "lobby", rcon_server, password="stale")
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    try:
+        (server_dir / "pid").write_text(str(proc.pid), encoding="utf-8")
+        result = ServerManager("lobby").stop(timeout=10)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+
+    assert result.stopped
+    assert rcon_server.commands == []
+    assert "sending SIGTERM" in capsys.readouterr().out
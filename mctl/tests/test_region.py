@@ -0,0 +1,145 @@
+import hashlib
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Set
+
+import pytest
+
+from mctl.core.exceptions import WorldError
+from mctl.core.world.manager import WorldManager
+from mctl.core.world.nbt import find_long
+from mctl.core.world.region import SECTOR_SIZE, compact, iter_chunks, read_header
+
+FIXTURES = Path(__file__).parent / "fixtures" / "world"
+# the chunks of fixtures/world/region/r.0.0.mca, see fixtures/make_regions.py
+READABLE = {0: 0, 1: 5000, 32: 2000, 33: 10}
+LZ4_CHUNK = 34
+CORRUPT = {35, 36}
+
+
+@pytest.fixture
+def world(mctl_home: Path) -> Path:
+    server_dir = mctl_home / "servers" / "lobby"
+    shutil.copytree(FIXTURES, server_dir / "world")
+    return server_dir / "world"
+
+
+def _digests(root: Path) -> Dict[str, str]:
+    return {p.relative_to(root).as_posix(): hashlib.sha256(p.read_bytes()).hexdigest() for p in sorted(root.rglob("*")) if p.is_file()}
+
+
+def _inhabited(path: Path) -> Dict[int, int]:
+    return {chunk.index: find_long(nbt, "InhabitedTime", ("Level",)) or 0 for chunk, nbt in iter_chunks(path) if nbt is not None}
+
+
+def test_read_header() -> None:
+    header = read_header(FIXTURES / "region" / "r.0.0.mca")
+    chunks = {c.index: c for c in header.chunks}
+    assert sorted(chunks) == [0, 1, 32, 33, 34, 35, 36]
+    assert (chunks[1].offset, chunks[1].sectors, chunks[1].timestamp) == (3, 2, 1700000001)
+    assert (chunks[32].x, chunks[32].z) == (0, 1)
+    assert all(chunks[i].length is None for i in CORRUPT)
+    assert header.file_size == 10 * SECTOR_SIZE
+    assert header.free_sectors == 1
+    assert header.slack_sectors == 1
+
+
+def test_read_header_of_truncated_file(tmp_path: Path) -> None:
+    path = tmp_path / "r.0.0.mca"
+    path.write_bytes(bytes(SECTOR_SIZE))
+    assert not read_header(path).chunks
+
+
+def test_iter_chunks() -> None:
+    nbt = {chunk.index: data for chunk, data in iter_chunks(FIXTURES / "region" / "r.0.0.mca")}
+    assert {i: find_long(nbt[i] or b"", "InhabitedTime", ("Level",)) for i in READABLE} == READABLE
+    assert nbt[LZ4_CHUNK] is None
+    assert all(nbt[i] is None for i in CORRUPT)
+
+
+def test_iter_chunks_external() -> None:
+    ((chunk, nbt),) = list(iter_chunks(FIXTURES / "region" / "r.-1.0.mca"))
+    assert chunk.index == 0
+    assert nbt is not None and find_long(nbt, "InhabitedTime") == 0
+
+
+@pytest.mark.usefixtures("world")
+def test_analyze(mctl_home: Path) -> None:
+    stats = {d.dimension: d for d in WorldManager("lobby", mctl_home).analyze()}
+    assert set(stats) == {"minecraft:overworld", "minecraft:the_nether"}
+    overworld = stats["minecraft:overworld"]
+    assert (overworld.path, overworld.regions, overworld.chunks) == ("world", 2, 8)
+    assert overworld.file_bytes == 13 * SECTOR_SIZE
+    assert overworld.free_bytes == SECTOR_SIZE
+    assert overworld.slack_bytes == SECTOR_SIZE
+    assert stats["minecraft:the_nether"].chunks == 1
+
+
+@pytest.mark.parametrize("drop", [set(), {0}, {1, 33}, set(READABLE) | {LZ4_CHUNK}])
+def test_compact_dry_run_matches(tmp_path: Path, drop: Set[int]) -> None:
+    path = tmp_path / "r.0.0.mca"
+    shutil.copy(FIXTURES / "region" / "r.0.0.mca", path)
+    original = path.read_bytes()
+
+    estimate = compact(path, drop, dry_run=True)
+    assert path.read_bytes() == original
+
+    result = compact(path, drop)
+    assert result == estimate
+    before, after, corrupt = result
+    assert before == len(original)
+    assert corrupt == len(CORRUPT)
+    if after == 0:
+        assert not path.exists()
+        return
+    assert path.stat().st_size == after
+
+    header = read_header(path)
+    assert header.free_sectors == 0
+    assert header.slack_sectors == 0
+    assert {c.index for c in header.chunks} == (set(READABLE) | {LZ4_CHUNK}) - drop
+    assert _inhabited(path) == {i: t for i, t in READABLE.items() if i not in drop}
+
+
+def test_compact_drops_external_chunk(tmp_path: Path) -> None:
+    shutil.copytree(FIXTURES / "region", tmp_path / "region")
+    path = tmp_path / "region" / "r.-1.0.mca"
+    assert compact(path, {0}) == (3 * SECTOR_SIZE, 0, 0)
+    assert not path.exists()
+    assert not (tmp_path / "region" / "c.-32.0.mcc").exists()
+
+
+def test_prune_dry_run_matches(world: Path, mctl_home: Path) -> None:
+    original = _digests(world)
+    planned = {r.path: r for r in WorldManager("lobby", mctl_home).prune(100, workers=1, dry_run=True)}
+    assert _digests(world) == original
+
+    pruned = {r.path: r for r in WorldManager("lobby", mctl_home).prune(100, workers=1)}
+    assert pruned == planned
+
+    region = pruned[str(world / "region" / "r.0.0.mca")]
+    # chunks 0 and 33 are below 100 ticks; the LZ4 one is unreadable and kept, the corrupt ones are unreadable and dropped
+    assert (region.chunks, region.removed, region.unreadable, region.corrupt) == (7, 2, 3, 2)
+    assert _inhabited(world / "region" / "r.0.0.mca") == {1: 5000, 32: 2000}
+    # the entities of a dropped chunk go with it
+    assert {c.index for c in read_header(world / "entities" / "r.0.0.mca").chunks} == {1}
+    # the only chunk of r.-1.0 was never visited: the region and its external chunk are gone
+    assert not (world / "region" / "r.-1.0.mca").exists()
+    assert not (world / "region" / "c.-32.0.mcc").exists()
+    assert (world / "DIM-1" / "region" / "r.0.0.mca").read_bytes() == (FIXTURES / "DIM-1" / "region" / "r.0.0.mca").read_bytes()
+
+
+def test_prune_refuses_running_server_of_its_home(tmp_path: Path) -> None:
+    # no mctl_home fixture: the pid file is only found through the manager's base path
+    home = tmp_path / "home"
+    shutil.copytree(FIXTURES, home / "servers" / "lobby" / "world")
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])  # pylint: disable=consider-using-with
+    (home / "servers" / "lobby" / "pid").write_text(str(process.pid), encoding="utf-8")
+    try:
+        with pytest.raises(WorldError, match="is running"):
+            WorldManager("lobby", home).prune(100, workers=1)
+    finally:
+        process.kill()
+        process.wait()
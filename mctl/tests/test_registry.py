@@ -0,0 +1,94 @@
+import os
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+import yaml
+
+from mctl.core.servers import registry as registry_module
+from mctl.core.servers.registry import ServerRegistry
+
+
+def _server(home: Path, name: str, **meta: Any) -> Path:
+    path = home / "servers" / name / "mctl.yaml"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(yaml.safe_dump({"type": "paper", "version": "1.21.1", **meta}), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def parsed(monkeypatch: pytest.MonkeyPatch) -> List[str]:
+    """
+    Record every mctl.yaml the registry parses.
+    """
+    calls: List[str] = []
+    safe_load = yaml.safe_load
+
+    def counting(stream: Any) -> Any:
+        calls.append(Path(stream.name).parent.name)
+        return safe_load(stream)
+    monkeypatch.setattr(registry_module.yaml, "safe_load", counting)
+    return calls
+
+
+def test_index_is_revalidated_by_mtime_and_size(tmp_path: Path, parsed: List[str]) -> None:
+    lobby = _server(tmp_path, "lobby", group="lobby")
+    _server(tmp_path, "survival")
+    ServerRegistry(tmp_path).update("lobby")
+    ServerRegistry(tmp_path).update("survival")
+    parsed.clear()
+
+    assert ServerRegistry(tmp_path).select("lobby") == ["lobby"]
+    assert not parsed
+
+    # same size, new mtime
+    st = lobby.stat()
+    lobby.write_text(lobby.read_text(encoding="utf-8").replace("lobby", "hub01"), encoding="utf-8")
+    os.utime(lobby, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert ServerRegistry(tmp_path).select("hub01") == ["lobby"]
+    assert parsed == ["lobby"]
+
+    # same mtime, new size
+    st = lobby.stat()
+    lobby.write_text(lobby.read_text(encoding="utf-8").replace("hub01", "hub"), encoding="utf-8")
+    os.utime(lobby, ns=(st.st_atime_ns, st.st_mtime_ns))
+    parsed.clear()
+    assert ServerRegistry(tmp_path).select("hub") == ["lobby"]
+    assert parsed == ["lobby"]
+
+
+def test_reads_do_not_write_the_index(tmp_path: Path, parsed: List[str]) -> None:
+    _server(tmp_path, "lobby")
+    ServerRegistry(tmp_path).update("lobby")
+    index = (tmp_path / "registry.json").read_bytes()
+    (tmp_path / ".registry.lock").unlink()
+
+    # added, edited and deleted by hand
+    _server(tmp_path, "survival", group="smp")
+    _server(tmp_path, "lobby", version="1.20.6")
+    parsed.clear()
+    registry = ServerRegistry(tmp_path)
+    assert [(s.name, s.version, s.group) for s in registry.list_servers()] == [("lobby", "1.20.6", None), ("survival", "1.21.1", "smp")]
+    assert sorted(parsed) == ["lobby", "survival"]
+    assert registry.names() == ["lobby", "survival"]
+    assert len(parsed) == 2
+
+    (tmp_path / "servers" / "survival" / "mctl.yaml").unlink()
+    assert ServerRegistry(tmp_path).names() == ["lobby"]
+    assert (tmp_path / "registry.json").read_bytes() == index
+    assert not (tmp_path / ".registry.lock").exists()
+
+
+def test_update_and_remove(tmp_path: Path) -> None:
+    _server(tmp_path, "lobby", memory="4G")
+    registry = ServerRegistry(tmp_path)
+    registry.update("lobby")
+    assert registry.get_info("lobby").memory == "4G"
+    assert registry.list_servers(server_type="PAPER", version="1.21.1", running=False)[0].name == "lobby"
+    assert not registry.list_servers(running=True)
+
+    registry.remove("lobby")
+    assert not registry.names()
+    assert b'"lobby"' not in (tmp_path / "registry.json").read_bytes()
+    with pytest.raises(FileNotFoundError):
+        registry.get_info("lobby")
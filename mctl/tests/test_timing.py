@@ -0,0 +1,81 @@
+import json
+import threading
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from mctl.cli import artifacts
+from mctl.cli.main import app
+from mctl.core.utils import timing
+
+
+@pytest.fixture
+def tracer(monkeypatch: pytest.MonkeyPatch) -> timing.Tracer:
+    monkeypatch.setattr(timing, "_TRACER", None)
+    return timing.enable()
+
+
+def test_phases_nest_in_order(tracer: timing.Tracer) -> None:
+    def worker() -> None:
+        with timing.span("download", version="1.21.1"):
+            pass
+
+    with timing.span("install"):
+        with timing.span("metadata"):
+            pass
+        thread = threading.Thread(target=worker, name="fetch")
+        thread.start()
+        thread.join()
+        for _ in range(2):
+            with timing.span("write properties"):
+                with timing.span("fsync"):
+                    pass
+    with timing.span("first start"):
+        pass
+
+    phases = tracer.phases()
+    # the worker's span has no parent in its own thread, it becomes a root of its own
+    assert [(p.name, p.depth, p.calls) for p in phases] == [
+        ("install", 0, 1), ("metadata", 1, 1), ("write properties", 1, 2), ("fsync", 2, 2), ("download", 0, 1), ("first start", 0, 1),
+    ]
+    install, write = phases[0], phases[2]
+    assert install.total_ms >= write.total_ms >= write.max_ms > 0
+
+
+def test_chrome_trace(tracer: timing.Tracer, tmp_path: Path) -> None:
+    with timing.span("install", version="1.21.1", build=132):
+        pass
+    path = tmp_path / "trace.json"
+    tracer.write_trace(path)
+    trace = json.loads(path.read_text(encoding="utf-8"))
+
+    (recorded,) = tracer.spans
+    assert trace["displayTimeUnit"] == "ms"
+    complete, thread_name = trace["traceEvents"]
+    assert complete == {
+        "name": "install", "cat": "mctl", "ph": "X", "pid": complete["pid"], "tid": recorded.thread_id,
+        "ts": recorded.start_ns / 1000, "dur": recorded.duration_ns / 1000, "args": {"version": "1.21.1", "build": "132"},
+    }
+    assert thread_name == {"name": "thread_name", "ph": "M", "pid": complete["pid"], "tid": recorded.thread_id, "args": {"name": "MainThread"}}
+
+
+def test_disabled_spans_record_nothing(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(timing, "_TRACER", None)
+    # the same no-op context manager every time, nothing is allocated
+    assert timing.span("install", version="1.21.1") is timing.span("metadata")
+    with timing.span("install"):
+        pass
+    assert timing._TRACER is None  # pylint: disable=protected-access
+
+
+def test_cli_traces_the_command(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(timing, "_TRACER", None)
+    monkeypatch.setattr(artifacts, "DEFAULT_HOME_PATH", tmp_path)
+    path = tmp_path / "trace.json"
+    result = CliRunner().invoke(app, ["--timings", "--trace", str(path), "artifacts", "list"])
+    assert result.exit_code == 0, result.output
+    assert "The artifact store is empty." in result.output
+    assert "mctl artifacts" in result.output.split("Timings", 1)[1]
+    events = json.loads(path.read_text(encoding="utf-8"))["traceEvents"]
+    assert [e["name"] for e in events if e["ph"] == "X"] == ["mctl artifacts"]
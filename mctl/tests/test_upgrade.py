@@ -0,0 +1,138 @@
+import errno
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+import pytest
+
+from mctl.core.exceptions import DaemonError
+from mctl.core.interfaces import StartResult, UpgradeResult
+from mctl.core.servers import upgrade
+from mctl.core.servers.lifecycle import start_server
+from mctl.core.servers.manager import ServerManager
+from mctl.core.servers.upgrade import UPGRADE_DIR, ServerUpgrader
+
+
+def test_plan_sees_running_servers_of_its_home(tmp_path: Path) -> None:
+    # no mctl_home fixture: the upgrader has to find pid files through its base path
+    home = tmp_path / "home"
+    for name in ("lobby", "survival"):
+        server_dir = home / "servers" / name
+        server_dir.mkdir(parents=True)
+        (server_dir / "mctl.yaml").write_text(f"name: {name}\ntype: vanilla\nversion: 1.21.1\n", encoding="utf-8")
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])  # pylint: disable=consider-using-with
+    (home / "servers" / "lobby" / "pid").write_text(str(process.pid), encoding="utf-8")
+
+    try:
+        results = {r.name: r for r in ServerUpgrader(home, offline=True).plan(["lobby", "survival"], "1.21.2")}
+    finally:
+        process.kill()
+        process.wait()
+    assert (results["lobby"].status, results["lobby"].to_version, results["lobby"].was_running) == ("planned", "1.21.2", True)
+    assert not results["survival"].was_running
+
+
+@pytest.fixture
+def upgrader(mctl_home: Path, fake_java: Path) -> Iterator[ServerUpgrader]:  # pylint: disable=unused-argument
+    yield ServerUpgrader(mctl_home, timeout=10)
+    for pid_file in (mctl_home / "servers").glob("*/pid"):
+        ServerManager(pid_file.parent.name, mctl_home).stop(timeout=5)
+
+
+def _install(home: Path, name: str, running: bool) -> Path:
+    server_dir = home / "servers" / name
+    server_dir.mkdir(parents=True)
+    (server_dir / "server.jar").write_bytes(b"PK\x03\x04old")
+    # the game port is allocated at the first start
+    (server_dir / "server.properties").write_text("motd=test\n", encoding="utf-8")
+    (server_dir / "mctl.yaml").write_text(f"name: {name}\ntype: vanilla\nversion: 1.21.1\njar: {server_dir / 'server.jar'}\n", encoding="utf-8")
+    if running:
+        assert ServerManager(name, home).start(timeout=10).ready
+    return server_dir
+
+
+def _roll_out(upgrader: ServerUpgrader, tmp_path: Path, names: List[str], jar: bytes) -> Dict[str, UpgradeResult]:
+    """
+    Stage a release whose server.jar holds jar for every server and roll it out.
+    """
+    release = tmp_path / "release"
+    release.mkdir()
+    (release / "server.jar").write_bytes(b"PK\x03\x04" + jar)
+    results = upgrader.plan(names, "1.21.2")
+    for result in results:
+        upgrader._stage_server(result.name, (release, "0" * 64, "server.jar"))  # pylint: disable=protected-access
+        result.status = "staged"
+    upgrader.roll_out(results)
+    return {r.name: r for r in results}
+
+
+def _state(home: Path, name: str) -> Tuple[bytes, str, bool]:
+    """The server's jar, the version in its mctl.yaml and whether it runs."""
+    manager = ServerManager(name, home)
+    return (manager.server_path / "server.jar").read_bytes(), str(manager.load_meta()["version"]), manager.pid() is not None
+
+
+def test_roll_out(upgrader: ServerUpgrader, mctl_home: Path, tmp_path: Path) -> None:
+    _install(mctl_home, "lobby", running=True)
+    _install(mctl_home, "survival", running=False)
+    results = _roll_out(upgrader, tmp_path, ["lobby", "survival"], b"new")
+
+    assert results["lobby"].status == results["survival"].status == "upgraded"
+    assert results["lobby"].was_running and results["lobby"].downtime is not None
+    assert _state(mctl_home, "lobby") == (b"PK\x03\x04new", "1.21.2", True)
+    assert _state(mctl_home, "survival") == (b"PK\x03\x04new", "1.21.2", False)
+    assert not list(mctl_home.glob(f"servers/*/{UPGRADE_DIR}"))
+
+
+def test_roll_back_and_halt_later_waves(upgrader: ServerUpgrader, mctl_home: Path, tmp_path: Path) -> None:
+    for name in ("a-lobby", "b-lobby"):
+        _install(mctl_home, name, running=True)
+    _install(mctl_home, "survival", running=False)
+    results = _roll_out(upgrader, tmp_path, ["a-lobby", "b-lobby", "survival"], b"crash")
+
+    # the first wave rolled back and started on the old files again, nothing else was touched
+    assert (results["a-lobby"].status, results["a-lobby"].error) == ("rolled back", "not ready on 1.21.2")
+    assert results["b-lobby"].status == results["survival"].status == "skipped"
+    assert _state(mctl_home, "a-lobby") == (b"PK\x03\x04old", "1.21.1", True)
+    assert _state(mctl_home, "b-lobby") == (b"PK\x03\x04old", "1.21.1", True)
+    assert _state(mctl_home, "survival") == (b"PK\x03\x04old", "1.21.1", False)
+    assert not list(mctl_home.glob(f"servers/*/{UPGRADE_DIR}"))
+
+
+def test_failed_roll_back_keeps_previous_files(upgrader: ServerUpgrader, mctl_home: Path, tmp_path: Path,
+                                                monkeypatch: pytest.MonkeyPatch) -> None:
+    server_dir = _install(mctl_home, "lobby", running=True)
+    replace = os.replace
+
+    def failing_replace(src: Path, dst: Path) -> None:
+        if f"{UPGRADE_DIR}/previous/" in str(src):
+            raise OSError(errno.EIO, "Input/output error")
+        replace(src, dst)
+
+    monkeypatch.setattr(upgrade.os, "replace", failing_replace)
+    result = _roll_out(upgrader, tmp_path, ["lobby"], b"crash")["lobby"]
+    monkeypatch.undo()
+
+    assert result.status == "failed"
+    assert "restoring the previous files failed" in str(result.error)
+    assert (server_dir / UPGRADE_DIR / "previous" / "server.jar").read_bytes() == b"PK\x03\x04old"
+
+
+def test_restart_after_error(upgrader: ServerUpgrader, mctl_home: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    _install(mctl_home, "lobby", running=True)
+    calls = []
+
+    def flaky_start(name: str, **kwargs: Any) -> StartResult:
+        calls.append(name)
+        if len(calls) == 1:
+            raise DaemonError("mctld went away")
+        return start_server(name, **kwargs)
+
+    monkeypatch.setattr(upgrade, "start_server", flaky_start)
+    result = _roll_out(upgrader, tmp_path, ["lobby"], b"new")["lobby"]
+
+    assert (result.status, result.error) == ("failed", "mctld went away")
+    assert _state(mctl_home, "lobby") == (b"PK\x03\x04old", "1.21.1", True)
+    assert not (mctl_home / "servers" / "lobby" / UPGRADE_DIR).exists()
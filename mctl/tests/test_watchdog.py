@@ -0,0 +1,138 @@
+import asyncio
+import signal
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, cast
+
+import pytest
+
+from mctl.core.daemon.supervisor import ManagedServer, Supervisor
+from mctl.core.daemon.watchdog import Watchdog
+from mctl.core.interfaces import StartResult, StopResult
+from mctl.core.settings import SETTINGS_DEFAULTS
+
+LAG = "[Server thread/WARN]: Can't keep up! Is the server overloaded? Running {ms}ms or {ticks} ticks behind"
+
+
+class _Supervisor:
+    """Records what the watchdog asks of the supervisor."""
+
+    def __init__(self, base_path: Path):
+        self.base_path = base_path
+        self.servers: Dict[str, ManagedServer] = {}
+        self.calls: List[Tuple[str, str, Any]] = []
+
+    async def op_stop(self, name: str, timeout: Optional[float] = None) -> StopResult:
+        self.calls.append(("stop", name, timeout))
+        return StopResult(name=name, stopped=True)
+
+    async def op_start(self, name: str, wait: bool = True) -> StartResult:
+        self.calls.append(("start", name, wait))
+        return StartResult(name=name, started=True, ready=False)
+
+
+class _Process:
+    def __init__(self) -> None:
+        self.signals: List[int] = []
+
+    def send_signal(self, sig: int) -> None:
+        self.signals.append(sig)
+
+
+@pytest.fixture
+def supervisor(tmp_path: Path) -> _Supervisor:
+    server_dir = tmp_path / "servers" / "lobby"
+    server_dir.mkdir(parents=True)
+    (server_dir / "mctl.yaml").write_text("type: paper\nwatchdog_lag_ms: 5000\nwatchdog_window: 60\n", encoding="utf-8")
+    return _Supervisor(tmp_path)
+
+
+def _server() -> Tuple[ManagedServer, _Process]:
+    server = ManagedServer("lobby")
+    process = _Process()
+    server.process = cast(Any, process)
+    return server, process
+
+
+def _settings(**overrides: Any) -> Dict[str, Any]:
+    return {**{key: value for key, value in SETTINGS_DEFAULTS.items() if key.startswith("watchdog_")}, "watchdog_deadline": 30, **overrides}
+
+
+def test_alert_once_per_problem(supervisor: _Supervisor) -> None:
+    watchdog = Watchdog(cast(Supervisor, supervisor))
+    server, process = _server()
+
+    async def act() -> None:
+        for now in (100, 115, 200):
+            await watchdog._act(server, "lag", "8000 ms behind within 60s", _settings(), now)  # pylint: disable=protected-access
+
+    asyncio.run(act())
+    assert [(a.kind, a.action) for a in server.alerts] == [("lag", "alert")]
+    assert (server.problems, process.signals, supervisor.calls) == ({"lag": 100}, [], [])
+
+
+def test_off_and_unknown_actions(supervisor: _Supervisor) -> None:
+    watchdog = Watchdog(cast(Supervisor, supervisor))
+    server, _ = _server()
+
+    async def act() -> None:
+        await watchdog._act(server, "lag", "behind", _settings(watchdog_lag_action="off"), 100)  # pylint: disable=protected-access
+        assert not server.alerts and not server.problems
+        await watchdog._act(server, "hang", "silent", _settings(watchdog_hang_action="reboot"), 100)  # pylint: disable=protected-access
+
+    asyncio.run(act())
+    assert [(a.kind, a.action) for a in server.alerts] == [("hang", "alert")]
+
+
+def test_restart_stops_within_the_deadline(supervisor: _Supervisor) -> None:
+    watchdog = Watchdog(cast(Supervisor, supervisor))
+    server, _ = _server()
+
+    async def act() -> None:
+        await watchdog._act(server, "hang", "silent", _settings(watchdog_hang_action="restart"), 100)  # pylint: disable=protected-access
+        await asyncio.gather(*watchdog._tasks)  # pylint: disable=protected-access
+
+    asyncio.run(act())
+    assert supervisor.calls == [("stop", "lobby", 30.0), ("start", "lobby", False)]
+
+
+def test_kill_after_the_deadline(supervisor: _Supervisor) -> None:
+    watchdog = Watchdog(cast(Supervisor, supervisor))
+    server, process = _server()
+
+    async def act(now: float) -> None:
+        await watchdog._act(server, "hang", "silent", _settings(watchdog_hang_action="kill"), now)  # pylint: disable=protected-access
+
+    asyncio.run(act(100))
+    asyncio.run(act(129))
+    assert not process.signals
+    asyncio.run(act(130))
+    assert process.signals == [signal.SIGKILL]
+    assert [a.detail for a in server.alerts] == ["silent", "still silent after 30s, killed"]
+
+
+def test_hook_gets_the_alert(supervisor: _Supervisor, tmp_path: Path) -> None:
+    watchdog = Watchdog(cast(Supervisor, supervisor))
+    server, _ = _server()
+    out = tmp_path / "hook.txt"
+    hook = f'echo "$MCTL_SERVER $MCTL_EVENT $MCTL_ACTION $MCTL_DETAIL" > {out}'
+
+    async def act() -> None:
+        await watchdog._act(server, "lag", "8000 ms behind", _settings(watchdog_hook=hook), 100)  # pylint: disable=protected-access
+        await asyncio.gather(*watchdog._tasks)  # pylint: disable=protected-access
+
+    asyncio.run(act())
+    assert out.read_text(encoding="utf-8") == "lobby lag alert 8000 ms behind\n"
+
+
+def test_check_uses_server_settings_and_sees_recovery(supervisor: _Supervisor) -> None:
+    watchdog = Watchdog(cast(Supervisor, supervisor))
+    server, _ = _server()
+    server.lag.feed(LAG.format(ms=6000, ticks=120), 100)
+
+    asyncio.run(watchdog.check(server, 110))
+    assert server.lag.window == 60
+    assert [(a.kind, a.detail) for a in server.alerts] == [("lag", "6000 ms behind within 60s")]
+    # the warning left the window and the server kept logging
+    server.lag.feed("[Server thread/INFO]: Steve joined the game", 170)
+    asyncio.run(watchdog.check(server, 170))
+    assert not server.problems